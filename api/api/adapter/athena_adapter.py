@@ -1,6 +1,5 @@
 import re
-from time import sleep
-from typing import Callable, Dict
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 import awswrangler as wr
 import boto3
@@ -8,7 +7,14 @@ from awswrangler.exceptions import QueryFailed
 from botocore.exceptions import ClientError
 from pandas import DataFrame
 
+from api.adapter.athena_admission_controller import AthenaAdmissionController
+from api.adapter.athena_query_poller import AthenaQueryPoller
 from api.common.config.aws import ATHENA_DATABASE, ATHENA_WORKGROUP, OUTPUT_QUERY_BUCKET
+from api.common.config.constants import (
+    ATHENA_QUERY_TIMEOUT_SECONDS,
+    QUERY_PAGE_SIZE_LIMIT,
+    QUERY_STREAM_CHUNK_SIZE,
+)
 from api.common.custom_exceptions import AWSServiceError, QueryExecutionError, UserError
 from api.common.logger import AppLogger
 from api.domain.dataset_metadata import DatasetMetadata
@@ -25,93 +31,185 @@ class AthenaAdapter:
             [str, str], DataFrame
         ] = wr.athena.read_sql_query,
         athena_client=boto3.client("athena"),
+        query_poller=AthenaQueryPoller(),
+        admission_controller=AthenaAdmissionController(),
     ):
         self.__database = database
         self.__workgroup = workgroup
         self.__s3_output = s3_output
         self.__athena_read_sql_query = athena_read_sql_query
         self.__athena_client = athena_client
+        self.__query_poller = query_poller
+        self.__admission_controller = admission_controller
 
     def query(
         self,
         dataset: DatasetMetadata,
         query: SQLQuery,
+        subject_id: Optional[str] = None,
     ) -> DataFrame:
         table_name = dataset.glue_table_name()
-        return self.query_sql(query.to_sql(table_name))
+        return self.query_sql(query.to_sql(table_name), subject_id)
 
-    def query_sql(self, query_string: str) -> DataFrame:
-        try:
-            return self.__athena_read_sql_query(
-                sql=query_string,
-                database=self.__database,
-                ctas_approach=False,
-                workgroup=self.__workgroup,
-                s3_output=self.__s3_output,
-            )
-        except QueryFailed as error:
-            self._handle_query_error(error)
-        except ClientError as error:
-            self._handle_client_error(error)
+    def query_sql(
+        self, query_string: str, subject_id: Optional[str] = None
+    ) -> DataFrame:
+        with self.__admission_controller.admit(subject_id, interactive=True):
+            try:
+                return self.__athena_read_sql_query(
+                    sql=query_string,
+                    database=self.__database,
+                    ctas_approach=False,
+                    workgroup=self.__workgroup,
+                    s3_output=self.__s3_output,
+                )
+            except QueryFailed as error:
+                self._handle_query_error(error)
+            except ClientError as error:
+                self._handle_client_error(error)
+
+    def query_sql_in_chunks(
+        self,
+        query_string: str,
+        subject_id: Optional[str] = None,
+        chunk_size: int = QUERY_STREAM_CHUNK_SIZE,
+    ) -> Iterator[DataFrame]:
+        """
+        Waits for the query to complete, then reads the result `chunk_size` rows at a time as the
+        returned iterator is consumed
+        """
+        with self.__admission_controller.admit(subject_id, interactive=True):
+            try:
+                return self.__athena_read_sql_query(
+                    sql=query_string,
+                    database=self.__database,
+                    ctas_approach=False,
+                    workgroup=self.__workgroup,
+                    s3_output=self.__s3_output,
+                    chunksize=chunk_size,
+                )
+            except QueryFailed as error:
+                self._handle_query_error(error)
+            except ClientError as error:
+                self._handle_client_error(error)
 
-    def query_async(self, dataset: DatasetMetadata, query: SQLQuery) -> Dict[str, str]:
+    def query_async(
+        self,
+        dataset: DatasetMetadata,
+        query: SQLQuery,
+        subject_id: Optional[str] = None,
+    ) -> Dict[str, str]:
         """
         :return: QueryExecutionId from Athena
         """
         table_name = dataset.glue_table_name()
-        return self.query_sql_async(query.to_sql(table_name))
+        return self.query_sql_async(query.to_sql(table_name), subject_id)
 
-    def query_sql_async(self, query_string: str) -> Dict[str, str]:
+    def query_sql_async(
+        self, query_string: str, subject_id: Optional[str] = None
+    ) -> Dict[str, str]:
         """
+        Starts the query once it is admitted as a background query, which holds its admission
+        until the query execution has finished
         :return: QueryExecutionId from Athena
         """
+        ticket = self.__admission_controller.acquire(subject_id, interactive=False)
         try:
-            return self.__athena_client.start_query_execution(
+            query_execution_id = self.__athena_client.start_query_execution(
                 QueryString=query_string,
                 WorkGroup=self.__workgroup,
                 QueryExecutionContext={"Database": self.__database},
                 ResultConfiguration={"OutputLocation": self.__s3_output},
             )["QueryExecutionId"]
-        except QueryFailed as error:
-            self._handle_query_error(error)
+        except Exception as error:
+            self.__admission_controller.release(ticket)
+            if isinstance(error, QueryFailed):
+                self._handle_query_error(error)
+            if isinstance(error, ClientError):
+                self._handle_client_error(error)
+            raise error
+        self.__query_poller.watch(
+            query_execution_id, lambda: self.__admission_controller.release(ticket)
+        )
+        return query_execution_id
+
+    def admission_metrics(self) -> Dict[str, float]:
+        return self.__admission_controller.metrics()
+
+    def wait_for_query_to_complete(
+        self, query_execution_id: str, timeout: float = ATHENA_QUERY_TIMEOUT_SECONDS
+    ) -> None:
+        query_execution = self.__query_poller.wait(query_execution_id, timeout)
+        if query_execution is None:
+            AppLogger.error(
+                f"Timed out after {timeout}s when waiting for query with ID {query_execution_id} to complete"
+            )
+            raise AWSServiceError("Query took too long to execute")
+
+        status = query_execution.get("Status", {})
+        if status.get("State") != "SUCCEEDED":
+            reason = status.get("StateChangeReason", "Unknown error occurred")
+            AppLogger.error(f"Query {query_execution_id} failed to complete")
+            raise QueryExecutionError(f"Query did not complete: {reason}")
+
+    def get_query_execution(self, query_execution_id: str) -> Dict:
+        try:
+            return self.__athena_client.get_query_execution(
+                QueryExecutionId=query_execution_id
+            )["QueryExecution"]
         except ClientError as error:
             self._handle_client_error(error)
 
-    def wait_for_query_to_complete(self, query_execution_id: str) -> None:
-        retry_interval_seconds = 30
-        num_retries = 8
+    def get_query_results_page(
+        self,
+        query_execution_id: str,
+        page_size: int,
+        next_token: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Optional[str]]], Optional[str]]:
+        """
+        Reads one page of the results of a finished query execution, without reading the pages
+        before it
+        :return: The rows of the page and the token of the next page, None after the last page
+        """
+        request = {"QueryExecutionId": query_execution_id}
+        if next_token is None:
+            # The first page starts with a row of the column names
+            request["MaxResults"] = min(page_size + 1, QUERY_PAGE_SIZE_LIMIT)
+        else:
+            request["MaxResults"] = page_size
+            request["NextToken"] = next_token
+        response = self._get_query_results(**request)
 
-        while num_retries > 0:
-            try:
-                response = self.__athena_client.get_query_execution(
-                    QueryExecutionId=query_execution_id
-                )
-                state = (
-                    response.get("QueryExecution", {})
-                    .get("Status", {})
-                    .get("State", None)
+        columns = [
+            column["Name"]
+            for column in response["ResultSet"]["ResultSetMetadata"]["ColumnInfo"]
+        ]
+        rows = response["ResultSet"]["Rows"]
+        next_page_token = response.get("NextToken")
+        if next_token is None:
+            rows = rows[1:]
+            if len(rows) < page_size and next_page_token is not None:
+                # Athena's limit leaves no room for the last rows of a full first page
+                response = self._get_query_results(
+                    QueryExecutionId=query_execution_id,
+                    MaxResults=page_size - len(rows),
+                    NextToken=next_page_token,
                 )
+                rows = rows + response["ResultSet"]["Rows"]
+                next_page_token = response.get("NextToken")
+        return [
+            {
+                column: value.get("VarCharValue")
+                for column, value in zip(columns, row["Data"])
+            }
+            for row in rows
+        ], next_page_token
 
-                if state == "SUCCEEDED":
-                    return
-                elif state in ["FAILED", "CANCELLED"]:
-                    reason = (
-                        response.get("QueryExecution", {})
-                        .get("Status", {})
-                        .get("StateChangeReason", "Unknown error occurred")
-                    )
-                    AppLogger.error(f"Query {query_execution_id} failed to complete")
-                    raise QueryExecutionError(f"Query did not complete: {reason}")
-            except ClientError:
-                pass
-            num_retries -= 1
-            sleep(retry_interval_seconds)
-            retry_interval_seconds *= 2
-
-        AppLogger.error(
-            f"Retries exhausted when waiting for query with ID {query_execution_id} to complete"
-        )
-        raise AWSServiceError("Query took too long to execute")
+    def _get_query_results(self, **request) -> Dict:
+        try:
+            return self.__athena_client.get_query_results(**request)
+        except ClientError as error:
+            self._handle_client_error(error)
 
     def _handle_client_error(self, error):
         if error.response["Error"]["Code"] == "InvalidRequestException":
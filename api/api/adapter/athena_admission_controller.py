@@ -0,0 +1,218 @@
+import itertools
+import time
+from contextlib import contextmanager
+from threading import Condition
+from typing import Callable, Dict, Iterator, List, Optional
+
+from api.common.config.constants import (
+    ATHENA_ADMISSION_REPLICAS,
+    ATHENA_ADMISSION_TIMEOUT_SECONDS,
+    ATHENA_INTERACTIVE_RESERVED_QUERIES,
+    ATHENA_MAX_CONCURRENT_QUERIES,
+    ATHENA_MAX_CONCURRENT_QUERIES_PER_SUBJECT,
+)
+from api.common.custom_exceptions import TooManyRequestsError
+from api.common.logger import AppLogger
+
+
+class QueryTicket:
+    def __init__(
+        self,
+        subject_id: Optional[str],
+        interactive: bool,
+        start_tag: float,
+        sequence: int,
+        enqueued: float,
+    ):
+        self.subject_id = subject_id
+        self.interactive = interactive
+        self.start_tag = start_tag
+        self.sequence = sequence
+        self.enqueued = enqueued
+        self.admitted = False
+        self.released = False
+
+
+class AthenaAdmissionController:
+    """
+    Shares the concurrent queries of the Athena workgroup between subjects. At most
+    `max_concurrency` queries run at a time, and at most `max_concurrency_per_subject` of them for
+    one subject. Waiting queries are admitted in weighted fair order across subjects, using the
+    start time fair queueing of each subject's queries. Interactive queries are admitted before
+    background ones, and `interactive_reserved` of the slots are only used by interactive queries.
+
+    The queries are only counted within this process. When `replicas` processes query the same
+    workgroup, each of them is given an equal share of the limits so that together they stay
+    within them.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = ATHENA_MAX_CONCURRENT_QUERIES,
+        max_concurrency_per_subject: int = ATHENA_MAX_CONCURRENT_QUERIES_PER_SUBJECT,
+        interactive_reserved: int = ATHENA_INTERACTIVE_RESERVED_QUERIES,
+        timeout: float = ATHENA_ADMISSION_TIMEOUT_SECONDS,
+        subject_weights: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        replicas: int = ATHENA_ADMISSION_REPLICAS,
+    ):
+        replicas = max(replicas, 1)
+        self.max_concurrency = max(max_concurrency // replicas, 1)
+        self.max_concurrency_per_subject = max(
+            max_concurrency_per_subject // replicas, 1
+        )
+        self.interactive_reserved = min(
+            interactive_reserved // replicas, self.max_concurrency - 1
+        )
+        self.timeout = timeout
+        self.subject_weights = subject_weights or {}
+        self.clock = clock
+        self._condition = Condition()
+        self._sequence = itertools.count()
+        self._queued: List[QueryTicket] = []
+        self._running = 0
+        self._running_by_subject: Dict[Optional[str], int] = {}
+        self._virtual_time = 0.0
+        self._finish_tags: Dict[Optional[str], float] = {}
+        self._admitted = 0
+        self._rejected = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    @contextmanager
+    def admit(
+        self, subject_id: Optional[str], interactive: bool = True
+    ) -> Iterator[QueryTicket]:
+        ticket = self.acquire(subject_id, interactive)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def acquire(self, subject_id: Optional[str], interactive: bool) -> QueryTicket:
+        """
+        Waits until the query can run, raising TooManyRequestsError if it has not been admitted
+        within the timeout. The returned ticket must be released once the query has finished.
+        """
+        with self._condition:
+            ticket = self._enqueue(subject_id, interactive)
+            deadline = ticket.enqueued + self.timeout
+            self._admit_queued()
+            while not ticket.admitted:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    self._queued.remove(ticket)
+                    self._rejected += 1
+                    AppLogger.warning(
+                        f"Rejected an Athena query of subject {subject_id} after waiting {self.timeout}s"
+                    )
+                    raise TooManyRequestsError(
+                        "There are too many queries running, please try again later"
+                    )
+                self._condition.wait(remaining)
+        return ticket
+
+    def release(self, ticket: QueryTicket) -> None:
+        with self._condition:
+            if ticket.released or not ticket.admitted:
+                return
+            ticket.released = True
+            self._running -= 1
+            self._running_by_subject[ticket.subject_id] -= 1
+            if not self._running_by_subject[ticket.subject_id]:
+                del self._running_by_subject[ticket.subject_id]
+            self._admit_queued()
+
+    def metrics(self) -> Dict[str, float]:
+        with self._condition:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "running": self._running,
+                "queued_interactive": sum(
+                    1 for ticket in self._queued if ticket.interactive
+                ),
+                "queued_background": sum(
+                    1 for ticket in self._queued if not ticket.interactive
+                ),
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "wait_seconds_total": round(self._wait_seconds_total, 3),
+                "wait_seconds_max": round(self._wait_seconds_max, 3),
+            }
+
+    def _enqueue(self, subject_id: Optional[str], interactive: bool) -> QueryTicket:
+        start_tag = max(self._virtual_time, self._finish_tags.get(subject_id, 0.0))
+        self._finish_tags[subject_id] = start_tag + 1 / self.subject_weights.get(
+            subject_id, 1.0
+        )
+        ticket = QueryTicket(
+            subject_id, interactive, start_tag, next(self._sequence), self.clock()
+        )
+        self._queued.append(ticket)
+        return ticket
+
+    def _admit_queued(self) -> None:
+        admitted = False
+        while True:
+            ticket = self._next_admissible()
+            if ticket is None:
+                break
+            self._queued.remove(ticket)
+            self._start(ticket)
+            admitted = True
+        if admitted:
+            self._condition.notify_all()
+
+    def _next_admissible(self) -> Optional[QueryTicket]:
+        if self._running >= self.max_concurrency:
+            return None
+        background_allowed = (
+            self._running < self.max_concurrency - self.interactive_reserved
+        )
+        candidates = [
+            ticket
+            for ticket in self._queued
+            if (ticket.interactive or background_allowed)
+            and not self._subject_at_limit(ticket.subject_id)
+        ]
+        if not candidates:
+            return None
+        return min(
+            candidates,
+            key=lambda ticket: (
+                not ticket.interactive,
+                ticket.start_tag,
+                ticket.sequence,
+            ),
+        )
+
+    def _subject_at_limit(self, subject_id: Optional[str]) -> bool:
+        # Queries run by the API itself have no subject and are only limited in total
+        return (
+            subject_id is not None
+            and self._running_by_subject.get(subject_id, 0)
+            >= self.max_concurrency_per_subject
+        )
+
+    def _start(self, ticket: QueryTicket) -> None:
+        ticket.admitted = True
+        self._running += 1
+        self._running_by_subject[ticket.subject_id] = (
+            self._running_by_subject.get(ticket.subject_id, 0) + 1
+        )
+        self._virtual_time = max(self._virtual_time, ticket.start_tag)
+        # Subjects without queries beyond the virtual time start from it again
+        self._finish_tags = {
+            subject_id: finish_tag
+            for subject_id, finish_tag in self._finish_tags.items()
+            if finish_tag > self._virtual_time
+        }
+
+        waited = self.clock() - ticket.enqueued
+        self._admitted += 1
+        self._wait_seconds_total += waited
+        self._wait_seconds_max = max(self._wait_seconds_max, waited)
+        if waited >= 1:
+            AppLogger.info(
+                f"Athena query of subject {ticket.subject_id} waited {waited:.1f}s to run"
+            )
@@ -0,0 +1,201 @@
+import time
+from threading import Condition, Event, Thread
+from typing import Callable, Dict, List, Optional
+
+import boto3
+
+from api.common.config.constants import (
+    ATHENA_POLL_BACKOFF_FACTOR,
+    ATHENA_POLL_BATCH_SIZE,
+    ATHENA_POLL_MAX_INTERVAL_SECONDS,
+    ATHENA_POLL_MIN_INTERVAL_SECONDS,
+    ATHENA_QUERY_TIMEOUT_SECONDS,
+)
+from api.common.logger import AppLogger
+
+FINISHED_QUERY_STATES = {"SUCCEEDED", "FAILED", "CANCELLED"}
+
+
+class _PendingExecution:
+    def __init__(self, started: float):
+        self.started = started
+        self.next_poll = started
+        self.result: Optional[Dict] = None
+        self.finished = Event()
+        self.callbacks: List[Callable[[], None]] = []
+
+
+class AthenaQueryPoller:
+    """
+    Waits for Athena query executions on a single background thread, which checks every outstanding
+    execution of the process with one batch request. Each execution is checked more often while it
+    is new, backing off in proportion to how long it has been running for. Executions that have not
+    finished after `max_lifetime` seconds are no longer waited for, and their callbacks are called.
+    """
+
+    def __init__(
+        self,
+        athena_client=boto3.client("athena"),
+        min_interval: float = ATHENA_POLL_MIN_INTERVAL_SECONDS,
+        max_interval: float = ATHENA_POLL_MAX_INTERVAL_SECONDS,
+        backoff_factor: float = ATHENA_POLL_BACKOFF_FACTOR,
+        batch_size: int = ATHENA_POLL_BATCH_SIZE,
+        max_lifetime: float = ATHENA_QUERY_TIMEOUT_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.athena_client = athena_client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.batch_size = batch_size
+        self.max_lifetime = max_lifetime
+        self.clock = clock
+        self._pending: Dict[str, _PendingExecution] = {}
+        self._condition = Condition()
+        self._thread: Optional[Thread] = None
+
+    def wait(self, query_execution_id: str, timeout: float) -> Optional[Dict]:
+        """
+        :return: The finished query execution, or None if it did not finish within the timeout
+        """
+        execution = self._register(query_execution_id)
+        self._start()
+
+        if not execution.finished.wait(timeout):
+            with self._condition:
+                if not execution.callbacks:
+                    self._pending.pop(query_execution_id, None)
+            return None
+        return execution.result
+
+    def watch(self, query_execution_id: str, on_finished: Callable[[], None]) -> None:
+        """
+        Calls `on_finished` from the poller thread once the execution has finished, or has been
+        watched for longer than the maximum lifetime, without waiting for it
+        """
+        execution = self._register(query_execution_id)
+        with self._condition:
+            execution.callbacks.append(on_finished)
+        self._start()
+
+    def poll(self) -> None:
+        """
+        Checks the state of every execution that is due to be checked
+        """
+        now = self.clock()
+        with self._condition:
+            due = [
+                query_execution_id
+                for query_execution_id, execution in self._pending.items()
+                if execution.next_poll <= now
+            ]
+        for start in range(0, len(due), self.batch_size):
+            end = start + self.batch_size
+            self._poll_batch(due[start:end])
+
+    def next_interval(self, running_for: float) -> float:
+        return min(
+            max(running_for * self.backoff_factor, self.min_interval),
+            self.max_interval,
+        )
+
+    def _start(self) -> None:
+        with self._condition:
+            if self._thread is None:
+                self._thread = Thread(
+                    target=self._run, name="athena-query-poller", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+
+    def _register(self, query_execution_id: str) -> _PendingExecution:
+        with self._condition:
+            execution = self._pending.get(query_execution_id)
+            if execution is None:
+                execution = _PendingExecution(self.clock())
+                self._pending[query_execution_id] = execution
+            return execution
+
+    def _poll_batch(self, query_execution_ids: List[str]) -> None:
+        try:
+            response = self.athena_client.batch_get_query_execution(
+                QueryExecutionIds=query_execution_ids
+            )
+        except Exception as error:
+            # The executions are checked again at their next interval
+            AppLogger.warning(f"Failed to check the state of Athena queries: {error}")
+            response = {}
+        # Athena does not return the executions it could not find, such as expired ones
+        query_executions = {
+            unprocessed["QueryExecutionId"]: {
+                "QueryExecutionId": unprocessed["QueryExecutionId"],
+                "Status": {
+                    "State": "FAILED",
+                    "StateChangeReason": unprocessed.get("ErrorMessage", ""),
+                },
+            }
+            for unprocessed in response.get("UnprocessedQueryExecutionIds", [])
+        }
+        query_executions.update(
+            {
+                query_execution["QueryExecutionId"]: query_execution
+                for query_execution in response.get("QueryExecutions", [])
+            }
+        )
+
+        now = self.clock()
+        finished = []
+        with self._condition:
+            for query_execution_id in query_execution_ids:
+                execution = self._pending.get(query_execution_id)
+                if execution is None:
+                    continue
+                query_execution = query_executions.get(query_execution_id, {})
+                if (
+                    query_execution.get("Status", {}).get("State")
+                    in FINISHED_QUERY_STATES
+                ):
+                    del self._pending[query_execution_id]
+                    execution.result = query_execution
+                    execution.finished.set()
+                    finished.append(execution)
+                    continue
+                if now - execution.started >= self.max_lifetime:
+                    AppLogger.warning(
+                        f"Stopped waiting for Athena query {query_execution_id} after {self.max_lifetime} seconds"
+                    )
+                    del self._pending[query_execution_id]
+                    execution.finished.set()
+                    finished.append(execution)
+                    continue
+                # A query started some time before it was waited for backs off from its run time
+                engine_seconds = (
+                    query_execution.get("Statistics", {}).get(
+                        "EngineExecutionTimeInMillis", 0
+                    )
+                    / 1000
+                )
+                execution.next_poll = now + self.next_interval(
+                    max(now - execution.started, engine_seconds)
+                )
+
+        for execution in finished:
+            for callback in execution.callbacks:
+                try:
+                    callback()
+                except Exception as error:
+                    AppLogger.error(
+                        f"Failed to handle a finished Athena query: {error}"
+                    )
+
+    def _run(self) -> None:
+        while True:
+            self.poll()
+            with self._condition:
+                if not self._pending:
+                    self._thread = None
+                    return
+                next_poll = min(
+                    execution.next_poll for execution in self._pending.values()
+                )
+                self._condition.wait(max(next_poll - self.clock(), 0))
@@ -1,13 +1,14 @@
 import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from functools import reduce
+from decimal import Decimal
 from typing import Any, Callable, Dict, List, Optional, Type
 
 import boto3
-from boto3.dynamodb.conditions import Attr, Key, Or
+from boto3.dynamodb.conditions import Attr, Key
 from botocore.exceptions import ClientError
 
+from api.adapter.permissions_cache import PermissionsCache
 from api.common.config.auth import (
     PermissionsTableItem,
     Sensitivity,
@@ -17,19 +18,30 @@ from api.common.config.auth import (
 from api.common.config.aws import (
     AWS_REGION,
     DYNAMO_PERMISSIONS_TABLE_NAME,
+    SCHEMA_CATALOG_INDEX_NAME,
+    SCHEMA_CATALOG_PARTITION_KEY,
+    SCHEMA_CATALOG_SORT_KEY,
     SCHEMA_TABLE_NAME,
     SERVICE_TABLE_NAME,
 )
+from api.common.config.constants import (
+    DYNAMO_BATCH_GET_MAX_ATTEMPTS,
+    DYNAMO_BATCH_GET_RETRY_DELAY_SECONDS,
+    DYNAMO_BATCH_GET_SIZE,
+)
+from api.common.config.layers import Layer
 from api.common.custom_exceptions import AWSServiceError, UserError
 from api.common.logger import AppLogger
 from api.domain.dataset_filters import DatasetFilters
 from api.domain.dataset_metadata import DatasetMetadata
 from api.domain.Jobs.Job import Job
+from api.domain.Jobs.CompactionJob import CompactionJob
+from api.domain.Jobs.DeletionJob import DeletionJob
 from api.domain.Jobs.QueryJob import QueryJob
 from api.domain.Jobs.UploadJob import UploadJob
 from api.domain.permission_item import PermissionItem
 from api.domain.schema import Schema, COLUMNS
-from api.domain.schema_metadata import IS_LATEST_VERSION
+from api.domain.schema_metadata import IS_LATEST_VERSION, SchemaMetadata
 from api.domain.subject_permissions import SubjectPermissions
 
 
@@ -105,6 +117,14 @@ class DatabaseAdapter(ABC):
         pass
 
 
+def schema_catalog_keys(metadata: SchemaMetadata) -> Dict[str, str]:
+    """The keys of the latest version of a schema in the schema catalog index"""
+    return {
+        SCHEMA_CATALOG_PARTITION_KEY: f"{metadata.layer}/{metadata.get_sensitivity()}",
+        SCHEMA_CATALOG_SORT_KEY: f"{metadata.domain}/{metadata.dataset}",
+    }
+
+
 @dataclass
 class ExpressionAttribute:
     name: str
@@ -120,10 +140,16 @@ class ExpressionAttribute:
 
 
 class DynamoDBAdapter(DatabaseAdapter):
-    def __init__(self, data_source=boto3.resource("dynamodb", region_name=AWS_REGION)):
+    def __init__(
+        self,
+        data_source=boto3.resource("dynamodb", region_name=AWS_REGION),
+        permissions_cache=PermissionsCache(),
+    ):
+        self.data_source = data_source
         self.permissions_table = data_source.Table(DYNAMO_PERMISSIONS_TABLE_NAME)
         self.service_table = data_source.Table(SERVICE_TABLE_NAME)
         self.schema_table = data_source.Table(SCHEMA_TABLE_NAME)
+        self.permissions_cache = permissions_cache
 
     def store_subject_permissions(
         self, subject_type: SubjectType, subject_id: str, permissions: List[str]
@@ -144,6 +170,8 @@ class DynamoDBAdapter(DatabaseAdapter):
             self._handle_client_error(
                 f"Error storing the {subject_type}: {subject_id}", error
             )
+        finally:
+            self.permissions_cache.invalidate_subject(subject_id)
 
     def store_protected_permissions(
         self, permissions: List[PermissionItem], domain: str
@@ -167,6 +195,8 @@ class DynamoDBAdapter(DatabaseAdapter):
             self._handle_client_error(
                 f"Error storing the protected domain permission for {domain}", error
             )
+        finally:
+            self.permissions_cache.invalidate_all()
 
     def store_schema(self, schema: Schema) -> None:
         try:
@@ -179,6 +209,11 @@ class DynamoDBAdapter(DatabaseAdapter):
                     "SK": schema.metadata.get_version(),
                     **schema.metadata.dict(),
                     COLUMNS: [dict(col) for col in schema.columns],
+                    **(
+                        schema_catalog_keys(schema.metadata)
+                        if schema.metadata.get_is_latest_version()
+                        else {}
+                    ),
                 }
             )
         except ClientError as error:
@@ -203,16 +238,7 @@ class DynamoDBAdapter(DatabaseAdapter):
                 self.permissions_table.query,
                 KeyConditionExpression=Key("PK").eq(PermissionsTableItem.PERMISSION),
             )
-            return [
-                PermissionItem(
-                    id=permission["SK"],
-                    type=permission["Type"],
-                    layer=permission.get("Layer"),
-                    sensitivity=permission.get("Sensitivity"),
-                    domain=permission.get("Domain"),
-                )
-                for permission in permissions
-            ]
+            return [self._map_permission(permission) for permission in permissions]
 
         except KeyError as error:
             AppLogger.info(
@@ -242,27 +268,46 @@ class DynamoDBAdapter(DatabaseAdapter):
                 "Error fetching protected permissions, please contact your system administrator"
             )
 
+    def get_permissions_for_subject(self, subject_id: str) -> List[PermissionItem]:
+        """
+        Resolves the permissions of the subject, reading them from the permissions cache when
+        they have been read recently
+        """
+        return self.permissions_cache.get_subject_permissions(
+            subject_id, lambda: self._resolve_permissions_for_subject(subject_id)
+        )
+
+    def permissions_cache_metrics(self) -> Dict[str, float]:
+        return self.permissions_cache.metrics()
+
+    def _resolve_permissions_for_subject(self, subject_id: str) -> List[PermissionItem]:
+        permissions = self._find_permissions(
+            self.get_permission_keys_for_subject(subject_id)
+        )
+        return sorted(
+            (self._map_permission(permission) for permission in permissions),
+            key=lambda permission: permission.id,
+        )
+
     def get_permission_keys_for_subject(self, subject_id: str) -> List[str]:
         AppLogger.info(f"Getting permissions for: {subject_id}")
         try:
-            return [
-                permission
-                for permission in self.permissions_table.query(
-                    KeyConditionExpression=Key("PK").eq(PermissionsTableItem.SUBJECT),
-                    FilterExpression=Attr("Id").eq(subject_id),
-                )["Items"][0]["Permissions"]
-                if permission is not None and permission != ""
-            ]
-        except KeyError:
-            return []
+            item = self.permissions_table.get_item(
+                Key={"PK": PermissionsTableItem.SUBJECT, "SK": subject_id}
+            ).get("Item")
         except ClientError:
             AppLogger.info(f"Error retrieving permissions for subject {subject_id}")
             raise AWSServiceError(
                 "Error fetching permissions, please contact your system administrator"
             )
-        except IndexError:
+        if item is None:
             AppLogger.info(f"Subject {subject_id} not found")
             raise UserError(f"Subject {subject_id} not found in database")
+        return [
+            permission
+            for permission in item.get("Permissions", [])
+            if permission is not None and permission != ""
+        ]
 
     def update_subject_permissions(
         self, subject_permissions: SubjectPermissions
@@ -297,14 +342,22 @@ class DynamoDBAdapter(DatabaseAdapter):
                 f"Error updating permissions for {subject_permissions.subject_id}",
                 error,
             )
+        finally:
+            self.permissions_cache.invalidate_subject(subject_permissions.subject_id)
 
     def delete_subject(self, subject_id: str) -> None:
-        self.permissions_table.delete_item(Key={"PK": "SUBJECT", "SK": subject_id})
+        try:
+            self.permissions_table.delete_item(Key={"PK": "SUBJECT", "SK": subject_id})
+        finally:
+            self.permissions_cache.invalidate_subject(subject_id)
 
     def delete_permission(self, permission_id: str) -> None:
-        self.permissions_table.delete_item(
-            Key={"PK": "PERMISSION", "SK": permission_id}
-        )
+        try:
+            self.permissions_table.delete_item(
+                Key={"PK": "PERMISSION", "SK": permission_id}
+            )
+        finally:
+            self.permissions_cache.invalidate_all()
 
     def delete_schema(self, metadata: Type[DatasetMetadata]) -> None:
         try:
@@ -356,6 +409,41 @@ class DynamoDBAdapter(DatabaseAdapter):
         }
         self._store_job(item_config)
 
+    def store_compaction_job(self, compaction_job: CompactionJob) -> None:
+        item_config = {
+            "PK": "JOB",
+            "SK": compaction_job.job_id,
+            "SK2": compaction_job.subject_id,
+            "Type": compaction_job.job_type,
+            "Status": compaction_job.status,
+            "Step": compaction_job.step,
+            "Errors": compaction_job.errors if compaction_job.errors else None,
+            "Layer": compaction_job.layer,
+            "Domain": compaction_job.domain,
+            "Dataset": compaction_job.dataset,
+            "Version": compaction_job.version,
+            "FilesCompacted": compaction_job.files_compacted,
+            "FilesWritten": compaction_job.files_written,
+            "TTL": compaction_job.expiry_time,
+        }
+        self._store_job(item_config)
+
+    def store_deletion_job(self, deletion_job: DeletionJob) -> None:
+        item_config = {
+            "PK": "JOB",
+            "SK": deletion_job.job_id,
+            "SK2": deletion_job.subject_id,
+            "Type": deletion_job.job_type,
+            "Status": deletion_job.status,
+            "Step": deletion_job.step,
+            "Errors": deletion_job.errors if deletion_job.errors else None,
+            "Layer": deletion_job.layer,
+            "Domain": deletion_job.domain,
+            "Dataset": deletion_job.dataset,
+            "TTL": deletion_job.expiry_time,
+        }
+        self._store_job(item_config)
+
     def get_jobs(self, subject_id: str) -> List[Dict]:
         try:
             return [
@@ -373,15 +461,14 @@ class DynamoDBAdapter(DatabaseAdapter):
 
     def get_job(self, job_id: str) -> Dict:
         try:
-            return self._map_job(
-                self.service_table.query(
-                    KeyConditionExpression=Key("PK").eq("JOB") & Key("SK").eq(job_id)
-                )["Items"][0]
+            item = self.service_table.get_item(Key={"PK": "JOB", "SK": job_id}).get(
+                "Item"
             )
-        except IndexError:
-            raise UserError(f"Could not find job with id {job_id}")
         except ClientError as error:
             self._handle_client_error("Error fetching job from the database", error)
+        if item is None:
+            raise UserError(f"Could not find job with id {job_id}")
+        return self._map_job(item)
 
     def get_schema(self, dataset: Type[DatasetMetadata]) -> Optional[dict]:
         try:
@@ -401,6 +488,11 @@ class DynamoDBAdapter(DatabaseAdapter):
         query: DatasetFilters = DatasetFilters(),
         attributes: List[ExpressionAttribute] = None,
     ) -> List[dict]:
+        """
+        Reads the latest schemas matching the query from the schema catalog index, with one query
+        for each of the layers and sensitivities the query matches. Only the latest version of
+        each schema is indexed, so deprecated versions are never read.
+        """
         try:
             query_arguments = query.format_resource_query()
             if query_arguments:
@@ -417,11 +509,23 @@ class DynamoDBAdapter(DatabaseAdapter):
                     attr.alias: attr.name for attr in attributes
                 }
 
-            return self.collect_all_items(
-                self.schema_table.scan,
-                FilterExpression=filter_expression,
-                **additional_kwargs,
-            )
+            schemas = []
+            for partition in self._schema_catalog_partitions(query):
+                key_condition = Key(SCHEMA_CATALOG_PARTITION_KEY).eq(partition)
+                if query.domain and isinstance(query.domain, str):
+                    key_condition &= Key(SCHEMA_CATALOG_SORT_KEY).begins_with(
+                        f"{query.domain.lower()}/"
+                    )
+                schemas.extend(
+                    self.collect_all_items(
+                        self.schema_table.query,
+                        IndexName=SCHEMA_CATALOG_INDEX_NAME,
+                        KeyConditionExpression=key_condition,
+                        FilterExpression=filter_expression,
+                        **additional_kwargs,
+                    )
+                )
+            return schemas
         except KeyError:
             return []
         except ClientError as error:
@@ -429,6 +533,19 @@ class DynamoDBAdapter(DatabaseAdapter):
                 "Error fetching the latest schemas from the database", error
             )
 
+    @staticmethod
+    def _schema_catalog_partitions(query: DatasetFilters) -> List[str]:
+        def values(value, default: List[str]) -> List[str]:
+            if not value:
+                return default
+            return list(dict.fromkeys(value)) if isinstance(value, list) else [value]
+
+        return [
+            f"{layer}/{sensitivity}"
+            for layer in values(query.layer, list(Layer))
+            for sensitivity in values(query.sensitivity, list(Sensitivity))
+        ]
+
     def get_latest_schema(self, dataset: Type[DatasetMetadata]) -> Optional[dict]:
         try:
             return self.schema_table.query(
@@ -452,7 +569,8 @@ class DynamoDBAdapter(DatabaseAdapter):
                     "PK": dataset.dataset_identifier(with_version=False),
                     "SK": dataset.get_version(),
                 },
-                UpdateExpression="set #A = :a",
+                # Removing the catalog keys takes the version out of the schema catalog index
+                UpdateExpression=f"set #A = :a remove {SCHEMA_CATALOG_PARTITION_KEY}, {SCHEMA_CATALOG_SORT_KEY}",
                 ExpressionAttributeNames={
                     "#A": IS_LATEST_VERSION,
                 },
@@ -513,11 +631,353 @@ class DynamoDBAdapter(DatabaseAdapter):
         except ClientError as error:
             self._handle_client_error("There was an error updating job status", error)
 
+    def update_compaction_job(self, job: CompactionJob) -> None:
+        try:
+            self.service_table.update_item(
+                Key={
+                    "PK": "JOB",
+                    "SK": job.job_id,
+                },
+                ConditionExpression="SK = :jid",
+                UpdateExpression="set #A = :a, #B = :b, #C = :c, #D = :d, #E = :e",
+                ExpressionAttributeNames={
+                    "#A": "Step",
+                    "#B": "Status",
+                    "#C": "Errors",
+                    "#D": "FilesCompacted",
+                    "#E": "FilesWritten",
+                },
+                ExpressionAttributeValues={
+                    ":a": job.step,
+                    ":b": job.status,
+                    ":c": job.errors if job.errors else None,
+                    ":d": job.files_compacted,
+                    ":e": job.files_written,
+                    ":jid": job.job_id,
+                },
+            )
+        except ClientError as error:
+            self._handle_client_error("There was an error updating job status", error)
+
+    def get_dataset_statistics(self, dataset: Type[DatasetMetadata]) -> Optional[Dict]:
+        try:
+            return self.service_table.get_item(
+                Key=self._dataset_statistics_key(dataset)
+            ).get("Item")
+        except ClientError as error:
+            self._handle_client_error(
+                "Error fetching dataset statistics from the database", error
+            )
+
+    def update_dataset_size(
+        self,
+        dataset: Type[DatasetMetadata],
+        size_bytes: int,
+        object_count: int,
+        last_updated: Optional[str],
+    ) -> None:
+        try:
+            self.service_table.update_item(
+                Key=self._dataset_statistics_key(dataset),
+                UpdateExpression="set #A = :a, #B = :b, #C = :c",
+                ExpressionAttributeNames={
+                    "#A": "SizeBytes",
+                    "#B": "ObjectCount",
+                    "#C": "LastUpdated",
+                },
+                ExpressionAttributeValues={
+                    ":a": size_bytes,
+                    ":b": object_count,
+                    ":c": last_updated,
+                },
+            )
+        except ClientError as error:
+            self._handle_client_error(
+                "There was an error updating the dataset statistics", error
+            )
+
+    def add_dataset_size(
+        self,
+        dataset: Type[DatasetMetadata],
+        size_bytes: int,
+        object_count: int,
+        last_updated: Optional[str],
+    ) -> bool:
+        """
+        Adds the change in size to the recorded size of the dataset, leaving the last updated
+        time as it is when none is given
+
+        :return: False when no size has been recorded for the dataset yet
+        """
+        update_expression = "add #A :a, #B :b"
+        attribute_names = {"#A": "SizeBytes", "#B": "ObjectCount"}
+        attribute_values = {":a": size_bytes, ":b": object_count}
+        if last_updated is not None:
+            update_expression += " set #C = :c"
+            attribute_names["#C"] = "LastUpdated"
+            attribute_values[":c"] = last_updated
+        try:
+            self.service_table.update_item(
+                Key=self._dataset_statistics_key(dataset),
+                ConditionExpression="attribute_exists(#A)",
+                UpdateExpression=update_expression,
+                ExpressionAttributeNames=attribute_names,
+                ExpressionAttributeValues=attribute_values,
+            )
+            return True
+        except ClientError as error:
+            if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return False
+            self._handle_client_error(
+                "There was an error updating the dataset statistics", error
+            )
+
+    def store_dataset_upload_rows(
+        self,
+        dataset: Type[DatasetMetadata],
+        raw_file_identifier: str,
+        rows: int,
+        overwrite: bool,
+    ) -> None:
+        """
+        Row counts are kept for each upload, so that deleting an uploaded file can remove its rows.
+        Once the data has been overwritten every upload of the dataset is counted.
+        """
+        try:
+            if overwrite:
+                self.service_table.update_item(
+                    Key=self._dataset_statistics_key(dataset),
+                    UpdateExpression="set #U = :u, #R = :r",
+                    ExpressionAttributeNames={"#U": "UploadRows", "#R": "RowsComplete"},
+                    ExpressionAttributeValues={
+                        ":u": {raw_file_identifier: rows},
+                        ":r": True,
+                    },
+                )
+                return
+            # A nested attribute can only be set once its map exists
+            self.service_table.update_item(
+                Key=self._dataset_statistics_key(dataset),
+                UpdateExpression="set #U = if_not_exists(#U, :empty)",
+                ExpressionAttributeNames={"#U": "UploadRows"},
+                ExpressionAttributeValues={":empty": {}},
+            )
+            self.service_table.update_item(
+                Key=self._dataset_statistics_key(dataset),
+                UpdateExpression="set #U.#F = :rows",
+                ExpressionAttributeNames={
+                    "#U": "UploadRows",
+                    "#F": raw_file_identifier,
+                },
+                ExpressionAttributeValues={":rows": rows},
+            )
+        except ClientError as error:
+            self._handle_client_error(
+                "There was an error updating the dataset statistics", error
+            )
+
+    def delete_dataset_upload_rows(
+        self, dataset: Type[DatasetMetadata], raw_file_identifier: str
+    ) -> None:
+        try:
+            self.service_table.update_item(
+                Key=self._dataset_statistics_key(dataset),
+                ConditionExpression="attribute_exists(#U)",
+                UpdateExpression="remove #U.#F",
+                ExpressionAttributeNames={
+                    "#U": "UploadRows",
+                    "#F": raw_file_identifier,
+                },
+            )
+        except ClientError as error:
+            if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return
+            self._handle_client_error(
+                "There was an error updating the dataset statistics", error
+            )
+
+    def replace_dataset_upload_rows(
+        self, dataset: Type[DatasetMetadata], upload_rows: Dict[str, int]
+    ) -> None:
+        try:
+            self.service_table.update_item(
+                Key=self._dataset_statistics_key(dataset),
+                UpdateExpression="set #U = :u, #R = :r",
+                ExpressionAttributeNames={"#U": "UploadRows", "#R": "RowsComplete"},
+                ExpressionAttributeValues={":u": upload_rows, ":r": True},
+            )
+        except ClientError as error:
+            self._handle_client_error(
+                "There was an error updating the dataset statistics", error
+            )
+
+    def update_dataset_column_statistics(
+        self,
+        dataset: Type[DatasetMetadata],
+        column_statistics: str,
+        complete: bool,
+    ) -> None:
+        """
+        :param column_statistics: The merged statistics of every column, as JSON
+        :param complete: Whether every upload of the dataset has been included
+        """
+        try:
+            self.service_table.update_item(
+                Key=self._dataset_statistics_key(dataset),
+                UpdateExpression="set #S = :s, #C = :c",
+                ExpressionAttributeNames={
+                    "#S": "ColumnStatistics",
+                    "#C": "ColumnsComplete",
+                },
+                ExpressionAttributeValues={":s": column_statistics, ":c": complete},
+            )
+        except ClientError as error:
+            self._handle_client_error(
+                "There was an error updating the dataset statistics", error
+            )
+
+    def store_dataset_upload_statistics(
+        self,
+        dataset: Type[DatasetMetadata],
+        raw_file_identifier: str,
+        column_statistics: str,
+    ) -> None:
+        """
+        The column statistics of each upload are kept in an item of their own, so that the
+        statistics of the dataset can be merged again once an uploaded file has been deleted
+        """
+        try:
+            self.service_table.put_item(
+                Item={
+                    **self._dataset_upload_statistics_key(dataset, raw_file_identifier),
+                    "ColumnStatistics": column_statistics,
+                }
+            )
+        except ClientError as error:
+            self._handle_client_error(
+                "There was an error updating the dataset statistics", error
+            )
+
+    def list_dataset_upload_statistics(
+        self, dataset: Type[DatasetMetadata]
+    ) -> Dict[str, str]:
+        """
+        :return: The column statistics of each upload of the dataset version, as JSON
+        """
+        prefix = self._dataset_upload_statistics_key(dataset, "")["SK"]
+        try:
+            items = self.collect_all_items(
+                self.service_table.query,
+                KeyConditionExpression=Key("PK").eq(ServiceTableItem.DATASET_STATISTICS)
+                & Key("SK").begins_with(prefix),
+            )
+        except ClientError as error:
+            self._handle_client_error(
+                "Error fetching dataset statistics from the database", error
+            )
+        return {
+            item["SK"].removeprefix(prefix): item["ColumnStatistics"] for item in items
+        }
+
+    def delete_dataset_upload_statistics(
+        self, dataset: Type[DatasetMetadata], raw_file_identifiers: List[str]
+    ) -> None:
+        try:
+            with self.service_table.batch_writer() as batch:
+                for raw_file_identifier in raw_file_identifiers:
+                    batch.delete_item(
+                        Key=self._dataset_upload_statistics_key(
+                            dataset, raw_file_identifier
+                        )
+                    )
+        except ClientError as error:
+            self._handle_client_error(
+                "There was an error updating the dataset statistics", error
+            )
+
+    def acquire_dataset_lock(
+        self, dataset: Type[DatasetMetadata], owner: str, expiry: float
+    ) -> bool:
+        """
+        Locks the dataset version for the owner until the expiry time, unless another owner holds
+        a lock on it that has not expired
+
+        :return: Whether the lock was acquired
+        """
+        try:
+            self.service_table.put_item(
+                Item={
+                    **self._dataset_lock_key(dataset),
+                    "Owner": owner,
+                    "LockExpiry": Decimal(str(expiry)),
+                },
+                ConditionExpression=Attr("PK").not_exists()
+                | Attr("Owner").eq(owner)
+                | Attr("LockExpiry").lt(Decimal(str(time.time()))),
+            )
+            return True
+        except ClientError as error:
+            if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return False
+            self._handle_client_error("There was an error locking the dataset", error)
+
+    def release_dataset_lock(self, dataset: Type[DatasetMetadata], owner: str) -> None:
+        try:
+            self.service_table.delete_item(
+                Key=self._dataset_lock_key(dataset),
+                ConditionExpression=Attr("Owner").eq(owner),
+            )
+        except ClientError as error:
+            if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                # The lock expired and has been taken by another owner
+                return
+            self._handle_client_error("There was an error unlocking the dataset", error)
+
+    def delete_dataset_statistics(self, dataset: Type[DatasetMetadata]) -> None:
+        """
+        Deletes the statistics of every version of the dataset
+        """
+        try:
+            items = self.collect_all_items(
+                self.service_table.query,
+                KeyConditionExpression=Key("PK").eq(ServiceTableItem.DATASET_STATISTICS)
+                & Key("SK").begins_with(
+                    f"{dataset.dataset_identifier(with_version=False)}/"
+                ),
+                ProjectionExpression="PK, SK",
+            )
+            with self.service_table.batch_writer() as batch:
+                for item in items:
+                    batch.delete_item(Key={"PK": item["PK"], "SK": item["SK"]})
+        except ClientError as error:
+            self._handle_client_error(
+                "There was an error deleting the dataset statistics", error
+            )
+
+    def _dataset_statistics_key(self, dataset: Type[DatasetMetadata]) -> Dict:
+        return {
+            "PK": ServiceTableItem.DATASET_STATISTICS,
+            "SK": dataset.dataset_identifier(),
+        }
+
+    def _dataset_lock_key(self, dataset: Type[DatasetMetadata]) -> Dict:
+        return {"PK": ServiceTableItem.DATASET_LOCK, "SK": dataset.dataset_identifier()}
+
+    def _dataset_upload_statistics_key(
+        self, dataset: Type[DatasetMetadata], raw_file_identifier: str
+    ) -> Dict:
+        return {
+            "PK": ServiceTableItem.DATASET_STATISTICS,
+            "SK": f"{dataset.dataset_identifier()}/uploads/{raw_file_identifier}",
+        }
+
     def _map_job(self, job: Dict) -> Dict:
         name_map = {
             "SK": "job_id",
             "RawFileIdentifier": "raw_file_identifier",
             "ResultsURL": "result_url",
+            "FilesCompacted": "files_compacted",
+            "FilesWritten": "files_written",
         }
         return {
             name_map.get(key, key.lower()): value
@@ -528,14 +988,14 @@ class DynamoDBAdapter(DatabaseAdapter):
     def _store_job(self, item: Dict):
         self.service_table.put_item(Item=item)
 
-    def _find_permissions(self, permissions: List[str]) -> Dict[str, Any]:
+    def _find_permissions(self, permissions: List[str]) -> List[Dict]:
         try:
-            return self.collect_all_items(
-                self.permissions_table.query,
-                KeyConditionExpression=Key("PK").eq(PermissionsTableItem.PERMISSION),
-                FilterExpression=reduce(
-                    Or, ([Attr("Id").eq(value) for value in permissions])
-                ),
+            return self.batch_get_items(
+                self.permissions_table,
+                [
+                    {"PK": PermissionsTableItem.PERMISSION, "SK": permission}
+                    for permission in dict.fromkeys(permissions)
+                ],
             )
         except ClientError as error:
             self._handle_client_error(
@@ -552,6 +1012,15 @@ class DynamoDBAdapter(DatabaseAdapter):
         AppLogger.error(f"{message}: {error}")
         raise AWSServiceError(message)
 
+    def _map_permission(self, item: Dict) -> PermissionItem:
+        return PermissionItem(
+            id=item["SK"],
+            type=item["Type"],
+            layer=item.get("Layer"),
+            sensitivity=item.get("Sensitivity"),
+            domain=item.get("Domain"),
+        )
+
     def _generate_protected_permission_item(self, item: dict) -> PermissionItem:
         return PermissionItem(
             id=item["Id"],
@@ -561,6 +1030,32 @@ class DynamoDBAdapter(DatabaseAdapter):
             layer=item["Layer"],
         )
 
+    def batch_get_items(self, table, keys: List[Dict]) -> List[Dict]:
+        """
+        Reads the items with the given keys, DYNAMO_BATCH_GET_SIZE keys per request. Keys that
+        DynamoDB leaves unprocessed when throttled are retried with exponential backoff. Keys
+        must not be duplicated, and items that do not exist are left out of the result.
+        """
+        items = []
+        for start in range(0, len(keys), DYNAMO_BATCH_GET_SIZE):
+            end = start + DYNAMO_BATCH_GET_SIZE
+            request = {table.name: {"Keys": keys[start:end]}}
+            for attempt in range(1, DYNAMO_BATCH_GET_MAX_ATTEMPTS + 1):
+                response = self.data_source.batch_get_item(RequestItems=request)
+                items.extend(response.get("Responses", {}).get(table.name, []))
+                request = response.get("UnprocessedKeys")
+                if not request:
+                    break
+                if attempt == DYNAMO_BATCH_GET_MAX_ATTEMPTS:
+                    AppLogger.error(
+                        f"Keys of {table.name} were still unprocessed after {attempt} attempts"
+                    )
+                    raise AWSServiceError(
+                        "Error fetching items from the database, please try again later"
+                    )
+                time.sleep(DYNAMO_BATCH_GET_RETRY_DELAY_SECONDS * 2 ** (attempt - 1))
+        return items
+
     def collect_all_items(self, method: Callable, **kwargs) -> List[Dict]:
         response = method(**kwargs)
         items = response["Items"]
@@ -7,6 +7,8 @@ from botocore.exceptions import ClientError
 from api.common.config.aws import (
     AWS_REGION,
     GLUE_CATALOGUE_DB_NAME,
+    GLUE_MAX_PARTITIONS_PER_REQUEST,
+    GLUE_PARTITION_PROJECTION,
     GLUE_TABLE_PRESENCE_CHECK_INTERVAL,
     GLUE_TABLE_PRESENCE_CHECK_RETRY_COUNT,
 )
@@ -26,9 +28,11 @@ class GlueAdapter:
         self,
         glue_client=boto3.client("glue", region_name=AWS_REGION),
         glue_catalogue_db_name=GLUE_CATALOGUE_DB_NAME,
+        partition_projection: bool = GLUE_PARTITION_PROJECTION,
     ):
         self.glue_client = glue_client
         self.glue_catalogue_db_name = glue_catalogue_db_name
+        self.partition_projection = partition_projection
 
     def create_table(self, schema: Schema):
         try:
@@ -37,19 +41,10 @@ class GlueAdapter:
                 TableInput={
                     "Name": schema.metadata.glue_table_name(),
                     "Owner": "hadoop",
-                    "StorageDescriptor": {
-                        "Columns": schema.get_non_partition_columns_for_glue(),
-                        "Location": schema.metadata.s3_file_location(),
-                        "InputFormat": "org.apache.hadoop.hive.ql.io.parquet.MapredParquetInputFormat",
-                        "OutputFormat": "org.apache.hadoop.hive.ql.io.parquet.MapredParquetOutputFormat",
-                        "Compressed": False,
-                        "SerdeInfo": {
-                            "SerializationLibrary": "org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe",
-                            "Parameters": {"serialization.format": "1"},
-                        },
-                        "NumberOfBuckets": -1,
-                        "StoredAsSubDirectories": False,
-                    },
+                    "StorageDescriptor": self._storage_descriptor(
+                        schema.get_non_partition_columns_for_glue(),
+                        schema.metadata.s3_file_location(),
+                    ),
                     "PartitionKeys": schema.get_partition_columns_for_glue(),
                     "TableType": "EXTERNAL_TABLE",
                     "Parameters": {
@@ -57,6 +52,7 @@ class GlueAdapter:
                         "typeOfData": "file",
                         "compressionType": "none",
                         "EXTERNAL": "TRUE",
+                        **self._partition_projection_parameters(schema),
                     },
                 },
                 PartitionIndexes=[
@@ -74,6 +70,95 @@ class GlueAdapter:
         except ClientError as error:
             self._handle_table_create_error(error)
 
+    def _storage_descriptor(self, columns: List[dict], location: str) -> Dict:
+        return {
+            "Columns": columns,
+            "Location": location,
+            "InputFormat": "org.apache.hadoop.hive.ql.io.parquet.MapredParquetInputFormat",
+            "OutputFormat": "org.apache.hadoop.hive.ql.io.parquet.MapredParquetOutputFormat",
+            "Compressed": False,
+            "SerdeInfo": {
+                "SerializationLibrary": "org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe",
+                "Parameters": {"serialization.format": "1"},
+            },
+            "NumberOfBuckets": -1,
+            "StoredAsSubDirectories": False,
+        }
+
+    def _partition_projection_parameters(self, schema: Schema) -> Dict[str, str]:
+        partitions = schema.get_partitions()
+        if not self.partition_projection or not partitions:
+            return {}
+        location_template = "/".join(
+            f"{partition}=${{{partition}}}" for partition in partitions
+        )
+        return {
+            "projection.enabled": "true",
+            **{f"projection.{partition}.type": "injected" for partition in partitions},
+            "storage.location.template": f"{schema.metadata.s3_file_location()}/{location_template}",
+        }
+
+    def create_partitions(self, schema: Schema, partition_paths: List[str]) -> None:
+        """
+        Registers the partitions written by an upload, given as paths of the form
+        "year=2020/month=01". Partitions that are already registered are skipped.
+        """
+        table_name = schema.metadata.glue_table_name()
+        if not partition_paths or self._uses_partition_projection(table_name):
+            return
+        AppLogger.info(
+            f"Registering {len(partition_paths)} partitions for table [{table_name}]"
+        )
+        partition_inputs = [
+            self._partition_input(schema, partition_path)
+            for partition_path in partition_paths
+        ]
+        for start in range(0, len(partition_inputs), GLUE_MAX_PARTITIONS_PER_REQUEST):
+            end = start + GLUE_MAX_PARTITIONS_PER_REQUEST
+            try:
+                response = self.glue_client.batch_create_partition(
+                    DatabaseName=self.glue_catalogue_db_name,
+                    TableName=table_name,
+                    PartitionInputList=partition_inputs[start:end],
+                )
+            except ClientError as error:
+                AppLogger.error(
+                    f"Failed to register partitions for table [{table_name}]: {error}"
+                )
+                raise AWSServiceError(
+                    f"Failed to register partitions for table [{table_name}]"
+                )
+            errors = [
+                error
+                for error in response.get("Errors", [])
+                if error["ErrorDetail"]["ErrorCode"] != "AlreadyExistsException"
+            ]
+            if errors:
+                AppLogger.error(
+                    f"Failed to register partitions for table [{table_name}]: {errors}"
+                )
+                raise AWSServiceError(
+                    f"Failed to register partitions for table [{table_name}]"
+                )
+
+    def _partition_input(self, schema: Schema, partition_path: str) -> Dict:
+        return {
+            "Values": [
+                partition.split("=", 1)[1] for partition in partition_path.split("/")
+            ],
+            "StorageDescriptor": self._storage_descriptor(
+                schema.get_non_partition_columns_for_glue(),
+                f"{schema.metadata.s3_file_location()}/{partition_path}",
+            ),
+        }
+
+    def _uses_partition_projection(self, table_name: str) -> bool:
+        # Only tables created while partition projection was enabled are projected
+        if not self.partition_projection:
+            return False
+        table = self._get_table(table_name)
+        return table["Table"].get("Parameters", {}).get("projection.enabled") == "true"
+
     def _handle_table_create_error(self, error: ClientError):
         if error.response["Error"]["Code"] == "AlreadyExistsException":
             raise TableAlreadyExistsError("Table already exists with same name")
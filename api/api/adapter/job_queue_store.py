@@ -0,0 +1,309 @@
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from decimal import Decimal
+from typing import Dict, Iterator, Optional
+
+import boto3
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+
+from api.common.config.auth import ServiceTableItem
+from api.common.config.aws import AWS_REGION, SERVICE_TABLE_NAME
+from api.common.config.constants import JOB_QUEUE_SQLITE_PATH, JOB_QUEUE_STORE
+from api.common.custom_exceptions import AWSServiceError
+from api.common.logger import AppLogger
+from api.domain.scheduled_task import ScheduledTask, TaskStatus
+
+
+def log_reclaimed_task(task: ScheduledTask) -> None:
+    AppLogger.warning(
+        f"Task {task.task_id} was claimed again by another worker and is left in the queue"
+    )
+
+
+class JobQueueStore(ABC):
+    """
+    Persists the queued and running tasks of the job scheduler, so that tasks survive restarts and
+    can be shared between the API and worker processes
+    """
+
+    @abstractmethod
+    def enqueue(self, task: ScheduledTask) -> None:
+        pass
+
+    @abstractmethod
+    def claim_next(
+        self, worker_id: str, lease_expiry: float
+    ) -> Optional[ScheduledTask]:
+        """
+        Claims the queued task with the highest priority, or a running task whose lease has expired
+        """
+        pass
+
+    @abstractmethod
+    def renew_lease(self, task: ScheduledTask, lease_expiry: float) -> None:
+        pass
+
+    @abstractmethod
+    def complete(self, task: ScheduledTask) -> None:
+        """
+        Removes the task, unless its lease expired and it has been claimed again since
+        """
+        pass
+
+    @abstractmethod
+    def count_queued(self) -> int:
+        pass
+
+
+class SQLiteJobQueueStore(JobQueueStore):
+    def __init__(self, path: str = JOB_QUEUE_SQLITE_PATH):
+        self.path = path
+        with self._transaction() as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tasks (
+                    task_id TEXT PRIMARY KEY,
+                    order_key TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    lease_expiry REAL,
+                    data TEXT NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS tasks_order ON tasks (status, order_key)"
+            )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            yield connection
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    # Matches a task only while it is still held by the claim that the given task was read from
+    _CLAIMED_BY = (
+        "task_id = ? AND json_extract(data, '$.worker_id') = ?"
+        " AND json_extract(data, '$.attempts') = ?"
+    )
+
+    def _save(self, connection: sqlite3.Connection, task: ScheduledTask) -> None:
+        connection.execute(
+            "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?)",
+            (
+                task.task_id,
+                task.order_key(),
+                task.status,
+                task.lease_expiry,
+                json.dumps(task.dict()),
+            ),
+        )
+
+    def enqueue(self, task: ScheduledTask) -> None:
+        with self._transaction() as connection:
+            self._save(connection, task)
+
+    def claim_next(
+        self, worker_id: str, lease_expiry: float
+    ) -> Optional[ScheduledTask]:
+        with self._transaction() as connection:
+            row = connection.execute(
+                """
+                SELECT data FROM tasks
+                WHERE status = ? OR (status = ? AND lease_expiry < ?)
+                ORDER BY order_key LIMIT 1
+                """,
+                (TaskStatus.QUEUED, TaskStatus.RUNNING, time.time()),
+            ).fetchone()
+            if row is None:
+                return None
+            task = ScheduledTask.parse_obj(json.loads(row[0]))
+            task.status = TaskStatus.RUNNING
+            task.worker_id = worker_id
+            task.lease_expiry = lease_expiry
+            task.attempts += 1
+            self._save(connection, task)
+            return task
+
+    def renew_lease(self, task: ScheduledTask, lease_expiry: float) -> None:
+        with self._transaction() as connection:
+            renewed = ScheduledTask.parse_obj(
+                {**task.dict(), "lease_expiry": lease_expiry}
+            )
+            cursor = connection.execute(
+                f"UPDATE tasks SET lease_expiry = ?, data = ? WHERE {self._CLAIMED_BY}",
+                (
+                    lease_expiry,
+                    json.dumps(renewed.dict()),
+                    task.task_id,
+                    task.worker_id,
+                    task.attempts,
+                ),
+            )
+            if cursor.rowcount:
+                task.lease_expiry = lease_expiry
+
+    def complete(self, task: ScheduledTask) -> None:
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                f"DELETE FROM tasks WHERE {self._CLAIMED_BY}",
+                (task.task_id, task.worker_id, task.attempts),
+            )
+            if not cursor.rowcount:
+                log_reclaimed_task(task)
+
+    def count_queued(self) -> int:
+        with self._transaction() as connection:
+            return connection.execute(
+                "SELECT COUNT(*) FROM tasks WHERE status = ?", (TaskStatus.QUEUED,)
+            ).fetchone()[0]
+
+
+class DynamoDBJobQueueStore(JobQueueStore):
+    """
+    Tasks are stored in the service table under the TASK partition, sorted by their order key
+    """
+
+    def __init__(self, data_source=boto3.resource("dynamodb", region_name=AWS_REGION)):
+        self.service_table = data_source.Table(SERVICE_TABLE_NAME)
+
+    def enqueue(self, task: ScheduledTask) -> None:
+        try:
+            self.service_table.put_item(Item=self._to_item(task))
+        except ClientError as error:
+            self._handle_client_error("There was an error queueing the job", error)
+
+    def claim_next(
+        self, worker_id: str, lease_expiry: float
+    ) -> Optional[ScheduledTask]:
+        now = Decimal(str(time.time()))
+        claimable = Attr("Status").eq(TaskStatus.QUEUED) | (
+            Attr("Status").eq(TaskStatus.RUNNING) & Attr("LeaseExpiry").lt(now)
+        )
+        try:
+            for item in self._query(FilterExpression=claimable):
+                task = self._from_item(item)
+                try:
+                    self.service_table.update_item(
+                        Key={"PK": ServiceTableItem.TASK, "SK": task.order_key()},
+                        ConditionExpression=claimable,
+                        UpdateExpression="set #S = :s, #W = :w, #L = :l, #A = :a",
+                        ExpressionAttributeNames={
+                            "#S": "Status",
+                            "#W": "WorkerId",
+                            "#L": "LeaseExpiry",
+                            "#A": "Attempts",
+                        },
+                        ExpressionAttributeValues={
+                            ":s": TaskStatus.RUNNING,
+                            ":w": worker_id,
+                            ":l": Decimal(str(lease_expiry)),
+                            ":a": task.attempts + 1,
+                        },
+                    )
+                except ClientError as error:
+                    if (
+                        error.response["Error"]["Code"]
+                        == "ConditionalCheckFailedException"
+                    ):
+                        # Another worker claimed the task first
+                        continue
+                    raise error
+                task.status = TaskStatus.RUNNING
+                task.worker_id = worker_id
+                task.lease_expiry = lease_expiry
+                task.attempts += 1
+                return task
+        except ClientError as error:
+            self._handle_client_error("There was an error claiming the next job", error)
+        return None
+
+    def renew_lease(self, task: ScheduledTask, lease_expiry: float) -> None:
+        try:
+            self.service_table.update_item(
+                Key={"PK": ServiceTableItem.TASK, "SK": task.order_key()},
+                ConditionExpression=Attr("WorkerId").eq(task.worker_id),
+                UpdateExpression="set #L = :l",
+                ExpressionAttributeNames={"#L": "LeaseExpiry"},
+                ExpressionAttributeValues={":l": Decimal(str(lease_expiry))},
+            )
+            task.lease_expiry = lease_expiry
+        except ClientError as error:
+            self._handle_client_error(
+                "There was an error renewing the job lease", error
+            )
+
+    def complete(self, task: ScheduledTask) -> None:
+        try:
+            self.service_table.delete_item(
+                Key={"PK": ServiceTableItem.TASK, "SK": task.order_key()},
+                ConditionExpression=Attr("WorkerId").eq(task.worker_id)
+                & Attr("Attempts").eq(task.attempts),
+            )
+        except ClientError as error:
+            if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                log_reclaimed_task(task)
+                return
+            self._handle_client_error("There was an error completing the job", error)
+
+    def count_queued(self) -> int:
+        try:
+            return sum(
+                1
+                for _ in self._query(
+                    FilterExpression=Attr("Status").eq(TaskStatus.QUEUED),
+                    ProjectionExpression="SK",
+                )
+            )
+        except ClientError as error:
+            self._handle_client_error(
+                "There was an error counting the queued jobs", error
+            )
+
+    def _query(self, **kwargs) -> Iterator[Dict]:
+        query_arguments = {
+            "KeyConditionExpression": Key("PK").eq(ServiceTableItem.TASK),
+            "ScanIndexForward": True,
+            **kwargs,
+        }
+        while True:
+            response = self.service_table.query(**query_arguments)
+            yield from response["Items"]
+            if "LastEvaluatedKey" not in response:
+                return
+            query_arguments["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def _to_item(self, task: ScheduledTask) -> Dict:
+        return {
+            "PK": ServiceTableItem.TASK,
+            "SK": task.order_key(),
+            "Status": task.status,
+            "Attempts": task.attempts,
+            "Task": json.dumps(task.dict()),
+        }
+
+    def _from_item(self, item: Dict) -> ScheduledTask:
+        task = ScheduledTask.parse_obj(json.loads(item["Task"]))
+        task.attempts = int(item["Attempts"])
+        return task
+
+    @staticmethod
+    def _handle_client_error(message: str, error: ClientError) -> None:
+        AppLogger.error(f"{message}: {error}")
+        raise AWSServiceError(message)
+
+
+def create_job_queue_store(store_type: str = JOB_QUEUE_STORE) -> JobQueueStore:
+    if store_type == "sqlite":
+        return SQLiteJobQueueStore()
+    return DynamoDBJobQueueStore()
@@ -0,0 +1,124 @@
+from typing import Iterator, Optional
+
+import awswrangler as wr
+import duckdb
+import pyarrow as pa
+import pyarrow.dataset as ds
+from pandas import DataFrame
+
+from api.common.config.aws import DATA_BUCKET
+from api.common.config.constants import (
+    LOCAL_QUERY_ENGINE_DATA_ROOT,
+    QUERY_STREAM_CHUNK_SIZE,
+)
+from api.common.custom_exceptions import LocalQueryError
+from api.common.logger import AppLogger
+from api.domain.data_types import DateType
+from api.domain.schema import Schema
+
+
+class LocalQueryAdapter:
+    """
+    Runs queries in process with DuckDB over the Parquet files of a dataset, which avoids Athena's
+    start up time for small datasets. The files are read with pyarrow from S3 or a local directory.
+    Filters on partition columns are pushed down to pyarrow, so only the matching `column=value`
+    directories are read.
+    """
+
+    def __init__(self, data_root: Optional[str] = LOCAL_QUERY_ENGINE_DATA_ROOT):
+        self.data_root = data_root or f"s3://{DATA_BUCKET}"
+
+    def query_sql(self, schema: Schema, query_string: str) -> DataFrame:
+        connection = self._connect(schema)
+        try:
+            table = connection.execute(query_string).to_arrow_table()
+        except duckdb.Error as error:
+            raise LocalQueryError(f"Failed to execute query locally: {error}")
+        finally:
+            connection.close()
+        return table.to_pandas(types_mapper=wr._data_types.pyarrow2pandas_extension)
+
+    def query_sql_in_chunks(
+        self,
+        schema: Schema,
+        query_string: str,
+        chunk_size: int = QUERY_STREAM_CHUNK_SIZE,
+    ) -> Iterator[DataFrame]:
+        """
+        Runs the query straight away, so that it fails before any chunk is read, then reads the
+        result `chunk_size` rows at a time as the returned iterator is consumed
+        """
+        connection = self._connect(schema)
+        try:
+            reader = connection.execute(query_string).to_arrow_reader(chunk_size)
+        except duckdb.Error as error:
+            connection.close()
+            raise LocalQueryError(f"Failed to execute query locally: {error}")
+        return self._read_chunks(connection, reader)
+
+    def _read_chunks(
+        self, connection: duckdb.DuckDBPyConnection, reader: pa.RecordBatchReader
+    ) -> Iterator[DataFrame]:
+        try:
+            for batch in reader:
+                yield batch.to_pandas(
+                    types_mapper=wr._data_types.pyarrow2pandas_extension
+                )
+        finally:
+            connection.close()
+
+    def _connect(self, schema: Schema) -> duckdb.DuckDBPyConnection:
+        """
+        Creates a connection in which the dataset is a view named after its Glue table, so that
+        queries are written the same way as for Athena
+        """
+        files_view = f"{schema.metadata.glue_table_name()}_files"
+        connection = duckdb.connect()
+        try:
+            connection.register(files_view, self._dataset(schema))
+            partition_dates = [
+                column.name
+                for column in schema.get_partition_columns()
+                if column.data_type == DateType.DATE
+            ]
+            # Date partitions are written as timestamps in their path
+            replace = (
+                f" REPLACE ({', '.join(f'CAST({name} AS DATE) AS {name}' for name in partition_dates)})"
+                if partition_dates
+                else ""
+            )
+            connection.execute(
+                f"CREATE VIEW {schema.metadata.glue_table_name()} AS SELECT *{replace} FROM {files_view}"  # nosec: B608
+            )
+        except (duckdb.Error, pa.ArrowException, OSError) as error:
+            connection.close()
+            raise LocalQueryError(f"Failed to read dataset locally: {error}")
+        return connection
+
+    def _dataset(self, schema: Schema) -> ds.Dataset:
+        partition_schema = pa.schema(
+            [
+                pa.field(
+                    column.name,
+                    pa.timestamp("s")
+                    if column.data_type == DateType.DATE
+                    else wr._data_types.athena2pyarrow(column.data_type),
+                )
+                for column in schema.get_partition_columns()
+            ]
+        )
+        dataset_schema = pa.schema(
+            list(schema.generate_non_partition_storage_schema())
+            + list(partition_schema)
+        )
+        path = f"{self.data_root}/{schema.metadata.dataset_location()}"
+        try:
+            return ds.dataset(
+                path,
+                schema=dataset_schema,
+                format="parquet",
+                partitioning=ds.partitioning(partition_schema, flavor="hive"),
+            )
+        except FileNotFoundError:
+            AppLogger.info(f"No data found at {path}")
+            return ds.dataset(dataset_schema.empty_table())
@@ -0,0 +1,91 @@
+import time
+from threading import Lock
+from typing import Callable, Dict, List, Tuple
+
+from api.common.config.constants import PERMISSIONS_CACHE_TTL_SECONDS
+from api.domain.permission_item import PermissionItem
+
+
+class PermissionsCache:
+    """
+    Caches the resolved permissions of each subject for `ttl` seconds, so that authorising a
+    request does not read the permissions table. Writes to the permissions table made in this
+    process invalidate the cache straight away, writes made by other instances of the API are
+    seen once the cached entry expires.
+    """
+
+    def __init__(
+        self,
+        ttl: float = PERMISSIONS_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._subject_permissions: Dict[str, Tuple[float, List[PermissionItem]]] = {}
+        # Incremented on every invalidation, so that permissions read before an invalidation
+        # are not cached after it
+        self._generation = 0
+        self._lock = Lock()
+
+    def get_subject_permissions(
+        self, subject_id: str, load: Callable[[], List[PermissionItem]]
+    ) -> List[PermissionItem]:
+        now = self.clock()
+        with self._lock:
+            cached = self._subject_permissions.get(subject_id)
+            if cached is not None and now - cached[0] < self.ttl:
+                self.hits += 1
+                return list(cached[1])
+            self.misses += 1
+            generation = self._generation
+
+        permissions = load()
+        if self.ttl > 0:
+            with self._lock:
+                if generation == self._generation:
+                    self._subject_permissions[subject_id] = (now, list(permissions))
+        return permissions
+
+    def invalidate_subject(self, subject_id: str) -> None:
+        with self._lock:
+            self._subject_permissions.pop(subject_id, None)
+            self._generation += 1
+            self.invalidations += 1
+
+    def invalidate_all(self) -> None:
+        with self._lock:
+            self._subject_permissions.clear()
+            self._generation += 1
+            self.invalidations += 1
+
+    def metrics(self) -> Dict[str, float]:
+        now = self.clock()
+        with self._lock:
+            self._subject_permissions = {
+                subject_id: cached
+                for subject_id, cached in self._subject_permissions.items()
+                if now - cached[0] < self.ttl
+            }
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "entries": len(self._subject_permissions),
+                "ttl_seconds": self.ttl,
+                # How out of date a permission changed by another API instance can be
+                "max_staleness_seconds": round(
+                    max(
+                        (
+                            now - cached[0]
+                            for cached in self._subject_permissions.values()
+                        ),
+                        default=0.0,
+                    ),
+                    3,
+                ),
+            }
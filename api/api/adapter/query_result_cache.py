@@ -0,0 +1,271 @@
+import hashlib
+import io
+import sqlite3
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional
+
+import boto3
+import pandas as pd
+from botocore.exceptions import ClientError
+
+from api.common.config.auth import ServiceTableItem
+from api.common.config.aws import AWS_REGION, OUTPUT_QUERY_BUCKET, SERVICE_TABLE_NAME
+from api.common.config.constants import (
+    QUERY_CACHE_BACKEND,
+    QUERY_CACHE_MAX_SIZE,
+    QUERY_CACHE_S3_PREFIX,
+    QUERY_CACHE_SQLITE_PATH,
+)
+from api.common.logger import AppLogger
+from api.domain.dataset_metadata import DatasetMetadata
+
+
+class QueryResultCache:
+    """
+    Caches query results as Parquet in memory, evicting the least recently used results once they
+    take up more than `max_size` bytes. Results are keyed by their SQL and the data version of the
+    dataset, which is incremented whenever data is uploaded to or deleted from the dataset, so
+    results cached before a change are never read again.
+
+    Data versions are kept in memory, so this cache is only correct when uploads and deletions run
+    in the same process as the queries.
+    """
+
+    def __init__(self, max_size: int = QUERY_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._results: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+        self._data_versions: Dict[str, int] = {}
+
+    def cache_key(self, dataset: DatasetMetadata, sql: str) -> Optional[str]:
+        """
+        Must be called before the query is run, so that the result of a query that overlaps with an
+        upload is cached under the data version from before the upload.
+
+        :return: None if the data version could not be read, in which case the result is not cached
+        """
+        try:
+            data_version = self._get_data_version(dataset)
+        except Exception as error:
+            AppLogger.warning(
+                f"Failed to read the data version of {dataset.string_representation()}: {error}"
+            )
+            return None
+        return hashlib.sha256(
+            f"{dataset.dataset_identifier(with_version=False)}#{data_version}#{sql.strip()}".encode()
+        ).hexdigest()
+
+    def get(self, key: Optional[str]) -> Optional[pd.DataFrame]:
+        result = None
+        if key is not None:
+            try:
+                result = self._read(key)
+            except Exception as error:
+                AppLogger.warning(
+                    f"Failed to read cached query result [{key}]: {error}"
+                )
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return pd.read_parquet(io.BytesIO(result)) if result is not None else None
+
+    def put(self, key: Optional[str], dataframe: pd.DataFrame) -> None:
+        if key is None:
+            return
+        try:
+            self._write(key, dataframe.to_parquet())
+        except Exception as error:
+            AppLogger.warning(f"Failed to cache query result [{key}]: {error}")
+
+    def invalidate(self, dataset: DatasetMetadata) -> None:
+        try:
+            self._increment_data_version(dataset)
+        except Exception as error:
+            AppLogger.error(
+                f"Failed to invalidate cached query results for {dataset.string_representation()}: {error}"
+            )
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._results),
+                "size_bytes": self._size,
+            }
+
+    def _get_data_version(self, dataset: DatasetMetadata) -> int:
+        with self._lock:
+            return self._data_versions.get(
+                dataset.dataset_identifier(with_version=False), 0
+            )
+
+    def _increment_data_version(self, dataset: DatasetMetadata) -> None:
+        identifier = dataset.dataset_identifier(with_version=False)
+        with self._lock:
+            self._data_versions[identifier] = self._data_versions.get(identifier, 0) + 1
+
+    def _read(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+            return result
+
+    def _write(self, key: str, result: bytes) -> None:
+        if len(result) > self.max_size:
+            return
+        with self._lock:
+            previous = self._results.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._results[key] = result
+            self._size += len(result)
+            while self._size > self.max_size:
+                _, evicted = self._results.popitem(last=False)
+                self._size -= len(evicted)
+
+
+class LocalQueryResultCache(QueryResultCache):
+    """
+    Keeps the data versions in SQLite, so that uploads and deletions run by a worker on the same
+    host invalidate the results cached by the API
+    """
+
+    def __init__(
+        self, path: str = QUERY_CACHE_SQLITE_PATH, max_size: int = QUERY_CACHE_MAX_SIZE
+    ):
+        super().__init__(max_size)
+        self.path = path
+        connection = self._connect()
+        try:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS data_versions (
+                    dataset TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL
+                )
+                """
+            )
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _get_data_version(self, dataset: DatasetMetadata) -> int:
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT version FROM data_versions WHERE dataset = ?",
+                (dataset.dataset_identifier(with_version=False),),
+            ).fetchone()
+        finally:
+            connection.close()
+        return row[0] if row else 0
+
+    def _increment_data_version(self, dataset: DatasetMetadata) -> None:
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    """
+                    INSERT INTO data_versions VALUES (?, 1)
+                    ON CONFLICT (dataset) DO UPDATE SET version = version + 1
+                    """,
+                    (dataset.dataset_identifier(with_version=False),),
+                )
+        finally:
+            connection.close()
+
+
+class SharedQueryResultCache(QueryResultCache):
+    """
+    Shares results between API instances by also storing them in the query results bucket, where
+    they expire with the bucket's lifecycle rule. Data versions are kept in the service table under
+    the DATA_VERSION partition.
+    """
+
+    def __init__(
+        self,
+        s3_client=boto3.client("s3", region_name=AWS_REGION),
+        data_source=boto3.resource("dynamodb", region_name=AWS_REGION),
+        bucket: str = OUTPUT_QUERY_BUCKET,
+        max_size: int = QUERY_CACHE_MAX_SIZE,
+    ):
+        super().__init__(max_size)
+        self.s3_client = s3_client
+        self.service_table = data_source.Table(SERVICE_TABLE_NAME)
+        self.bucket = bucket
+
+    def _get_data_version(self, dataset: DatasetMetadata) -> int:
+        item = self.service_table.get_item(
+            Key={
+                "PK": ServiceTableItem.DATA_VERSION,
+                "SK": dataset.dataset_identifier(with_version=False),
+            },
+            ConsistentRead=True,
+        ).get("Item")
+        return int(item["Version"]) if item else 0
+
+    def _increment_data_version(self, dataset: DatasetMetadata) -> None:
+        self.service_table.update_item(
+            Key={
+                "PK": ServiceTableItem.DATA_VERSION,
+                "SK": dataset.dataset_identifier(with_version=False),
+            },
+            UpdateExpression="ADD #V :one",
+            ExpressionAttributeNames={"#V": "Version"},
+            ExpressionAttributeValues={":one": 1},
+        )
+
+    def _read(self, key: str) -> Optional[bytes]:
+        result = super()._read(key)
+        if result is not None:
+            return result
+        try:
+            result = self.s3_client.get_object(
+                Bucket=self.bucket, Key=self._s3_key(key)
+            )["Body"].read()
+        except ClientError as error:
+            if error.response["Error"]["Code"] == "NoSuchKey":
+                return None
+            raise error
+        super()._write(key, result)
+        return result
+
+    def _write(self, key: str, result: bytes) -> None:
+        if len(result) > self.max_size:
+            return
+        self.s3_client.put_object(
+            Bucket=self.bucket, Key=self._s3_key(key), Body=result
+        )
+        super()._write(key, result)
+
+    def _s3_key(self, key: str) -> str:
+        return f"{QUERY_CACHE_S3_PREFIX}/{key}.parquet"
+
+
+class DisabledQueryResultCache(QueryResultCache):
+    def cache_key(self, dataset: DatasetMetadata, sql: str) -> Optional[str]:
+        return None
+
+    def get(self, key: Optional[str]) -> Optional[pd.DataFrame]:
+        return None
+
+    def invalidate(self, dataset: DatasetMetadata) -> None:
+        pass
+
+
+def create_query_result_cache(backend: str = QUERY_CACHE_BACKEND) -> QueryResultCache:
+    if backend == "shared":
+        return SharedQueryResultCache()
+    if backend == "local":
+        return LocalQueryResultCache()
+    return DisabledQueryResultCache()
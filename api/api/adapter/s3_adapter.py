@@ -1,12 +1,26 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Optional, Type, Union
+from typing import Callable, Dict, List, Tuple, Type, Union
 
 import boto3
+from boto3.exceptions import S3UploadFailedError
+import pyarrow as pa
+import pyarrow.parquet as pq
 from botocore.exceptions import ClientError
 from botocore.response import StreamingBody
 
-from api.application.services.partitioning_service import Partition
+from api.application.services.data_files import (
+    file_uploads,
+    is_compacted_file,
+    remove_upload,
+)
+from api.application.services.partitioning_service import (
+    Partition,
+    partition_to_parquet,
+)
 from api.common.config.aws import (
     AWS_REGION,
     DATA_BUCKET,
@@ -14,27 +28,56 @@ from api.common.config.aws import (
 )
 from api.common.config.constants import (
     CONTENT_ENCODING,
+    INCOMING_UPLOADS_S3_PREFIX,
+    PARQUET_FOOTER_READ_BYTES,
     QUERY_RESULTS_LINK_EXPIRY_SECONDS,
+    S3_DELETE_BATCH_SIZE,
+    S3_UPLOAD_CONCURRENCY,
+    S3_UPLOAD_MAX_ATTEMPTS,
+    S3_UPLOAD_RETRY_DELAY_SECONDS,
 )
 from api.common.custom_exceptions import AWSServiceError, UserError
 from api.common.logger import AppLogger
 from api.domain.dataset_metadata import DatasetMetadata
+from api.domain.dataset_statistics import DatasetSizeChange
 from api.domain.schema_metadata import SchemaMetadata
 from api.domain.schema import Schema
 
 
+# Errors that S3 returns when it is throttling requests or temporarily unavailable
+RETRYABLE_ERROR_CODES = {
+    "SlowDown",
+    "Throttling",
+    "ThrottlingException",
+    "RequestTimeout",
+    "InternalError",
+    "ServiceUnavailable",
+}
+
+
+def is_retryable_error(error: ClientError) -> bool:
+    return (
+        error.response.get("Error", {}).get("Code") in RETRYABLE_ERROR_CODES
+        or error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0) >= 500
+    )
+
+
 class S3Adapter:
     def __init__(
         self,
         s3_client=boto3.client(
             "s3",
             region_name=AWS_REGION,
-            config=boto3.session.Config(signature_version="s3v4"),
+            config=boto3.session.Config(
+                signature_version="s3v4", max_pool_connections=S3_UPLOAD_CONCURRENCY
+            ),
         ),
         s3_bucket=DATA_BUCKET,
+        upload_concurrency: int = S3_UPLOAD_CONCURRENCY,
     ):
         self.__s3_client = s3_client
         self.__s3_bucket = s3_bucket
+        self.__upload_concurrency = upload_concurrency
 
     def store_data(self, object_full_path: str, object_content: bytes):
         self._validate_file(object_content, object_full_path)
@@ -59,15 +102,136 @@ class S3Adapter:
         schema: Schema,
         filename: str,
         partitions: List[Partition],
-    ):
-        for partition in partitions:
-            upload_path = self._construct_partitioned_data_path(
-                partition.path, filename, schema.metadata
+    ) -> Dict[str, int]:
+        return self._store_partitions(
+            schema,
+            filename,
+            [
+                (partition.path, partial(partition_to_parquet, schema, partition))
+                for partition in partitions
+            ],
+        )
+
+    def upload_encoded_partitions(
+        self,
+        schema: Schema,
+        filename: str,
+        encoded_partitions: List[Tuple[str, bytes]],
+    ) -> Dict[str, int]:
+        return self._store_partitions(schema, filename, encoded_partitions)
+
+    def _store_partitions(
+        self,
+        schema: Schema,
+        filename: str,
+        partition_contents: List[Tuple[str, Union[bytes, Callable[[], bytes]]]],
+    ) -> Dict[str, int]:
+        """
+        Encodes and stores the partition files concurrently. Partitions that S3 fails to store
+        after retrying are reported together in a single error.
+
+        :return: The size in bytes of each stored file, by key
+        """
+        upload_paths = {
+            partition_path: self._construct_partitioned_data_path(
+                partition_path, filename, schema.metadata
             )
-            data_content = partition.df.to_parquet(
-                compression="gzip", index=False, schema=schema.generate_storage_schema()
+            for partition_path, _ in partition_contents
+        }
+        with ThreadPoolExecutor(max_workers=self.__upload_concurrency) as executor:
+            futures = {
+                partition_path: executor.submit(
+                    self._store_partition, upload_paths[partition_path], content
+                )
+                for partition_path, content in partition_contents
+            }
+
+        failed_partitions = []
+        for partition_path, future in futures.items():
+            error = future.exception()
+            if error is not None and not isinstance(error, ClientError):
+                raise error
+            if error is not None:
+                AppLogger.error(
+                    f"Failed to store partition [{partition_path}] of {schema.metadata.string_representation()}: {error}"
+                )
+                failed_partitions.append(partition_path)
+
+        if failed_partitions:
+            raise AWSServiceError(
+                f"Failed to store {len(failed_partitions)} of {len(futures)} partitions: {failed_partitions}"
+            )
+        return {
+            upload_paths[partition_path]: future.result()
+            for partition_path, future in futures.items()
+        }
+
+    def _store_partition(
+        self, upload_path: str, content: Union[bytes, Callable[[], bytes]]
+    ) -> int:
+        data_content = content() if callable(content) else content
+        for attempt in range(1, S3_UPLOAD_MAX_ATTEMPTS + 1):
+            try:
+                self.store_data(upload_path, data_content)
+                return len(data_content)
+            except ClientError as error:
+                if attempt == S3_UPLOAD_MAX_ATTEMPTS or not is_retryable_error(error):
+                    raise error
+                AppLogger.warning(
+                    f"Attempt {attempt} to store [{upload_path}] failed, retrying: {error}"
+                )
+                time.sleep(S3_UPLOAD_RETRY_DELAY_SECONDS * 2 ** (attempt - 1))
+
+    def upload_staged_data(
+        self, schema_metadata: SchemaMetadata, staging_directory: Path
+    ) -> Dict[str, int]:
+        """
+        Uploads every file in the staging directory to the dataset location concurrently, keeping
+        the partition paths relative to the staging directory. Files that S3 fails to store are
+        reported together in a single error.
+
+        :return: The size in bytes of each uploaded file, by key
+        """
+        AppLogger.info(
+            f"Promoting staged data for {schema_metadata.string_representation()}"
+        )
+        staged_files = {
+            os.path.join(
+                schema_metadata.dataset_location(),
+                staged_file.relative_to(staging_directory).as_posix(),
+            ): staged_file
+            for staged_file in sorted(staging_directory.rglob("*.parquet"))
+        }
+        with ThreadPoolExecutor(max_workers=self.__upload_concurrency) as executor:
+            futures = {
+                upload_path: executor.submit(
+                    self.__s3_client.upload_file,
+                    Filename=staged_file.as_posix(),
+                    Bucket=self.__s3_bucket,
+                    Key=upload_path,
+                )
+                for upload_path, staged_file in staged_files.items()
+            }
+
+        failed_files = []
+        for upload_path, future in futures.items():
+            error = future.exception()
+            if error is not None and not isinstance(
+                error, (ClientError, S3UploadFailedError)
+            ):
+                raise error
+            if error is not None:
+                AppLogger.error(f"Failed to store staged file [{upload_path}]: {error}")
+                failed_files.append(upload_path)
+
+        if failed_files:
+            raise AWSServiceError(
+                f"Failed to store {len(failed_files)} of {len(futures)} staged files: {failed_files}"
             )
-            self.store_data(upload_path, data_content)
+        return {
+            upload_path: staged_file.stat().st_size
+            for upload_path, staged_file in staged_files.items()
+        }
 
     def upload_raw_data(
         self, schema_metadata: SchemaMetadata, file_path: Path, raw_file_identifier: str
@@ -84,6 +248,29 @@ class S3Adapter:
             f"Raw data upload for {schema_metadata.glue_table_name()} completed"
         )
 
+    def upload_incoming_file(self, file_path: Path, raw_file_identifier: str) -> str:
+        """
+        Stages an incoming upload file in S3, so that it can be processed on any host
+
+        :return: The key of the staged file
+        """
+        key = f"{INCOMING_UPLOADS_S3_PREFIX}/{raw_file_identifier}/{file_path.name}"
+        self.__s3_client.upload_file(
+            Filename=file_path.name, Bucket=self.__s3_bucket, Key=key
+        )
+        return key
+
+    def download_incoming_file(self, key: str, file_path: Path) -> None:
+        self.__s3_client.download_file(
+            Bucket=self.__s3_bucket, Key=key, Filename=file_path.name
+        )
+
+    def delete_incoming_file(self, key: str) -> None:
+        try:
+            self.__s3_client.delete_object(Bucket=self.__s3_bucket, Key=key)
+        except ClientError as error:
+            AppLogger.error(f"Staged upload file {key} not deleted. Detail: {error}")
+
     def list_raw_files(self, dataset: DatasetMetadata) -> List[str]:
         object_list = self.list_files_from_path(dataset.raw_data_location())
         return self._map_object_list_to_filename(object_list)
@@ -96,68 +283,106 @@ class S3Adapter:
             *self.list_files_from_path(dataset.dataset_location(with_version=False)),
         ]
 
-    def get_last_updated_time(self, file_path: str) -> Optional[str]:
+    def get_folder_statistics(self, file_path: str) -> Dict:
         """
-        :return: Returns the last updated time for the dataset
+        :return: Returns the size in bytes, number of objects and last updated time of the objects under the path
         """
-        paginator = self.__s3_client.get_paginator("list_objects_v2")
-        page_iterator = paginator.paginate(Bucket=self.__s3_bucket, Prefix=file_path)
-        try:
-            return str(
-                max(
-                    [
-                        item["LastModified"]
-                        for page in page_iterator
-                        for item in page["Contents"]
-                    ]
-                )
+        objects = [
+            item
+            for page in self.__s3_client.get_paginator("list_objects_v2").paginate(
+                Bucket=self.__s3_bucket, Prefix=file_path
             )
-        except KeyError:
-            return None
+            for item in page.get("Contents", [])
+        ]
+        return {
+            "size_bytes": sum(item["Size"] for item in objects),
+            "object_count": len(objects),
+            "last_updated": (
+                str(max(item["LastModified"] for item in objects)) if objects else None
+            ),
+        }
 
-    def get_folder_size(self, file_path: str) -> int:
+    def read_parquet_metadata(self, keys: List[str]) -> Dict[str, pq.FileMetaData]:
         """
-        :return: Returns the size in bytes.
+        Reads the footer metadata of the Parquet files concurrently, without reading their data
         """
-        try:
-            paginator = self.__s3_client.get_paginator("list_objects_v2")
-            page_iterator = paginator.paginate(
-                Bucket=self.__s3_bucket, Prefix=file_path
-            )
-            return sum(
-                [item["Size"] for page in page_iterator for item in page["Contents"]]
-            )
-        except KeyError:
-            return 0
+        with ThreadPoolExecutor(max_workers=self.__upload_concurrency) as executor:
+            return dict(zip(keys, executor.map(self._read_parquet_metadata, keys)))
+
+    def _read_parquet_metadata(self, key: str) -> pq.FileMetaData:
+        tail = self._read_object_tail(key, PARQUET_FOOTER_READ_BYTES)
+        # A Parquet file ends with the footer, its length in 4 bytes and the magic number
+        footer_length = int.from_bytes(tail[-8:-4], "little")
+        if footer_length + 8 > len(tail):
+            tail = self._read_object_tail(key, footer_length + 8)
+        return pq.read_metadata(pa.BufferReader(tail))
+
+    def _read_object_tail(self, key: str, length: int) -> bytes:
+        return self.__s3_client.get_object(
+            Bucket=self.__s3_bucket, Key=key, Range=f"bytes=-{length}"
+        )["Body"].read()
 
     def delete_dataset_files(
         self, dataset: DatasetMetadata, raw_data_filename: str
-    ) -> None:
+    ) -> DatasetSizeChange:
         """
-        Deletes the raw file and the corresponding data file
+        Deletes the data files written by the upload of the raw file, and removes its rows from
+        the compacted files that hold them
+
+        :return: The change in the size of the dataset
         """
-        files = self.list_files_from_path(dataset.dataset_location())
+        files = {
+            item["Key"]: item["Size"]
+            for item in self.list_objects_from_path(dataset.dataset_location())
+        }
         raw_file_identifier = self._clean_filename(raw_data_filename)
 
         files_to_delete = [
             {"Key": data_file}
             for data_file in files
-            if self._clean_filename(data_file).startswith(raw_file_identifier)
+            if not is_compacted_file(data_file)
+            and self._clean_filename(data_file).startswith(raw_file_identifier)
         ]
+        compacted_files = [
+            key
+            for key, metadata in self.read_parquet_metadata(
+                [data_file for data_file in files if is_compacted_file(data_file)]
+            ).items()
+            if any(
+                upload == raw_file_identifier
+                for upload, _ in file_uploads(key, metadata)
+            )
+        ]
+        rewritten_size_change = 0
+        for key in compacted_files:
+            content = remove_upload(
+                key, self.retrieve_data(key).read(), raw_file_identifier
+            )
+            if content is None:
+                files_to_delete.append({"Key": key})
+            else:
+                self.__s3_client.put_object(
+                    Bucket=self.__s3_bucket, Key=key, Body=content
+                )
+                rewritten_size_change += len(content) - files[key]
 
         self._delete_objects(files_to_delete, raw_data_filename)
+        return DatasetSizeChange(
+            size_bytes=rewritten_size_change
+            - sum(files[data_file["Key"]] for data_file in files_to_delete),
+            object_count=-len(files_to_delete),
+        )
 
     def delete_previous_dataset_files(
         self, dataset: Type[DatasetMetadata], raw_file_identifier: str
     ):
         files = self.list_files_from_path(dataset.dataset_location())
         files_to_delete = [
-            file
+            {"Key": file}
             for file in files
             if not self._extract_filename(file).startswith(raw_file_identifier)
         ]
-        for file in files_to_delete:
-            self._delete_data(file)
+        self._delete_objects(files_to_delete, raw_file_identifier)
 
     def delete_dataset_files_using_key(self, keys: List[str], filename: str):
         files_to_delete = [{"Key": key} for key in keys]
@@ -198,26 +423,54 @@ class S3Adapter:
         return os.path.join(dataset.dataset_location(), partition_path, filename)
 
     def _delete_objects(self, files_to_delete: List[Dict], filename: str):
-        if files_to_delete:
-            response = self.__s3_client.delete_objects(
-                Bucket=self.__s3_bucket, Delete={"Objects": files_to_delete}
-            )
-            self._handle_deletion_response(filename, response)
-        else:
+        """
+        Deletes the objects in batches of at most S3_DELETE_BATCH_SIZE keys, sending the batches
+        concurrently. Every batch is attempted and the failures are reported together.
+        """
+        if not files_to_delete:
             AppLogger.info(f"No files to delete for: {filename}")
+            return
+
+        batches = []
+        for start in range(0, len(files_to_delete), S3_DELETE_BATCH_SIZE):
+            end = start + S3_DELETE_BATCH_SIZE
+            batches.append(files_to_delete[start:end])
+        with ThreadPoolExecutor(max_workers=self.__upload_concurrency) as executor:
+            futures = [
+                executor.submit(
+                    self.__s3_client.delete_objects,
+                    Bucket=self.__s3_bucket,
+                    Delete={"Objects": batch},
+                )
+                for batch in batches
+            ]
 
-    def _handle_deletion_response(self, filename, response):
-        if "Deleted" in response:
-            AppLogger.info(
-                f'Files deleted: {[item["Key"] for item in response["Deleted"]]}'
+        errors = []
+        for future in futures:
+            error = future.exception()
+            if error is not None and not isinstance(error, ClientError):
+                raise error
+            if error is not None:
+                errors.append(error)
+            else:
+                errors.extend(self._handle_deletion_response(future.result()))
+
+        if errors:
+            message = "\n".join([str(error) for error in errors])
+            AppLogger.error(
+                f"Error during file deletion [{filename}], {len(errors)} of {len(files_to_delete)} files not deleted: \n{message}"
             )
-        if "Errors" in response:
-            message = "\n".join([str(error) for error in response["Errors"]])
-            AppLogger.error(f"Error during file deletion [{filename}]: \n{message}")
             raise AWSServiceError(
                 f"The item [{filename}] could not be deleted. Please contact your administrator."
             )
 
+    def _handle_deletion_response(self, response: Dict) -> List:
+        if "Deleted" in response:
+            AppLogger.info(
+                f'Files deleted: {[item["Key"] for item in response["Deleted"]]}'
+            )
+        return response.get("Errors", [])
+
     def list_files_from_path(self, file_path: str) -> List[Dict]:
         try:
             paginator = self.__s3_client.get_paginator("list_objects_v2")
@@ -228,6 +481,18 @@ class S3Adapter:
         except KeyError:
             return []
 
+    def list_objects_from_path(self, file_path: str) -> List[Dict]:
+        """
+        Lists the key and size in bytes of every object under the path
+        """
+        paginator = self.__s3_client.get_paginator("list_objects_v2")
+        page_iterator = paginator.paginate(Bucket=self.__s3_bucket, Prefix=file_path)
+        return [
+            {"Key": item["Key"], "Size": item["Size"]}
+            for page in page_iterator
+            for item in page.get("Contents", [])
+        ]
+
     def _map_object_list_to_filename(self, object_list) -> List[str]:
         if len(object_list) > 0:
             return [
@@ -257,6 +522,3 @@ class S3Adapter:
 
     def _has_content(self, element: Union[str, bytes]) -> bool:
         return element is not None and len(element) > 0
-
-    def _delete_data(self, object_full_path: str):
-        self.__s3_client.delete_object(Bucket=self.__s3_bucket, Key=object_full_path)
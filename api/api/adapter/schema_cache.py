@@ -0,0 +1,121 @@
+import time
+from threading import Lock
+from typing import Callable, Dict, Optional, Tuple
+
+from api.common.config.constants import SCHEMA_CACHE_TTL_SECONDS
+from api.domain.dataset_metadata import DatasetMetadata
+from api.domain.schema import Schema
+
+
+class SchemaCache:
+    """
+    Caches parsed schemas by layer, domain, dataset and version, along with a pointer to the
+    latest version of each dataset, for `ttl` seconds. Schema changes made in this process
+    invalidate the dataset's schemas straight away, changes made by other instances of the API are
+    seen once the cached entries expire. Schemas that are not found are not cached.
+
+    Each caller gets its own copy of a cached schema, so that changing it does not change the cache.
+    """
+
+    def __init__(
+        self,
+        ttl: float = SCHEMA_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._schemas: Dict[Tuple[str, int], Tuple[float, Schema]] = {}
+        self._latest_versions: Dict[str, Tuple[float, int]] = {}
+        # Incremented on every invalidation, so that schemas read before an invalidation are not
+        # cached after it
+        self._generation = 0
+        self._lock = Lock()
+
+    def get_schema(
+        self,
+        dataset: DatasetMetadata,
+        version: Optional[int],
+        load: Callable[[], Optional[Schema]],
+    ) -> Optional[Schema]:
+        """Gets the given version of the dataset's schema, or its latest one when no version is given"""
+        now = self.clock()
+        dataset_key = self._dataset_key(dataset)
+        with self._lock:
+            schema = self._cached_schema(dataset_key, version, now)
+            if schema is not None:
+                self.hits += 1
+                return schema.copy(deep=True)
+            self.misses += 1
+            generation = self._generation
+
+        schema = load()
+        if schema is not None and self.ttl > 0:
+            with self._lock:
+                if generation == self._generation:
+                    self._store(
+                        dataset_key, schema.copy(deep=True), version is None, now
+                    )
+        return schema
+
+    def invalidate_dataset(self, dataset: DatasetMetadata) -> None:
+        dataset_key = self._dataset_key(dataset)
+        with self._lock:
+            self._latest_versions.pop(dataset_key, None)
+            self._schemas = {
+                key: cached
+                for key, cached in self._schemas.items()
+                if key[0] != dataset_key
+            }
+            self._generation += 1
+            self.invalidations += 1
+
+    def metrics(self) -> Dict[str, float]:
+        now = self.clock()
+        with self._lock:
+            self._schemas = {
+                key: cached
+                for key, cached in self._schemas.items()
+                if now - cached[0] < self.ttl
+            }
+            self._latest_versions = {
+                key: latest
+                for key, latest in self._latest_versions.items()
+                if now - latest[0] < self.ttl
+            }
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "entries": len(self._schemas),
+                "ttl_seconds": self.ttl,
+            }
+
+    def _cached_schema(
+        self, dataset_key: str, version: Optional[int], now: float
+    ) -> Optional[Schema]:
+        if version is None:
+            latest = self._latest_versions.get(dataset_key)
+            if latest is None or now - latest[0] >= self.ttl:
+                return None
+            version = latest[1]
+        cached = self._schemas.get((dataset_key, version))
+        if cached is None or now - cached[0] >= self.ttl:
+            return None
+        return cached[1]
+
+    def _store(
+        self, dataset_key: str, schema: Schema, latest: bool, now: float
+    ) -> None:
+        version = schema.get_version()
+        self._schemas[(dataset_key, version)] = (now, schema)
+        if latest:
+            self._latest_versions[dataset_key] = (now, version)
+
+    @staticmethod
+    def _dataset_key(dataset: DatasetMetadata) -> str:
+        return dataset.dataset_identifier(with_version=False)
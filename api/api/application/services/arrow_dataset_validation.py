@@ -0,0 +1,191 @@
+from typing import Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from api.common.custom_exceptions import (
+    DatasetValidationError,
+    UnprocessableDatasetError,
+)
+from api.application.services.dataset_validation import is_valid_custom_dtype
+from api.common.value_transformers import clean_column_name
+from api.domain.data_types import (
+    AthenaDataType,
+    DateType,
+    extract_athena_type_from_arrow,
+)
+from api.domain.schema import Schema
+from api.domain.validation_context import ValidationContext
+
+
+def build_validated_table(schema: Schema, batch: pa.RecordBatch) -> pa.Table:
+    """
+    Validates a parquet record batch without converting it to pandas.
+    The returned table has the columns in schema order, cast to the storage types.
+    """
+    return transform_and_validate(schema, pa.Table.from_batches([batch]))
+
+
+def transform_and_validate(schema: Schema, table: pa.Table) -> pa.Table:
+    validation_context = (
+        ValidationContext(table)
+        .pipe(table_has_rows)
+        .pipe(remove_empty_rows)
+        .pipe(clean_column_headers)
+        .pipe(table_has_correct_columns, schema)
+        .pipe(convert_date_columns, schema)
+        .pipe(table_has_acceptable_null_values, schema)
+        .pipe(table_has_correct_data_types, schema)
+        .pipe(table_has_no_illegal_characters_in_partition_columns, schema)
+    )
+
+    if validation_context.has_errors():
+        raise DatasetValidationError(validation_context.errors())
+
+    return validation_context.get_dataframe().select(schema.get_column_names())
+
+
+def table_has_rows(table: pa.Table) -> Tuple[pa.Table, list[str]]:
+    if table.num_rows == 0:
+        # Cannot proceed if there are no rows
+        raise UnprocessableDatasetError(["Dataset has no rows, it cannot be processed"])
+
+    return table, []
+
+
+def remove_empty_rows(table: pa.Table) -> Tuple[pa.Table, list[str]]:
+    if table.num_columns == 0:
+        return table, []
+    empty_rows = pc.is_null(table.column(0), nan_is_null=True)
+    for column in table.columns[1:]:
+        empty_rows = pc.and_(empty_rows, pc.is_null(column, nan_is_null=True))
+    if pc.any(empty_rows).as_py():
+        table = table.filter(pc.invert(empty_rows))
+    return table, []
+
+
+def clean_column_headers(table: pa.Table) -> Tuple[pa.Table, list[str]]:
+    return (
+        table.rename_columns([clean_column_name(name) for name in table.column_names]),
+        [],
+    )
+
+
+def table_has_correct_columns(
+    table: pa.Table, schema: Schema
+) -> Tuple[pa.Table, list[str]]:
+    expected_columns = schema.get_column_names()
+    actual_columns = table.column_names
+
+    has_expected_columns = all(
+        [expected_column in actual_columns for expected_column in expected_columns]
+    )
+
+    if not has_expected_columns or len(actual_columns) != len(expected_columns):
+        # Cannot reasonably proceed with further validation if we don't even have the correct columns
+        raise UnprocessableDatasetError(
+            [f"Expected columns: {expected_columns}, received: {actual_columns}"]
+        )
+
+    return table, []
+
+
+def convert_date_columns(table: pa.Table, schema: Schema) -> Tuple[pa.Table, list[str]]:
+    error_list = []
+
+    for column in schema.get_columns_by_type(DateType):
+        index = table.schema.get_field_index(column.name)
+        values = table.column(index)
+        if not (
+            pa.types.is_string(values.type) or pa.types.is_large_string(values.type)
+        ):
+            continue
+        try:
+            table = table.set_column(
+                index,
+                column.name,
+                pc.strptime(values, format=column.format, unit="s"),
+            )
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            error_list.append(
+                f"Column [{column.name}] does not match specified date format in at least one row"
+            )
+
+    return table, error_list
+
+
+def table_has_acceptable_null_values(
+    table: pa.Table, schema: Schema
+) -> Tuple[pa.Table, list[str]]:
+    error_list = []
+    for column in schema.columns:
+        if column.allow_null:
+            continue
+        values = table.column(column.name)
+        has_nulls = values.null_count > 0
+        if not has_nulls and pa.types.is_floating(values.type):
+            # pandas treats NaN as null, keep the same semantics for parquet uploads
+            has_nulls = pc.any(pc.is_nan(values)).as_py()
+        if has_nulls:
+            error_list.append(f"Column [{column.name}] does not allow null values")
+
+    return table, error_list
+
+
+def table_has_correct_data_types(
+    table: pa.Table, schema: Schema
+) -> Tuple[pa.Table, list[str]]:
+    """
+    Compares the type family of each column with the schema, in the same way as the pandas
+    validation, and casts the columns that match to their storage type
+    """
+    error_list = []
+    storage_schema = schema.generate_storage_schema()
+    for column in schema.columns:
+        index = table.schema.get_field_index(column.name)
+        values = table.column(index)
+        expected_type = column.data_type
+        storage_type = storage_schema.field(column.name).type
+
+        if not pa.types.is_null(values.type):
+            actual_type = extract_athena_type_from_arrow(column.name, values.type)
+            types_match = isinstance(
+                AthenaDataType(expected_type).value,
+                type(AthenaDataType(actual_type).value),
+            )
+            if is_valid_custom_dtype(actual_type, expected_type):
+                # Date columns that could not be parsed are reported by convert_date_columns
+                continue
+            if not types_match:
+                error_list.append(
+                    f"Column [{column.name}] has an incorrect data type. Expected {expected_type}, received {actual_type}"
+                    # noqa: E501
+                )
+                continue
+
+        try:
+            table = table.set_column(
+                index, column.name, pc.cast(values, storage_type, safe=True)
+            )
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            error_list.append(
+                f"Failed to convert column [{column.name}] to type [{expected_type}]"
+            )
+
+    return table, error_list
+
+
+def table_has_no_illegal_characters_in_partition_columns(
+    table: pa.Table, schema: Schema
+) -> Tuple[pa.Table, list[str]]:
+    error_list = []
+    for column in schema.get_partition_columns():
+        values = table.column(column.name)
+        if column.is_of_data_type(DateType) or not pa.types.is_string(values.type):
+            continue
+        if pc.any(pc.match_substring(values, "/")).as_py():
+            error_list.append(
+                f"Partition column [{column.name}] has values with illegal characters '/'"
+            )
+
+    return table, error_list
@@ -77,8 +77,11 @@ def validate_token(
     browser_request: bool = Depends(is_browser_request),
     client_token: Optional[str] = Depends(oauth2_scheme),
     user_token: Optional[str] = Depends(oauth2_user_scheme),
+    request: Request = None,
 ) -> Token:
     check_credentials_availability(browser_request, client_token, user_token)
+    if request is not None:
+        return get_request_token(request)
     token = client_token if client_token else user_token
     return parse_token(token)
 
@@ -100,9 +103,10 @@ def secure_endpoint(
     browser_request: bool = Depends(is_browser_request),
     client_token: Optional[str] = Depends(oauth2_scheme),
     user_token: Optional[str] = Depends(oauth2_user_scheme),
+    request: Request = None,
 ):
     try:
-        token = validate_token(browser_request, client_token, user_token)
+        token = validate_token(browser_request, client_token, user_token, request)
         check_permissions(token.subject, security_scopes.scopes)
     except (InvalidTokenError, AuthorisationError) as error:
         handle_authorisation_error(user_token, error)
@@ -116,9 +120,10 @@ def secure_dataset_endpoint(
     layer: Optional[Layer] = None,
     domain: Optional[str] = None,
     dataset: Optional[str] = None,
+    request: Request = None,
 ):
     try:
-        token = validate_token(browser_request, client_token, user_token)
+        token = validate_token(browser_request, client_token, user_token, request)
         metadata = process_dataset_metadata(layer, domain, dataset)
         dataset_access_evaluator.can_access_dataset(
             metadata, token.subject, security_scopes.scopes
@@ -138,11 +143,20 @@ def process_dataset_metadata(layer, domain, dataset) -> DatasetMetadata:
 
 
 def get_subject_id(request: Request):
-    client_token = get_client_token(request)
-    user_token = get_user_token(request)
-    token = client_token if client_token else user_token
-    token = parse_token(token)
-    return token.subject
+    return get_request_token(request).subject
+
+
+def get_request_token(request: Request) -> Token:
+    """
+    Parses the token of the request, favouring the client token over the user token. The parsed
+    token is kept on the request state so that the middleware, the endpoint security and the
+    endpoint itself parse it once between them.
+    """
+    token = getattr(request.state, "token", None)
+    if token is None:
+        token = parse_token(get_client_token(request) or get_user_token(request))
+        request.state.token = token
+    return token
 
 
 def get_client_token(request: Request) -> Optional[str]:
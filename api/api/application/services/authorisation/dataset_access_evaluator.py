@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import List
+from typing import Callable, List
 
 from api.common.custom_exceptions import AuthorisationError
 from api.common.config.auth import Action, Sensitivity, ALL, Layer
@@ -104,32 +104,55 @@ class DatasetAccessEvaluator:
         self,
         permissions: List[PermissionItem],
         filters: DatasetFilters = DatasetFilters(),
-    ) -> List[SchemaMetadata]:
-        authorised_datasets = set()
-        for permission in permissions:
-            authorised_datasets.update(
-                self.extract_datasets_from_permission(permission, filters)
-            )
-        return sorted(authorised_datasets)
-
-    def extract_datasets_from_permission(
-        self, permission: PermissionItem, filters: DatasetFilters = DatasetFilters()
     ) -> List[SchemaMetadata]:
         """
-        Extracts the datasets from the permission, while combining with the filters argument.
-        The permission filters overwrite the filters argument to stop any injection of permissions via the filters.
+        Reads the latest schemas in the layers and sensitivities of the permissions once, then keeps
+        those that overlap with at least one of the permissions.
+        The permissions overwrite the layer, domain and sensitivity of the filters argument to stop
+        any injection of permissions via the filters.
         """
+        if not permissions:
+            return []
         query = DatasetFilters(
             **(
-                # If there are overlapping keys, the permission values will overwrite the others
                 dict(filters)
                 | {
-                    SENSITIVITY: SensitivityPermissionConverter[
-                        permission.sensitivity
-                    ].value,
-                    LAYER: LayerPermissionConverter[permission.layer].value,
-                    DOMAIN: permission.domain,
+                    SENSITIVITY: self._permission_values(
+                        permissions,
+                        lambda permission: SensitivityPermissionConverter[
+                            permission.sensitivity
+                        ].value,
+                    ),
+                    LAYER: self._permission_values(
+                        permissions,
+                        lambda permission: LayerPermissionConverter[
+                            permission.layer
+                        ].value,
+                    ),
+                    DOMAIN: None,
                 }
             )
         )
-        return self.schema_service.get_schema_metadatas(query)
+        return sorted(
+            {
+                schema_metadata
+                for schema_metadata in self.schema_service.get_schema_metadatas(query)
+                if any(
+                    self.schema_metadata_overlaps_with_permission(
+                        schema_metadata, permission
+                    )
+                    for permission in permissions
+                )
+            }
+        )
+
+    @staticmethod
+    def _permission_values(
+        permissions: List[PermissionItem],
+        values: Callable[[PermissionItem], List[str]],
+    ) -> List[str]:
+        return list(
+            dict.fromkeys(
+                value for permission in permissions for value in values(permission)
+            )
+        )
@@ -1,14 +1,93 @@
-from typing import Any
+import hashlib
+import time
+from collections import OrderedDict
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, Optional, Tuple
 
 import jwt
 from jwt import PyJWKClient
+from jwt.exceptions import PyJWTError
 
 from api.common.config.auth import (
     COGNITO_JWKS_URL,
 )
+from api.common.config.constants import (
+    JWKS_REFRESH_INTERVAL_SECONDS,
+    VERIFIED_TOKEN_CACHE_SIZE,
+)
+from api.common.custom_exceptions import AuthorisationError
+from api.common.logger import AppLogger
 from api.domain.token import Token
 
-jwks_client = PyJWKClient(COGNITO_JWKS_URL)
+# The key set is refreshed in the background well before it expires, so that requests do not
+# wait for it to be fetched
+jwks_client = PyJWKClient(COGNITO_JWKS_URL, lifespan=2 * JWKS_REFRESH_INTERVAL_SECONDS)
+
+
+class VerifiedTokenCache:
+    """
+    Keeps the tokens whose signature has been verified, keyed by a hash of the token, so that a
+    token sent with every request is only verified once. A token is served from the cache until
+    it expires, tokens without an expiry are not cached. At most `max_size` tokens are kept, the
+    least recently used ones are evicted first.
+    """
+
+    def __init__(
+        self,
+        max_size: int = VERIFIED_TOKEN_CACHE_SIZE,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_size = max_size
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._tokens: OrderedDict[str, Tuple[float, Token]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, token: str) -> Optional[Token]:
+        key = self._key(token)
+        with self._lock:
+            cached = self._tokens.get(key)
+            if cached is not None and self.clock() < cached[0]:
+                self._tokens.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            if cached is not None:
+                del self._tokens[key]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, verified_token: Token, expiry: Optional[Any]) -> None:
+        if self.max_size <= 0 or not isinstance(expiry, (int, float)):
+            return
+        key = self._key(token)
+        with self._lock:
+            self._tokens[key] = (expiry, verified_token)
+            self._tokens.move_to_end(key)
+            while len(self._tokens) > self.max_size:
+                self._tokens.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+
+    def metrics(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._tokens),
+                "max_entries": self.max_size,
+            }
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+
+verified_token_cache = VerifiedTokenCache()
 
 
 def get_validated_token_payload(token: str) -> dict[str, Any]:
@@ -16,6 +95,40 @@ def get_validated_token_payload(token: str) -> dict[str, Any]:
     return jwt.decode(token, signing_key.key, algorithms=["RS256"])
 
 
-def parse_token(token: str) -> Token:
+def parse_token(token: Optional[str]) -> Token:
+    if not token:
+        AppLogger.info("Cannot parse the token of a request without credentials")
+        raise AuthorisationError("You are not authorised to perform this action")
+    cached = verified_token_cache.get(token)
+    if cached is not None:
+        return cached
     payload = get_validated_token_payload(token)
-    return Token(payload)
+    verified_token = Token(payload)
+    verified_token_cache.put(token, verified_token, payload.get("exp"))
+    return verified_token
+
+
+def refresh_signing_keys() -> None:
+    try:
+        jwks_client.get_jwk_set(refresh=True)
+    except PyJWTError as error:
+        # The keys fetched before are kept and requests fetch them again once they expire
+        AppLogger.warning(f"Failed to refresh the token signing keys: {error}")
+
+
+def start_signing_key_refresh(
+    interval: float = JWKS_REFRESH_INTERVAL_SECONDS,
+) -> Event:
+    """
+    Fetches the token signing keys straight away and then every `interval` seconds, on a
+    background thread. Setting the returned event stops the refresh.
+    """
+    stopped = Event()
+
+    def refresh():
+        refresh_signing_keys()
+        while not stopped.wait(interval):
+            refresh_signing_keys()
+
+    Thread(target=refresh, name="jwks-refresh", daemon=True).start()
+    return stopped
@@ -0,0 +1,111 @@
+import datetime
+import math
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+import awswrangler as wr
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from api.domain.data_types import DateType
+from api.domain.dataset_statistics import ColumnStatistics
+from api.domain.schema import Column, Schema
+
+
+def file_column_statistics(
+    schema: Schema,
+    metadata: pq.FileMetaData,
+    partition_path: str,
+    row_groups: Optional[List[int]] = None,
+) -> Dict[str, ColumnStatistics]:
+    """
+    Reads the statistics of every column of a data file, or of the given row groups of it, from
+    its footer. Partition columns are not stored in the file, their value is taken from its
+    partition path instead.
+    """
+    if row_groups is None:
+        row_groups = list(range(metadata.num_row_groups))
+    statistics = merge_column_statistics(
+        {
+            row_group.column(index).path_in_schema: _chunk_statistics(
+                row_group.column(index).statistics
+            )
+            for index in range(row_group.num_columns)
+        }
+        for row_group in (metadata.row_group(index) for index in row_groups)
+    )
+    if any(metadata.row_group(index).num_rows for index in row_groups):
+        partition_columns = {
+            column.name: column for column in schema.get_partition_columns()
+        }
+        for partition in filter(None, partition_path.split("/")):
+            name, value = partition.split("=", 1)
+            if name in partition_columns:
+                value = _partition_value(partition_columns[name], value)
+                statistics[name] = ColumnStatistics(min=value, max=value)
+    return statistics
+
+
+def merge_column_statistics(
+    statistics: Iterable[Dict[str, ColumnStatistics]]
+) -> Dict[str, ColumnStatistics]:
+    merged = {}
+    for file_statistics in statistics:
+        for name, column_statistics in file_statistics.items():
+            current = merged.get(name)
+            if current is None:
+                merged[name] = column_statistics
+                continue
+            merged[name] = ColumnStatistics(
+                min=_select(min, current.min, column_statistics.min),
+                max=_select(max, current.max, column_statistics.max),
+                null_count=current.null_count + column_statistics.null_count,
+            )
+    return merged
+
+
+def _chunk_statistics(statistics) -> ColumnStatistics:
+    if statistics is None:
+        return ColumnStatistics()
+    if not statistics.has_min_max:
+        return ColumnStatistics(null_count=statistics.null_count)
+    return ColumnStatistics(
+        min=_statistic_value(statistics.min),
+        max=_statistic_value(statistics.max),
+        null_count=statistics.null_count,
+    )
+
+
+def _statistic_value(value: Any) -> Any:
+    # Values are kept as JSON types, dates and timestamps as strings in the format of their partitions
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, bytes):
+        return value.decode(errors="replace")
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _partition_value(column: Column, value: str) -> Any:
+    if column.data_type == DateType.DATE:
+        # Date partitions are written as timestamps
+        return value.split(" ")[0]
+    storage_type = wr._data_types.athena2pyarrow(column.data_type)
+    if pa.types.is_integer(storage_type):
+        return int(value)
+    if pa.types.is_floating(storage_type) or pa.types.is_decimal(storage_type):
+        return float(value)
+    if pa.types.is_boolean(storage_type):
+        return value == "True"
+    return value
+
+
+def _select(function, first: Any, second: Any) -> Any:
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return function(first, second)
@@ -0,0 +1,231 @@
+import time
+import uuid
+from itertools import groupby
+from typing import Dict, List, Tuple
+
+from api.adapter.dynamodb_adapter import DynamoDBAdapter
+from api.adapter.s3_adapter import S3Adapter
+from api.application.services.data_files import (
+    read_file_uploads,
+    write_compacted_file,
+)
+from api.application.services.dataset_statistics_service import (
+    DatasetStatisticsService,
+)
+from api.application.services.job_scheduler import JobQueue
+from api.application.services.job_service import JobService
+from api.application.services.schema_service import SchemaService
+from api.common.config.constants import (
+    COMPACTED_FILE_PREFIX,
+    COMPACTION_MAX_FILES_PER_MERGE,
+    COMPACTION_SMALL_FILE_SIZE,
+    DATASET_LOCK_SECONDS,
+    PARTITION_FILE_TARGET_SIZE,
+)
+from api.common.custom_exceptions import AWSServiceError, ConflictError
+from api.common.logger import AppLogger
+from api.common.utilities import build_error_message_list
+from api.domain.dataset_metadata import DatasetMetadata
+from api.domain.dataset_statistics import DatasetSizeChange
+from api.domain.Jobs.CompactionJob import CompactionJob, CompactionStep
+from api.domain.scheduled_task import ScheduledTask, TaskType
+from api.domain.schema import Schema
+
+
+def partition_path(key: str) -> str:
+    return key.rsplit("/", 1)[0]
+
+
+def plan_compaction(
+    objects: List[Dict],
+    small_file_size: int = COMPACTION_SMALL_FILE_SIZE,
+    target_file_size: int = PARTITION_FILE_TARGET_SIZE,
+    max_files_per_merge: int = COMPACTION_MAX_FILES_PER_MERGE,
+) -> List[List[Dict]]:
+    """
+    Groups the small parquet files of each partition into sets that will each be merged into one
+    file, regardless of the upload that wrote them
+    """
+    small_files = sorted(
+        (
+            item
+            for item in objects
+            if item["Key"].endswith(".parquet") and item["Size"] < small_file_size
+        ),
+        key=lambda item: item["Key"],
+    )
+
+    merges = []
+    for _, files in groupby(small_files, key=lambda item: partition_path(item["Key"])):
+        merge, merge_size = [], 0
+        for item in files:
+            merge.append(item)
+            merge_size += item["Size"]
+            if merge_size >= target_file_size or len(merge) == max_files_per_merge:
+                merges.append(merge)
+                merge, merge_size = [], 0
+        merges.append(merge)
+
+    return [merge for merge in merges if len(merge) > 1]
+
+
+def merge_parquet_files(schema: Schema, files: List[Tuple[str, bytes]]) -> bytes:
+    """
+    Merges the files, given as their key and content, into a compacted file that records which
+    upload each row came from
+    """
+    storage_schema = schema.generate_non_partition_storage_schema()
+    return write_compacted_file(
+        [
+            (
+                raw_file_identifier,
+                table.select(storage_schema.names).cast(storage_schema),
+            )
+            for key, content in files
+            for raw_file_identifier, table in read_file_uploads(key, content)
+        ]
+    )
+
+
+class CompactionService:
+    def __init__(
+        self,
+        s3_adapter=S3Adapter(),
+        job_service=JobService(),
+        schema_service=SchemaService(),
+        job_queue=JobQueue(),
+        dataset_statistics_service=DatasetStatisticsService(),
+        db_adapter=DynamoDBAdapter(),
+    ):
+        self.s3_adapter = s3_adapter
+        self.job_service = job_service
+        self.schema_service = schema_service
+        self.job_queue = job_queue
+        self.dataset_statistics_service = dataset_statistics_service
+        self.db_adapter = db_adapter
+
+    def compact_dataset(self, subject_id: str, dataset: DatasetMetadata) -> str:
+        schema = self.schema_service.get_schema(dataset)
+        compaction_job = self.job_service.create_compaction_job(
+            subject_id, schema.metadata
+        )
+        try:
+            self.job_queue.submit(
+                TaskType.COMPACTION,
+                {
+                    "job_id": compaction_job.job_id,
+                    "subject_id": subject_id,
+                    "layer": schema.get_layer(),
+                    "domain": schema.get_domain(),
+                    "dataset": schema.get_dataset(),
+                    "version": schema.get_version(),
+                },
+            )
+        except Exception as error:
+            self.job_service.fail(compaction_job, build_error_message_list(error))
+            raise error
+        return compaction_job.job_id
+
+    def run_compaction_task(self, task: ScheduledTask) -> None:
+        # Compaction can safely be run again, every merge leaves the dataset complete
+        self.process_compaction(*self._compaction_task_job(task))
+
+    def abandon_compaction_task(self, task: ScheduledTask) -> None:
+        compaction_job, _ = self._compaction_task_job(task)
+        self.job_service.fail(
+            compaction_job,
+            [
+                "The compaction was interrupted and could not be completed, please try again"
+            ],
+        )
+
+    def _compaction_task_job(self, task: ScheduledTask) -> tuple[CompactionJob, Schema]:
+        dataset = DatasetMetadata(
+            task.payload["layer"],
+            task.payload["domain"],
+            task.payload["dataset"],
+            task.payload["version"],
+        )
+        schema = self.schema_service.get_schema(dataset)
+        return (
+            CompactionJob(
+                task.payload["subject_id"], schema.metadata, task.payload["job_id"]
+            ),
+            schema,
+        )
+
+    def process_compaction(self, compaction_job: CompactionJob, schema: Schema) -> None:
+        dataset = schema.metadata
+        locked = False
+        size_change = None
+        try:
+            # Only one compaction or file deletion changes the files of a dataset at a time. The
+            # lock is held by the job, so a retried compaction task takes it over again.
+            locked = self.db_adapter.acquire_dataset_lock(
+                dataset, compaction_job.job_id, time.time() + DATASET_LOCK_SECONDS
+            )
+            if not locked:
+                raise ConflictError(
+                    "The dataset is already being compacted, overwritten or having a file deleted, please try again later"
+                )
+            merges = plan_compaction(
+                self.s3_adapter.list_objects_from_path(dataset.dataset_location())
+            )
+            AppLogger.info(
+                f"Compacting {sum(len(merge) for merge in merges)} files into {len(merges)} for {dataset.string_representation()}"
+            )
+            self.job_service.update_step(compaction_job, CompactionStep.COMPACTING)
+            compacted_size_change = DatasetSizeChange()
+            for merge in merges:
+                _, merged_size = self.compact_files(
+                    schema, [item["Key"] for item in merge]
+                )
+                compacted_size_change.size_bytes += merged_size - sum(
+                    item["Size"] for item in merge
+                )
+                compacted_size_change.object_count += 1 - len(merge)
+                self.job_service.record_compaction_progress(
+                    compaction_job, len(merge), 1
+                )
+            size_change = compacted_size_change
+            self.job_service.succeed_compaction(compaction_job)
+        except Exception as error:
+            AppLogger.error(
+                f"Compaction failed for {dataset.string_representation()}: {error}"
+            )
+            self.job_service.fail(compaction_job, build_error_message_list(error))
+        finally:
+            if locked:
+                self.db_adapter.release_dataset_lock(dataset, compaction_job.job_id)
+                if size_change is not None:
+                    self.dataset_statistics_service.record_compaction(
+                        dataset, size_change
+                    )
+                else:
+                    # Some of the merges may have been made before the failure
+                    self.dataset_statistics_service.record_change(dataset)
+
+    def compact_files(self, schema: Schema, keys: List[str]) -> Tuple[str, int]:
+        """
+        Writes the merged file before removing the files it replaces. If none of the originals
+        could be removed the merged file is deleted again, otherwise the remaining originals are
+        removed so that the merged file is the only copy of the data.
+
+        :return: The key and size in bytes of the merged file
+        """
+        path = partition_path(keys[0])
+        merged_key = f"{path}/{COMPACTED_FILE_PREFIX}{uuid.uuid4()}.parquet"
+        merged_content = merge_parquet_files(
+            schema, [(key, self.s3_adapter.retrieve_data(key).read()) for key in keys]
+        )
+        self.s3_adapter.store_data(merged_key, merged_content)
+        try:
+            self.s3_adapter.delete_dataset_files_using_key(keys, merged_key)
+        except AWSServiceError as error:
+            existing_keys = set(self.s3_adapter.list_files_from_path(f"{path}/"))
+            remaining_keys = [key for key in keys if key in existing_keys]
+            if len(remaining_keys) == len(keys):
+                self.s3_adapter.delete_dataset_files_using_key([merged_key], merged_key)
+                raise error
+            self.s3_adapter.delete_dataset_files_using_key(remaining_keys, merged_key)
+        return merged_key, len(merged_content)
@@ -0,0 +1,124 @@
+import json
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from api.common.config.constants import COMPACTED_FILE_PREFIX
+from api.domain.dataset_metadata import DatasetMetadata
+
+# Parquet key-value metadata of a compacted file, listing the uploads its rows came from in order
+UPLOADS_METADATA_KEY = b"shareez.uploads"
+
+
+def is_compacted_file(key: str) -> bool:
+    return key.rsplit("/", 1)[-1].startswith(COMPACTED_FILE_PREFIX)
+
+
+def upload_file_raw_file_identifier(key: str) -> str:
+    # Data files are named after the upload that wrote them, as {raw_file_identifier}_{id}
+    return key.rsplit("/", 1)[-1].split("_", 1)[0]
+
+
+def data_file_partition_path(dataset: DatasetMetadata, key: str) -> str:
+    """
+    :return: The partition path of the data file relative to the dataset location, empty for
+    datasets without partitions
+    """
+    return key.removeprefix(f"{dataset.dataset_location()}/").rpartition("/")[0]
+
+
+def compacted_file_uploads(
+    metadata: Optional[Dict[bytes, bytes]]
+) -> List[Tuple[str, int]]:
+    """
+    :return: The raw file identifier and number of rows of each upload in a compacted file, in the
+    order their rows are stored
+    """
+    if not metadata or UPLOADS_METADATA_KEY not in metadata:
+        return []
+    return [
+        (raw_file_identifier, rows)
+        for raw_file_identifier, rows in json.loads(metadata[UPLOADS_METADATA_KEY])
+    ]
+
+
+def file_uploads(key: str, metadata: pq.FileMetaData) -> List[Tuple[str, int]]:
+    if is_compacted_file(key):
+        return compacted_file_uploads(metadata.metadata)
+    return [(upload_file_raw_file_identifier(key), metadata.num_rows)]
+
+
+def upload_row_groups(key: str, metadata: pq.FileMetaData) -> Dict[str, List[int]]:
+    """
+    :return: The row groups holding the rows of each upload in the file, compacted files store
+    the rows of each upload in their own row groups
+    """
+    row_groups = {}
+    index = 0
+    for raw_file_identifier, rows in file_uploads(key, metadata):
+        upload_groups = row_groups.setdefault(raw_file_identifier, [])
+        while rows > 0 and index < metadata.num_row_groups:
+            upload_groups.append(index)
+            rows -= metadata.row_group(index).num_rows
+            index += 1
+    return row_groups
+
+
+def write_compacted_file(uploads: List[Tuple[str, pa.Table]]) -> bytes:
+    """
+    Writes the rows of each upload into their own row groups, recording the uploads in the file
+    metadata so that the rows of an upload can be found and removed again
+    """
+    tables = {}
+    for raw_file_identifier, table in uploads:
+        if table.num_rows:
+            tables.setdefault(raw_file_identifier, []).append(table)
+    upload_tables = [
+        (raw_file_identifier, pa.concat_tables(tables[raw_file_identifier]))
+        for raw_file_identifier in sorted(tables)
+    ]
+    schema = uploads[0][1].schema.with_metadata(
+        {
+            UPLOADS_METADATA_KEY: json.dumps(
+                [
+                    [raw_file_identifier, table.num_rows]
+                    for raw_file_identifier, table in upload_tables
+                ]
+            )
+        }
+    )
+    buffer = pa.BufferOutputStream()
+    with pq.ParquetWriter(buffer, schema, compression="gzip") as writer:
+        for _, table in upload_tables:
+            writer.write_table(table.replace_schema_metadata(schema.metadata))
+    return buffer.getvalue().to_pybytes()
+
+
+def read_file_uploads(key: str, content: bytes) -> List[Tuple[str, pa.Table]]:
+    """
+    :return: The rows of the file split by the upload they came from
+    """
+    table = pq.read_table(BytesIO(content))
+    if not is_compacted_file(key):
+        return [(upload_file_raw_file_identifier(key), table)]
+    uploads, offset = [], 0
+    for raw_file_identifier, rows in compacted_file_uploads(table.schema.metadata):
+        uploads.append((raw_file_identifier, table.slice(offset, rows)))
+        offset += rows
+    return uploads
+
+
+def remove_upload(
+    key: str, content: bytes, raw_file_identifier: str
+) -> Optional[bytes]:
+    """
+    :return: The compacted file without the rows of the upload, or None if it has no rows left
+    """
+    remaining = [
+        (upload, table)
+        for upload, table in read_file_uploads(key, content)
+        if upload != raw_file_identifier and table.num_rows
+    ]
+    return write_compacted_file(remaining) if remaining else None
@@ -1,37 +1,67 @@
+import multiprocessing
+import time
 import uuid
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from threading import Thread
-from typing import List, Tuple
+from threading import Lock
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 import pandas as pd
+import pyarrow as pa
 
 from api.adapter.athena_adapter import AthenaAdapter
+from api.adapter.dynamodb_adapter import DynamoDBAdapter
 from api.adapter.glue_adapter import GlueAdapter
+from api.adapter.local_query_adapter import LocalQueryAdapter
+from api.adapter.query_result_cache import create_query_result_cache
 from api.adapter.s3_adapter import S3Adapter
+from api.application.services.arrow_dataset_validation import build_validated_table
+from api.application.services.data_files import data_file_partition_path
+from api.application.services.dataset_statistics_service import (
+    DatasetStatisticsService,
+)
 from api.application.services.dataset_validation import build_validated_dataframe
+from api.application.services.job_scheduler import JobQueue
 from api.application.services.job_service import JobService
-from api.application.services.partitioning_service import generate_partitioned_data
+from api.application.services.partitioning_service import (
+    PartitionedParquetWriter,
+    generate_partitioned_data,
+    partition_to_parquet,
+)
 from api.application.services.schema_service import SchemaService
 from api.common.config.constants import (
+    ARROW_PARQUET_VALIDATION,
+    DATASET_LOCK_SECONDS,
     DATASET_ROWS_QUERY_LIMIT,
     DATASET_SIZE_QUERY_LIMIT,
+    LOCAL_QUERY_ENGINE_MAX_SIZE,
+    SINGLE_PASS_UPLOAD,
+    STAGE_INCOMING_FILES,
+    STREAMING_PARTITION_WRITERS,
+    UPLOAD_PROCESS_POOL_SIZE,
 )
 from api.common.custom_exceptions import (
     AWSServiceError,
+    ConflictError,
     DatasetValidationError,
+    LocalQueryError,
     QueryExecutionError,
     UnprocessableDatasetError,
     UserError,
 )
 from api.common.data_handlers import (
     construct_chunked_dataframe,
+    create_staging_directory,
     delete_incoming_raw_file,
+    delete_staging_directory,
     get_dataframe_from_chunk_type,
+    map_chunks,
 )
 from api.common.logger import AppLogger
 from api.common.utilities import build_error_message_list
-from api.domain.data_types import DateType
 from api.domain.dataset_metadata import DatasetMetadata
+from api.domain.dataset_statistics import DatasetStatistics
 from api.domain.enriched_schema import (
     EnrichedColumn,
     EnrichedSchema,
@@ -39,10 +69,62 @@ from api.domain.enriched_schema import (
 )
 from api.domain.Jobs.QueryJob import QueryJob, QueryStep
 from api.domain.Jobs.UploadJob import UploadJob, UploadStep
+from api.domain.query_page import QueryCursor, QueryPage
+from api.domain.scheduled_task import ScheduledTask, TaskType
 from api.domain.schema import Schema
 from api.domain.sql_query import SQLQuery
 
 
+def validate_chunk_data(
+    schema: Schema, chunk: Union[pd.DataFrame, pa.RecordBatch]
+) -> Union[pd.DataFrame, pa.Table]:
+    """
+    Validates the chunk, keeping parquet record batches in Arrow when ARROW_PARQUET_VALIDATION is set
+    """
+    if ARROW_PARQUET_VALIDATION and isinstance(chunk, pa.RecordBatch):
+        return build_validated_table(schema, chunk)
+    return build_validated_dataframe(schema, get_dataframe_from_chunk_type(chunk))
+
+
+def validate_chunk(
+    schema: Schema, chunk: Union[pd.DataFrame, pa.RecordBatch]
+) -> List[str]:
+    """
+    Returns the validation errors of the chunk.
+    Defined at module level so that it can be sent to upload worker processes.
+    """
+    try:
+        validate_chunk_data(schema, chunk)
+    except DatasetValidationError as error:
+        return list(error.message)
+    return []
+
+
+def count_rows(
+    chunks: Iterable[Union[pd.DataFrame, pa.RecordBatch]], row_count: List[int]
+) -> Iterator[Union[pd.DataFrame, pa.RecordBatch]]:
+    """
+    Passes the chunks through, adding the number of rows read to `row_count[0]`
+    """
+    for chunk in chunks:
+        row_count[0] += len(chunk)
+        yield chunk
+
+
+def encode_chunk(
+    schema: Schema, chunk: Union[pd.DataFrame, pa.RecordBatch]
+) -> List[Tuple[str, bytes]]:
+    """
+    Validates and partitions the chunk, returning the encoded parquet content of each partition path.
+    Defined at module level so that it can be sent to upload worker processes.
+    """
+    validated_dataframe = validate_chunk_data(schema, chunk)
+    return [
+        (partition.path, partition_to_parquet(schema, partition))
+        for partition in generate_partitioned_data(schema, validated_dataframe)
+    ]
+
+
 class DataService:
     def __init__(
         self,
@@ -51,12 +133,34 @@ class DataService:
         athena_adapter=AthenaAdapter(),
         job_service=JobService(),
         schema_service=SchemaService(),
+        job_queue=JobQueue(),
+        query_result_cache=create_query_result_cache(),
+        dataset_statistics_service=DatasetStatisticsService(),
+        local_query_adapter=LocalQueryAdapter(),
+        db_adapter=DynamoDBAdapter(),
+        single_pass_upload: bool = SINGLE_PASS_UPLOAD,
+        process_pool_size: int = UPLOAD_PROCESS_POOL_SIZE,
+        streaming_partition_writers: bool = STREAMING_PARTITION_WRITERS,
+        local_query_max_size: int = LOCAL_QUERY_ENGINE_MAX_SIZE,
+        stage_incoming_files: bool = STAGE_INCOMING_FILES,
     ):
         self.s3_adapter = s3_adapter
         self.glue_adapter = glue_adapter
         self.athena_adapter = athena_adapter
         self.job_service = job_service
         self.schema_service = schema_service
+        self.job_queue = job_queue
+        self.query_result_cache = query_result_cache
+        self.dataset_statistics_service = dataset_statistics_service
+        self.local_query_adapter = local_query_adapter
+        self.db_adapter = db_adapter
+        self.single_pass_upload = single_pass_upload
+        self.process_pool_size = process_pool_size
+        self.streaming_partition_writers = streaming_partition_writers
+        self.local_query_max_size = local_query_max_size
+        self.stage_incoming_files = stage_incoming_files
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._process_pool_lock = Lock()
 
     def list_raw_files(self, dataset: DatasetMetadata) -> list[str]:
         raw_files = self.s3_adapter.list_raw_files(dataset)
@@ -73,6 +177,32 @@ class DataService:
     def generate_permanent_filename(self, raw_file_identifier: str) -> str:
         return f"{raw_file_identifier}_{uuid.uuid4()}.parquet"
 
+    def get_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        """
+        The pool is created on first use and shared by every upload handled by this service.
+        Workers are spawned rather than forked as the API process is multithreaded.
+        """
+        if self.process_pool_size <= 0:
+            return None
+        with self._process_pool_lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.process_pool_size,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+        return self._process_pool
+
+    def map_chunks(
+        self, function, chunks: Iterable[Union[pd.DataFrame, pa.RecordBatch]]
+    ):
+        # Allow each worker to have one chunk queued behind the one it is processing
+        return map_chunks(
+            function,
+            chunks,
+            executor=self.get_process_pool(),
+            max_in_flight=self.process_pool_size * 2,
+        )
+
     def upload_dataset(
         self,
         subject_id: str,
@@ -86,30 +216,136 @@ class DataService:
             subject_id, job_id, file_path.name, raw_file_identifier, dataset
         )
 
-        Thread(
-            target=self.process_upload,
-            args=(upload_job, schema, file_path, raw_file_identifier),
-            name=upload_job.job_id,
-        ).start()
+        incoming_file_key = None
+        try:
+            if self.stage_incoming_files:
+                incoming_file_key = self.s3_adapter.upload_incoming_file(
+                    file_path, raw_file_identifier
+                )
+            self.job_queue.submit(
+                TaskType.UPLOAD,
+                {
+                    "job_id": upload_job.job_id,
+                    "subject_id": subject_id,
+                    "filename": file_path.name,
+                    "file_path": file_path.as_posix(),
+                    "incoming_file_key": incoming_file_key,
+                    "raw_file_identifier": raw_file_identifier,
+                    "layer": schema.get_layer(),
+                    "domain": schema.get_domain(),
+                    "dataset": schema.get_dataset(),
+                    "version": schema.get_version(),
+                },
+            )
+        except Exception as error:
+            if incoming_file_key is not None:
+                self.s3_adapter.delete_incoming_file(incoming_file_key)
+            delete_incoming_raw_file(schema, file_path, raw_file_identifier)
+            self.job_service.fail(upload_job, build_error_message_list(error))
+            raise error
 
         return f"{raw_file_identifier}.csv", dataset.version, upload_job.job_id
 
+    def run_upload_task(self, task: ScheduledTask) -> None:
+        upload_job, schema = self._upload_task_job(task)
+        raw_file_identifier = task.payload["raw_file_identifier"]
+        file_path = Path(task.payload["file_path"])
+        incoming_file_key = task.payload.get("incoming_file_key")
+        if task.attempts > 1:
+            # Remove any data written by the interrupted attempt before processing again. The
+            # interrupted attempt did not record its files, so the dataset is listed again.
+            self.s3_adapter.delete_dataset_files(schema.metadata, raw_file_identifier)
+            self.dataset_statistics_service.record_change(schema.metadata)
+        if incoming_file_key is not None and not file_path.exists():
+            # The upload was received by another host
+            self.s3_adapter.download_incoming_file(incoming_file_key, file_path)
+        try:
+            self.process_upload(upload_job, schema, file_path, raw_file_identifier)
+        finally:
+            if incoming_file_key is not None:
+                self.s3_adapter.delete_incoming_file(incoming_file_key)
+
+    def abandon_upload_task(self, task: ScheduledTask) -> None:
+        upload_job, schema = self._upload_task_job(task)
+        delete_incoming_raw_file(
+            schema, Path(task.payload["file_path"]), upload_job.raw_file_identifier
+        )
+        if task.payload.get("incoming_file_key") is not None:
+            self.s3_adapter.delete_incoming_file(task.payload["incoming_file_key"])
+        self.job_service.fail(
+            upload_job,
+            ["The upload was interrupted and could not be completed, please try again"],
+        )
+
+    def _upload_task_job(self, task: ScheduledTask) -> Tuple[UploadJob, Schema]:
+        dataset = DatasetMetadata(
+            task.payload["layer"],
+            task.payload["domain"],
+            task.payload["dataset"],
+            task.payload["version"],
+        )
+        upload_job = UploadJob(
+            task.payload["subject_id"],
+            task.payload["job_id"],
+            task.payload["filename"],
+            task.payload["raw_file_identifier"],
+            dataset,
+        )
+        return upload_job, self.schema_service.get_schema(dataset)
+
     def process_upload(
         self, job: UploadJob, schema: Schema, file_path: Path, raw_file_identifier: str
     ) -> None:
+        # Overwriting removes the files a compaction may be merging, so the data of an overwriting
+        # upload is written while holding the dataset lock. The lock is held by the upload, so a
+        # retried upload task takes it over again.
+        lock_owner = f"upload-{raw_file_identifier}"
+        locked = False
         try:
             self.job_service.update_step(job, UploadStep.VALIDATION)
-            self.validate_incoming_data(schema, file_path, raw_file_identifier)
+            if self.single_pass_upload:
+                staging_directory, rows = self.validate_and_stage_incoming_data(
+                    schema, file_path, raw_file_identifier
+                )
+            else:
+                rows = self.validate_incoming_data(
+                    schema, file_path, raw_file_identifier
+                )
             self.job_service.update_step(job, UploadStep.RAW_DATA_UPLOAD)
             self.s3_adapter.upload_raw_data(
                 schema.metadata, file_path, raw_file_identifier
             )
             self.job_service.update_step(job, UploadStep.DATA_UPLOAD)
-            self.process_chunks(schema, file_path, raw_file_identifier)
+            if schema.has_overwrite_behaviour():
+                locked = self.db_adapter.acquire_dataset_lock(
+                    schema.metadata, lock_owner, time.time() + DATASET_LOCK_SECONDS
+                )
+                if not locked:
+                    raise ConflictError(
+                        "The dataset is being compacted, overwritten or having a file deleted, please try again later"
+                    )
+            if self.single_pass_upload:
+                data_files = self.promote_staged_data(
+                    schema, staging_directory, raw_file_identifier
+                )
+            else:
+                data_files = self.process_chunks(schema, file_path, raw_file_identifier)
             self.job_service.update_step(job, UploadStep.LOAD_PARTITIONS)
-            self.load_partitions(schema)
+            self.load_partitions(
+                schema,
+                {data_file_partition_path(schema.metadata, key) for key in data_files},
+            )
+            self.dataset_statistics_service.record_upload(
+                schema,
+                raw_file_identifier,
+                rows,
+                schema.has_overwrite_behaviour(),
+                data_files,
+            )
             self.job_service.update_step(job, UploadStep.CLEAN_UP)
             delete_incoming_raw_file(schema, file_path, raw_file_identifier)
+            if self.single_pass_upload:
+                delete_staging_directory(raw_file_identifier)
             self.job_service.update_step(job, UploadStep.NONE)
             self.job_service.succeed(job)
         except Exception as error:
@@ -117,35 +353,142 @@ class DataService:
                 f"Processing upload failed for layer [{schema.get_layer()}], domain [{schema.get_domain()}], dataset [{schema.get_dataset()}], and version [{schema.get_version()}]: {error}"
             )
             delete_incoming_raw_file(schema, file_path, raw_file_identifier)
+            if self.single_pass_upload:
+                delete_staging_directory(raw_file_identifier)
             self.job_service.fail(job, build_error_message_list(error))
+            self.dataset_statistics_service.record_change(schema.metadata)
             raise error
+        finally:
+            if locked:
+                self.db_adapter.release_dataset_lock(schema.metadata, lock_owner)
+            # A failed upload may still have written or removed some of the data
+            self.query_result_cache.invalidate(schema.metadata)
 
     def validate_incoming_data(
         self, schema: Schema, file_path: Path, raw_file_identifier: str
-    ) -> None:
+    ) -> int:
+        """
+        :return: The number of rows in the file
+        """
         AppLogger.info(
             f"Validating dataset for {schema.get_layer()}/{schema.get_domain()}/{schema.get_dataset()}"
         )
         dataset_errors = set()
-        for chunk in construct_chunked_dataframe(file_path):
-            dataframe = get_dataframe_from_chunk_type(chunk)
-            try:
-                build_validated_dataframe(schema, dataframe)
-            except DatasetValidationError as error:
-                dataset_errors.update(error.message)
+        row_count = [0]
+        for chunk_errors in self.map_chunks(
+            partial(validate_chunk, schema),
+            count_rows(construct_chunked_dataframe(file_path), row_count),
+        ):
+            dataset_errors.update(chunk_errors)
         if dataset_errors:
             delete_incoming_raw_file(schema, file_path, raw_file_identifier)
             raise DatasetValidationError(list(dataset_errors))
+        return row_count[0]
 
-    def process_chunks(
+    def validate_and_stage_incoming_data(
         self, schema: Schema, file_path: Path, raw_file_identifier: str
+    ) -> Tuple[Path, int]:
+        """
+        Validates each chunk once and stages its converted output locally. Validation carries on
+        after the first failing chunk so that every error is reported, but nothing more is staged.
+
+        :return: The staging directory and the number of rows in the file
+        """
+        AppLogger.info(
+            f"Validating and staging dataset for {schema.get_layer()}/{schema.get_domain()}/{schema.get_dataset()}"
+        )
+        staging_directory = create_staging_directory(raw_file_identifier)
+        partition_writer = (
+            PartitionedParquetWriter(
+                schema,
+                staging_directory,
+                partial(self.generate_permanent_filename, raw_file_identifier),
+            )
+            if self.streaming_partition_writers
+            else None
+        )
+        dataset_errors = set()
+        rows = 0
+        try:
+            for chunk in construct_chunked_dataframe(file_path):
+                rows += len(chunk)
+                try:
+                    validated_dataframe = validate_chunk_data(schema, chunk)
+                except DatasetValidationError as error:
+                    dataset_errors.update(error.message)
+                    continue
+                if dataset_errors:
+                    continue
+                if partition_writer:
+                    partition_writer.write(validated_dataframe)
+                else:
+                    self.stage_data(
+                        schema,
+                        validated_dataframe,
+                        staging_directory,
+                        self.generate_permanent_filename(raw_file_identifier),
+                    )
+        finally:
+            if partition_writer:
+                partition_writer.close()
+        if dataset_errors:
+            delete_incoming_raw_file(schema, file_path, raw_file_identifier)
+            raise DatasetValidationError(list(dataset_errors))
+        return staging_directory, rows
+
+    def stage_data(
+        self,
+        schema: Schema,
+        validated_dataframe: Union[pd.DataFrame, pa.Table],
+        staging_directory: Path,
+        filename: str,
     ) -> None:
+        for partition in generate_partitioned_data(schema, validated_dataframe):
+            partition_directory = staging_directory / partition.path
+            partition_directory.mkdir(parents=True, exist_ok=True)
+            partition_to_parquet(schema, partition, partition_directory / filename)
+
+    def promote_staged_data(
+        self, schema: Schema, staging_directory: Path, raw_file_identifier: str
+    ) -> Dict[str, int]:
+        """
+        Uploads the staged data, returning the size in bytes of each data file written, by key
+        """
+        data_files = self.s3_adapter.upload_staged_data(
+            schema.metadata, staging_directory
+        )
+
+        if schema.has_overwrite_behaviour():
+            self.remove_existing_data(schema, raw_file_identifier)
+        return data_files
+
+    def process_chunks(
+        self, schema: Schema, file_path: Path, raw_file_identifier: str
+    ) -> Dict[str, int]:
+        """
+        Validates and uploads every chunk, returning the size in bytes of each data file written,
+        by key
+        """
         AppLogger.info(
             f"Processing chunks for {schema.get_layer()}/{schema.get_domain()}/{schema.get_dataset()}/{schema.get_version()}"
         )
-        for chunk in construct_chunked_dataframe(file_path):
-            dataframe = get_dataframe_from_chunk_type(chunk)
-            self.process_chunk(schema, raw_file_identifier, dataframe)
+        data_files = {}
+        if self.get_process_pool():
+            for encoded_partitions in self.map_chunks(
+                partial(encode_chunk, schema), construct_chunked_dataframe(file_path)
+            ):
+                data_files.update(
+                    self.s3_adapter.upload_encoded_partitions(
+                        schema,
+                        self.generate_permanent_filename(raw_file_identifier),
+                        encoded_partitions,
+                    )
+                )
+        else:
+            for chunk in construct_chunked_dataframe(file_path):
+                data_files.update(
+                    self.process_chunk(schema, raw_file_identifier, chunk)
+                )
 
         if schema.has_overwrite_behaviour():
             self.remove_existing_data(schema, raw_file_identifier)
@@ -153,13 +496,17 @@ class DataService:
         AppLogger.info(
             f"Processing chunks for {schema.get_layer()}/{schema.get_domain()}/{schema.get_dataset()}/{schema.get_version()} completed"
         )
+        return data_files
 
     def process_chunk(
-        self, schema: Schema, raw_file_identifier: str, chunk: pd.DataFrame
-    ) -> None:
-        validated_dataframe = build_validated_dataframe(schema, chunk)
+        self,
+        schema: Schema,
+        raw_file_identifier: str,
+        chunk: Union[pd.DataFrame, pa.RecordBatch],
+    ) -> Dict[str, int]:
+        validated_dataframe = validate_chunk_data(schema, chunk)
         permanent_filename = self.generate_permanent_filename(raw_file_identifier)
-        self.upload_data(schema, validated_dataframe, permanent_filename)
+        return self.upload_data(schema, validated_dataframe, permanent_filename)
 
     def remove_existing_data(self, schema: Schema, raw_file_identifier: str) -> None:
         AppLogger.info(
@@ -183,55 +530,174 @@ class DataService:
             )
 
     def get_last_updated_time(self, metadata: DatasetMetadata) -> str:
-        last_updated = self.s3_adapter.get_last_updated_time(
-            metadata.dataset_location()
-        )
+        last_updated = self.dataset_statistics_service.get_statistics(
+            metadata
+        ).last_updated
         return last_updated or "Never updated"
 
     def get_dataset_info(self, dataset: DatasetMetadata) -> EnrichedSchema:
         schema = self.schema_service.get_schema(dataset)
-        statistics_dataframe = self.athena_adapter.query(
-            dataset, self._build_query(schema)
-        )
-        last_updated = self.get_last_updated_time(dataset)
+        statistics = self.dataset_statistics_service.get_statistics(dataset)
+        if statistics.row_count is None or statistics.column_statistics is None:
+            statistics = self.dataset_statistics_service.recompute_statistics(schema)
         return EnrichedSchema(
-            metadata=self._enrich_metadata(schema, statistics_dataframe, last_updated),
-            columns=self._enrich_columns(schema, statistics_dataframe),
+            metadata=self._enrich_metadata(schema, statistics),
+            columns=self._enrich_columns(schema, statistics),
         )
 
     def upload_data(
         self,
         schema: Schema,
-        validated_dataframe: pd.DataFrame,
+        validated_dataframe: Union[pd.DataFrame, pa.Table],
         filename: str,
-    ):
+    ) -> Dict[str, int]:
         partitions = generate_partitioned_data(schema, validated_dataframe)
-        self.s3_adapter.upload_partitioned_data(schema, filename, partitions)
+        return self.s3_adapter.upload_partitioned_data(schema, filename, partitions)
 
-    def load_partitions(self, schema: Schema):
+    def load_partitions(self, schema: Schema, partition_paths: Set[str]):
         if schema.get_partition_columns():
-            query_id = self.athena_adapter.query_sql_async(
-                f"MSCK REPAIR TABLE `{schema.metadata.glue_table_name()}`;"
-            )
-            self.athena_adapter.wait_for_query_to_complete(query_id)
+            self.glue_adapter.create_partitions(schema, sorted(partition_paths))
 
     def is_query_too_large(self, dataset: DatasetMetadata, query: SQLQuery):
         if query.limit:
             if int(query.limit) <= DATASET_ROWS_QUERY_LIMIT:
                 return False
 
-        size_of_datasets = self.s3_adapter.get_folder_size(dataset.s3_file_location())
-        return size_of_datasets > DATASET_SIZE_QUERY_LIMIT
+        statistics = self.dataset_statistics_service.get_statistics(dataset)
+        return statistics.size_bytes > DATASET_SIZE_QUERY_LIMIT
+
+    def use_local_query_engine(self, dataset: DatasetMetadata) -> bool:
+        if self.local_query_max_size <= 0:
+            return False
+        statistics = self.dataset_statistics_service.get_statistics(dataset)
+        return statistics.size_bytes <= self.local_query_max_size
 
     def query_data(
         self,
         dataset: DatasetMetadata,
         query: SQLQuery,
+        subject_id: Optional[str] = None,
     ) -> pd.DataFrame:
-        if not self.is_query_too_large(dataset, query):
-            return self.athena_adapter.query(dataset, query)
-        else:
+        sql = query.to_sql(dataset.glue_table_name())
+        cache_key = self.query_result_cache.cache_key(dataset, sql)
+        cached_result = self.query_result_cache.get(cache_key)
+        if cached_result is not None:
+            return cached_result
+        if self.is_query_too_large(dataset, query):
+            raise UnprocessableDatasetError("Dataset too large for this endpoint")
+        result = None
+        if self.use_local_query_engine(dataset):
+            result = self._query_locally(
+                dataset, lambda schema: self.local_query_adapter.query_sql(schema, sql)
+            )
+        if result is None:
+            result = self.athena_adapter.query_sql(sql, subject_id)
+        self.query_result_cache.put(cache_key, result)
+        return result
+
+    def query_data_in_chunks(
+        self,
+        dataset: DatasetMetadata,
+        query: SQLQuery,
+        subject_id: Optional[str] = None,
+    ) -> Iterator[pd.DataFrame]:
+        sql = query.to_sql(dataset.glue_table_name())
+        cache_key = self.query_result_cache.cache_key(dataset, sql)
+        cached_result = self.query_result_cache.get(cache_key)
+        if cached_result is not None:
+            return iter([cached_result])
+        if self.is_query_too_large(dataset, query):
             raise UnprocessableDatasetError("Dataset too large for this endpoint")
+        chunks = None
+        if self.use_local_query_engine(dataset):
+            chunks = self._query_locally(
+                dataset,
+                lambda schema: self.local_query_adapter.query_sql_in_chunks(
+                    schema, sql
+                ),
+            )
+        if chunks is None:
+            chunks = self.athena_adapter.query_sql_in_chunks(sql, subject_id)
+        return self._cache_single_chunk_result(cache_key, chunks)
+
+    def _query_locally(self, dataset: DatasetMetadata, run_query):
+        """
+        Runs the query with the local query engine, returning None when it cannot be run locally
+        so that it is run on Athena instead
+        """
+        try:
+            return run_query(self.schema_service.get_schema(dataset))
+        except LocalQueryError as error:
+            AppLogger.warning(
+                f"Running the query on {dataset.string_representation()} with Athena: {error}"
+            )
+            return None
+
+    def query_data_page(
+        self,
+        dataset: DatasetMetadata,
+        query: SQLQuery,
+        page_size: int,
+        cursor: Optional[str] = None,
+        subject_id: Optional[str] = None,
+    ) -> QueryPage:
+        """
+        Runs the query and returns the first page of its result, or returns the page of an earlier
+        run that the cursor points at. Each page is read from Athena's stored result when it is
+        requested, so the query is neither run again nor held on the server.
+        """
+        if cursor is None:
+            query_execution_id = self.athena_adapter.query_async(
+                dataset, query, subject_id
+            )
+            self.athena_adapter.wait_for_query_to_complete(query_execution_id)
+            next_token = None
+        else:
+            query_cursor = QueryCursor.decode(cursor)
+            query = query_cursor.query
+            query_execution_id = query_cursor.query_execution_id
+            next_token = query_cursor.next_token
+            # The cursor is not signed, so only executions of a query on this dataset are read
+            query_execution = self.athena_adapter.get_query_execution(
+                query_execution_id
+            )
+            if query_execution.get("Query") != query.to_sql(dataset.glue_table_name()):
+                raise UserError(
+                    f"The cursor is not for a query on {dataset.string_representation()}"
+                )
+
+        rows, next_token = self.athena_adapter.get_query_results_page(
+            query_execution_id, page_size, next_token
+        )
+        return QueryPage(
+            data=rows,
+            next_cursor=(
+                QueryCursor(
+                    query_execution_id=query_execution_id,
+                    next_token=next_token,
+                    query=query,
+                ).encode()
+                if next_token
+                else None
+            ),
+        )
+
+    def _cache_single_chunk_result(
+        self, cache_key: Optional[str], chunks: Iterator[pd.DataFrame]
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Results that fit in one chunk are cached once they have been read, larger results are not
+        cached so that they are never held in memory as a whole
+        """
+        first_chunk = None
+        chunk_count = 0
+        for chunk in chunks:
+            chunk_count += 1
+            if chunk_count == 1:
+                first_chunk = chunk
+            yield chunk
+        if chunk_count == 1:
+            self.query_result_cache.put(cache_key, first_chunk)
 
     def query_large_data(
         self,
@@ -240,16 +706,48 @@ class DataService:
         query: SQLQuery,
     ) -> str:
         query_job = self.job_service.create_query_job(subject_id, dataset)
-        query_execution_id = self.athena_adapter.query_async(dataset, query)
-        Thread(
-            target=self.generate_results_download_url_async,
-            args=(
-                query_job,
-                query_execution_id,
-            ),
-        ).start()
+        query_execution_id = self.athena_adapter.query_async(dataset, query, subject_id)
+        try:
+            self.job_queue.submit(
+                TaskType.QUERY,
+                {
+                    "job_id": query_job.job_id,
+                    "subject_id": subject_id,
+                    "query_execution_id": query_execution_id,
+                    "layer": dataset.layer,
+                    "domain": dataset.domain,
+                    "dataset": dataset.dataset,
+                    "version": dataset.version,
+                },
+            )
+        except Exception as error:
+            self.job_service.fail(query_job, build_error_message_list(error))
+            raise error
         return query_job.job_id
 
+    def run_query_task(self, task: ScheduledTask) -> None:
+        self.generate_results_download_url_async(
+            self._query_task_job(task), task.payload["query_execution_id"]
+        )
+
+    def abandon_query_task(self, task: ScheduledTask) -> None:
+        self.job_service.fail(
+            self._query_task_job(task),
+            ["The query was interrupted and could not be completed, please try again"],
+        )
+
+    def _query_task_job(self, task: ScheduledTask) -> QueryJob:
+        return QueryJob(
+            task.payload["subject_id"],
+            DatasetMetadata(
+                task.payload["layer"],
+                task.payload["domain"],
+                task.payload["dataset"],
+                task.payload["version"],
+            ),
+            task.payload["job_id"],
+        )
+
     def generate_results_download_url_async(
         self, query_job: QueryJob, query_execution_id: str
     ) -> None:
@@ -266,53 +764,32 @@ class DataService:
             self.job_service.fail(query_job, build_error_message_list(error))
             raise error
 
-    def _build_query(self, schema: Schema) -> SQLQuery:
-        date_columns = schema.get_columns_by_type(DateType)
-        date_range_queries = [
-            *[
-                f"cast(max({column.name}) as date) as max_{column.name}"
-                for column in date_columns
-            ],
-            *[
-                f"cast(min({column.name}) as date) as min_{column.name}"
-                for column in date_columns
-            ],
-        ]
-        columns_to_query = [
-            "count(*) as data_size",
-            *date_range_queries,
-        ]
-        return SQLQuery(select_columns=columns_to_query)
-
     def _enrich_metadata(
-        self, schema: Schema, statistics_dataframe: pd.DataFrame, last_updated: str
+        self, schema: Schema, statistics: DatasetStatistics
     ) -> EnrichedSchemaMetadata:
-        dataset_size = statistics_dataframe.at[0, "data_size"]
         return EnrichedSchemaMetadata(
             **schema.metadata.dict(),
-            number_of_rows=dataset_size,
+            # An empty dataset has no recorded statistics even once they are recomputed
+            number_of_rows=statistics.row_count or 0,
             number_of_columns=len(schema.columns),
-            last_updated=last_updated,
+            last_updated=statistics.last_updated or "Never updated",
         )
 
     def _enrich_columns(
-        self, schema: Schema, statistics_dataframe: pd.DataFrame
+        self, schema: Schema, statistics: DatasetStatistics
     ) -> List[EnrichedColumn]:
-        strftime_format = "%Y-%m-%d"
         enriched_columns = []
-        date_columns = schema.get_columns_by_type(DateType)
+        dataset_column_statistics = statistics.column_statistics or {}
         for column in schema.columns:
-            statistics = None
-            if column in date_columns:
-                statistics = {
-                    "max": statistics_dataframe.at[0, f"max_{column.name}"].strftime(
-                        strftime_format
-                    ),
-                    "min": statistics_dataframe.at[0, f"min_{column.name}"].strftime(
-                        strftime_format
-                    ),
-                }
+            column_statistics = dataset_column_statistics.get(column.name)
             enriched_columns.append(
-                EnrichedColumn(**column.dict(), statistics=statistics)
+                EnrichedColumn(
+                    **column.dict(),
+                    statistics=(
+                        column_statistics.dict()
+                        if column_statistics is not None
+                        else None
+                    ),
+                )
             )
         return enriched_columns
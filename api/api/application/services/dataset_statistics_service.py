@@ -0,0 +1,376 @@
+import json
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from api.adapter.dynamodb_adapter import DynamoDBAdapter
+from api.adapter.s3_adapter import S3Adapter
+from api.application.services.column_statistics import (
+    file_column_statistics,
+    merge_column_statistics,
+)
+from api.application.services.data_files import (
+    data_file_partition_path,
+    file_uploads,
+    is_compacted_file,
+    upload_file_raw_file_identifier,
+    upload_row_groups,
+)
+from api.common.logger import AppLogger
+from api.domain.dataset_metadata import DatasetMetadata
+from api.domain.dataset_statistics import (
+    ColumnStatistics,
+    DatasetSizeChange,
+    DatasetStatistics,
+)
+from api.domain.schema import Schema
+
+
+class DatasetStatisticsService:
+    """
+    Keeps a statistics record for each dataset version, so that reading the size, row count,
+    column statistics and last updated time of a dataset does not list or query its files. The
+    record is updated by the paths that change the data, from the sizes of the files they write
+    and delete. The dataset version is only listed when a change is not known, such as a failed
+    upload, or the record has not been made yet.
+
+    The min, max and null count of each column are read from the footers of the Parquet files
+    written by an upload and stored for that upload. The statistics of the dataset are merged
+    from the uploads that still have rows, so deleting an uploaded file removes its values.
+    Compacted files record which uploads their rows came from.
+    """
+
+    def __init__(self, s3_adapter=S3Adapter(), db_adapter=DynamoDBAdapter()):
+        self.s3_adapter = s3_adapter
+        self.db_adapter = db_adapter
+
+    def get_statistics(self, dataset: DatasetMetadata) -> DatasetStatistics:
+        item = self.db_adapter.get_dataset_statistics(dataset)
+        if item is None or "SizeBytes" not in item:
+            # Datasets written before their statistics were recorded get them on first read
+            AppLogger.info(
+                f"Recording statistics for {dataset.string_representation()}"
+            )
+            self.refresh_size(dataset)
+            item = self.db_adapter.get_dataset_statistics(dataset) or {}
+        upload_rows = item.get("UploadRows", {})
+        return DatasetStatistics(
+            size_bytes=int(item.get("SizeBytes", 0)),
+            object_count=int(item.get("ObjectCount", 0)),
+            row_count=(
+                sum(int(rows) for rows in upload_rows.values())
+                if item.get("RowsComplete")
+                else None
+            ),
+            last_updated=item.get("LastUpdated"),
+            column_statistics=(
+                self._decode_column_statistics(item["ColumnStatistics"])
+                if item.get("ColumnsComplete")
+                else None
+            ),
+        )
+
+    def recompute_statistics(self, schema: Schema) -> DatasetStatistics:
+        """
+        Recomputes the row count and column statistics of every upload from the footers of the
+        data files, for datasets uploaded before they were recorded
+        """
+        dataset = schema.metadata
+        AppLogger.info(
+            f"Recomputing the statistics of {dataset.string_representation()}"
+        )
+        files = self._list_data_files(dataset)
+        metadata = self.s3_adapter.read_parquet_metadata(files)
+        upload_rows, upload_files = {}, {}
+        for key in files:
+            for raw_file_identifier, rows in file_uploads(key, metadata[key]):
+                upload_rows[raw_file_identifier] = (
+                    upload_rows.get(raw_file_identifier, 0) + rows
+                )
+            for raw_file_identifier, row_groups in upload_row_groups(
+                key, metadata[key]
+            ).items():
+                upload_files.setdefault(raw_file_identifier, []).append(
+                    (key, row_groups)
+                )
+        for raw_file_identifier, row_group_files in sorted(upload_files.items()):
+            self.db_adapter.store_dataset_upload_statistics(
+                dataset,
+                raw_file_identifier,
+                self._encode_column_statistics(
+                    self._files_column_statistics(schema, row_group_files, metadata)
+                ),
+            )
+        self.db_adapter.replace_dataset_upload_rows(dataset, upload_rows)
+        self._merge_column_statistics(dataset, files)
+        self.refresh_size(dataset)
+        return self.get_statistics(dataset)
+
+    def refresh_size(self, dataset: DatasetMetadata) -> None:
+        folder_statistics = self.s3_adapter.get_folder_statistics(
+            dataset.dataset_location()
+        )
+        self.db_adapter.update_dataset_size(
+            dataset,
+            folder_statistics["size_bytes"],
+            folder_statistics["object_count"],
+            folder_statistics["last_updated"],
+        )
+
+    def record_upload(
+        self,
+        schema: Schema,
+        raw_file_identifier: str,
+        rows: int,
+        overwrite: bool,
+        data_files: Dict[str, int],
+    ) -> None:
+        """
+        :param data_files: The size in bytes of each data file written by the upload, by key
+        """
+        dataset = schema.metadata
+
+        def update_statistics():
+            self.db_adapter.store_dataset_upload_rows(
+                dataset, raw_file_identifier, rows, overwrite
+            )
+            self.db_adapter.store_dataset_upload_statistics(
+                dataset,
+                raw_file_identifier,
+                self._encode_column_statistics(
+                    self._files_column_statistics(
+                        schema,
+                        [(key, None) for key in data_files],
+                        self.s3_adapter.read_parquet_metadata(list(data_files)),
+                    )
+                ),
+            )
+            if overwrite:
+                # The files of every other upload have been removed
+                self._merge_upload_column_statistics(
+                    dataset,
+                    self.db_adapter.list_dataset_upload_statistics(dataset),
+                    lambda upload: upload == raw_file_identifier,
+                    True,
+                )
+                self.db_adapter.update_dataset_size(
+                    dataset, sum(data_files.values()), len(data_files), self._now()
+                )
+            else:
+                self._apply_change(
+                    dataset,
+                    DatasetSizeChange(
+                        size_bytes=sum(data_files.values()),
+                        object_count=len(data_files),
+                    ),
+                    set(),
+                    self._now(),
+                )
+
+        self._record(dataset, update_statistics)
+
+    def record_file_deletion(
+        self,
+        dataset: DatasetMetadata,
+        raw_file_identifier: str,
+        size_change: Optional[DatasetSizeChange],
+    ) -> None:
+        """
+        :param size_change: The change in size made by deleting the file, or None when the
+        deletion failed part way through
+        """
+
+        def update_statistics():
+            self.db_adapter.delete_dataset_upload_rows(dataset, raw_file_identifier)
+            self._apply_change(dataset, size_change, {raw_file_identifier}, None)
+
+        self._record(dataset, update_statistics)
+
+    def record_compaction(
+        self, dataset: DatasetMetadata, size_change: DatasetSizeChange
+    ) -> None:
+        """
+        Records a compaction, which changes the size of the dataset but not its rows
+        """
+        self._record(
+            dataset, lambda: self._update_size(dataset, size_change, self._now())
+        )
+
+    def record_change(self, dataset: DatasetMetadata) -> None:
+        """
+        Records a change whose effect on the files is not known, such as a failed upload, by
+        listing the dataset
+        """
+
+        def update_statistics():
+            self._merge_column_statistics(dataset, self._list_data_files(dataset))
+            self.refresh_size(dataset)
+
+        self._record(dataset, update_statistics)
+
+    def delete_statistics(self, dataset: DatasetMetadata) -> None:
+        self.db_adapter.delete_dataset_statistics(dataset)
+
+    def _apply_change(
+        self,
+        dataset: DatasetMetadata,
+        size_change: Optional[DatasetSizeChange],
+        removed_uploads: Set[str],
+        last_updated: Optional[str],
+    ) -> None:
+        """
+        Removes the statistics of the uploads whose rows were removed and adds the change in size.
+        The dataset is listed instead when the change is not known, or when its statistics were
+        recorded before the column statistics were.
+        """
+        item = self.db_adapter.get_dataset_statistics(dataset) or {}
+        if size_change is None or "ColumnsComplete" not in item:
+            self._merge_column_statistics(dataset, self._list_data_files(dataset))
+        else:
+            self._merge_upload_column_statistics(
+                dataset,
+                self.db_adapter.list_dataset_upload_statistics(dataset),
+                lambda upload: upload not in removed_uploads,
+                item["ColumnsComplete"],
+            )
+        if size_change is None:
+            self.refresh_size(dataset)
+        else:
+            self._update_size(dataset, size_change, last_updated)
+
+    def _update_size(
+        self,
+        dataset: DatasetMetadata,
+        size_change: DatasetSizeChange,
+        last_updated: Optional[str],
+    ) -> None:
+        if not self.db_adapter.add_dataset_size(
+            dataset, size_change.size_bytes, size_change.object_count, last_updated
+        ):
+            # There is no recorded size to add the change to yet
+            self.refresh_size(dataset)
+
+    def _merge_upload_column_statistics(
+        self,
+        dataset: DatasetMetadata,
+        upload_statistics: Dict[str, str],
+        keep: Callable[[str], bool],
+        complete: bool,
+    ) -> None:
+        """
+        Merges the statistics of the uploads that are kept and removes the others
+        """
+        removed_uploads = [
+            raw_file_identifier
+            for raw_file_identifier in upload_statistics
+            if not keep(raw_file_identifier)
+        ]
+        if removed_uploads:
+            self.db_adapter.delete_dataset_upload_statistics(dataset, removed_uploads)
+        self.db_adapter.update_dataset_column_statistics(
+            dataset,
+            self._encode_column_statistics(
+                merge_column_statistics(
+                    self._decode_column_statistics(column_statistics)
+                    for raw_file_identifier, column_statistics in upload_statistics.items()
+                    if keep(raw_file_identifier)
+                )
+            ),
+            complete,
+        )
+
+    def _merge_column_statistics(
+        self, dataset: DatasetMetadata, files: List[str]
+    ) -> None:
+        """
+        Merges the statistics of the uploads that still have files, removing the ones of the
+        uploads that have been deleted or overwritten. The merged statistics are complete when
+        every file belongs to an upload with recorded statistics.
+        """
+        upload_statistics = self.db_adapter.list_dataset_upload_statistics(dataset)
+        raw_file_identifiers = self._raw_file_identifiers(files)
+        self._merge_upload_column_statistics(
+            dataset,
+            upload_statistics,
+            lambda upload: upload in raw_file_identifiers,
+            raw_file_identifiers.issubset(upload_statistics),
+        )
+
+    def _files_column_statistics(
+        self,
+        schema: Schema,
+        files: List[Tuple[str, Optional[List[int]]]],
+        metadata: Dict,
+    ) -> Dict[str, ColumnStatistics]:
+        """
+        Merges the statistics of the files, given as their key and the row groups to read the
+        statistics of, or None to read every row group
+        """
+        return merge_column_statistics(
+            file_column_statistics(
+                schema,
+                metadata[key],
+                data_file_partition_path(schema.metadata, key),
+                row_groups,
+            )
+            for key, row_groups in files
+        )
+
+    def _list_data_files(self, dataset: DatasetMetadata) -> List[str]:
+        return [
+            key
+            for key in self.s3_adapter.list_files_from_path(
+                f"{dataset.dataset_location()}/"
+            )
+            if key.endswith(".parquet")
+        ]
+
+    def _raw_file_identifiers(self, files: List[str]) -> Set[str]:
+        """
+        :return: The uploads that have rows in the files, read from the footers of compacted files
+        """
+        raw_file_identifiers = {
+            upload_file_raw_file_identifier(key)
+            for key in files
+            if not is_compacted_file(key)
+        }
+        compacted_files = [key for key in files if is_compacted_file(key)]
+        if compacted_files:
+            for key, metadata in self.s3_adapter.read_parquet_metadata(
+                compacted_files
+            ).items():
+                raw_file_identifiers.update(
+                    raw_file_identifier
+                    for raw_file_identifier, _ in file_uploads(key, metadata)
+                )
+        return raw_file_identifiers
+
+    @staticmethod
+    def _encode_column_statistics(
+        column_statistics: Dict[str, ColumnStatistics]
+    ) -> str:
+        return json.dumps(
+            {name: statistics.dict() for name, statistics in column_statistics.items()}
+        )
+
+    @staticmethod
+    def _decode_column_statistics(
+        column_statistics: str,
+    ) -> Dict[str, ColumnStatistics]:
+        return {
+            name: ColumnStatistics.parse_obj(statistics)
+            for name, statistics in json.loads(column_statistics).items()
+        }
+
+    @staticmethod
+    def _now() -> str:
+        # In the format of the last modified times of S3 objects
+        return str(datetime.now(timezone.utc).replace(microsecond=0))
+
+    def _record(self, dataset: DatasetMetadata, update_statistics) -> None:
+        # The data has already changed, so failing to record it is logged rather than raised
+        try:
+            update_statistics()
+        except Exception as error:
+            AppLogger.error(
+                f"Failed to record the statistics of {dataset.string_representation()}: {error}"
+            )
@@ -56,9 +56,7 @@ def dataset_has_correct_columns(
     actual_columns = list(df.columns)
     error_list = []
 
-    has_expected_columns = all(
-        [expected_column in actual_columns for expected_column in expected_columns]
-    )
+    has_expected_columns = set(expected_columns).issubset(actual_columns)
 
     if not has_expected_columns or len(actual_columns) != len(expected_columns):
         # Cannot reasonably proceed with further validation if we don't even have the correct columns
@@ -127,10 +125,8 @@ def dataset_has_no_illegal_characters_in_partition_columns(
     for column in schema.get_partition_columns():
         series = data_frame[column.name]
         if not column.is_of_data_type(DateType) and series.dtype == object:
-            any_illegal_characters = any(
-                [value is True for value in series.str.contains("/")]
-            )
-            if any_illegal_characters:
+            # Values that are not strings give NaN, which any() skips
+            if series.str.contains("/", regex=False).any():
                 error_list.append(
                     f"Partition column [{column.name}] has values with illegal characters '/'"
                 )
@@ -141,6 +137,10 @@ def dataset_has_no_illegal_characters_in_partition_columns(
 def remove_empty_rows(df: pd.DataFrame) -> Tuple[pd.DataFrame, list[str]]:
     error_list = []
     try:
+        # A row can only be empty when every column has nulls, so the full scan is skipped
+        # as soon as a column without nulls is found
+        if any(not df.iloc[:, index].hasnans for index in range(df.shape[1])):
+            return df, error_list
         df.dropna(how="all", inplace=True)
     except (TypeError, ValueError, KeyError) as error:
         error_list.append(f"Could not drop null values: {error}")
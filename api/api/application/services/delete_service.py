@@ -1,12 +1,27 @@
 import re
+import time
+import uuid
 
+from api.adapter.dynamodb_adapter import DynamoDBAdapter
 from api.adapter.glue_adapter import GlueAdapter
+from api.adapter.query_result_cache import create_query_result_cache
 from api.adapter.s3_adapter import S3Adapter
+from api.application.services.dataset_statistics_service import (
+    DatasetStatisticsService,
+)
+from api.application.services.job_scheduler import JobQueue
+from api.application.services.job_service import JobService
 from api.application.services.schema_service import SchemaService
-from api.common.config.constants import FILENAME_WITH_TIMESTAMP_REGEX
-from api.common.custom_exceptions import AWSServiceError, UserError
+from api.common.config.constants import (
+    DATASET_LOCK_SECONDS,
+    FILENAME_WITH_TIMESTAMP_REGEX,
+)
+from api.common.custom_exceptions import AWSServiceError, ConflictError, UserError
 from api.common.logger import AppLogger
+from api.common.utilities import build_error_message_list
 from api.domain.dataset_metadata import DatasetMetadata
+from api.domain.Jobs.DeletionJob import DeletionJob, DeletionStep
+from api.domain.scheduled_task import ScheduledTask, TaskType
 
 
 class DeleteService:
@@ -15,10 +30,20 @@ class DeleteService:
         s3_adapter=S3Adapter(),
         glue_adapter=GlueAdapter(),
         schema_service=SchemaService(),
+        job_service=JobService(),
+        job_queue=JobQueue(),
+        query_result_cache=create_query_result_cache(),
+        dataset_statistics_service=DatasetStatisticsService(),
+        db_adapter=DynamoDBAdapter(),
     ):
         self.s3_adapter = s3_adapter
         self.glue_adapter = glue_adapter
         self.schema_service = schema_service
+        self.job_service = job_service
+        self.job_queue = job_queue
+        self.query_result_cache = query_result_cache
+        self.dataset_statistics_service = dataset_statistics_service
+        self.db_adapter = db_adapter
 
     def delete_schemas(self, metadata: type[DatasetMetadata]):
         self.schema_service.delete_schemas(metadata)
@@ -40,7 +65,24 @@ class DeleteService:
     def delete_dataset_file(self, dataset: DatasetMetadata, filename: str):
         self._validate_filename(filename)
         self.s3_adapter.find_raw_file(dataset, filename)
-        self.s3_adapter.delete_dataset_files(dataset, filename)
+        # Compacted files hold the rows of several uploads, so the file is not deleted while a
+        # compaction is merging them
+        lock_owner = f"deletion-{uuid.uuid4()}"
+        if not self.db_adapter.acquire_dataset_lock(
+            dataset, lock_owner, time.time() + DATASET_LOCK_SECONDS
+        ):
+            raise ConflictError(
+                "The dataset is being compacted, overwritten or having another file deleted, please try again later"
+            )
+        size_change = None
+        try:
+            size_change = self.s3_adapter.delete_dataset_files(dataset, filename)
+        finally:
+            self.db_adapter.release_dataset_lock(dataset, lock_owner)
+            self.query_result_cache.invalidate(dataset)
+            self.dataset_statistics_service.record_file_deletion(
+                dataset, filename.rsplit(".", 1)[0], size_change
+            )
 
     def delete_table(self, dataset: DatasetMetadata):
         self.glue_adapter.delete_tables([dataset.glue_table_name()])
@@ -52,13 +94,75 @@ class DeleteService:
         # 3. Delete Glue Tables
         # 4. Delete Schemas
         dataset_files = self.s3_adapter.list_dataset_files(dataset)
-        self.s3_adapter.delete_dataset_files_using_key(
-            dataset_files, f"{dataset.layer}/{dataset.domain}/{dataset.dataset}"
-        )
+        try:
+            self.s3_adapter.delete_dataset_files_using_key(
+                dataset_files, f"{dataset.layer}/{dataset.domain}/{dataset.dataset}"
+            )
+        finally:
+            self.query_result_cache.invalidate(dataset)
+        self.dataset_statistics_service.delete_statistics(dataset)
         tables = self.glue_adapter.get_tables_for_dataset(dataset)
         self.glue_adapter.delete_tables(tables)
         self.schema_service.delete_schemas(dataset)
 
+    def delete_dataset_in_background(
+        self, subject_id: str, dataset: DatasetMetadata
+    ) -> str:
+        deletion_job = self.job_service.create_deletion_job(subject_id, dataset)
+        try:
+            self.job_queue.submit(
+                TaskType.DELETION,
+                {
+                    "job_id": deletion_job.job_id,
+                    "subject_id": subject_id,
+                    "layer": dataset.layer,
+                    "domain": dataset.domain,
+                    "dataset": dataset.dataset,
+                },
+            )
+        except Exception as error:
+            self.job_service.fail(deletion_job, build_error_message_list(error))
+            raise error
+        return deletion_job.job_id
+
+    def process_deletion(
+        self, deletion_job: DeletionJob, dataset: DatasetMetadata
+    ) -> None:
+        try:
+            self.job_service.update_step(deletion_job, DeletionStep.DELETING)
+            self.delete_dataset(dataset)
+            self.job_service.update_step(deletion_job, DeletionStep.NONE)
+            self.job_service.succeed(deletion_job)
+        except Exception as error:
+            AppLogger.error(
+                f"Deletion failed for layer [{dataset.layer}], domain [{dataset.domain}] and dataset [{dataset.dataset}]: {error}"
+            )
+            self.job_service.fail(deletion_job, build_error_message_list(error))
+
+    def run_deletion_task(self, task: ScheduledTask) -> None:
+        # Deleting a dataset again only removes what the interrupted attempt left behind
+        self.process_deletion(*self._deletion_task_job(task))
+
+    def abandon_deletion_task(self, task: ScheduledTask) -> None:
+        deletion_job, _ = self._deletion_task_job(task)
+        self.job_service.fail(
+            deletion_job,
+            [
+                "The deletion was interrupted and could not be completed, please try again"
+            ],
+        )
+
+    def _deletion_task_job(
+        self, task: ScheduledTask
+    ) -> tuple[DeletionJob, DatasetMetadata]:
+        dataset = DatasetMetadata(
+            task.payload["layer"], task.payload["domain"], task.payload["dataset"]
+        )
+        return (
+            DeletionJob(task.payload["subject_id"], dataset, task.payload["job_id"]),
+            dataset,
+        )
+
     def _validate_filename(self, filename: str):
         if not re.match(FILENAME_WITH_TIMESTAMP_REGEX, filename):
             raise UserError(f"Invalid file name [{filename}]")
@@ -1,4 +1,9 @@
 import csv
+import io
+from typing import Iterable, Iterator, Union
+
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pandas import DataFrame
 
 from api.domain.mime_type import MimeType
@@ -13,3 +18,92 @@ class FormatService:
             return df.to_parquet(engine="pyarrow")
         else:
             return df.to_dict(orient="index")
+
+    @staticmethod
+    def from_chunks_to_mimetype(
+        chunks: Iterable[DataFrame], mime_type: MimeType
+    ) -> Iterator[Union[str, bytes]]:
+        """
+        Formats each chunk as soon as it is read, so only one chunk is held in memory at a time
+        """
+        if mime_type == MimeType.TEXT_CSV:
+            return _chunks_to_csv(chunks)
+        elif mime_type == MimeType.BINARY:
+            return _chunks_to_parquet(chunks)
+        elif mime_type == MimeType.ARROW_STREAM:
+            return _chunks_to_arrow_stream(chunks)
+        else:
+            return _chunks_to_ndjson(chunks)
+
+
+class _StreamSink(io.RawIOBase):
+    """
+    Collects what a writer has written since it was last taken. The position is not reset, as the
+    Parquet writer uses it to record the offsets of the row groups.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.buffer.extend(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def take(self) -> bytes:
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def _chunks_to_csv(chunks: Iterable[DataFrame]) -> Iterator[str]:
+    for index, chunk in enumerate(chunks):
+        yield chunk.to_csv(quoting=csv.QUOTE_NONNUMERIC, index=False, header=index == 0)
+
+
+def _chunks_to_ndjson(chunks: Iterable[DataFrame]) -> Iterator[str]:
+    for chunk in chunks:
+        if chunk.shape[0] > 0:
+            yield chunk.to_json(orient="records", lines=True).rstrip("\n") + "\n"
+
+
+def _chunks_to_parquet(chunks: Iterable[DataFrame]) -> Iterator[bytes]:
+    sink = _StreamSink()
+    writer = None
+    for chunk in chunks:
+        if writer is None:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            writer = pq.ParquetWriter(sink, table.schema)
+        else:
+            table = pa.Table.from_pandas(
+                chunk, schema=writer.schema, preserve_index=False
+            )
+        # Each chunk is written as one row group
+        writer.write_table(table, row_group_size=max(table.num_rows, 1))
+        yield sink.take()
+    if writer is not None:
+        writer.close()
+        yield sink.take()
+
+
+def _chunks_to_arrow_stream(chunks: Iterable[DataFrame]) -> Iterator[bytes]:
+    sink = _StreamSink()
+    writer = None
+    schema = None
+    for chunk in chunks:
+        batch = pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False)
+        if writer is None:
+            schema = batch.schema
+            writer = pa.ipc.new_stream(sink, schema)
+        writer.write_batch(batch)
+        yield sink.take()
+    if writer is not None:
+        writer.close()
+        yield sink.take()
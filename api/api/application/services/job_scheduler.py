@@ -0,0 +1,160 @@
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock, Semaphore, Thread
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from api.adapter.job_queue_store import JobQueueStore, create_job_queue_store
+from api.common.config.constants import (
+    JOB_QUEUE_MAX_SIZE,
+    JOB_SCHEDULER_CONCURRENCY,
+    JOB_SCHEDULER_POLL_INTERVAL_SECONDS,
+    JOB_TASK_LEASE_SECONDS,
+    JOB_TASK_MAX_ATTEMPTS,
+)
+from api.common.custom_exceptions import TooManyRequestsError
+from api.common.logger import AppLogger
+from api.domain.scheduled_task import TASK_PRIORITIES, ScheduledTask, TaskType
+
+
+class TaskHandler(NamedTuple):
+    # Runs the task, a task that was interrupted is run again with its attempts incremented
+    run: Callable[[ScheduledTask], None]
+    # Called instead of run once a task has been attempted too many times
+    abandon: Callable[[ScheduledTask], None]
+
+
+class JobQueue:
+    def __init__(
+        self,
+        store: Optional[JobQueueStore] = None,
+        max_size: int = JOB_QUEUE_MAX_SIZE,
+    ):
+        self.store = store if store else create_job_queue_store()
+        self.max_size = max_size
+
+    def submit(self, task_type: TaskType, payload: Dict[str, Any]) -> ScheduledTask:
+        if self.store.count_queued() >= self.max_size:
+            raise TooManyRequestsError(
+                "There are too many jobs waiting to be processed, please try again later"
+            )
+        task = ScheduledTask(
+            task_type=task_type, payload=payload, priority=TASK_PRIORITIES[task_type]
+        )
+        self.store.enqueue(task)
+        AppLogger.info(f"Queued {task_type} task {task.task_id}")
+        return task
+
+
+class JobScheduler:
+    """
+    Runs queued tasks with at most `concurrency` running at a time. The leases of running tasks are
+    renewed in the background, so if this process stops its tasks are picked up by another scheduler.
+    """
+
+    def __init__(
+        self,
+        store: JobQueueStore,
+        handlers: Dict[TaskType, TaskHandler],
+        concurrency: int = JOB_SCHEDULER_CONCURRENCY,
+        poll_interval: float = JOB_SCHEDULER_POLL_INTERVAL_SECONDS,
+        lease_seconds: float = JOB_TASK_LEASE_SECONDS,
+        max_attempts: int = JOB_TASK_MAX_ATTEMPTS,
+    ):
+        self.store = store
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4()}"
+        self._slots = Semaphore(concurrency)
+        self._running: Dict[str, ScheduledTask] = {}
+        self._running_lock = Lock()
+        self._stopped = Event()
+
+    def start(self) -> Thread:
+        thread = Thread(target=self.run, name="job-scheduler", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def run(self) -> None:
+        AppLogger.info(
+            f"Job scheduler {self.worker_id} started with concurrency {self.concurrency}"
+        )
+        Thread(target=self._renew_leases, name="job-lease-renewal", daemon=True).start()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while not self._stopped.is_set():
+                self._slots.acquire()
+                task = self._claim_next()
+                if task is None:
+                    self._slots.release()
+                    self._stopped.wait(self.poll_interval)
+                    continue
+                executor.submit(self._run_task, task)
+
+    def run_next(self) -> bool:
+        """
+        Claims and runs the next task in the calling thread, returning whether there was one
+        """
+        self._slots.acquire()
+        task = self._claim_next()
+        if task is None:
+            self._slots.release()
+            return False
+        self._run_task(task)
+        return True
+
+    def _claim_next(self) -> Optional[ScheduledTask]:
+        try:
+            task = self.store.claim_next(
+                self.worker_id, time.time() + self.lease_seconds
+            )
+        except Exception as error:
+            AppLogger.error(f"Failed to claim the next task: {error}")
+            return None
+        if task is not None:
+            with self._running_lock:
+                self._running[task.task_id] = task
+        return task
+
+    def _run_task(self, task: ScheduledTask) -> None:
+        try:
+            handler = self.handlers[task.task_type]
+            if task.attempts > self.max_attempts:
+                AppLogger.warning(
+                    f"Abandoning {task.task_type} task {task.task_id} after {task.attempts - 1} attempts"
+                )
+                handler.abandon(task)
+            else:
+                AppLogger.info(
+                    f"Running {task.task_type} task {task.task_id}, attempt {task.attempts}"
+                )
+                handler.run(task)
+        except Exception as error:
+            AppLogger.error(f"{task.task_type} task {task.task_id} failed: {error}")
+        finally:
+            with self._running_lock:
+                self._running.pop(task.task_id, None)
+            try:
+                self.store.complete(task)
+            except Exception as error:
+                AppLogger.error(f"Failed to complete task {task.task_id}: {error}")
+            self._slots.release()
+
+    def _renew_leases(self) -> None:
+        while not self._stopped.wait(self.lease_seconds / 3):
+            with self._running_lock:
+                running_tasks = list(self._running.values())
+            for task in running_tasks:
+                try:
+                    self.store.renew_lease(task, time.time() + self.lease_seconds)
+                except Exception as error:
+                    AppLogger.error(
+                        f"Failed to renew the lease of task {task.task_id}: {error}"
+                    )
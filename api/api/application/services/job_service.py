@@ -3,6 +3,8 @@ from typing import Dict, List
 from api.adapter.dynamodb_adapter import DynamoDBAdapter
 from api.common.logger import AppLogger
 from api.domain.dataset_metadata import DatasetMetadata
+from api.domain.Jobs.CompactionJob import CompactionJob, CompactionStep
+from api.domain.Jobs.DeletionJob import DeletionJob
 from api.domain.Jobs.Job import JobStep, Job, JobStatus
 from api.domain.Jobs.QueryJob import QueryJob, QueryStep
 from api.domain.Jobs.UploadJob import UploadJob
@@ -62,3 +64,29 @@ class JobService:
         AppLogger.info(f"Setting query results URL on {query_job.job_id}")
         query_job.set_results_url(url)
         self.db_adapter.update_query_job(query_job)
+
+    def create_compaction_job(
+        self, subject_id: str, dataset: DatasetMetadata
+    ) -> CompactionJob:
+        job = CompactionJob(subject_id, dataset)
+        self.db_adapter.store_compaction_job(job)
+        return job
+
+    def create_deletion_job(
+        self, subject_id: str, dataset: DatasetMetadata
+    ) -> DeletionJob:
+        job = DeletionJob(subject_id, dataset)
+        self.db_adapter.store_deletion_job(job)
+        return job
+
+    def record_compaction_progress(
+        self, compaction_job: CompactionJob, files_compacted: int, files_written: int
+    ) -> None:
+        compaction_job.record_progress(files_compacted, files_written)
+        self.db_adapter.update_compaction_job(compaction_job)
+
+    def succeed_compaction(self, compaction_job: CompactionJob) -> None:
+        AppLogger.info(f"Compaction job {compaction_job.job_id} has succeeded")
+        compaction_job.set_step(CompactionStep.NONE)
+        compaction_job.set_status(JobStatus.SUCCESS)
+        self.db_adapter.update_compaction_job(compaction_job)
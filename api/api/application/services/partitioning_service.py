@@ -1,15 +1,25 @@
-from typing import List, Tuple, Hashable, Optional
+import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple, Hashable, Optional, Union
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from pydantic import BaseModel
 
+from api.common.config.constants import (
+    PARTITION_FILE_TARGET_SIZE,
+    PARTITION_ROW_GROUP_SIZE,
+    PARTITION_WRITER_MAX_BUFFERED_ROWS,
+)
 from api.domain.schema import Schema
 
 
 class Partition(BaseModel):
     keys: Optional[list] = [""]
     path: Optional[str] = ""
-    df: pd.DataFrame
+    df: Union[pd.DataFrame, pa.Table]
 
     class Config:
         arbitrary_types_allowed = True
@@ -26,11 +36,15 @@ def drop_columns(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
     return df.drop(labels=columns, axis=1)
 
 
-def generate_partitioned_data(schema: Schema, df: pd.DataFrame) -> List[Partition]:
+def generate_partitioned_data(
+    schema: Schema, df: Union[pd.DataFrame, pa.Table]
+) -> List[Partition]:
     partitions = schema.get_partitions()
 
     if len(partitions) == 0:
         return non_partitioned_dataframe(df)
+    if isinstance(df, pa.Table):
+        return partitioned_table(df, partitions)
     return partitioned_dataframe(df, partitions)
 
 
@@ -51,5 +65,159 @@ def partitioned_dataframe(df: pd.DataFrame, partitions: List[str]) -> List[Parti
     return partitioned_data
 
 
-def non_partitioned_dataframe(df: pd.DataFrame) -> List[Partition]:
+def partitioned_table(table: pa.Table, partitions: List[str]) -> List[Partition]:
+    """
+    Arrow equivalent of partitioned_dataframe, producing the same keys and paths
+    """
+    partitioned_data = []
+    group_keys = (
+        table.group_by(partitions)
+        .aggregate([])
+        .sort_by([(partition, "ascending") for partition in partitions])
+    )
+    for group_spec in zip(
+        *[group_keys.column(partition).to_pylist() for partition in partitions]
+    ):
+        if any(value is None for value in group_spec):
+            # pandas groupby drops null keys
+            continue
+        mask = None
+        for partition, value in zip(partitions, group_spec):
+            condition = pc.equal(table.column(partition), value)
+            mask = condition if mask is None else pc.and_(mask, condition)
+        group_spec = tuple(format_partition_value(value) for value in group_spec)
+        partitioned_data.append(
+            Partition(
+                keys=group_spec,
+                path=generate_path(partitions, group_spec),
+                df=table.filter(mask).drop(partitions),
+            )
+        )
+    return partitioned_data
+
+
+def format_partition_value(value: Any) -> Any:
+    # Dates are grouped as timestamps by pandas, keep the same partition paths
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return pd.Timestamp(value)
+    return value
+
+
+def non_partitioned_dataframe(df: Union[pd.DataFrame, pa.Table]) -> List[Partition]:
     return [Partition(df=df)]
+
+
+def partition_to_parquet(
+    schema: Schema, partition: Partition, path: Optional[Union[str, Path]] = None
+) -> Optional[bytes]:
+    """
+    Encodes the partition as gzip compressed parquet, returning the bytes when no path is provided
+    """
+    if isinstance(partition.df, pa.Table):
+        storage_schema = schema.generate_non_partition_storage_schema()
+        table = partition.df.select(storage_schema.names).cast(storage_schema)
+        if path is not None:
+            pq.write_table(table, path, compression="gzip")
+            return None
+        buffer = pa.BufferOutputStream()
+        pq.write_table(table, buffer, compression="gzip")
+        return buffer.getvalue().to_pybytes()
+    return partition.df.to_parquet(
+        path,
+        compression="gzip",
+        index=False,
+        schema=schema.generate_non_partition_storage_schema(),
+    )
+
+
+def partition_to_table(schema: Schema, partition: Partition) -> pa.Table:
+    storage_schema = schema.generate_non_partition_storage_schema()
+    if isinstance(partition.df, pa.Table):
+        return partition.df.select(storage_schema.names).cast(storage_schema)
+    return pa.Table.from_pandas(
+        partition.df, schema=storage_schema, preserve_index=False
+    ).replace_schema_metadata()
+
+
+class PartitionedParquetWriter:
+    """
+    Keeps one parquet file open per partition for the whole upload. Rows are buffered per
+    partition so that row groups are written at a reasonable size, and a new file is started
+    once the current one reaches the target size.
+    """
+
+    def __init__(
+        self,
+        schema: Schema,
+        directory: Path,
+        generate_filename: Callable[[], str],
+        target_file_size: int = PARTITION_FILE_TARGET_SIZE,
+        row_group_size: int = PARTITION_ROW_GROUP_SIZE,
+        max_buffered_rows: int = PARTITION_WRITER_MAX_BUFFERED_ROWS,
+    ):
+        self.schema = schema
+        self.directory = directory
+        self.generate_filename = generate_filename
+        self.target_file_size = target_file_size
+        self.row_group_size = row_group_size
+        self.max_buffered_rows = max_buffered_rows
+        self._storage_schema = schema.generate_non_partition_storage_schema()
+        self._buffers: Dict[str, List[pa.Table]] = {}
+        self._buffered_rows: Dict[str, int] = {}
+        self._writers: Dict[str, Tuple[pq.ParquetWriter, pa.NativeFile]] = {}
+
+    def __enter__(self) -> "PartitionedParquetWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, validated_data: Union[pd.DataFrame, pa.Table]) -> None:
+        for partition in generate_partitioned_data(self.schema, validated_data):
+            table = partition_to_table(self.schema, partition)
+            self._buffers.setdefault(partition.path, []).append(table)
+            self._buffered_rows[partition.path] = (
+                self._buffered_rows.get(partition.path, 0) + table.num_rows
+            )
+            if self._buffered_rows[partition.path] >= self.row_group_size:
+                self._flush(partition.path)
+
+        if sum(self._buffered_rows.values()) >= self.max_buffered_rows:
+            for partition_path in list(self._buffers):
+                self._flush(partition_path)
+
+    def close(self) -> None:
+        for partition_path in list(self._buffers):
+            self._flush(partition_path)
+        for partition_path in list(self._writers):
+            self._close_writer(partition_path)
+
+    def _flush(self, partition_path: str) -> None:
+        tables = self._buffers.pop(partition_path, [])
+        self._buffered_rows.pop(partition_path, None)
+        if not tables:
+            return
+        writer, sink = self._get_writer(partition_path)
+        writer.write_table(pa.concat_tables(tables), row_group_size=self.row_group_size)
+        if sink.tell() >= self.target_file_size:
+            self._close_writer(partition_path)
+
+    def _get_writer(
+        self, partition_path: str
+    ) -> Tuple[pq.ParquetWriter, pa.NativeFile]:
+        if partition_path not in self._writers:
+            partition_directory = self.directory / partition_path
+            partition_directory.mkdir(parents=True, exist_ok=True)
+            sink = pa.OSFile(
+                (partition_directory / self.generate_filename()).as_posix(), "wb"
+            )
+            self._writers[partition_path] = (
+                pq.ParquetWriter(sink, self._storage_schema, compression="gzip"),
+                sink,
+            )
+        return self._writers[partition_path]
+
+    def _close_writer(self, partition_path: str) -> None:
+        writer, sink = self._writers.pop(partition_path)
+        writer.close()
+        sink.close()
@@ -17,13 +17,7 @@ class PermissionsService:
         return self.dynamodb_adapter.get_permission_keys_for_subject(subject_id)
 
     def get_subject_permissions(self, subject_id: str) -> List[PermissionItem]:
-        permission_keys = self.get_subject_permission_keys(subject_id)
-        all_permissions = self.dynamodb_adapter.get_all_permissions()
-        return [
-            permission
-            for permission in all_permissions
-            if permission.id in permission_keys
-        ]
+        return self.dynamodb_adapter.get_permissions_for_subject(subject_id)
 
     def get_all_permissions_ui(self) -> List[dict]:
         all_permissions = self.dynamodb_adapter.get_all_permissions()
@@ -1,7 +1,8 @@
-from typing import List, Type
+from typing import List, Optional, Type
 
 from api.adapter.dynamodb_adapter import DynamoDBAdapter
 from api.adapter.glue_adapter import GlueAdapter
+from api.adapter.schema_cache import SchemaCache
 from api.application.services.protected_domain_service import ProtectedDomainService
 from api.application.services.schema_validation import validate_schema_for_upload
 from api.common.config.constants import (
@@ -28,25 +29,46 @@ class SchemaService:
         dynamodb_adapter=DynamoDBAdapter(),
         glue_adapter=GlueAdapter(),
         protected_domain_service=ProtectedDomainService(),
+        schema_cache=SchemaCache(),
     ):
         self.dynamodb_adapter = dynamodb_adapter
         self.glue_adapter = glue_adapter
         self.protected_domain_service = protected_domain_service
+        self.schema_cache = schema_cache
 
     def get_schema(
-        self, dataset: Type[DatasetMetadata], latest: bool = False
+        self,
+        dataset: Type[DatasetMetadata],
+        latest: bool = False,
+        use_cache: bool = True,
     ) -> Schema:
-        if latest or not dataset.get_version():
-            schema_dict = self.dynamodb_adapter.get_latest_schema(dataset)
+        """
+        Gets the schema of the dataset's version, or of its latest version. Cached schemas are
+        shared and must not be modified, schema changes read them with `use_cache=False`.
+        """
+        version = None if latest or not dataset.get_version() else dataset.get_version()
+        if use_cache:
+            schema = self.schema_cache.get_schema(
+                dataset, version, lambda: self._read_schema(dataset, version)
+            )
         else:
-            schema_dict = self.dynamodb_adapter.get_schema(dataset)
+            schema = self._read_schema(dataset, version)
 
-        if not schema_dict:
+        if schema is None:
             raise SchemaNotFoundError(
                 f"Could not find the schema for dataset {dataset.string_representation()}"
             )
 
-        return self._parse_schema(schema_dict)
+        return schema
+
+    def _read_schema(
+        self, dataset: Type[DatasetMetadata], version: Optional[int]
+    ) -> Optional[Schema]:
+        if version is None:
+            schema_dict = self.dynamodb_adapter.get_latest_schema(dataset)
+        else:
+            schema_dict = self.dynamodb_adapter.get_schema(dataset)
+        return self._parse_schema(schema_dict) if schema_dict else None
 
     def _parse_schema(self, schema: dict, only_metadata: bool = False):
         metadata = SchemaMetadata.parse_obj(schema)
@@ -67,32 +89,41 @@ class SchemaService:
             ]
         return []
 
-    def get_latest_schema_version(self, dataset: Type[DatasetMetadata]) -> int:
-        schema = self.dynamodb_adapter.get_latest_schema(dataset)
-        if not schema:
+    def get_latest_schema_version(
+        self, dataset: Type[DatasetMetadata], use_cache: bool = True
+    ) -> int:
+        try:
+            return self.get_schema(
+                dataset, latest=True, use_cache=use_cache
+            ).get_version()
+        except SchemaNotFoundError:
             return FIRST_SCHEMA_VERSION_NUMBER
 
-        return self._parse_schema(schema).get_version()
-
     def delete_schema(self, dataset: Type[DatasetMetadata]) -> int:
-        return self.dynamodb_adapter.delete_schema(dataset)
+        try:
+            return self.dynamodb_adapter.delete_schema(dataset)
+        finally:
+            self.schema_cache.invalidate_dataset(dataset)
 
     def delete_schemas(self, dataset: Type[DatasetMetadata]) -> int:
-        max_version = self.get_latest_schema_version(dataset)
-        for i in range(max_version):
-            metadata = DatasetMetadata(
-                layer=dataset.layer,
-                domain=dataset.domain,
-                dataset=dataset.dataset,
-                version=i + 1,
-            )
-            self.dynamodb_adapter.delete_schema(metadata)
+        max_version = self.get_latest_schema_version(dataset, use_cache=False)
+        try:
+            for i in range(max_version):
+                metadata = DatasetMetadata(
+                    layer=dataset.layer,
+                    domain=dataset.domain,
+                    dataset=dataset.dataset,
+                    version=i + 1,
+                )
+                self.dynamodb_adapter.delete_schema(metadata)
+        finally:
+            self.schema_cache.invalidate_dataset(dataset)
 
     def upload_schema(self, schema: Schema) -> str:
         schema.metadata.version = FIRST_SCHEMA_VERSION_NUMBER
         dataset = schema.metadata
         try:
-            if self.get_schema(dataset) is not None:
+            if self.get_schema(dataset, use_cache=False) is not None:
                 AppLogger.warning(
                     f"Schema already exists for {dataset.string_representation()}"
                 )
@@ -102,11 +133,14 @@ class SchemaService:
         self.check_for_protected_domain(schema)
         validate_schema_for_upload(schema)
         self.glue_adapter.create_table(schema)
-        self.dynamodb_adapter.store_schema(schema)
+        try:
+            self.dynamodb_adapter.store_schema(schema)
+        finally:
+            self.schema_cache.invalidate_dataset(dataset)
         return schema.metadata.glue_table_name()
 
     def update_schema(self, schema: Schema) -> str:
-        original_schema = self.get_schema(schema.metadata, latest=True)
+        original_schema = self.get_schema(schema.metadata, latest=True, use_cache=False)
 
         schema.metadata.version = (
             original_schema.get_version() + SCHEMA_VERSION_INCREMENT
@@ -119,8 +153,11 @@ class SchemaService:
         # Upload schema
         self.glue_adapter.create_table(schema)
 
-        self.dynamodb_adapter.store_schema(schema)
-        self.dynamodb_adapter.deprecate_schema(original_schema.metadata)
+        try:
+            self.dynamodb_adapter.store_schema(schema)
+            self.dynamodb_adapter.deprecate_schema(original_schema.metadata)
+        finally:
+            self.schema_cache.invalidate_dataset(schema.metadata)
         return schema.metadata.dataset_identifier()
 
     def check_for_protected_domain(self, schema: Schema) -> str:
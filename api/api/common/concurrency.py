@@ -0,0 +1,20 @@
+from functools import partial
+from typing import Callable, TypeVar
+
+from anyio import CapacityLimiter, to_thread
+
+from api.common.config.constants import AWS_CALL_CONCURRENCY
+
+T = TypeVar("T")
+
+aws_call_limiter = CapacityLimiter(AWS_CALL_CONCURRENCY)
+
+
+async def run_blocking(function: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Runs a blocking call, such as one to an AWS service, on a worker thread so that async
+    endpoints do not hold up the event loop while they wait for it
+    """
+    return await to_thread.run_sync(
+        partial(function, *args, **kwargs), limiter=aws_call_limiter
+    )
@@ -107,3 +107,7 @@ class PermissionsTableItem(StrEnum):
 
 class ServiceTableItem(StrEnum):
     JOB = "JOB"
+    TASK = "TASK"
+    DATA_VERSION = "DATA_VERSION"
+    DATASET_STATISTICS = "DATASET_STATISTICS"
+    DATASET_LOCK = "DATASET_LOCK"
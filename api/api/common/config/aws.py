@@ -16,6 +16,11 @@ PERMISSIONS_TABLE_SUFFIX = "_users_permissions"
 DYNAMO_PERMISSIONS_TABLE_NAME = RESOURCE_PREFIX + PERMISSIONS_TABLE_SUFFIX
 SERVICE_TABLE_NAME = RESOURCE_PREFIX + "_service_table"
 SCHEMA_TABLE_NAME = RESOURCE_PREFIX + "_schema_table"
+# The latest version of each schema is indexed by its layer and sensitivity, then by its domain and
+# dataset. Deprecated versions have no catalog keys and are left out of the index.
+SCHEMA_CATALOG_INDEX_NAME = "SCHEMA_CATALOG"
+SCHEMA_CATALOG_PARTITION_KEY = "CatalogPK"
+SCHEMA_CATALOG_SORT_KEY = "CatalogSK"
 
 
 MAX_TAG_COUNT = 30
@@ -24,6 +29,13 @@ GLUE_CSV_SERIALISATION_LIBRARY = "org.apache.hadoop.hive.serde2.OpenCSVSerde"
 GLUE_QUOTE_CHAR = '"'
 GLUE_TABLE_PRESENCE_CHECK_RETRY_COUNT = 18
 GLUE_TABLE_PRESENCE_CHECK_INTERVAL = 20
+# Glue accepts at most 100 partitions per batch_create_partition request
+GLUE_MAX_PARTITIONS_PER_REQUEST = 100
+# Tables created with partition projection resolve their partitions from the S3 path at query
+# time, so uploads do not register them. Queries must filter on every partition column.
+GLUE_PARTITION_PROJECTION = (
+    os.getenv("GLUE_PARTITION_PROJECTION", "False").lower() == "true"
+)
 
 INFERRED_UNNAMED_COLUMN_PREFIX = (
     "unnamed_"  # Pandas infers an empty column name as "unnamed_\d"
@@ -38,6 +38,127 @@ CHUNK_SIZE = 50
 CHUNK_SIZE_MB = MB_1 * CHUNK_SIZE
 PARQUET_CHUNK_SIZE = 10000
 
+# Validate and convert each chunk once, staging the output locally until every chunk has passed
+SINGLE_PASS_UPLOAD = os.getenv("SINGLE_PASS_UPLOAD", "False").lower() == "true"
+# Single pass uploads keep one parquet writer open per partition, so each partition is written
+# as a few files of roughly the target size rather than one file per chunk
+STREAMING_PARTITION_WRITERS = (
+    os.getenv("STREAMING_PARTITION_WRITERS", "False").lower() == "true"
+)
+PARTITION_FILE_TARGET_SIZE = MB_1 * int(
+    os.getenv("PARTITION_FILE_TARGET_SIZE_MB", "128")
+)
+PARTITION_ROW_GROUP_SIZE = 100_000
+PARTITION_WRITER_MAX_BUFFERED_ROWS = 1_000_000
+# Compaction merges the files of an upload smaller than this in each partition into files of
+# roughly the partition file target size
+COMPACTION_SMALL_FILE_SIZE = MB_1 * int(
+    os.getenv("COMPACTION_SMALL_FILE_SIZE_MB", "32")
+)
+# S3 deletes at most 1000 objects per request
+COMPACTION_MAX_FILES_PER_MERGE = 1000
+# Compaction merges the files of several uploads into files named {COMPACTED_FILE_PREFIX}{id}
+COMPACTED_FILE_PREFIX = "compacted-"
+# A dataset version is locked while it is compacted or an uploaded file is deleted from it, the
+# lock is given up after DATASET_LOCK_SECONDS if its holder stops without releasing it
+DATASET_LOCK_SECONDS = 3600
+# Upload, large query and compaction jobs are queued in JOB_QUEUE_STORE ("dynamodb" or "sqlite")
+# and run by a job scheduler, either inside the API process ("inline") or by api.worker ("worker")
+JOB_QUEUE_STORE = os.getenv("JOB_QUEUE_STORE", "dynamodb")
+JOB_QUEUE_SQLITE_PATH = os.getenv("JOB_QUEUE_SQLITE_PATH", "job_queue.db")
+JOB_QUEUE_MAX_SIZE = int(os.getenv("JOB_QUEUE_MAX_SIZE", "100"))
+JOB_SCHEDULER_MODE = os.getenv("JOB_SCHEDULER_MODE", "inline")
+JOB_SCHEDULER_CONCURRENCY = int(os.getenv("JOB_SCHEDULER_CONCURRENCY", "4"))
+JOB_SCHEDULER_POLL_INTERVAL_SECONDS = 2
+# Uploaded files are staged in S3 when their upload task can run on another host. An inline
+# scheduler with a SQLite queue always runs the task on the host that received the file.
+STAGE_INCOMING_FILES = JOB_SCHEDULER_MODE != "inline" or JOB_QUEUE_STORE != "sqlite"
+# A running task is given back to the queue if its worker stops renewing the lease
+JOB_TASK_LEASE_SECONDS = 300
+JOB_TASK_MAX_ATTEMPTS = 2
+# Incoming upload files are staged in the data bucket under this prefix until their upload job has
+# run, so that a job can be run by any API or worker host
+INCOMING_UPLOADS_S3_PREFIX = "incoming_uploads"
+# Number of worker processes used to validate and encode upload chunks, 0 processes chunks in the upload thread
+UPLOAD_PROCESS_POOL_SIZE = int(os.getenv("UPLOAD_PROCESS_POOL_SIZE", "0"))
+# Number of partition files written to S3 concurrently, also used to size the S3 connection pool
+S3_UPLOAD_CONCURRENCY = int(os.getenv("S3_UPLOAD_CONCURRENCY", "10"))
+# Attempts at storing a partition file when S3 throttles the request or fails with a server error
+S3_UPLOAD_MAX_ATTEMPTS = 3
+S3_UPLOAD_RETRY_DELAY_SECONDS = 1
+# S3 deletes at most 1000 objects per request
+S3_DELETE_BATCH_SIZE = 1000
+# DynamoDB reads at most 100 keys per batch get, keys it leaves unprocessed are retried
+DYNAMO_BATCH_GET_SIZE = 100
+DYNAMO_BATCH_GET_MAX_ATTEMPTS = 5
+DYNAMO_BATCH_GET_RETRY_DELAY_SECONDS = 0.05
+# Number of rows read from Athena at a time when a query result is streamed
+QUERY_STREAM_CHUNK_SIZE = 10_000
+# Athena returns at most 1000 rows per page of query results
+QUERY_PAGE_SIZE_LIMIT = 1000
+# Parquet footers are read with one request for this many bytes from the end of the file, or two
+# requests when the footer is larger
+PARQUET_FOOTER_READ_BYTES = 64 * 1024
+# Number of blocking AWS calls that async endpoints can run at once, on threads apart from the ones
+# FastAPI runs synchronous endpoints and dependencies on
+AWS_CALL_CONCURRENCY = int(os.getenv("AWS_CALL_CONCURRENCY", "40"))
+# Athena query executions are polled every ATHENA_POLL_BACKOFF_FACTOR of the time they have been
+# running for, within the minimum and maximum interval, until ATHENA_QUERY_TIMEOUT_SECONDS
+ATHENA_POLL_MIN_INTERVAL_SECONDS = 0.25
+ATHENA_POLL_MAX_INTERVAL_SECONDS = 15
+ATHENA_POLL_BACKOFF_FACTOR = 0.2
+ATHENA_QUERY_TIMEOUT_SECONDS = int(os.getenv("ATHENA_QUERY_TIMEOUT_SECONDS", "7200"))
+# Athena returns at most 50 query executions per batch request
+ATHENA_POLL_BATCH_SIZE = 50
+# Athena queries are admitted so that at most ATHENA_MAX_CONCURRENT_QUERIES run at once, at most
+# ATHENA_MAX_CONCURRENT_QUERIES_PER_SUBJECT for one subject, with ATHENA_INTERACTIVE_RESERVED_QUERIES
+# of them kept for interactive queries. Queries that cannot run within
+# ATHENA_ADMISSION_TIMEOUT_SECONDS are rejected. Admission is tracked in each process, so every API
+# and worker process gets its share of the limits: they are divided by ATHENA_ADMISSION_REPLICAS,
+# the largest number of processes that query Athena at the same time.
+ATHENA_MAX_CONCURRENT_QUERIES = int(os.getenv("ATHENA_MAX_CONCURRENT_QUERIES", "20"))
+ATHENA_MAX_CONCURRENT_QUERIES_PER_SUBJECT = int(
+    os.getenv("ATHENA_MAX_CONCURRENT_QUERIES_PER_SUBJECT", "5")
+)
+ATHENA_INTERACTIVE_RESERVED_QUERIES = int(
+    os.getenv("ATHENA_INTERACTIVE_RESERVED_QUERIES", "5")
+)
+ATHENA_ADMISSION_TIMEOUT_SECONDS = int(
+    os.getenv("ATHENA_ADMISSION_TIMEOUT_SECONDS", "60")
+)
+ATHENA_ADMISSION_REPLICAS = int(os.getenv("ATHENA_ADMISSION_REPLICAS", "1"))
+# Datasets of up to LOCAL_QUERY_ENGINE_MAX_SIZE are queried in process with DuckDB rather than on
+# Athena, reading their files from LOCAL_QUERY_ENGINE_DATA_ROOT or the data bucket. It is off (0)
+# unless a size is set: the filter, select and aggregation SQL of a query is run in DuckDB's dialect,
+# so functions that only exist in Athena, or behave differently in it, can give other results.
+LOCAL_QUERY_ENGINE_MAX_SIZE = MB_1 * int(
+    os.getenv("LOCAL_QUERY_ENGINE_MAX_SIZE_MB", "0")
+)
+LOCAL_QUERY_ENGINE_DATA_ROOT = os.getenv("LOCAL_QUERY_ENGINE_DATA_ROOT")
+# Query results are cached in QUERY_CACHE_BACKEND: "local" keeps them in memory with the data
+# versions in SQLite, "shared" also stores them in S3 with the data versions in DynamoDB, "none"
+# turns the cache off. "local" only sees the data changes made on the same host, so deployments
+# with several hosts use "shared". The cache is off unless it is chosen.
+QUERY_CACHE_BACKEND = os.getenv("QUERY_CACHE_BACKEND", "none")
+QUERY_CACHE_SQLITE_PATH = os.getenv("QUERY_CACHE_SQLITE_PATH", "query_cache.db")
+QUERY_CACHE_MAX_SIZE = MB_1 * int(os.getenv("QUERY_CACHE_MAX_SIZE_MB", "256"))
+QUERY_CACHE_S3_PREFIX = "query_cache"
+# The resolved permissions of each subject are cached for PERMISSIONS_CACHE_TTL_SECONDS, which bounds
+# how long a change made by another instance of the API takes to apply, including a revoked
+# permission. 0, the default, turns the cache off.
+PERMISSIONS_CACHE_TTL_SECONDS = int(os.getenv("PERMISSIONS_CACHE_TTL_SECONDS", "0"))
+# Parsed schemas are cached for SCHEMA_CACHE_TTL_SECONDS, which bounds how long a schema change made
+# by another instance of the API takes to apply. 0, the default, turns the cache off.
+SCHEMA_CACHE_TTL_SECONDS = int(os.getenv("SCHEMA_CACHE_TTL_SECONDS", "0"))
+# At most VERIFIED_TOKEN_CACHE_SIZE verified tokens are kept until they expire, 0 turns the cache off.
+# The keys tokens are signed with are refreshed every JWKS_REFRESH_INTERVAL_SECONDS.
+VERIFIED_TOKEN_CACHE_SIZE = int(os.getenv("VERIFIED_TOKEN_CACHE_SIZE", "10000"))
+JWKS_REFRESH_INTERVAL_SECONDS = int(os.getenv("JWKS_REFRESH_INTERVAL_SECONDS", "300"))
+# Validate and partition parquet uploads as Arrow tables instead of converting them to pandas
+ARROW_PARQUET_VALIDATION = (
+    os.getenv("ARROW_PARQUET_VALIDATION", "False").lower() == "true"
+)
+
 FIRST_SCHEMA_VERSION_NUMBER = 1
 SCHEMA_VERSION_INCREMENT = 1
 
@@ -44,6 +44,12 @@ class QueryExecutionError(AWSServiceError):
         super().__init__(message)
 
 
+# The query is run on Athena instead
+class LocalQueryError(BaseAppException):
+    def __init__(self, message):
+        super().__init__(message)
+
+
 # Could become a generic NotFoundError
 class SchemaNotFoundError(UserError):
     def __init__(self, message, status_code: int = 404):
@@ -1,6 +1,9 @@
 import os
+import shutil
 import psutil
-from typing import Any
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Callable, Iterable, Iterator, Optional
 from pathlib import Path
 
 import pandas as pd
@@ -96,6 +99,35 @@ def get_dataframe_from_chunk_type(
         return chunk.to_pandas()
 
 
+def map_chunks(
+    function: Callable[[Any], Any],
+    chunks: Iterable[Any],
+    executor: Optional[Executor] = None,
+    max_in_flight: int = 1,
+) -> Iterator[Any]:
+    """
+    Applies the function to each chunk, yielding the results in chunk order.
+    With an executor, at most max_in_flight chunks are read ahead of the result being consumed
+    so that the file is never fully loaded into memory.
+    """
+    if executor is None:
+        for chunk in chunks:
+            yield function(chunk)
+        return
+
+    pending = deque()
+    try:
+        for chunk in chunks:
+            pending.append(executor.submit(function, chunk))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
 def delete_incoming_raw_file(
     schema: Schema, file_path: Path, raw_file_identifier: str = None
 ):
@@ -109,3 +141,14 @@ def delete_incoming_raw_file(
         AppLogger.error(
             f"Temporary upload file for {schema.metadata.string_representation()} not deleted. {raw_file_identifier_string if raw_file_identifier is not None else ''}. Detail: {error}"
         )
+
+
+def create_staging_directory(raw_file_identifier: str) -> Path:
+    # Holds the converted output of a single pass upload until every chunk has been validated
+    staging_directory = Path(f"{raw_file_identifier}-staging")
+    staging_directory.mkdir(parents=True, exist_ok=True)
+    return staging_directory
+
+
+def delete_staging_directory(raw_file_identifier: str):
+    shutil.rmtree(Path(f"{raw_file_identifier}-staging"), ignore_errors=True)
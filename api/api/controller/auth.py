@@ -1,5 +1,5 @@
+import asyncio
 import json
-import time
 from typing import Dict
 
 import requests
@@ -14,6 +14,7 @@ from api.application.services.authorisation.authorisation_service import (
 )
 
 from api.common.aws_utilities import get_secret
+from api.common.concurrency import run_blocking
 from api.common.config.auth import (
     IDENTITY_PROVIDER_TOKEN_URL,
     COGNITO_USER_LOGIN_APP_CREDENTIALS_SECRETS_NAME,
@@ -36,8 +37,8 @@ async def get_login_url(request: Request):
     if user_logged_in(request):
         return RedirectResponse(url="/", status_code=HTTP_302_FOUND)
 
-    cognito_user_login_client_id = get_secret(
-        COGNITO_USER_LOGIN_APP_CREDENTIALS_SECRETS_NAME
+    cognito_user_login_client_id = (
+        await run_blocking(get_secret, COGNITO_USER_LOGIN_APP_CREDENTIALS_SECRETS_NAME)
     )["client_id"]
     user_auth_url = construct_user_auth_url(cognito_user_login_client_id)
     return {"auth_url": user_auth_url}
@@ -45,15 +46,15 @@ async def get_login_url(request: Request):
 
 @auth_router.get("/logout")
 async def logout():
-    cognito_user_login_client_id = get_secret(
-        COGNITO_USER_LOGIN_APP_CREDENTIALS_SECRETS_NAME
+    cognito_user_login_client_id = (
+        await run_blocking(get_secret, COGNITO_USER_LOGIN_APP_CREDENTIALS_SECRETS_NAME)
     )["client_id"]
     logout_url = construct_logout_url(cognito_user_login_client_id)
     redirect_response = RedirectResponse(url=logout_url, status_code=HTTP_302_FOUND)
     redirect_response.delete_cookie(ShareEz_ACCESS_TOKEN)
     # we sleep for just over a second so that the Cloudfront cache has time
     # to clear
-    time.sleep(1.2)
+    await asyncio.sleep(1.2)
     return redirect_response
 
 
@@ -65,8 +66,12 @@ async def redirect_oauth_token_request(request: Request):
     }
     payload = await _load_json_bytes_to_dict(request)
 
-    response = requests.post(
-        IDENTITY_PROVIDER_TOKEN_URL, headers=headers, data=payload, timeout=5
+    response = await run_blocking(
+        requests.post,
+        IDENTITY_PROVIDER_TOKEN_URL,
+        headers=headers,
+        data=payload,
+        timeout=5,
     )
 
     return response.json()
@@ -86,7 +91,9 @@ async def auth_success_callback(code: str):
 
 
 async def _get_client_info():
-    user_login_app_secrets = get_secret(COGNITO_USER_LOGIN_APP_CREDENTIALS_SECRETS_NAME)
+    user_login_app_secrets = await run_blocking(
+        get_secret, COGNITO_USER_LOGIN_APP_CREDENTIALS_SECRETS_NAME
+    )
     cognito_user_login_client_id = user_login_app_secrets["client_id"]
     cognito_user_login_client_secret = user_login_app_secrets["client_secret"]
     return cognito_user_login_client_id, cognito_user_login_client_secret
@@ -115,8 +122,13 @@ async def _get_access_token(auth, code, cognito_user_login_client_id):
         "redirect_uri": COGNITO_REDIRECT_URI,
         "code": code,
     }
-    response = requests.post(
-        IDENTITY_PROVIDER_TOKEN_URL, auth=auth, headers=headers, data=payload, timeout=5
+    response = await run_blocking(
+        requests.post,
+        IDENTITY_PROVIDER_TOKEN_URL,
+        auth=auth,
+        headers=headers,
+        data=payload,
+        timeout=5,
     )
     response_content = json.loads(response.content.decode(CONTENT_ENCODING))
     access_token = response_content["access_token"]
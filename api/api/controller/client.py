@@ -4,6 +4,7 @@ from fastapi import status as http_status
 
 from api.application.services.authorisation.authorisation_service import secure_endpoint
 from api.application.services.subject_service import SubjectService
+from api.common.concurrency import run_blocking
 from api.common.config.auth import Action
 from api.common.config.constants import BASE_API_PATH
 from api.domain.client import ClientRequest
@@ -70,7 +71,7 @@ async def create_client(client_request: ClientRequest):
     ### Click  `Try it out` to use the endpoint
 
     """
-    return subject_service.create_client(client_request)
+    return await run_blocking(subject_service.create_client, client_request)
 
 
 @client_router.delete(
@@ -89,5 +90,5 @@ async def delete_client(client_id: str):
     ### Click  `Try it out` to use the endpoint
 
     """
-    subject_service.delete_client(client_id)
+    await run_blocking(subject_service.delete_client, client_id)
     return {"details": f"The client '{client_id}' has been deleted"}
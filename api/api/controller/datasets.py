@@ -1,3 +1,4 @@
+import itertools
 import os
 from typing import Optional
 
@@ -5,8 +6,8 @@ from fastapi import APIRouter, Request
 from fastapi import UploadFile, File, Response, Security
 from fastapi import status as http_status
 from fastapi import Path as FastApiPath
-from pandas import DataFrame
-from starlette.responses import PlainTextResponse
+from fastapi import Query
+from starlette.responses import PlainTextResponse, StreamingResponse
 
 from api.adapter.athena_adapter import AthenaAdapter
 from api.application.services.authorisation.authorisation_service import (
@@ -17,12 +18,14 @@ from api.application.services.authorisation.authorisation_service import (
 from api.application.services.authorisation.dataset_access_evaluator import (
     DatasetAccessEvaluator,
 )
+from api.application.services.compaction_service import CompactionService
 from api.application.services.data_service import DataService
 
 from api.application.services.delete_service import DeleteService
 from api.application.services.format_service import FormatService
 from api.application.services.schema_service import SchemaService
 from api.application.services.search_service import SearchService
+from api.common.concurrency import run_blocking
 from api.common.data_handlers import store_file_to_disk
 from api.common.utilities import strtobool
 from api.common.config.auth import Action
@@ -30,6 +33,7 @@ from api.common.config.constants import (
     BASE_API_PATH,
     LOWERCASE_ROUTE_DESCRIPTION,
     LOWERCASE_REGEX,
+    QUERY_PAGE_SIZE_LIMIT,
     VALID_FILE_MIME_TYPES,
     VALID_FILE_EXTENSIONS,
 )
@@ -45,6 +49,7 @@ from api.domain.dataset_filters import DatasetFilters
 from api.domain.dataset_metadata import DatasetMetadata
 from api.domain.schema_metadata import SchemaMetadata
 from api.domain.mime_type import MimeType
+from api.domain.query_page import QueryPage
 from api.domain.sql_query import SQLQuery
 from api.domain.Jobs.Job import generate_uuid
 
@@ -52,6 +57,7 @@ from api.domain.Jobs.Job import generate_uuid
 CATALOG_DISABLED = strtobool(os.environ.get("CATALOG_DISABLED", "False"))
 
 athena_adapter = AthenaAdapter()
+compaction_service = CompactionService()
 data_service = DataService()
 delete_service = DeleteService()
 schema_service = SchemaService()
@@ -100,8 +106,11 @@ async def list_all_datasets(
     ### Click  `Try it out` to use the endpoint
     """
     subject_id = get_subject_id(request)
-    datasets = data_access_evaluator.get_authorised_datasets(
-        subject_id, Action.READ, tag_filters
+    datasets = await run_blocking(
+        data_access_evaluator.get_authorised_datasets,
+        subject_id,
+        Action.READ,
+        tag_filters,
     )
 
     class EnrichedMetadata(SchemaMetadata):
@@ -111,7 +120,9 @@ async def list_all_datasets(
         return [
             EnrichedMetadata(
                 **metadata.dict(),
-                last_updated_date=data_service.get_last_updated_time(metadata),
+                last_updated_date=await run_blocking(
+                    data_service.get_last_updated_time, metadata
+                ),
             )
             for metadata in datasets
         ]
@@ -130,7 +141,7 @@ if not CATALOG_DISABLED:
     async def search_dataset_metadata(
         term: str,
     ):
-        return search_service.search(term)
+        return await run_blocking(search_service.search, term)
 
 
 @datasets_router.get(
@@ -188,9 +199,10 @@ async def get_dataset_info(
     ### Click  `Try it out` to use the endpoint
 
     """
-    return data_service.get_dataset_info(
-        construct_dataset_metadata(layer, domain, dataset, version)
+    dataset_metadata = await run_blocking(
+        construct_dataset_metadata, layer, domain, dataset, version
     )
+    return await run_blocking(data_service.get_dataset_info, dataset_metadata)
 
 
 @datasets_router.get(
@@ -254,8 +266,8 @@ async def list_raw_files(
     ### Click  `Try it out` to use the endpoint
 
     """
-    raw_files = data_service.list_raw_files(
-        DatasetMetadata(layer, domain, dataset, version)
+    raw_files = await run_blocking(
+        data_service.list_raw_files, DatasetMetadata(layer, domain, dataset, version)
     )
     return raw_files
 
@@ -264,7 +276,14 @@ async def list_raw_files(
     "/{layer}/{domain}/{dataset}",
     dependencies=[Security(secure_endpoint, scopes=[Action.DATA_ADMIN])],
 )
-async def delete_dataset(layer: Layer, domain: str, dataset: str, response: Response):
+async def delete_dataset(
+    layer: Layer,
+    domain: str,
+    dataset: str,
+    request: Request,
+    response: Response,
+    background: Optional[bool] = False,
+):
     """
     ## Delete Dataset
 
@@ -273,13 +292,17 @@ async def delete_dataset(layer: Layer, domain: str, dataset: str, response: Resp
 
     When all valid items in the domain/dataset have been deleted, a success message will be displayed.
 
+    Large datasets can be deleted in the background by setting `background` to true. The response then contains
+    an asynchronous Job ID that can be used to track the progress of the deletion at the `/jobs/<job-id>` endpoint.
+
     ### Inputs
 
-    | Parameters | Required | Usage         | Example values                  | Definition                    |
-    |------------|----------|---------------|---------------------------------|-------------------------------|
-    | `layer`    | True     | URL parameter | `raw`                           | layer of the dataset          |
-    | `domain`   | True     | URL parameter | `land`                          | domain of the dataset         |
-    | `dataset`  | True     | URL parameter | `train_journeys`                | dataset title                 |
+    | Parameters   | Required | Usage           | Example values                  | Definition                    |
+    |--------------|----------|-----------------|---------------------------------|-------------------------------|
+    | `layer`      | True     | URL parameter   | `raw`                           | layer of the dataset          |
+    | `domain`     | True     | URL parameter   | `land`                          | domain of the dataset         |
+    | `dataset`    | True     | URL parameter   | `train_journeys`                | dataset title                 |
+    | `background` | False    | Query parameter | `true`                          | delete as a background job    |
 
     ### Accepted permissions
     In order to use this endpoint you need the DATA_ADMIN permission.
@@ -287,8 +310,17 @@ async def delete_dataset(layer: Layer, domain: str, dataset: str, response: Resp
     ### Click `Try it out` to use the endpoint
 
     """
-    delete_service.delete_dataset(DatasetMetadata(layer, domain, dataset))
     response.status_code = http_status.HTTP_202_ACCEPTED
+    if background:
+        job_id = await run_blocking(
+            delete_service.delete_dataset_in_background,
+            get_subject_id(request),
+            DatasetMetadata(layer, domain, dataset),
+        )
+        return {"details": {"job_id": job_id}}
+    await run_blocking(
+        delete_service.delete_dataset, DatasetMetadata(layer, domain, dataset)
+    )
     return {"details": f"{dataset} has been deleted."}
 
 
@@ -347,8 +379,10 @@ async def delete_data_file(
     ### Click  `Try it out` to use the endpoint
 
     """
-    delete_service.delete_dataset_file(
-        DatasetMetadata(layer, domain, dataset, version), filename
+    await run_blocking(
+        delete_service.delete_dataset_file,
+        DatasetMetadata(layer, domain, dataset, version),
+        filename,
     )
     return {"details": f"{filename} has been deleted."}
 
@@ -467,6 +501,10 @@ def upload_data(
                     "example": 'col1;col2;col3\n"123","something","500"\n"456","something else","600"'
                 },
                 "application/octet-stream": {},
+                "application/vnd.apache.arrow.stream": {},
+                "application/x-ndjson": {
+                    "example": '{"col1":"123","col2":"something","col3":"500"}\n{"col1":"456","col2":"something else","col3":"600"}\n'
+                },
             }
         },
         204: {
@@ -553,6 +591,22 @@ async def query_dataset(
 
     We recommend using this in a programmatic sense.
 
+    #### NDJSON
+
+    To get a newline delimited JSON response, the `Accept` Header has to be set to `application/x-ndjson`, this can be set below. Each line is one row, e.g.:
+
+    ```
+    {"column1":"value1","column2":"value2"}
+    ...
+    ```
+
+    #### Arrow
+
+    To get an Arrow IPC stream, the `Accept` Header has to be set to `application/vnd.apache.arrow.stream`, this can be set below. The response is a stream
+    of record batches that keep the column types of the dataset, rather than converting every value to a string. This is the format used by the SDK.
+
+    CSV, Parquet, NDJSON and Arrow responses are streamed as the result is read from the query engine, so large results are not held in memory.
+
     ### Empty response
 
     If there are no rows to return then a 204 response will be returned.
@@ -567,20 +621,38 @@ async def query_dataset(
     ### Click  `Try it out` to use the endpoint
 
     """
-    df = data_service.query_data(
-        construct_dataset_metadata(layer, domain, dataset, version), query
+    mime_type = MimeType.to_mimetype(request.headers.get("Accept"))
+    subject_id = get_subject_id(request)
+    dataset_metadata = await run_blocking(
+        construct_dataset_metadata, layer, domain, dataset, version
     )
-    if df.shape[0] == 0:
-        # Return 204 if dataframe is empty
-        return PlainTextResponse(
-            status_code=204,
-            content="No rows were returned. Either there is no data or the query is too limiting.",
+    if mime_type == MimeType.APPLICATION_JSON:
+        df = await run_blocking(
+            data_service.query_data, dataset_metadata, query, subject_id
         )
-    else:
-        string_df = df.astype("string")
-        output_format = request.headers.get("Accept")
-        mime_type = MimeType.to_mimetype(output_format)
-        return _format_query_output(string_df, mime_type)
+        if df.shape[0] == 0:
+            return _empty_query_response()
+        return await run_blocking(
+            lambda: FormatService.from_df_to_mimetype(df.astype("string"), mime_type)
+        )
+
+    chunks = await run_blocking(
+        data_service.query_data_in_chunks, dataset_metadata, query, subject_id
+    )
+    # Read up to the first row before responding, so that empty results and query errors
+    # still get their own status codes
+    first_chunk = await run_blocking(
+        next, (chunk for chunk in chunks if chunk.shape[0] > 0), None
+    )
+    if first_chunk is None:
+        return _empty_query_response()
+    chunks = itertools.chain([first_chunk], chunks)
+    if mime_type != MimeType.ARROW_STREAM:
+        chunks = (chunk.astype("string") for chunk in chunks)
+    return StreamingResponse(
+        FormatService.from_chunks_to_mimetype(chunks, mime_type),
+        media_type=mime_type,
+    )
 
 
 @datasets_router.post(
@@ -639,15 +711,163 @@ async def query_large_dataset(
 
     """
     subject_id = get_subject_id(request)
-    job_id = data_service.query_large_data(
-        subject_id, construct_dataset_metadata(layer, domain, dataset, version), query
+    dataset_metadata = await run_blocking(
+        construct_dataset_metadata, layer, domain, dataset, version
+    )
+    job_id = await run_blocking(
+        data_service.query_large_data, subject_id, dataset_metadata, query
     )
     return {"details": {"job_id": job_id}}
 
 
-def _format_query_output(df: DataFrame, mime_type: MimeType) -> Response:
-    formatted_output = FormatService.from_df_to_mimetype(df, mime_type)
-    if mime_type in [MimeType.TEXT_CSV, MimeType.BINARY]:
-        return PlainTextResponse(status_code=200, content=formatted_output)
-    else:
-        return formatted_output
+@datasets_router.post(
+    "/{layer}/{domain}/{dataset}/query/paginated",
+    dependencies=[Security(secure_dataset_endpoint, scopes=[Action.READ])],
+    response_model=QueryPage,
+)
+async def query_dataset_paginated(
+    layer: Layer,
+    dataset: str,
+    request: Request,
+    domain: str = FastApiPath(
+        ..., pattern=LOWERCASE_REGEX, description=LOWERCASE_ROUTE_DESCRIPTION
+    ),
+    version: Optional[int] = None,
+    cursor: Optional[str] = None,
+    page_size: int = Query(
+        default=QUERY_PAGE_SIZE_LIMIT, ge=1, le=QUERY_PAGE_SIZE_LIMIT
+    ),
+    query: Optional[SQLQuery] = SQLQuery(),
+):
+    """
+    ## Query dataset paginated
+
+    Data can be queried provided data has been uploaded at some point in the past.
+
+    This endpoint returns the result of the query one page at a time, so results of any size can be read incrementally
+    without running the query again for each page.
+
+    ### Inputs
+
+    | Parameters    | Required     | Usage                   | Example values                                                                                                              | Definition                    |
+    |---------------|--------------|-------------------------|-----------------------------------------------------------------------------------------------------------------------------|-------------------------------|
+    | `layer`       | True         | URL parameter           | `raw`                                                                                                                       | layer of the dataset          |
+    | `domain`      | True         | URL parameter           | `space`                                                                                                                     | domain of the dataset         |
+    | `dataset`     | True         | URL parameter           | `rocket_launches`                                                                                                           | dataset title                 |
+    | `version`     | False        | Query parameter         | '3'                                                                                                                         | dataset version               |
+    | `cursor`      | False        | Query parameter         | `eyJxdWVyeV9leGVjdXRpb25faWQiOi...`                                                                                         | cursor of the page to read    |
+    | `page_size`   | False        | Query parameter         | '500'                                                                                                                       | maximum rows in the page      |
+    | `query`       | False        | JSON Request Body       | Consult the [docs](https://ShareEz.readthedocs.io/en/latest/api/query/)                                                       | the query object              |
+
+    #### Layer
+
+    The set of values that can be specified for layer are specific to the instance of ShareEz. You can list them at the endpoint `/layers`.
+
+    #### Cursor
+
+    Without a cursor the query is run and the first page of its result is returned. To read the next page, call the endpoint again
+    with the `next_cursor` of the previous page, the query body is then ignored. The page size can be between 1 and 1000 rows and can change
+    between pages.
+
+    ### Outputs
+
+    A page of rows in JSON format and the cursor of the next page, which is `null` after the last page, e.g.:
+
+    ```json
+    {
+        "data": [
+            {"column1": "value1", "column2": "value2"},
+            ...
+        ],
+        "next_cursor": "eyJxdWVyeV9leGVjdXRpb25faWQiOi..."
+    }
+    ```
+
+    Cursors can be used until the query results expire.
+
+    ### Accepted permissions
+
+    In order to use this endpoint you need a `READ` permission with appropriate sensitivity level permission,
+    e.g.: `READ_ALL`, `READ_PUBLIC`, `READ_PRIVATE`, `READ_PROTECTED_{DOMAIN}`
+
+    ### Click  `Try it out` to use the endpoint
+
+    """
+    subject_id = get_subject_id(request)
+    dataset_metadata = await run_blocking(
+        construct_dataset_metadata, layer, domain, dataset, version
+    )
+    return await run_blocking(
+        data_service.query_data_page,
+        dataset_metadata,
+        query,
+        page_size,
+        cursor,
+        subject_id,
+    )
+
+
+@datasets_router.post(
+    "/{layer}/{domain}/{dataset}/compact",
+    dependencies=[Security(secure_dataset_endpoint, scopes=[Action.WRITE])],
+    status_code=http_status.HTTP_202_ACCEPTED,
+)
+async def compact_dataset(
+    layer: Layer,
+    dataset: str,
+    request: Request,
+    domain: str = FastApiPath(
+        ..., pattern=LOWERCASE_REGEX, description=LOWERCASE_ROUTE_DESCRIPTION
+    ),
+    version: Optional[int] = None,
+):
+    """
+    ## Compact dataset
+
+    Datasets that receive many small uploads build up a large number of small files, which slows down queries.
+    This endpoint starts a job that merges the small files in each partition, from any number of uploads, into larger files.
+
+    The data in the dataset is not changed. The merged files record which upload each row came from, so deleting an
+    uploaded file still removes exactly the data it contained. Only one compaction or file deletion runs on a dataset
+    at a time, a compaction started while another is running fails.
+
+    ### Inputs
+
+    | Parameters    | Required     | Usage                   | Example values                  | Definition                    |
+    |---------------|--------------|-------------------------|---------------------------------|-------------------------------|
+    | `layer`       | True         | URL parameter           | `raw`                           | layer of the dataset          |
+    | `domain`      | True         | URL parameter           | `space`                         | domain of the dataset         |
+    | `dataset`     | True         | URL parameter           | `rocket_launches`               | dataset title                 |
+    | `version`     | False        | Query parameter         | '3'                             | dataset version               |
+
+    #### Layer
+
+    The set of values that can be specified for layer are specific to the instance of ShareEz. You can list them at the endpoint `/layers`.
+
+    ### Outputs
+
+    Asynchronous Job ID that can be used to track the progress of the compaction at the `/jobs/<job-id>` endpoint.
+
+    ### Accepted permissions
+
+    In order to use this endpoint you need a relevant `WRITE` permission that matches the dataset sensitivity level,
+    e.g.: `WRITE_ALL`, `WRITE_PUBLIC`, `WRITE_PRIVATE`, `WRITE_PROTECTED_{DOMAIN}`
+
+    ### Click  `Try it out` to use the endpoint
+
+    """
+    subject_id = get_subject_id(request)
+    dataset_metadata = await run_blocking(
+        construct_dataset_metadata, layer, domain, dataset, version
+    )
+    job_id = await run_blocking(
+        compaction_service.compact_dataset, subject_id, dataset_metadata
+    )
+    return {"details": {"job_id": job_id}}
+
+
+def _empty_query_response() -> Response:
+    return PlainTextResponse(
+        status_code=204,
+        content="No rows were returned. Either there is no data or the query is too limiting.",
+    )
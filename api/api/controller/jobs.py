@@ -8,6 +8,7 @@ from api.application.services.authorisation.authorisation_service import (
     get_subject_id,
 )
 from api.application.services.job_service import JobService
+from api.common.concurrency import run_blocking
 from api.common.config.auth import Action
 from api.common.config.constants import BASE_API_PATH
 
@@ -48,7 +49,7 @@ async def list_all_jobs(request: Request):
     ### Click  `Try it out` to use the endpoint
 
     """
-    return jobs_service.get_all_jobs(get_subject_id(request))
+    return await run_blocking(jobs_service.get_all_jobs, get_subject_id(request))
 
 
 @jobs_router.get(
@@ -70,4 +71,4 @@ async def get_job(job_id: str):
     ### Click  `Try it out` to use the endpoint
 
     """
-    return jobs_service.get_job(job_id)
+    return await run_blocking(jobs_service.get_job, job_id)
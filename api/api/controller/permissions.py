@@ -3,6 +3,7 @@ from fastapi import status as http_status
 
 from api.application.services.authorisation.authorisation_service import secure_endpoint
 from api.application.services.permissions_service import PermissionsService
+from api.common.concurrency import run_blocking
 from api.common.config.auth import Action
 from api.common.config.constants import BASE_API_PATH
 
@@ -30,7 +31,7 @@ async def get_permissions():
 
     ### Click  `Try it out` to use the endpoint
     """
-    return permissions_service.get_permissions()
+    return await run_blocking(permissions_service.get_permissions)
 
 
 @permissions_router.get(
@@ -50,5 +51,7 @@ async def get_subject_permissions(subject_id: str):
     """
     return [
         permission.dict()
-        for permission in permissions_service.get_subject_permissions(subject_id)
+        for permission in await run_blocking(
+            permissions_service.get_subject_permissions, subject_id
+        )
     ]
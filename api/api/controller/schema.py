@@ -7,6 +7,7 @@ from api.application.services.authorisation.authorisation_service import secure_
 from api.application.services.delete_service import DeleteService
 from api.application.services.schema_infer_service import SchemaInferService
 from api.application.services.schema_service import SchemaService
+from api.common.concurrency import run_blocking
 from api.common.config.auth import Action, Sensitivity
 from api.common.config.constants import (
     BASE_API_PATH,
@@ -92,9 +93,16 @@ async def generate_schema(
         raise InvalidFileUploadError(f"This file type {extension}, is not supported.")
 
     job_id = generate_uuid()
-    incoming_file_path = store_file_to_disk(extension, job_id, file, to_chunk=True)
-    return schema_infer_service.infer_schema(
-        layer, domain, dataset, sensitivity, incoming_file_path
+    incoming_file_path = await run_blocking(
+        store_file_to_disk, extension, job_id, file, to_chunk=True
+    )
+    return await run_blocking(
+        schema_infer_service.infer_schema,
+        layer,
+        domain,
+        dataset,
+        sensitivity,
+        incoming_file_path,
     )
 
 
@@ -142,10 +150,10 @@ async def upload_schema(schema: Schema):
     ### Click  `Try it out` to use the endpoint
     """
     try:
-        schema_file_name = schema_service.upload_schema(schema)
+        schema_file_name = await run_blocking(schema_service.upload_schema, schema)
         return {"details": schema_file_name}
     except AWSServiceError as error:
-        handle_schema_upload_failure(schema, error)
+        await run_blocking(handle_schema_upload_failure, schema, error)
 
 
 @schema_router.put(
@@ -186,10 +194,10 @@ async def update_schema(schema: Schema):
     ### Click  `Try it out` to use the endpoint
     """
     try:
-        schema_file_name = schema_service.update_schema(schema)
+        schema_file_name = await run_blocking(schema_service.update_schema, schema)
         return {"details": schema_file_name}
     except AWSServiceError as error:
-        handle_schema_upload_failure(schema, error)
+        await run_blocking(handle_schema_upload_failure, schema, error)
 
 
 def handle_schema_upload_failure(schema: Schema, error):
@@ -4,6 +4,7 @@ from fastapi import status as http_status
 
 from api.application.services.authorisation.authorisation_service import secure_endpoint
 from api.application.services.subject_service import SubjectService
+from api.common.concurrency import run_blocking
 from api.common.config.auth import Action
 from api.common.config.constants import BASE_API_PATH
 from api.domain.subject_permissions import SubjectPermissions
@@ -29,7 +30,7 @@ async def list_subjects():
     ### Click  `Try it out` to use the endpoint
 
     """
-    return subject_service.list_subjects()
+    return await run_blocking(subject_service.list_subjects)
 
 
 @subjects_router.put(
@@ -75,4 +76,6 @@ async def update_subject_permissions(subject_permissions: SubjectPermissions):
     ### Click  `Try it out` to use the endpoint
 
     """
-    return subject_service.set_subject_permissions(subject_permissions)
+    return await run_blocking(
+        subject_service.set_subject_permissions, subject_permissions
+    )
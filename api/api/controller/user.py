@@ -4,6 +4,7 @@ from fastapi import status as http_status
 
 from api.application.services.authorisation.authorisation_service import secure_endpoint
 from api.application.services.subject_service import SubjectService
+from api.common.concurrency import run_blocking
 from api.common.config.auth import Action
 from api.common.config.constants import BASE_API_PATH
 from api.domain.user import UserRequest, UserDeleteRequest
@@ -71,7 +72,7 @@ async def create_user(user_request: UserRequest):
     ### Click  `Try it out` to use the endpoint
 
     """
-    return subject_service.create_user(user_request)
+    return await run_blocking(subject_service.create_user, user_request)
 
 
 @user_router.delete(
@@ -103,5 +104,5 @@ async def delete_user(delete_request: UserDeleteRequest):
     ### Click  `Try it out` to use the endpoint
 
     """
-    subject_service.delete_user(delete_request)
+    await run_blocking(subject_service.delete_user, delete_request)
     return {"details": f"The user '{delete_request.username}' has been deleted"}
@@ -0,0 +1,33 @@
+import time
+from typing import Optional
+
+from api.common.config.constants import UPLOAD_JOB_EXPIRY_DAYS
+from api.common.config.layers import Layer
+from api.domain.dataset_metadata import DatasetMetadata
+from api.domain.Jobs.Job import Job, JobType, JobStep
+
+
+class CompactionStep(JobStep):
+    INITIALISATION = "INITIALISATION"
+    COMPACTING = "COMPACTING"
+    NONE = "-"
+
+
+class CompactionJob(Job):
+    def __init__(
+        self, subject_id: str, dataset: DatasetMetadata, job_id: Optional[str] = None
+    ):
+        super().__init__(
+            JobType.COMPACTION, CompactionStep.INITIALISATION, subject_id, job_id
+        )
+        self.layer: Layer = dataset.layer
+        self.domain: str = dataset.domain
+        self.dataset: str = dataset.dataset
+        self.version: int = dataset.version
+        self.files_compacted: int = 0
+        self.files_written: int = 0
+        self.expiry_time: int = int(time.time() + UPLOAD_JOB_EXPIRY_DAYS * 24 * 60 * 60)
+
+    def record_progress(self, files_compacted: int, files_written: int) -> None:
+        self.files_compacted += files_compacted
+        self.files_written += files_written
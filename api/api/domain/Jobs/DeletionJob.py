@@ -0,0 +1,26 @@
+import time
+from typing import Optional
+
+from api.common.config.constants import UPLOAD_JOB_EXPIRY_DAYS
+from api.common.config.layers import Layer
+from api.domain.dataset_metadata import DatasetMetadata
+from api.domain.Jobs.Job import Job, JobType, JobStep
+
+
+class DeletionStep(JobStep):
+    INITIALISATION = "INITIALISATION"
+    DELETING = "DELETING"
+    NONE = "-"
+
+
+class DeletionJob(Job):
+    def __init__(
+        self, subject_id: str, dataset: DatasetMetadata, job_id: Optional[str] = None
+    ):
+        super().__init__(
+            JobType.DELETION, DeletionStep.INITIALISATION, subject_id, job_id
+        )
+        self.layer: Layer = dataset.layer
+        self.domain: str = dataset.domain
+        self.dataset: str = dataset.dataset
+        self.expiry_time: int = int(time.time() + UPLOAD_JOB_EXPIRY_DAYS * 24 * 60 * 60)
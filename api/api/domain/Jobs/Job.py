@@ -15,6 +15,8 @@ class JobStatus(StrEnum):
 class JobType(StrEnum):
     QUERY = "QUERY"
     UPLOAD = "UPLOAD"
+    COMPACTION = "COMPACTION"
+    DELETION = "DELETION"
 
 
 class JobStep(StrEnum):
@@ -15,8 +15,10 @@ class QueryStep(JobStep):
 
 
 class QueryJob(Job):
-    def __init__(self, subject_id: str, dataset: DatasetMetadata):
-        super().__init__(JobType.QUERY, QueryStep.INITIALISATION, subject_id)
+    def __init__(
+        self, subject_id: str, dataset: DatasetMetadata, job_id: Optional[str] = None
+    ):
+        super().__init__(JobType.QUERY, QueryStep.INITIALISATION, subject_id, job_id)
         self.layer: Layer = dataset.layer
         self.domain: str = dataset.domain
         self.dataset: str = dataset.dataset
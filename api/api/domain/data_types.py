@@ -1,6 +1,7 @@
 from strenum import StrEnum
 from enum import Enum
 
+import pyarrow as pa
 from pandas import DataFrame
 from pandas.api.types import infer_dtype
 
@@ -106,3 +107,21 @@ def extract_athena_types(df: DataFrame) -> dict:
             )
 
     return types
+
+
+def extract_athena_type_from_arrow(column: str, data_type: pa.DataType) -> str:
+    if pa.types.is_boolean(data_type):
+        return AthenaDataType.BOOLEAN.value
+    elif pa.types.is_integer(data_type):
+        return AthenaDataType.INT.value
+    elif pa.types.is_floating(data_type):
+        return AthenaDataType.DOUBLE.value
+    elif pa.types.is_decimal(data_type):
+        return AthenaDataType.DECIMAL.value
+    elif pa.types.is_string(data_type) or pa.types.is_large_string(data_type):
+        return AthenaDataType.STRING.value
+    elif pa.types.is_date(data_type) or pa.types.is_timestamp(data_type):
+        return AthenaDataType.DATE.value
+    raise UnsupportedTypeError(
+        f"Unable to convert the column [{column}] of type [{data_type}] to Athena Schema. This type is currently unsupported."
+    )
@@ -0,0 +1,26 @@
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+
+class ColumnStatistics(BaseModel):
+    # None when every value of the column is null
+    min: Optional[Any] = None
+    max: Optional[Any] = None
+    null_count: int = 0
+
+
+class DatasetStatistics(BaseModel):
+    size_bytes: int = 0
+    object_count: int = 0
+    # None when the dataset was uploaded before its rows were counted
+    row_count: Optional[int] = None
+    last_updated: Optional[str] = None
+    # None when the dataset was uploaded before its column statistics were recorded
+    column_statistics: Optional[Dict[str, ColumnStatistics]] = None
+
+
+class DatasetSizeChange(BaseModel):
+    # The change in the size and number of objects of a dataset made by writing or deleting files
+    size_bytes: int = 0
+    object_count: int = 0
@@ -1,4 +1,4 @@
-from typing import List, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel
 
@@ -7,7 +7,7 @@ from api.domain.schema_metadata import SchemaMetadata
 
 
 class EnrichedColumn(Column):
-    statistics: Optional[Dict[str, str]] = None
+    statistics: Optional[Dict[str, Any]] = None
 
 
 class EnrichedSchemaMetadata(SchemaMetadata):
@@ -7,6 +7,8 @@ class MimeType(StrEnum):
     APPLICATION_JSON = "application/json"
     TEXT_CSV = "text/csv"
     BINARY = "application/octet-stream"
+    NDJSON = "application/x-ndjson"
+    ARROW_STREAM = "application/vnd.apache.arrow.stream"
 
     @staticmethod
     def to_mimetype(mime_type: str):
@@ -0,0 +1,35 @@
+import base64
+import binascii
+import json
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from api.common.custom_exceptions import UserError
+from api.domain.sql_query import SQLQuery
+
+
+class QueryCursor(BaseModel):
+    """
+    Points at the next page of the results of an Athena query execution. The query is kept so
+    that the execution can be checked to be a query on the requested dataset.
+    """
+
+    query_execution_id: str
+    next_token: str
+    query: SQLQuery
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(self.json(exclude_none=True).encode()).decode()
+
+    @classmethod
+    def decode(cls, cursor: str) -> "QueryCursor":
+        try:
+            return cls.parse_obj(json.loads(base64.urlsafe_b64decode(cursor.encode())))
+        except (binascii.Error, UnicodeDecodeError, ValueError, ValidationError):
+            raise UserError("Invalid cursor")
+
+
+class QueryPage(BaseModel):
+    data: List[Dict[str, Optional[str]]]
+    next_cursor: Optional[str] = None
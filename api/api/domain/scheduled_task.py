@@ -0,0 +1,46 @@
+import time
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Field
+from strenum import StrEnum
+
+from api.domain.Jobs.Job import generate_uuid
+
+
+class TaskStatus(StrEnum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+
+
+class TaskType(StrEnum):
+    UPLOAD = "UPLOAD"
+    QUERY = "QUERY"
+    COMPACTION = "COMPACTION"
+    DELETION = "DELETION"
+
+
+# Lower values are run first, tasks of the same priority are run in the order they were queued
+TASK_PRIORITIES = {
+    TaskType.QUERY: 0,
+    TaskType.UPLOAD: 1,
+    TaskType.COMPACTION: 2,
+    TaskType.DELETION: 2,
+}
+
+
+class ScheduledTask(BaseModel):
+    task_type: TaskType
+    payload: Dict[str, Any]
+    task_id: str = Field(default_factory=generate_uuid)
+    priority: int = 0
+    status: TaskStatus = TaskStatus.QUEUED
+    enqueued_at: float = Field(default_factory=time.time)
+    attempts: int = 0
+    worker_id: Optional[str] = None
+    lease_expiry: Optional[float] = None
+
+    def order_key(self) -> str:
+        """
+        Sorts by priority and then by the time the task was queued
+        """
+        return f"{self.priority:03d}#{self.enqueued_at:017.6f}#{self.task_id}"
@@ -1,5 +1,6 @@
 from strenum import StrEnum
-from typing import List, Dict, Optional, Set
+from functools import lru_cache
+from typing import List, Dict, Optional, Set, Tuple
 
 import awswrangler as wr
 from pydantic.main import BaseModel
@@ -7,6 +8,8 @@ import pyarrow as pa
 
 from api.domain.schema_metadata import Owner, SchemaMetadata, UpdateBehaviour
 
+STORAGE_SCHEMA_CACHE_SIZE = 256
+
 METADATA = "metadata"
 COLUMNS = "columns"
 
@@ -101,9 +104,27 @@ class Schema(BaseModel):
         )
 
     def generate_storage_schema(self) -> pa.schema:
-        return pa.schema(
-            [
-                pa.field(column.name, wr._data_types.athena2pyarrow(column.data_type))
+        return _storage_schema(
+            tuple((column.name, column.data_type) for column in self.columns)
+        )
+
+    def generate_non_partition_storage_schema(self) -> pa.schema:
+        """The schema of the stored files, partition columns are encoded in the file path instead"""
+        return _storage_schema(
+            tuple(
+                (column.name, column.data_type)
                 for column in self.columns
-            ]
+                if column.partition_index is None
+            )
         )
+
+
+@lru_cache(maxsize=STORAGE_SCHEMA_CACHE_SIZE)
+def _storage_schema(columns: Tuple[Tuple[str, str], ...]) -> pa.schema:
+    # Arrow schemas are immutable, so one is shared by every schema with the same columns
+    return pa.schema(
+        [
+            pa.field(name, wr._data_types.athena2pyarrow(data_type))
+            for name, data_type in columns
+        ]
+    )
@@ -1,25 +1,23 @@
-from typing import Tuple, Callable, List
+from typing import Tuple, Callable, List, Union
 
 import pandas as pd
+import pyarrow as pa
+
+Data = Union[pd.DataFrame, pa.Table]
 
 
 class ValidationContext:
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: Data):
         self._error_context: List[str] = list()
-        self._df: pd.DataFrame = df
-
-    def pipe(
-        self,
-        function: Callable[[pd.DataFrame], Tuple[pd.DataFrame, List[str]]],
-        *args,
-        **kwargs
-    ):
+        self._df: Data = df
+
+    def pipe(self, function: Callable[[Data], Tuple[Data, List[str]]], *args, **kwargs):
         result, errors = function(self._df, *args, **kwargs)
         self._error_context.extend(errors) if errors else None
         self._df = result
         return self
 
-    def get_dataframe(self) -> pd.DataFrame:
+    def get_dataframe(self) -> Data:
         return self._df
 
     def has_errors(self) -> bool:
@@ -10,25 +10,34 @@ from starlette.status import HTTP_404_NOT_FOUND, HTTP_200_OK, HTTP_401_UNAUTHORI
 
 from api.application.services.authorisation.authorisation_service import (
     get_client_token,
+    get_subject_id,
     get_user_token,
     secure_endpoint,
-    ShareEz_ACCESS_TOKEN,
     user_logged_in,
 )
-from api.application.services.authorisation.token_utils import parse_token
+from api.application.services.authorisation.token_utils import (
+    start_signing_key_refresh,
+    verified_token_cache,
+)
 from api.application.services.permissions_service import PermissionsService
 from api.application.services.authorisation.dataset_access_evaluator import (
     DatasetAccessEvaluator,
 )
+from api.common.concurrency import run_blocking
 from api.common.config.auth import IDENTITY_PROVIDER_BASE_URL, Action
 from api.common.config.docs import custom_openapi_docs_generator, COMMIT_SHA, VERSION
-from api.common.config.constants import BASE_API_PATH
+from api.common.config.constants import BASE_API_PATH, JOB_SCHEDULER_MODE
 from api.common.logger import AppLogger, init_logger
 from api.common.custom_exceptions import UserError, AWSServiceError
 from api.common.utilities import strtobool
 from api.controller.auth import auth_router
 from api.controller.client import client_router
-from api.controller.datasets import datasets_router
+from api.controller.datasets import (
+    compaction_service,
+    data_service,
+    datasets_router,
+    delete_service,
+)
 from api.controller.jobs import jobs_router
 from api.controller.layers import layers_router
 from api.controller.permissions import permissions_router
@@ -37,6 +46,7 @@ from api.controller.schema import schema_router
 from api.controller.subjects import subjects_router
 from api.controller.user import user_router
 from api.exception_handler import add_exception_handlers
+from api.worker import build_job_scheduler
 
 try:
     load_dotenv()
@@ -74,6 +84,9 @@ app.include_router(layers_router)
 @app.on_event("startup")
 async def startup_event():
     init_logger()
+    start_signing_key_refresh()
+    if JOB_SCHEDULER_MODE == "inline":
+        build_job_scheduler(data_service, compaction_service, delete_service).start()
 
 
 @app.middleware("http")
@@ -101,6 +114,11 @@ def status(request: Request):
         "sha": COMMIT_SHA,
         "version": VERSION,
         "root_path": request.scope.get("root_path"),
+        "query_cache": data_service.query_result_cache.metrics(),
+        "query_admission": data_service.athena_adapter.admission_metrics(),
+        "permissions_cache": permissions_service.dynamodb_adapter.permissions_cache_metrics(),
+        "token_cache": verified_token_cache.metrics(),
+        "schema_cache": data_service.schema_service.schema_cache.metrics(),
     }
 
 
@@ -152,9 +170,9 @@ async def methods(request: Request):
     default_error_message = "You have not been granted relevant permissions. Please speak to your system administrator."
 
     try:
-        subject_id = parse_token(request.cookies.get(ShareEz_ACCESS_TOKEN)).subject
-        subject_permissions = permissions_service.get_subject_permission_keys(
-            subject_id
+        subject_id = get_subject_id(request)
+        subject_permissions = await run_blocking(
+            permissions_service.get_subject_permission_keys, subject_id
         )
         allowed_actions = _determine_user_ui_actions(subject_permissions)
         if not any([action_allowed for action_allowed in allowed_actions.values()]):
@@ -174,7 +192,7 @@ async def methods(request: Request):
     include_in_schema=False,
 )
 async def get_permissions_ui():
-    return permissions_service.get_all_permissions_ui()
+    return await run_blocking(permissions_service.get_all_permissions_ui)
 
 
 @app.get(
@@ -184,9 +202,11 @@ async def get_permissions_ui():
     include_in_schema=False,
 )
 async def get_datasets_ui(action: Action, request: Request):
-    subject_id = parse_token(request.cookies.get(ShareEz_ACCESS_TOKEN)).subject
+    subject_id = get_subject_id(request)
 
-    datasets = upload_service.get_authorised_datasets(subject_id, action)
+    datasets = await run_blocking(
+        upload_service.get_authorised_datasets, subject_id, action
+    )
     return [dataset.to_dict() for dataset in datasets]
 
 
@@ -196,10 +216,9 @@ async def favicon():
 
 
 def _get_subject_id(request: Request):
-    client_token = get_client_token(request)
-    user_token = get_user_token(request)
-    token = client_token if client_token else user_token
-    return parse_token(token).subject if token else "Not an authenticated user"
+    if get_client_token(request) or get_user_token(request):
+        return get_subject_id(request)
+    return "Not an authenticated user"
 
 
 def _determine_user_ui_actions(subject_permissions: List[str]) -> Dict[str, bool]:
@@ -0,0 +1,57 @@
+import signal
+from typing import Optional
+
+from api.adapter.job_queue_store import JobQueueStore, create_job_queue_store
+from api.application.services.compaction_service import CompactionService
+from api.application.services.data_service import DataService
+from api.application.services.delete_service import DeleteService
+from api.application.services.job_scheduler import JobScheduler, TaskHandler
+from api.common.logger import init_logger
+from api.domain.scheduled_task import TaskType
+
+
+def build_job_scheduler(
+    data_service: Optional[DataService] = None,
+    compaction_service: Optional[CompactionService] = None,
+    delete_service: Optional[DeleteService] = None,
+    store: Optional[JobQueueStore] = None,
+) -> JobScheduler:
+    data_service = data_service if data_service else DataService()
+    compaction_service = (
+        compaction_service if compaction_service else CompactionService()
+    )
+    delete_service = delete_service if delete_service else DeleteService()
+    return JobScheduler(
+        store if store else create_job_queue_store(),
+        {
+            TaskType.UPLOAD: TaskHandler(
+                data_service.run_upload_task, data_service.abandon_upload_task
+            ),
+            TaskType.QUERY: TaskHandler(
+                data_service.run_query_task, data_service.abandon_query_task
+            ),
+            TaskType.COMPACTION: TaskHandler(
+                compaction_service.run_compaction_task,
+                compaction_service.abandon_compaction_task,
+            ),
+            TaskType.DELETION: TaskHandler(
+                delete_service.run_deletion_task, delete_service.abandon_deletion_task
+            ),
+        },
+    )
+
+
+def main() -> None:
+    """
+    Runs queued jobs outside of the API, started with `python -m api.worker`. Incoming upload files
+    are read from where the API staged them in S3.
+    """
+    init_logger()
+    scheduler = build_job_scheduler()
+    signal.signal(signal.SIGTERM, lambda *_: scheduler.stop())
+    signal.signal(signal.SIGINT, lambda *_: scheduler.stop())
+    scheduler.run()
+
+
+if __name__ == "__main__":
+    main()
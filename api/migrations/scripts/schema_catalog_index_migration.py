@@ -0,0 +1,54 @@
+"""
+Adds the schema catalog keys to the latest version of every schema, so that the schemas stored
+before the SCHEMA_CATALOG index was added to the schema table are listed by the API.
+
+Run it once the index has been created by the infrastructure changes. It can be run again safely.
+"""
+import sys
+import os
+
+import boto3
+import dotenv
+
+dotenv.load_dotenv()
+
+# Add api to PYTHONPATH
+current_dir = os.path.dirname(os.path.abspath(__file__))
+target_dir = os.path.abspath(os.path.join(current_dir, "..", ".."))
+sys.path.append(target_dir)
+
+from api.adapter.dynamodb_adapter import schema_catalog_keys  # noqa: E402
+from api.domain.schema_metadata import IS_LATEST_VERSION, SchemaMetadata  # noqa: E402
+
+AWS_REGION = os.environ["AWS_REGION"]
+RESOURCE_PREFIX = os.environ["RESOURCE_PREFIX"]
+SCHEMA_TABLE_NAME = f"{RESOURCE_PREFIX}_schema_table"
+
+
+def main(schema_table):
+    scan_arguments = {}
+    indexed = 0
+    while True:
+        response = schema_table.scan(**scan_arguments)
+        for item in response["Items"]:
+            if not item.get(IS_LATEST_VERSION):
+                continue
+            keys = schema_catalog_keys(SchemaMetadata.parse_obj(item))
+            schema_table.update_item(
+                Key={"PK": item["PK"], "SK": item["SK"]},
+                UpdateExpression="set "
+                + ", ".join(f"{name} = :{name}" for name in keys),
+                ExpressionAttributeValues={
+                    f":{name}": value for name, value in keys.items()
+                },
+            )
+            indexed += 1
+        if not response.get("LastEvaluatedKey"):
+            break
+        scan_arguments["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    print(f"Added {indexed} schemas to the schema catalog index")
+
+
+if __name__ == "__main__":
+    dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
+    main(dynamodb.Table(SCHEMA_TABLE_NAME))
@@ -1,4 +1,4 @@
-from unittest.mock import Mock, patch, call
+from unittest.mock import Mock, call
 
 import pandas as pd
 import pytest
@@ -6,7 +6,13 @@ from awswrangler.exceptions import QueryFailed
 from botocore.exceptions import ClientError
 
 from api.adapter.athena_adapter import AthenaAdapter
-from api.common.custom_exceptions import UserError, AWSServiceError, QueryExecutionError
+from api.adapter.athena_admission_controller import AthenaAdmissionController
+from api.common.custom_exceptions import (
+    UserError,
+    AWSServiceError,
+    QueryExecutionError,
+    TooManyRequestsError,
+)
 from api.domain.dataset_metadata import DatasetMetadata
 from api.domain.sql_query import SQLQuery, SQLQueryOrderBy
 
@@ -78,6 +84,30 @@ class TestQuery:
             s3_output="out",
         )
 
+    def test_query_sql_in_chunks_reads_result_in_chunks(self):
+        chunks = iter([pd.DataFrame({"column1": [1]}), pd.DataFrame({"column1": [2]})])
+        self.mock_athena_read_sql_query.return_value = chunks
+
+        result = self.athena_adapter.query_sql_in_chunks(
+            "SELECT * FROM layer_my_table_1", chunk_size=1
+        )
+
+        assert result is chunks
+        self.mock_athena_read_sql_query.assert_called_once_with(
+            sql="SELECT * FROM layer_my_table_1",
+            database="my_database",
+            ctas_approach=False,
+            workgroup="ShareEz_athena_workgroup",
+            s3_output="out",
+            chunksize=1,
+        )
+
+    def test_query_sql_in_chunks_fails(self):
+        self.mock_athena_read_sql_query.side_effect = QueryFailed("Some error")
+
+        with pytest.raises(UserError, match="Query failed to execute: Some error"):
+            self.athena_adapter.query_sql_in_chunks("SELECT * FROM layer_my_table_1")
+
     def test_query_fails(self):
         self.mock_athena_read_sql_query.side_effect = QueryFailed("Some error")
 
@@ -140,11 +170,15 @@ class TestLargeQuery:
     def setup_method(self):
         self.mock_athena_read_sql_query = Mock()
         self.mock_athena_client = Mock()
+        self.mock_query_poller = Mock()
+        self.admission_controller = Mock()
         self.athena_adapter = AthenaAdapter(
             database="my_database",
             athena_read_sql_query=self.mock_athena_read_sql_query,
             s3_output="out",
             athena_client=self.mock_athena_client,
+            query_poller=self.mock_query_poller,
+            admission_controller=self.admission_controller,
         )
 
     def test_returns_query_execution_id(self):
@@ -164,6 +198,13 @@ class TestLargeQuery:
         )
 
         assert result == "111-222-333"
+        query_execution_id, on_finished = self.mock_query_poller.watch.call_args.args
+        assert query_execution_id == "111-222-333"
+        self.admission_controller.release.assert_not_called()
+        on_finished()
+        self.admission_controller.release.assert_called_once_with(
+            self.admission_controller.acquire.return_value
+        )
 
     def test_uses_the_query_provided(self):
         self.mock_athena_client.start_query_execution.return_value = {
@@ -228,94 +269,245 @@ class TestLargeQuery:
 
 class TestWaitForQueryToComplete:
     def setup_method(self):
-        self.mock_athena_read_sql_query = Mock()
+        self.mock_query_poller = Mock()
+        self.athena_adapter = AthenaAdapter(
+            database="my_database",
+            athena_read_sql_query=Mock(),
+            s3_output="out",
+            athena_client=Mock(),
+            query_poller=self.mock_query_poller,
+        )
+
+    def test_successful_when_query_succeeds(self):
+        self.mock_query_poller.wait.return_value = {
+            "QueryExecutionId": "the-execution-id",
+            "Status": {"State": "SUCCEEDED"},
+        }
+
+        self.athena_adapter.wait_for_query_to_complete("the-execution-id", timeout=60)
+
+        self.mock_query_poller.wait.assert_called_once_with("the-execution-id", 60)
+
+    def test_raises_error_when_query_times_out(self):
+        self.mock_query_poller.wait.return_value = None
+
+        with pytest.raises(AWSServiceError, match="Query took too long to execute"):
+            self.athena_adapter.wait_for_query_to_complete("the-execution-id")
+
+    def test_raises_error_when_query_execution_has_failed(self):
+        self.mock_query_poller.wait.return_value = {
+            "Status": {"State": "FAILED", "StateChangeReason": "Column not found"}
+        }
+
+        with pytest.raises(
+            QueryExecutionError, match="Query did not complete: Column not found"
+        ):
+            self.athena_adapter.wait_for_query_to_complete("the-execution-id")
+
+    def test_raises_error_when_query_execution_has_been_cancelled(self):
+        self.mock_query_poller.wait.return_value = {
+            "Status": {
+                "State": "CANCELLED",
+                "StateChangeReason": "Insufficient memory",
+            }
+        }
+
+        with pytest.raises(
+            QueryExecutionError, match="Query did not complete: Insufficient memory"
+        ):
+            self.athena_adapter.wait_for_query_to_complete("the-execution-id")
+
+
+class TestQueryResultsPage:
+    def setup_method(self):
         self.mock_athena_client = Mock()
         self.athena_adapter = AthenaAdapter(
             database="my_database",
-            athena_read_sql_query=self.mock_athena_read_sql_query,
+            athena_read_sql_query=Mock(),
             s3_output="out",
             athena_client=self.mock_athena_client,
+            query_poller=Mock(),
         )
 
-    @patch("api.adapter.athena_adapter.sleep")
-    def test_successful_when_query_succeeds_within_retires(self, _mock_sleep):
-        self.mock_athena_client.get_query_execution.side_effect = [
-            {"QueryExecution": {"Status": {"State": "QUEUED"}}},
-            {"QueryExecution": {"Status": {"State": "RUNNING"}}},
-            {"QueryExecution": {"Status": {"State": "SUCCEEDED"}}},
-        ]
+    def results_response(self, rows, next_token=None):
+        response = {
+            "ResultSet": {
+                "ResultSetMetadata": {
+                    "ColumnInfo": [{"Name": "column1"}, {"Name": "column2"}]
+                },
+                "Rows": [
+                    {"Data": [{"VarCharValue": value} for value in row]} for row in rows
+                ],
+            }
+        }
+        if next_token:
+            response["NextToken"] = next_token
+        return response
+
+    def test_first_page_skips_row_of_column_names(self):
+        self.mock_athena_client.get_query_results.return_value = self.results_response(
+            [["column1", "column2"], ["1", "a"], ["2", "b"]], next_token="token-1"
+        )
 
-        expected_calls = [
-            call(QueryExecutionId="the-execution-id"),
-            call(QueryExecutionId="the-execution-id"),
-            call(QueryExecutionId="the-execution-id"),
+        rows, next_token = self.athena_adapter.get_query_results_page(
+            "the-execution-id", 2
+        )
+
+        assert rows == [
+            {"column1": "1", "column2": "a"},
+            {"column1": "2", "column2": "b"},
         ]
+        assert next_token == "token-1"
+        self.mock_athena_client.get_query_results.assert_called_once_with(
+            QueryExecutionId="the-execution-id", MaxResults=3
+        )
 
-        self.athena_adapter.wait_for_query_to_complete("the-execution-id")
+    def test_first_page_size_is_limited_by_athena(self):
+        self.mock_athena_client.get_query_results.return_value = self.results_response(
+            [["column1", "column2"]]
+        )
 
-        self.mock_athena_client.get_query_execution.assert_has_calls(expected_calls)
+        self.athena_adapter.get_query_results_page("the-execution-id", 1000)
 
-    @patch("api.adapter.athena_adapter.sleep")
-    def test_successful_when_query_succeeds_within_retires_after_at_least_once_client_error(
-        self, _mock_sleep
-    ):
-        self.mock_athena_client.get_query_execution.side_effect = [
-            {"QueryExecution": {"Status": {"State": "RUNNING"}}},
-            ClientError(
-                error_response={
-                    "Error": {"Code": "ConnectionFailure"},
-                },
-                operation_name="GetQueryExecution",
-            ),
-            {"QueryExecution": {"Status": {"State": "SUCCEEDED"}}},
-        ]
+        self.mock_athena_client.get_query_results.assert_called_once_with(
+            QueryExecutionId="the-execution-id", MaxResults=1000
+        )
 
-        expected_calls = [
-            call(QueryExecutionId="the-execution-id"),
-            call(QueryExecutionId="the-execution-id"),
-            call(QueryExecutionId="the-execution-id"),
+    def test_full_first_page_is_topped_up_after_the_size_limit(self):
+        self.mock_athena_client.get_query_results.side_effect = [
+            self.results_response(
+                [["column1", "column2"]] + [[str(index), "a"] for index in range(999)],
+                next_token="token-1",
+            ),
+            self.results_response([["999", "b"]], next_token="token-2"),
         ]
 
-        self.athena_adapter.wait_for_query_to_complete("the-execution-id")
+        rows, next_token = self.athena_adapter.get_query_results_page(
+            "the-execution-id", 1000
+        )
 
-        self.mock_athena_client.get_query_execution.assert_has_calls(expected_calls)
+        assert len(rows) == 1000
+        assert rows[0] == {"column1": "0", "column2": "a"}
+        assert rows[-1] == {"column1": "999", "column2": "b"}
+        assert next_token == "token-2"
+        self.mock_athena_client.get_query_results.assert_has_calls(
+            [
+                call(QueryExecutionId="the-execution-id", MaxResults=1000),
+                call(
+                    QueryExecutionId="the-execution-id",
+                    MaxResults=1,
+                    NextToken="token-1",
+                ),
+            ]
+        )
 
-    @patch("api.adapter.athena_adapter.sleep")
-    def test_raises_error_when_retries_exhausted(self, _mock_sleep):
-        self.mock_athena_client.get_query_execution.return_value = {
-            "QueryExecution": {"Status": {"State": "RUNNING"}}
+    def test_next_page_is_read_from_token(self):
+        self.mock_athena_client.get_query_results.return_value = {
+            "ResultSet": {
+                "ResultSetMetadata": {
+                    "ColumnInfo": [{"Name": "column1"}, {"Name": "column2"}]
+                },
+                "Rows": [{"Data": [{"VarCharValue": "3"}, {}]}],
+            }
         }
 
-        with pytest.raises(AWSServiceError, match="Query took too long to execute"):
-            self.athena_adapter.wait_for_query_to_complete("the-execution-id")
+        rows, next_token = self.athena_adapter.get_query_results_page(
+            "the-execution-id", 2, "token-1"
+        )
+
+        assert rows == [{"column1": "3", "column2": None}]
+        assert next_token is None
+        self.mock_athena_client.get_query_results.assert_called_once_with(
+            QueryExecutionId="the-execution-id", MaxResults=2, NextToken="token-1"
+        )
 
-        assert self.mock_athena_client.get_query_execution.call_count == 8
+    def test_raises_user_error_for_invalid_token(self):
+        self.mock_athena_client.get_query_results.side_effect = ClientError(
+            error_response={
+                "Error": {"Code": "InvalidRequestException"},
+                "Message": "Invalid token",
+            },
+            operation_name="GetQueryResults",
+        )
 
-    @patch("api.adapter.athena_adapter.sleep")
-    def test_raises_error_when_query_execution_has_failed(self, _mock_sleep):
+        with pytest.raises(UserError, match="Failed to execute query: Invalid token"):
+            self.athena_adapter.get_query_results_page("the-execution-id", 2, "bad")
+
+    def test_get_query_execution(self):
         self.mock_athena_client.get_query_execution.return_value = {
-            "QueryExecution": {
-                "Status": {"State": "FAILED", "StateChangeReason": "Column not found"}
-            }
+            "QueryExecution": {"QueryExecutionId": "the-execution-id"}
         }
 
-        with pytest.raises(
-            QueryExecutionError, match="Query did not complete: Column not found"
-        ):
-            self.athena_adapter.wait_for_query_to_complete("the-execution-id")
+        result = self.athena_adapter.get_query_execution("the-execution-id")
 
-    @patch("api.adapter.athena_adapter.sleep")
-    def test_raises_error_when_query_execution_has_been_cancelled(self, _mock_sleep):
-        self.mock_athena_client.get_query_execution.return_value = {
-            "QueryExecution": {
-                "Status": {
-                    "State": "CANCELLED",
-                    "StateChangeReason": "Insufficient memory",
-                }
-            }
+        assert result == {"QueryExecutionId": "the-execution-id"}
+        self.mock_athena_client.get_query_execution.assert_called_once_with(
+            QueryExecutionId="the-execution-id"
+        )
+
+
+class TestQueryAdmission:
+    def setup_method(self):
+        self.mock_athena_read_sql_query = Mock()
+        self.mock_athena_client = Mock()
+        self.mock_query_poller = Mock()
+        self.admission_controller = AthenaAdmissionController(
+            max_concurrency=2, max_concurrency_per_subject=1, timeout=0
+        )
+        self.athena_adapter = AthenaAdapter(
+            database="my_database",
+            athena_read_sql_query=self.mock_athena_read_sql_query,
+            s3_output="out",
+            athena_client=self.mock_athena_client,
+            query_poller=self.mock_query_poller,
+            admission_controller=self.admission_controller,
+        )
+
+    def test_query_holds_admission_while_it_runs(self):
+        self.mock_athena_read_sql_query.side_effect = (
+            lambda **kwargs: self.admission_controller.metrics()
+        )
+
+        metrics = self.athena_adapter.query_sql("SELECT * FROM table", "subject-1")
+
+        assert metrics["running"] == 1
+        assert self.athena_adapter.admission_metrics()["running"] == 0
+
+    def test_query_is_rejected_when_subject_has_too_many_queries_running(self):
+        self.admission_controller.acquire("subject-1", interactive=True)
+
+        with pytest.raises(TooManyRequestsError):
+            self.athena_adapter.query_sql_in_chunks("SELECT * FROM table", "subject-1")
+
+        self.mock_athena_read_sql_query.assert_not_called()
+
+    def test_async_query_holds_admission_until_execution_has_finished(self):
+        self.mock_athena_client.start_query_execution.return_value = {
+            "QueryExecutionId": "the-execution-id"
         }
 
-        with pytest.raises(
-            QueryExecutionError, match="Query did not complete: Insufficient memory"
-        ):
-            self.athena_adapter.wait_for_query_to_complete("the-execution-id")
+        result = self.athena_adapter.query_sql_async("SELECT * FROM table", "subject-1")
+
+        assert result == "the-execution-id"
+        assert self.admission_controller.metrics()["running"] == 1
+        query_execution_id, on_finished = self.mock_query_poller.watch.call_args.args
+        assert query_execution_id == "the-execution-id"
+
+        on_finished()
+
+        assert self.admission_controller.metrics()["running"] == 0
+
+    def test_async_query_releases_admission_when_it_fails_to_start(self):
+        self.mock_athena_client.start_query_execution.side_effect = ClientError(
+            error_response={
+                "Error": {"Code": "InternalServerException"},
+                "Message": "Failed",
+            },
+            operation_name="StartQueryExecution",
+        )
+
+        with pytest.raises(AWSServiceError):
+            self.athena_adapter.query_sql_async("SELECT * FROM table", "subject-1")
+
+        assert self.admission_controller.metrics()["running"] == 0
+        self.mock_query_poller.watch.assert_not_called()
@@ -0,0 +1,188 @@
+import time
+from threading import Thread
+from typing import List
+
+import pytest
+
+from api.adapter.athena_admission_controller import AthenaAdmissionController
+from api.common.custom_exceptions import TooManyRequestsError
+
+
+class TestAthenaAdmissionController:
+    def setup_method(self):
+        self.controller = AthenaAdmissionController(
+            max_concurrency=3,
+            max_concurrency_per_subject=2,
+            interactive_reserved=1,
+            timeout=0,
+        )
+
+    def queue(self, controller, subject_id: str, interactive: bool, order: List[str]):
+        """Starts a thread waiting to run a query, returning once the query is queued"""
+        queued = controller.metrics()
+        thread = Thread(
+            target=lambda: self.run_query(controller, subject_id, interactive, order)
+        )
+        thread.start()
+        while controller.metrics() == queued:
+            time.sleep(0.001)
+        return thread
+
+    def run_query(self, controller, subject_id, interactive, order):
+        with controller.admit(subject_id, interactive):
+            order.append(subject_id)
+
+    def test_admits_queries_up_to_the_concurrency_limit(self):
+        for subject_id in ["subject-1", "subject-2", "subject-3"]:
+            self.controller.acquire(subject_id, interactive=True)
+
+        with pytest.raises(
+            TooManyRequestsError,
+            match="There are too many queries running, please try again later",
+        ):
+            self.controller.acquire("subject-4", interactive=True)
+
+    def test_limits_the_queries_of_each_subject(self):
+        self.controller.acquire("subject-1", interactive=True)
+        self.controller.acquire("subject-1", interactive=True)
+
+        with pytest.raises(TooManyRequestsError):
+            self.controller.acquire("subject-1", interactive=True)
+        self.controller.acquire("subject-2", interactive=True)
+
+    def test_does_not_limit_queries_without_a_subject_per_subject(self):
+        for _ in range(3):
+            self.controller.acquire(None, interactive=True)
+
+        assert self.controller.metrics()["running"] == 3
+
+    def test_reserves_slots_for_interactive_queries(self):
+        self.controller.acquire("subject-1", interactive=False)
+        self.controller.acquire("subject-2", interactive=False)
+
+        with pytest.raises(TooManyRequestsError):
+            self.controller.acquire("subject-3", interactive=False)
+        self.controller.acquire("subject-3", interactive=True)
+
+    def test_release_admits_waiting_query(self):
+        controller = AthenaAdmissionController(max_concurrency=1, timeout=5)
+        ticket = controller.acquire("subject-1", interactive=True)
+        order = []
+        waiting = self.queue(controller, "subject-2", True, order)
+
+        controller.release(ticket)
+        waiting.join(5)
+
+        assert order == ["subject-2"]
+        assert controller.metrics()["running"] == 0
+
+    def test_release_is_idempotent(self):
+        ticket = self.controller.acquire("subject-1", interactive=True)
+
+        self.controller.release(ticket)
+        self.controller.release(ticket)
+
+        assert self.controller.metrics()["running"] == 0
+
+    def test_admits_waiting_queries_fairly_across_subjects(self):
+        controller = AthenaAdmissionController(
+            max_concurrency=1, interactive_reserved=0, timeout=5
+        )
+        ticket = controller.acquire("subject-1", interactive=True)
+        order = []
+        waiting = [
+            self.queue(controller, subject_id, True, order)
+            for subject_id in ["subject-1", "subject-1", "subject-1", "subject-2"]
+        ]
+
+        controller.release(ticket)
+        for thread in waiting:
+            thread.join(5)
+
+        assert order == ["subject-2", "subject-1", "subject-1", "subject-1"]
+
+    def test_weights_share_of_subjects(self):
+        controller = AthenaAdmissionController(
+            max_concurrency=1,
+            interactive_reserved=0,
+            timeout=5,
+            subject_weights={"subject-1": 2},
+        )
+        ticket = controller.acquire("subject-3", interactive=True)
+        order = []
+        waiting = [
+            self.queue(controller, subject_id, True, order)
+            for subject_id in ["subject-1"] * 4 + ["subject-2"] * 2
+        ]
+
+        controller.release(ticket)
+        for thread in waiting:
+            thread.join(5)
+
+        assert order == [
+            "subject-1",
+            "subject-2",
+            "subject-1",
+            "subject-1",
+            "subject-2",
+            "subject-1",
+        ]
+
+    def test_admits_interactive_queries_before_background_queries(self):
+        controller = AthenaAdmissionController(
+            max_concurrency=1, interactive_reserved=0, timeout=5
+        )
+        ticket = controller.acquire("subject-1", interactive=True)
+        order = []
+        waiting = [
+            self.queue(controller, "background", False, order),
+            self.queue(controller, "interactive", True, order),
+        ]
+
+        controller.release(ticket)
+        for thread in waiting:
+            thread.join(5)
+
+        assert order == ["interactive", "background"]
+
+    def test_metrics(self):
+        self.controller.acquire("subject-1", interactive=True)
+        with pytest.raises(TooManyRequestsError):
+            self.controller.acquire("subject-2", interactive=False)
+            self.controller.acquire("subject-2", interactive=False)
+
+        metrics = self.controller.metrics()
+
+        assert metrics["running"] == 2
+        assert metrics["queued_interactive"] == 0
+        assert metrics["queued_background"] == 0
+        assert metrics["admitted"] == 2
+        assert metrics["rejected"] == 1
+
+    def test_divides_the_limits_between_replicas(self):
+        controller = AthenaAdmissionController(
+            max_concurrency=20,
+            max_concurrency_per_subject=5,
+            interactive_reserved=5,
+            timeout=0,
+            replicas=3,
+        )
+
+        assert controller.max_concurrency == 6
+        assert controller.max_concurrency_per_subject == 1
+        assert controller.interactive_reserved == 1
+        assert controller.metrics()["max_concurrency"] == 6
+
+    def test_each_replica_admits_at_least_one_query(self):
+        controller = AthenaAdmissionController(
+            max_concurrency=2,
+            max_concurrency_per_subject=1,
+            interactive_reserved=1,
+            timeout=0,
+            replicas=4,
+        )
+
+        controller.acquire("subject-1", interactive=False)
+
+        assert controller.max_concurrency == 1
+        assert controller.interactive_reserved == 0
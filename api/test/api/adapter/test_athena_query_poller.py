@@ -0,0 +1,228 @@
+from threading import Event, Thread
+from unittest.mock import Mock, call
+
+from botocore.exceptions import ClientError
+
+from api.adapter.athena_query_poller import AthenaQueryPoller
+
+
+def query_execution(query_execution_id: str, state: str, engine_millis: int = 0):
+    return {
+        "QueryExecutionId": query_execution_id,
+        "Status": {"State": state},
+        "Statistics": {"EngineExecutionTimeInMillis": engine_millis},
+    }
+
+
+class TestAthenaQueryPoller:
+    def setup_method(self):
+        self.athena_client = Mock()
+        self.now = 100.0
+        self.poller = AthenaQueryPoller(
+            self.athena_client,
+            min_interval=0.25,
+            max_interval=15,
+            backoff_factor=0.2,
+            batch_size=2,
+            max_lifetime=3600,
+            clock=lambda: self.now,
+        )
+
+    def test_next_interval_backs_off_within_limits(self):
+        assert self.poller.next_interval(0) == 0.25
+        assert self.poller.next_interval(10) == 2
+        assert self.poller.next_interval(3600) == 15
+
+    def test_polls_outstanding_executions_in_batches(self):
+        executions = [self.poller._register(f"id-{index}") for index in range(3)]
+        self.athena_client.batch_get_query_execution.side_effect = [
+            {
+                "QueryExecutions": [
+                    query_execution("id-0", "SUCCEEDED"),
+                    query_execution("id-1", "RUNNING"),
+                ]
+            },
+            {"QueryExecutions": [query_execution("id-2", "FAILED")]},
+        ]
+
+        self.poller.poll()
+
+        self.athena_client.batch_get_query_execution.assert_has_calls(
+            [
+                call(QueryExecutionIds=["id-0", "id-1"]),
+                call(QueryExecutionIds=["id-2"]),
+            ]
+        )
+        assert executions[0].finished.is_set()
+        assert executions[0].result == query_execution("id-0", "SUCCEEDED")
+        assert not executions[1].finished.is_set()
+        assert executions[2].result == query_execution("id-2", "FAILED")
+        assert list(self.poller._pending) == ["id-1"]
+
+    def test_only_polls_executions_that_are_due(self):
+        self.poller._register("id-0")
+        self.athena_client.batch_get_query_execution.return_value = {
+            "QueryExecutions": [query_execution("id-0", "RUNNING")]
+        }
+        self.poller.poll()
+        self.now += 0.1
+
+        self.poller.poll()
+
+        assert self.athena_client.batch_get_query_execution.call_count == 1
+
+    def test_backs_off_from_engine_execution_time(self):
+        execution = self.poller._register("id-0")
+        self.athena_client.batch_get_query_execution.return_value = {
+            "QueryExecutions": [
+                query_execution("id-0", "RUNNING", engine_millis=50_000)
+            ]
+        }
+
+        self.poller.poll()
+
+        assert execution.next_poll == self.now + 10
+
+    def test_polls_again_when_request_fails(self):
+        execution = self.poller._register("id-0")
+        self.athena_client.batch_get_query_execution.side_effect = ClientError(
+            error_response={"Error": {"Code": "ThrottlingException"}},
+            operation_name="BatchGetQueryExecution",
+        )
+
+        self.poller.poll()
+
+        assert not execution.finished.is_set()
+        assert execution.next_poll == self.now + 0.25
+
+    def test_wait_returns_finished_execution(self):
+        poller = AthenaQueryPoller(self.athena_client, min_interval=0.01)
+        self.athena_client.batch_get_query_execution.side_effect = [
+            {"QueryExecutions": [query_execution("id-0", "QUEUED")]},
+            {"QueryExecutions": [query_execution("id-0", "SUCCEEDED")]},
+        ]
+
+        result = poller.wait("id-0", timeout=5)
+
+        assert result == query_execution("id-0", "SUCCEEDED")
+        assert self.athena_client.batch_get_query_execution.call_count == 2
+
+    def test_waits_for_several_executions_with_one_thread(self):
+        poller = AthenaQueryPoller(self.athena_client, min_interval=0.01)
+        self.athena_client.batch_get_query_execution.side_effect = (
+            lambda QueryExecutionIds: {
+                "QueryExecutions": [
+                    query_execution(query_execution_id, "SUCCEEDED")
+                    for query_execution_id in QueryExecutionIds
+                ]
+            }
+        )
+        results = {}
+        waiters = [
+            Thread(
+                target=lambda query_execution_id=query_execution_id: results.update(
+                    {query_execution_id: poller.wait(query_execution_id, timeout=5)}
+                )
+            )
+            for query_execution_id in ["id-0", "id-1", "id-2"]
+        ]
+
+        for waiter in waiters:
+            waiter.start()
+        for waiter in waiters:
+            waiter.join(5)
+
+        assert {
+            query_execution_id: result["Status"]["State"]
+            for query_execution_id, result in results.items()
+        } == {"id-0": "SUCCEEDED", "id-1": "SUCCEEDED", "id-2": "SUCCEEDED"}
+
+    def test_wait_returns_none_when_execution_does_not_finish_in_time(self):
+        poller = AthenaQueryPoller(self.athena_client, min_interval=0.01)
+        self.athena_client.batch_get_query_execution.return_value = {
+            "QueryExecutions": [query_execution("id-0", "RUNNING")]
+        }
+
+        assert poller.wait("id-0", timeout=0.05) is None
+        assert poller._pending == {}
+
+    def test_watch_calls_back_once_execution_has_finished(self):
+        poller = AthenaQueryPoller(self.athena_client, min_interval=0.01)
+        self.athena_client.batch_get_query_execution.side_effect = [
+            {"QueryExecutions": [query_execution("id-0", "RUNNING")]},
+            {"QueryExecutions": [query_execution("id-0", "SUCCEEDED")]},
+        ]
+        finished = Event()
+
+        poller.watch("id-0", finished.set)
+
+        assert finished.wait(5)
+        assert poller._pending == {}
+
+    def test_watched_execution_is_polled_after_wait_times_out(self):
+        execution = self.poller._register("id-0")
+        execution.callbacks.append(Mock())
+        self.poller._start = Mock()
+        self.athena_client.batch_get_query_execution.return_value = {
+            "QueryExecutions": [query_execution("id-0", "RUNNING")]
+        }
+
+        assert self.poller.wait("id-0", timeout=0) is None
+
+        assert list(self.poller._pending) == ["id-0"]
+
+    def test_callback_errors_are_not_raised(self):
+        execution = self.poller._register("id-0")
+        execution.callbacks.append(Mock(side_effect=ValueError("Failed")))
+        self.athena_client.batch_get_query_execution.return_value = {
+            "QueryExecutions": [query_execution("id-0", "SUCCEEDED")]
+        }
+
+        self.poller.poll()
+
+        assert execution.finished.is_set()
+
+    def test_unprocessed_executions_are_finished_as_failed(self):
+        execution = self.poller._register("id-0")
+        callback = Mock()
+        execution.callbacks.append(callback)
+        self.athena_client.batch_get_query_execution.return_value = {
+            "QueryExecutions": [],
+            "UnprocessedQueryExecutionIds": [
+                {
+                    "QueryExecutionId": "id-0",
+                    "ErrorCode": "InvalidRequestException",
+                    "ErrorMessage": "Query has expired",
+                }
+            ],
+        }
+
+        self.poller.poll()
+
+        assert execution.result == {
+            "QueryExecutionId": "id-0",
+            "Status": {"State": "FAILED", "StateChangeReason": "Query has expired"},
+        }
+        callback.assert_called_once()
+        assert self.poller._pending == {}
+
+    def test_stops_watching_executions_after_their_max_lifetime(self):
+        execution = self.poller._register("id-0")
+        callback = Mock()
+        execution.callbacks.append(callback)
+        self.athena_client.batch_get_query_execution.side_effect = ClientError(
+            error_response={"Error": {"Code": "ThrottlingException"}},
+            operation_name="BatchGetQueryExecution",
+        )
+
+        self.now += 3590
+        self.poller.poll()
+        callback.assert_not_called()
+
+        self.now += 15
+        self.poller.poll()
+
+        assert execution.finished.is_set()
+        assert execution.result is None
+        callback.assert_called_once()
+        assert self.poller._pending == {}
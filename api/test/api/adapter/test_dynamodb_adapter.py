@@ -1,15 +1,19 @@
+from decimal import Decimal
 from unittest.mock import Mock, call, patch
 
 import pytest
-from boto3.dynamodb.conditions import Key, Attr, Or
+from boto3.dynamodb.conditions import Key, Attr
 from botocore.exceptions import ClientError
 
 from api.adapter.dynamodb_adapter import DynamoDBAdapter, ExpressionAttribute
+from api.adapter.permissions_cache import PermissionsCache
 from api.common.config.auth import SubjectType
 from api.common.custom_exceptions import (
     AWSServiceError,
     UserError,
 )
+from api.domain.Jobs.CompactionJob import CompactionJob, CompactionStep
+from api.domain.Jobs.DeletionJob import DeletionJob
 from api.domain.Jobs.Job import JobStatus
 from api.domain.Jobs.QueryJob import QueryJob, QueryStep
 from api.domain.Jobs.UploadJob import UploadJob, UploadStep
@@ -95,7 +99,12 @@ class TestDynamoDBAdapterPermissionsTable:
             self.schema_table,
         ]
 
-        self.dynamo_adapter = DynamoDBAdapter(self.dynamo_data_source)
+        self.permissions_table.name = "PERMISSIONS TABLE"
+
+        self.permissions_cache = PermissionsCache(ttl=60)
+        self.dynamo_adapter = DynamoDBAdapter(
+            self.dynamo_data_source, self.permissions_cache
+        )
 
     def test_store_subject_permissions(self):
         client_id = "123456789"
@@ -238,9 +247,9 @@ class TestDynamoDBAdapterPermissionsTable:
     def test_validate_permission_throws_error_when_query_fails(self):
         permissions = ["READ_ALL", "WRITE_ALL", "READ_PRIVATE", "USER_ADMIN"]
 
-        self.permissions_table.query.side_effect = ClientError(
+        self.dynamo_data_source.batch_get_item.side_effect = ClientError(
             error_response={"Error": {"Code": "ConditionalCheckFailedException"}},
-            operation_name="Query",
+            operation_name="BatchGetItem",
         )
 
         with pytest.raises(
@@ -264,24 +273,26 @@ class TestDynamoDBAdapterPermissionsTable:
 
     def test_validates_permissions_exist_in_the_database(self):
         test_user_permissions = ["READ_PRIVATE", "WRITE_ALL"]
-        self.permissions_table.query.return_value = {
-            "Items": [
-                {
-                    "PK": "PERMISSION",
-                    "SK": "WRITE_ALL",
-                    "Id": "WRITE_ALL",
-                    "Sensitivity": "ALL",
-                    "Type": "WRITE",
-                },
-                {
-                    "PK": "PERMISSION",
-                    "SK": "READ_PRIVATE",
-                    "Id": "READ_PRIVATE",
-                    "Sensitivity": "PRIVATE",
-                    "Type": "READ",
-                },
-            ],
-            "Count": 2,
+        self.dynamo_data_source.batch_get_item.return_value = {
+            "Responses": {
+                "PERMISSIONS TABLE": [
+                    {
+                        "PK": "PERMISSION",
+                        "SK": "WRITE_ALL",
+                        "Id": "WRITE_ALL",
+                        "Sensitivity": "ALL",
+                        "Type": "WRITE",
+                    },
+                    {
+                        "PK": "PERMISSION",
+                        "SK": "READ_PRIVATE",
+                        "Id": "READ_PRIVATE",
+                        "Sensitivity": "PRIVATE",
+                        "Type": "READ",
+                    },
+                ]
+            },
+            "UnprocessedKeys": {},
         }
 
         try:
@@ -289,29 +300,35 @@ class TestDynamoDBAdapterPermissionsTable:
         except UserError:
             pytest.fail("Unexpected UserError was thrown")
 
-        self.permissions_table.query.assert_called_once_with(
-            KeyConditionExpression=Key("PK").eq("PERMISSION"),
-            FilterExpression=Or(
-                *[(Attr("Id").eq(value)) for value in test_user_permissions]
-            ),
+        self.dynamo_data_source.batch_get_item.assert_called_once_with(
+            RequestItems={
+                "PERMISSIONS TABLE": {
+                    "Keys": [
+                        {"PK": "PERMISSION", "SK": "READ_PRIVATE"},
+                        {"PK": "PERMISSION", "SK": "WRITE_ALL"},
+                    ]
+                }
+            }
         )
+        self.permissions_table.query.assert_not_called()
 
         self.service_table.assert_not_called()
 
     def test_raises_error_when_attempting_to_validate_at_least_one_invalid_permission(
         self,
     ):
-        self.permissions_table.query.return_value = {
-            "Items": [
-                {
-                    "PK": "PERMISSION",
-                    "SK": "WRITE_ALL",
-                    "Id": "WRITE_ALL",
-                    "Sensitivity": "ALL",
-                    "Type": "WRITE",
-                }
-            ],
-            "Count": 1,
+        self.dynamo_data_source.batch_get_item.return_value = {
+            "Responses": {
+                "PERMISSIONS TABLE": [
+                    {
+                        "PK": "PERMISSION",
+                        "SK": "WRITE_ALL",
+                        "Id": "WRITE_ALL",
+                        "Sensitivity": "ALL",
+                        "Type": "WRITE",
+                    }
+                ]
+            }
         }
 
         invalid_permissions = ["READ_SENSITIVE", "ACCESS_ALL", "ADMIN", "FAKE_ADMIN"]
@@ -375,22 +392,19 @@ class TestDynamoDBAdapterPermissionsTable:
 
     def test_get_permission_keys_for_subject(self):
         subject_id = "test-subject-id"
-        self.permissions_table.query.return_value = {
-            "Items": [
-                {
-                    "PK": "SUBJECT",
-                    "SK": subject_id,
-                    "Id": subject_id,
-                    "Type": "CLIENT",
-                    "Permissions": {
-                        "DATA_ADMIN",
-                        "READ_ALL",
-                        "USER_ADMIN",
-                        "WRITE_ALL",
-                    },
-                }
-            ],
-            "Count": 1,
+        self.permissions_table.get_item.return_value = {
+            "Item": {
+                "PK": "SUBJECT",
+                "SK": subject_id,
+                "Id": subject_id,
+                "Type": "CLIENT",
+                "Permissions": {
+                    "DATA_ADMIN",
+                    "READ_ALL",
+                    "USER_ADMIN",
+                    "WRITE_ALL",
+                },
+            }
         }
 
         expected_permissions = ["DATA_ADMIN", "READ_ALL", "USER_ADMIN", "WRITE_ALL"]
@@ -399,19 +413,16 @@ class TestDynamoDBAdapterPermissionsTable:
 
         assert sorted(response) == sorted(expected_permissions)
 
-        self.permissions_table.query.assert_called_once_with(
-            KeyConditionExpression=Key("PK").eq("SUBJECT"),
-            FilterExpression=Attr("Id").eq(subject_id),
+        self.permissions_table.get_item.assert_called_once_with(
+            Key={"PK": "SUBJECT", "SK": subject_id}
         )
+        self.permissions_table.query.assert_not_called()
 
         self.service_table.assert_not_called()
 
     def test_get_permissions_for_non_existent_subject(self):
         subject_id = "fake-subject-id"
-        self.permissions_table.query.return_value = {
-            "Items": [],
-            "Count": 0,
-        }
+        self.permissions_table.get_item.return_value = {}
 
         with pytest.raises(
             UserError,
@@ -423,16 +434,13 @@ class TestDynamoDBAdapterPermissionsTable:
 
     def test_get_permissions_for_subject_with_no_permissions(self):
         subject_id = "test-subject-id"
-        self.permissions_table.query.return_value = {
-            "Items": [
-                {
-                    "PK": "SUBJECT",
-                    "SK": subject_id,
-                    "Id": subject_id,
-                    "Type": "CLIENT",
-                }
-            ],
-            "Count": 1,
+        self.permissions_table.get_item.return_value = {
+            "Item": {
+                "PK": "SUBJECT",
+                "SK": subject_id,
+                "Id": subject_id,
+                "Type": "CLIENT",
+            }
         }
 
         response = self.dynamo_adapter.get_permission_keys_for_subject(subject_id)
@@ -442,17 +450,14 @@ class TestDynamoDBAdapterPermissionsTable:
 
     def test_get_permissions_for_subject_with_blank_permission(self):
         subject_id = "test-subject-id"
-        self.permissions_table.query.return_value = {
-            "Items": [
-                {
-                    "PK": "SUBJECT",
-                    "SK": subject_id,
-                    "Id": subject_id,
-                    "Type": "CLIENT",
-                    "Permissions": {""},
-                }
-            ],
-            "Count": 1,
+        self.permissions_table.get_item.return_value = {
+            "Item": {
+                "PK": "SUBJECT",
+                "SK": subject_id,
+                "Id": subject_id,
+                "Type": "CLIENT",
+                "Permissions": {""},
+            }
         }
 
         response = self.dynamo_adapter.get_permission_keys_for_subject(subject_id)
@@ -462,9 +467,9 @@ class TestDynamoDBAdapterPermissionsTable:
 
     def test_get_permissions_for_subject_throws_aws_service_error(self):
         subject_id = "test-subject-id"
-        self.permissions_table.query.side_effect = ClientError(
+        self.permissions_table.get_item.side_effect = ClientError(
             error_response={"Error": {"Code": "ConditionalCheckFailedException"}},
-            operation_name="Query",
+            operation_name="GetItem",
         )
 
         with pytest.raises(
@@ -594,6 +599,128 @@ class TestDynamoDBAdapterPermissionsTable:
 
         self.service_table.assert_not_called()
 
+    def test_get_permissions_for_subject_resolves_permissions_once(self):
+        self.permissions_table.get_item.return_value = {
+            "Item": {
+                "PK": "SUBJECT",
+                "SK": "some_id",
+                "Id": "some_id",
+                "Permissions": {"USER_ADMIN", "READ_ALL"},
+            }
+        }
+        self.dynamo_data_source.batch_get_item.return_value = {
+            "Responses": {
+                "PERMISSIONS TABLE": [
+                    self.expected_db_query_response["Items"][0],
+                    self.expected_db_query_response["Items"][1],
+                ]
+            }
+        }
+
+        first_response = self.dynamo_adapter.get_permissions_for_subject("some_id")
+        second_response = self.dynamo_adapter.get_permissions_for_subject("some_id")
+
+        expected_permissions = [
+            PermissionItem(id="READ_ALL", type="READ", sensitivity="ALL"),
+            PermissionItem(id="USER_ADMIN", type="USER_ADMIN"),
+        ]
+        assert first_response == expected_permissions
+        assert second_response == expected_permissions
+        self.permissions_table.get_item.assert_called_once()
+        self.dynamo_data_source.batch_get_item.assert_called_once()
+        assert self.dynamo_adapter.permissions_cache_metrics()["hits"] == 1
+
+    def test_update_subject_permissions_invalidates_cached_permissions(self):
+        self.permissions_cache.get_subject_permissions("some_id", lambda: [])
+        self.permissions_cache.get_subject_permissions("other_id", lambda: [])
+
+        self.dynamo_adapter.update_subject_permissions(
+            SubjectPermissions(subject_id="some_id", permissions=["READ_ALL"])
+        )
+
+        assert self.permissions_cache.metrics()["entries"] == 1
+        assert self.permissions_cache.metrics()["invalidations"] == 1
+
+    def test_delete_permission_invalidates_every_cached_subject(self):
+        self.permissions_cache.get_subject_permissions("some_id", lambda: [])
+        self.permissions_cache.get_subject_permissions("other_id", lambda: [])
+
+        self.dynamo_adapter.delete_permission("READ_PROTECTED_DOMAIN")
+
+        assert self.permissions_cache.metrics()["entries"] == 0
+
+    @patch("api.adapter.dynamodb_adapter.DYNAMO_BATCH_GET_SIZE", 2)
+    def test_batch_get_items_reads_keys_in_chunks(self):
+        keys = [{"PK": "PERMISSION", "SK": f"P{index}"} for index in range(5)]
+        self.dynamo_data_source.batch_get_item.side_effect = lambda RequestItems: {
+            "Responses": {
+                "PERMISSIONS TABLE": RequestItems["PERMISSIONS TABLE"]["Keys"]
+            }
+        }
+
+        result = self.dynamo_adapter.batch_get_items(self.permissions_table, keys)
+
+        assert result == keys
+        assert self.dynamo_data_source.batch_get_item.call_args_list == [
+            call(RequestItems={"PERMISSIONS TABLE": {"Keys": keys[0:2]}}),
+            call(RequestItems={"PERMISSIONS TABLE": {"Keys": keys[2:4]}}),
+            call(RequestItems={"PERMISSIONS TABLE": {"Keys": keys[4:5]}}),
+        ]
+
+    @patch("api.adapter.dynamodb_adapter.time")
+    def test_batch_get_items_retries_unprocessed_keys(self, mock_time):
+        keys = [{"PK": "PERMISSION", "SK": "P1"}, {"PK": "PERMISSION", "SK": "P2"}]
+        self.dynamo_data_source.batch_get_item.side_effect = [
+            {
+                "Responses": {"PERMISSIONS TABLE": [keys[0]]},
+                "UnprocessedKeys": {"PERMISSIONS TABLE": {"Keys": [keys[1]]}},
+            },
+            {"Responses": {"PERMISSIONS TABLE": [keys[1]]}, "UnprocessedKeys": {}},
+        ]
+
+        result = self.dynamo_adapter.batch_get_items(self.permissions_table, keys)
+
+        assert result == keys
+        self.dynamo_data_source.batch_get_item.assert_called_with(
+            RequestItems={"PERMISSIONS TABLE": {"Keys": [keys[1]]}}
+        )
+        mock_time.sleep.assert_called_once_with(0.05)
+
+    @patch("api.adapter.dynamodb_adapter.time")
+    def test_batch_get_items_fails_when_keys_stay_unprocessed(self, mock_time):
+        keys = [{"PK": "PERMISSION", "SK": "P1"}]
+        self.dynamo_data_source.batch_get_item.return_value = {
+            "UnprocessedKeys": {"PERMISSIONS TABLE": {"Keys": keys}}
+        }
+
+        with pytest.raises(
+            AWSServiceError,
+            match="Error fetching items from the database, please try again later",
+        ):
+            self.dynamo_adapter.batch_get_items(self.permissions_table, keys)
+
+        assert self.dynamo_data_source.batch_get_item.call_count == 5
+        assert mock_time.sleep.call_count == 4
+
+    def test_validate_permissions_rejects_duplicated_permissions(self):
+        self.dynamo_data_source.batch_get_item.return_value = {
+            "Responses": {
+                "PERMISSIONS TABLE": [self.expected_db_query_response["Items"][1]]
+            }
+        }
+
+        with pytest.raises(
+            UserError,
+            match="One or more of the provided permissions is invalid or duplicated",
+        ):
+            self.dynamo_adapter.validate_permissions(["READ_ALL", "READ_ALL"])
+
+        self.dynamo_data_source.batch_get_item.assert_called_once_with(
+            RequestItems={
+                "PERMISSIONS TABLE": {"Keys": [{"PK": "PERMISSION", "SK": "READ_ALL"}]}
+            }
+        )
+
     def test_delete_subject(self):
         self.dynamo_adapter.delete_subject("some_id")
         self.permissions_table.delete_item.assert_called_once_with(
@@ -694,6 +821,98 @@ class TestDynamoDBAdapterServiceTable:
 
         self.permissions_table.assert_not_called()
 
+    @patch("api.domain.Jobs.Job.uuid")
+    @patch("api.domain.Jobs.DeletionJob.time")
+    def test_store_deletion_job(self, mock_time, mock_uuid):
+        mock_time.time.return_value = 1000
+        mock_uuid.uuid4.return_value = "abc-123"
+
+        self.dynamo_adapter.store_deletion_job(
+            DeletionJob("subject-123", DatasetMetadata("layer", "domain1", "dataset1"))
+        )
+
+        self.service_table.put_item.assert_called_once_with(
+            Item={
+                "PK": "JOB",
+                "SK": "abc-123",
+                "SK2": "subject-123",
+                "Type": "DELETION",
+                "Status": "IN PROGRESS",
+                "Step": "INITIALISATION",
+                "Errors": None,
+                "Layer": "layer",
+                "Domain": "domain1",
+                "Dataset": "dataset1",
+                "TTL": 605800,
+            },
+        )
+
+    @patch("api.domain.Jobs.Job.uuid")
+    @patch("api.domain.Jobs.CompactionJob.time")
+    def test_store_compaction_job(self, mock_time, mock_uuid):
+        mock_time.time.return_value = 1000
+        mock_uuid.uuid4.return_value = "abc-123"
+
+        self.dynamo_adapter.store_compaction_job(
+            CompactionJob(
+                "subject-123", DatasetMetadata("layer", "domain1", "dataset1", 2)
+            )
+        )
+
+        self.service_table.put_item.assert_called_once_with(
+            Item={
+                "PK": "JOB",
+                "SK": "abc-123",
+                "SK2": "subject-123",
+                "Type": "COMPACTION",
+                "Status": "IN PROGRESS",
+                "Step": "INITIALISATION",
+                "Errors": None,
+                "Layer": "layer",
+                "Domain": "domain1",
+                "Dataset": "dataset1",
+                "Version": 2,
+                "FilesCompacted": 0,
+                "FilesWritten": 0,
+                "TTL": 605800,
+            },
+        )
+
+    @patch("api.domain.Jobs.Job.uuid")
+    def test_update_compaction_job(self, mock_uuid):
+        mock_uuid.uuid4.return_value = "abc-123"
+        job = CompactionJob(
+            "subject-123", DatasetMetadata("layer", "domain1", "dataset1", 2)
+        )
+        job.set_step(CompactionStep.COMPACTING)
+        job.record_progress(20, 2)
+
+        self.dynamo_adapter.update_compaction_job(job)
+
+        self.service_table.update_item.assert_called_once_with(
+            Key={
+                "PK": "JOB",
+                "SK": "abc-123",
+            },
+            ConditionExpression="SK = :jid",
+            UpdateExpression="set #A = :a, #B = :b, #C = :c, #D = :d, #E = :e",
+            ExpressionAttributeNames={
+                "#A": "Step",
+                "#B": "Status",
+                "#C": "Errors",
+                "#D": "FilesCompacted",
+                "#E": "FilesWritten",
+            },
+            ExpressionAttributeValues={
+                ":a": "COMPACTING",
+                ":b": "IN PROGRESS",
+                ":c": None,
+                ":d": 20,
+                ":e": 2,
+                ":jid": "abc-123",
+            },
+        )
+
     @patch("api.adapter.dynamodb_adapter.time")
     def test_get_jobs(self, mock_time):
         mock_time.time.return_value = 19821
@@ -770,19 +989,16 @@ class TestDynamoDBAdapterServiceTable:
         )
 
     def test_get_job(self):
-        self.service_table.query.return_value = {
-            "Items": [
-                {
-                    "Step": "VALIDATION",
-                    "SK": "113e0baf-5302-4b79-9902-ad620e8e531b",
-                    "Status": "IN PROGRESS",
-                    "Type": "UPLOAD",
-                    "Filename": "file1.csv",
-                    "Errors": None,
-                    "PK": "JOB",
-                }
-            ],
-            "Count": 1,
+        self.service_table.get_item.return_value = {
+            "Item": {
+                "Step": "VALIDATION",
+                "SK": "113e0baf-5302-4b79-9902-ad620e8e531b",
+                "Status": "IN PROGRESS",
+                "Type": "UPLOAD",
+                "Filename": "file1.csv",
+                "Errors": None,
+                "PK": "JOB",
+            }
         }
 
         expected = {
@@ -797,18 +1013,15 @@ class TestDynamoDBAdapterServiceTable:
         result = self.dynamo_adapter.get_job("113e0baf-5302-4b79-9902-ad620e8e531b")
 
         assert result == expected
-        self.service_table.query.assert_called_once_with(
-            KeyConditionExpression=Key("PK").eq("JOB")
-            & Key("SK").eq("113e0baf-5302-4b79-9902-ad620e8e531b")
+        self.service_table.get_item.assert_called_once_with(
+            Key={"PK": "JOB", "SK": "113e0baf-5302-4b79-9902-ad620e8e531b"}
         )
+        self.service_table.query.assert_not_called()
 
         self.permissions_table.assert_not_called()
 
     def test_get_job_fails_if_no_job_found(self):
-        self.service_table.query.return_value = {
-            "Items": [],
-            "Count": 0,
-        }
+        self.service_table.get_item.return_value = {}
 
         with pytest.raises(
             UserError,
@@ -819,9 +1032,9 @@ class TestDynamoDBAdapterServiceTable:
         self.permissions_table.assert_not_called()
 
     def test_get_job_fails_if_aws_fails(self):
-        self.service_table.query.side_effect = ClientError(
+        self.service_table.get_item.side_effect = ClientError(
             error_response={"Error": {"Code": "DatabaseConnectionError"}},
-            operation_name="Query",
+            operation_name="GetItem",
         )
 
         with pytest.raises(
@@ -981,6 +1194,281 @@ class TestDynamoDBAdapterServiceTable:
         ):
             self.dynamo_adapter.update_query_job(job)
 
+    def test_get_dataset_statistics(self):
+        self.service_table.get_item.return_value = {"Item": {"SizeBytes": 100}}
+
+        result = self.dynamo_adapter.get_dataset_statistics(
+            DatasetMetadata("layer", "domain", "dataset", 2)
+        )
+
+        assert result == {"SizeBytes": 100}
+        self.service_table.get_item.assert_called_once_with(
+            Key={"PK": "DATASET_STATISTICS", "SK": "layer/domain/dataset/2"}
+        )
+
+    def test_get_dataset_statistics_when_not_recorded(self):
+        self.service_table.get_item.return_value = {}
+
+        assert (
+            self.dynamo_adapter.get_dataset_statistics(
+                DatasetMetadata("layer", "domain", "dataset", 2)
+            )
+            is None
+        )
+
+    def test_update_dataset_size(self):
+        self.dynamo_adapter.update_dataset_size(
+            DatasetMetadata("layer", "domain", "dataset", 2),
+            100,
+            3,
+            "2022-03-01 11:03:49+00:00",
+        )
+
+        self.service_table.update_item.assert_called_once_with(
+            Key={"PK": "DATASET_STATISTICS", "SK": "layer/domain/dataset/2"},
+            UpdateExpression="set #A = :a, #B = :b, #C = :c",
+            ExpressionAttributeNames={
+                "#A": "SizeBytes",
+                "#B": "ObjectCount",
+                "#C": "LastUpdated",
+            },
+            ExpressionAttributeValues={
+                ":a": 100,
+                ":b": 3,
+                ":c": "2022-03-01 11:03:49+00:00",
+            },
+        )
+
+    def test_add_dataset_size(self):
+        result = self.dynamo_adapter.add_dataset_size(
+            DatasetMetadata("layer", "domain", "dataset", 2),
+            -100,
+            -1,
+            "2022-03-01 11:03:49+00:00",
+        )
+
+        assert result is True
+        self.service_table.update_item.assert_called_once_with(
+            Key={"PK": "DATASET_STATISTICS", "SK": "layer/domain/dataset/2"},
+            ConditionExpression="attribute_exists(#A)",
+            UpdateExpression="add #A :a, #B :b set #C = :c",
+            ExpressionAttributeNames={
+                "#A": "SizeBytes",
+                "#B": "ObjectCount",
+                "#C": "LastUpdated",
+            },
+            ExpressionAttributeValues={
+                ":a": -100,
+                ":b": -1,
+                ":c": "2022-03-01 11:03:49+00:00",
+            },
+        )
+
+    def test_add_dataset_size_keeps_the_last_updated_time(self):
+        self.dynamo_adapter.add_dataset_size(
+            DatasetMetadata("layer", "domain", "dataset", 2), -100, -1, None
+        )
+
+        update_arguments = self.service_table.update_item.call_args.kwargs
+        assert update_arguments["UpdateExpression"] == "add #A :a, #B :b"
+        assert update_arguments["ExpressionAttributeValues"] == {":a": -100, ":b": -1}
+
+    def test_add_dataset_size_when_no_size_has_been_recorded(self):
+        self.service_table.update_item.side_effect = ClientError(
+            error_response={"Error": {"Code": "ConditionalCheckFailedException"}},
+            operation_name="UpdateItem",
+        )
+
+        assert (
+            self.dynamo_adapter.add_dataset_size(
+                DatasetMetadata("layer", "domain", "dataset", 2), 100, 1, None
+            )
+            is False
+        )
+
+    def test_store_dataset_upload_rows_adds_rows_of_upload(self):
+        self.dynamo_adapter.store_dataset_upload_rows(
+            DatasetMetadata("layer", "domain", "dataset", 2), "abc-123", 10, False
+        )
+
+        key = {"PK": "DATASET_STATISTICS", "SK": "layer/domain/dataset/2"}
+        self.service_table.update_item.assert_has_calls(
+            [
+                call(
+                    Key=key,
+                    UpdateExpression="set #U = if_not_exists(#U, :empty)",
+                    ExpressionAttributeNames={"#U": "UploadRows"},
+                    ExpressionAttributeValues={":empty": {}},
+                ),
+                call(
+                    Key=key,
+                    UpdateExpression="set #U.#F = :rows",
+                    ExpressionAttributeNames={"#U": "UploadRows", "#F": "abc-123"},
+                    ExpressionAttributeValues={":rows": 10},
+                ),
+            ]
+        )
+
+    def test_store_dataset_upload_rows_replaces_rows_when_overwriting(self):
+        self.dynamo_adapter.store_dataset_upload_rows(
+            DatasetMetadata("layer", "domain", "dataset", 2), "abc-123", 10, True
+        )
+
+        self.service_table.update_item.assert_called_once_with(
+            Key={"PK": "DATASET_STATISTICS", "SK": "layer/domain/dataset/2"},
+            UpdateExpression="set #U = :u, #R = :r",
+            ExpressionAttributeNames={"#U": "UploadRows", "#R": "RowsComplete"},
+            ExpressionAttributeValues={":u": {"abc-123": 10}, ":r": True},
+        )
+
+    def test_delete_dataset_upload_rows_ignores_datasets_without_row_counts(self):
+        self.service_table.update_item.side_effect = ClientError(
+            error_response={"Error": {"Code": "ConditionalCheckFailedException"}},
+            operation_name="UpdateItem",
+        )
+
+        self.dynamo_adapter.delete_dataset_upload_rows(
+            DatasetMetadata("layer", "domain", "dataset", 2), "abc-123"
+        )
+
+        self.service_table.update_item.assert_called_once_with(
+            Key={"PK": "DATASET_STATISTICS", "SK": "layer/domain/dataset/2"},
+            ConditionExpression="attribute_exists(#U)",
+            UpdateExpression="remove #U.#F",
+            ExpressionAttributeNames={"#U": "UploadRows", "#F": "abc-123"},
+        )
+
+    def test_store_dataset_upload_statistics(self):
+        self.dynamo_adapter.store_dataset_upload_statistics(
+            DatasetMetadata("layer", "domain", "dataset", 2), "abc-123", "{}"
+        )
+
+        self.service_table.put_item.assert_called_once_with(
+            Item={
+                "PK": "DATASET_STATISTICS",
+                "SK": "layer/domain/dataset/2/uploads/abc-123",
+                "ColumnStatistics": "{}",
+            }
+        )
+
+    def test_list_dataset_upload_statistics(self):
+        self.service_table.query.return_value = {
+            "Items": [
+                {
+                    "PK": "DATASET_STATISTICS",
+                    "SK": "layer/domain/dataset/2/uploads/abc-123",
+                    "ColumnStatistics": '{"a": {}}',
+                },
+                {
+                    "PK": "DATASET_STATISTICS",
+                    "SK": "layer/domain/dataset/2/uploads/def-456",
+                    "ColumnStatistics": '{"b": {}}',
+                },
+            ]
+        }
+
+        result = self.dynamo_adapter.list_dataset_upload_statistics(
+            DatasetMetadata("layer", "domain", "dataset", 2)
+        )
+
+        assert result == {"abc-123": '{"a": {}}', "def-456": '{"b": {}}'}
+        self.service_table.query.assert_called_once_with(
+            KeyConditionExpression=Key("PK").eq("DATASET_STATISTICS")
+            & Key("SK").begins_with("layer/domain/dataset/2/uploads/"),
+        )
+
+    def test_update_dataset_column_statistics(self):
+        self.dynamo_adapter.update_dataset_column_statistics(
+            DatasetMetadata("layer", "domain", "dataset", 2), "{}", True
+        )
+
+        self.service_table.update_item.assert_called_once_with(
+            Key={"PK": "DATASET_STATISTICS", "SK": "layer/domain/dataset/2"},
+            UpdateExpression="set #S = :s, #C = :c",
+            ExpressionAttributeNames={
+                "#S": "ColumnStatistics",
+                "#C": "ColumnsComplete",
+            },
+            ExpressionAttributeValues={":s": "{}", ":c": True},
+        )
+
+    def test_delete_dataset_statistics_deletes_every_version(self):
+        self.service_table.query.return_value = {
+            "Items": [
+                {"PK": "DATASET_STATISTICS", "SK": "layer/domain/dataset/1"},
+                {"PK": "DATASET_STATISTICS", "SK": "layer/domain/dataset/2"},
+            ]
+        }
+        mock_batch_writer = Mock()
+        mock_batch_writer.__enter__ = Mock(return_value=mock_batch_writer)
+        mock_batch_writer.__exit__ = Mock(return_value=None)
+        self.service_table.batch_writer.return_value = mock_batch_writer
+
+        self.dynamo_adapter.delete_dataset_statistics(
+            DatasetMetadata("layer", "domain", "dataset")
+        )
+
+        self.service_table.query.assert_called_once_with(
+            KeyConditionExpression=Key("PK").eq("DATASET_STATISTICS")
+            & Key("SK").begins_with("layer/domain/dataset/"),
+            ProjectionExpression="PK, SK",
+        )
+        mock_batch_writer.delete_item.assert_has_calls(
+            [
+                call(Key={"PK": "DATASET_STATISTICS", "SK": "layer/domain/dataset/1"}),
+                call(Key={"PK": "DATASET_STATISTICS", "SK": "layer/domain/dataset/2"}),
+            ]
+        )
+
+    @patch("api.adapter.dynamodb_adapter.time")
+    def test_acquire_dataset_lock(self, mock_time):
+        mock_time.time.return_value = 100.5
+
+        locked = self.dynamo_adapter.acquire_dataset_lock(
+            DatasetMetadata("layer", "domain", "dataset", 1), "job-123", 200.5
+        )
+
+        assert locked is True
+        self.service_table.put_item.assert_called_once_with(
+            Item={
+                "PK": "DATASET_LOCK",
+                "SK": "layer/domain/dataset/1",
+                "Owner": "job-123",
+                "LockExpiry": Decimal("200.5"),
+            },
+            ConditionExpression=Attr("PK").not_exists()
+            | Attr("Owner").eq("job-123")
+            | Attr("LockExpiry").lt(Decimal("100.5")),
+        )
+
+    def test_acquire_dataset_lock_when_another_owner_holds_it(self):
+        self.service_table.put_item.side_effect = ClientError(
+            error_response={"Error": {"Code": "ConditionalCheckFailedException"}},
+            operation_name="PutItem",
+        )
+
+        assert (
+            self.dynamo_adapter.acquire_dataset_lock(
+                DatasetMetadata("layer", "domain", "dataset", 1), "job-123", 200.5
+            )
+            is False
+        )
+
+    def test_release_dataset_lock_only_removes_the_owners_lock(self):
+        self.service_table.delete_item.side_effect = ClientError(
+            error_response={"Error": {"Code": "ConditionalCheckFailedException"}},
+            operation_name="DeleteItem",
+        )
+
+        self.dynamo_adapter.release_dataset_lock(
+            DatasetMetadata("layer", "domain", "dataset", 1), "job-123"
+        )
+
+        self.service_table.delete_item.assert_called_once_with(
+            Key={"PK": "DATASET_LOCK", "SK": "layer/domain/dataset/1"},
+            ConditionExpression=Attr("Owner").eq("job-123"),
+        )
+
 
 class TestDynamoDBAdapterSchemaTable:
     def setup_method(self):
@@ -1061,9 +1549,21 @@ class TestDynamoDBAdapterSchemaTable:
                         "format": None,
                     },
                 ],
+                "CatalogPK": "raw/PUBLIC",
+                "CatalogSK": "some/other",
             }
         )
 
+    def test_store_schema_leaves_deprecated_versions_out_of_the_catalog(self):
+        schema = self.schema.copy(deep=True)
+        schema.metadata.is_latest_version = False
+
+        self.dynamo_adapter.store_schema(schema)
+
+        item = self.schema_table.put_item.call_args.kwargs["Item"]
+        assert "CatalogPK" not in item
+        assert "CatalogSK" not in item
+
     def test_store_schema_client_error(self):
         self.schema_table.put_item.side_effect = ClientError(
             error_response={"Error": {"Code": "TableDoesNotExist"}},
@@ -1104,57 +1604,96 @@ class TestDynamoDBAdapterSchemaTable:
             )
 
     def test_get_latest_schemas_with_no_args(self):
-        self.schema_table.scan.return_value = {"Items": ["schema", "schema_2"]}
+        self.schema_table.query.side_effect = [
+            {"Items": ["schema"]},
+            {"Items": ["schema_2"]},
+        ] + [{"Items": []}] * 4
         res = self.dynamo_adapter.get_latest_schemas()
 
-        self.schema_table.scan.assert_called_once_with(
-            FilterExpression=Attr("is_latest_version").eq(True)
+        self.schema_table.query.assert_has_calls(
+            [
+                call(
+                    IndexName="SCHEMA_CATALOG",
+                    KeyConditionExpression=Key("CatalogPK").eq(
+                        f"{layer}/{sensitivity}"
+                    ),
+                    FilterExpression=Attr("is_latest_version").eq(True),
+                )
+                for layer in ["raw", "layer"]
+                for sensitivity in ["PUBLIC", "PRIVATE", "PROTECTED"]
+            ]
+        )
+        assert self.schema_table.scan.call_count == 0
+        assert res == ["schema", "schema_2"]
+
+    def test_get_latest_schemas_reads_every_page(self):
+        self.schema_table.query.side_effect = [
+            {"Items": ["schema"], "LastEvaluatedKey": "key"},
+            {"Items": ["schema_2"]},
+        ]
+        res = self.dynamo_adapter.get_latest_schemas(
+            DatasetFilters(layer="raw", sensitivity="PUBLIC")
         )
+
+        assert self.schema_table.query.call_args_list[1].kwargs[
+            "ExclusiveStartKey"
+        ] == ("key")
         assert res == ["schema", "schema_2"]
 
     @pytest.mark.parametrize(
         "result, expected",
         [({"Items": ["schema", "schema_2"]}, ["schema", "schema_2"]), ({}, [])],
     )
-    def test_get_latest_schemas_with_filters(self, result, expected):
-        self.schema_table.scan.return_value = result
+    def test_get_latest_schemas_with_attributes(self, result, expected):
+        self.schema_table.query.return_value = result
 
         res = self.dynamo_adapter.get_latest_schemas(
+            DatasetFilters(layer=["raw"], sensitivity=["PUBLIC"]),
             attributes=[
                 ExpressionAttribute("Layer", "L"),
                 ExpressionAttribute("Domain", "Domain"),
-            ]
+            ],
         )
 
-        self.schema_table.scan.assert_called_once_with(
-            FilterExpression=Attr("is_latest_version").eq(True),
+        self.schema_table.query.assert_called_once_with(
+            IndexName="SCHEMA_CATALOG",
+            KeyConditionExpression=Key("CatalogPK").eq("raw/PUBLIC"),
+            FilterExpression=Attr("is_latest_version").eq(True)
+            & (Attr("sensitivity").is_in(["PUBLIC"]) & Attr("layer").is_in(["raw"])),
             ProjectionExpression="#L, #Domain",
             ExpressionAttributeNames={"#L": "Layer", "#Domain": "Domain"},
         )
         assert res == expected
 
-    @pytest.mark.parametrize(
-        "result, expected",
-        [({"Items": ["schema", "schema_2"]}, ["schema", "schema_2"]), ({}, [])],
-    )
-    def test_get_latest_schemas_with_attributes(self, result, expected):
-        self.schema_table.scan.return_value = result
-
-        mock_query = Attr("key_only_tags").eq("2") & Attr("foo").is_in(["bar"])
+    def test_get_latest_schemas_with_filters(self):
+        self.schema_table.query.return_value = {"Items": ["schema"]}
 
-        dataset_filters = Mock()
-        dataset_filters.format_resource_query = Mock(return_value=mock_query)
-
-        res = self.dynamo_adapter.get_latest_schemas(dataset_filters)
+        res = self.dynamo_adapter.get_latest_schemas(
+            DatasetFilters(
+                sensitivity="PROTECTED", domain="Domain", key_only_tags=["tag"]
+            )
+        )
 
-        self.schema_table.scan.assert_called_once_with(
-            FilterExpression=Attr("is_latest_version").eq(True) & mock_query
+        self.schema_table.query.assert_has_calls(
+            [
+                call(
+                    IndexName="SCHEMA_CATALOG",
+                    KeyConditionExpression=Key("CatalogPK").eq(f"{layer}/PROTECTED")
+                    & Key("CatalogSK").begins_with("domain/"),
+                    FilterExpression=Attr("is_latest_version").eq(True)
+                    & (
+                        Attr("key_only_tags").contains("tag")
+                        & Attr("sensitivity").eq("PROTECTED")
+                        & Attr("domain").eq("domain")
+                    ),
+                )
+                for layer in ["raw", "layer"]
+            ]
         )
-        dataset_filters.format_resource_query.assert_called_once()
-        assert res == expected
+        assert res == ["schema", "schema"]
 
     def test_get_latest_schemas_client_error(self):
-        self.schema_table.scan.side_effect = ClientError(
+        self.schema_table.query.side_effect = ClientError(
             error_response={"Error": {"Code": "KeyDoesNotExist"}},
             operation_name="Query",
         )
@@ -1204,7 +1743,7 @@ class TestDynamoDBAdapterSchemaTable:
                 "PK": "raw/domain/dataset",
                 "SK": 1,
             },
-            UpdateExpression="set #A = :a",
+            UpdateExpression="set #A = :a remove CatalogPK, CatalogSK",
             ExpressionAttributeNames={
                 "#A": "is_latest_version",
             },
@@ -92,6 +92,97 @@ class TestGlueAdapterTableMethods:
             ],
         )
 
+    def test_create_table_with_partition_projection(self):
+        self.glue_adapter.partition_projection = True
+
+        self.glue_adapter.create_table(self.valid_schema)
+
+        parameters = self.glue_boto_client.create_table.call_args.kwargs["TableInput"][
+            "Parameters"
+        ]
+        assert parameters["projection.enabled"] == "true"
+        assert parameters["projection.colname1.type"] == "injected"
+        assert (
+            parameters["storage.location.template"]
+            == f"s3://{DATA_BUCKET}/data/layer/domain/dataset/1/colname1=${{colname1}}"
+        )
+
+    def test_create_partitions(self):
+        self.glue_boto_client.batch_create_partition.return_value = {}
+
+        self.glue_adapter.create_partitions(
+            self.valid_schema, ["colname1=1", "colname1=2"]
+        )
+
+        self.glue_boto_client.batch_create_partition.assert_called_once()
+        kwargs = self.glue_boto_client.batch_create_partition.call_args.kwargs
+        assert kwargs["DatabaseName"] == "GLUE_CATALOGUE_DB_NAME"
+        assert kwargs["TableName"] == "layer_domain_dataset_1"
+        assert [partition["Values"] for partition in kwargs["PartitionInputList"]] == [
+            ["1"],
+            ["2"],
+        ]
+        assert [
+            partition["StorageDescriptor"]["Location"]
+            for partition in kwargs["PartitionInputList"]
+        ] == [
+            f"s3://{DATA_BUCKET}/data/layer/domain/dataset/1/colname1=1",
+            f"s3://{DATA_BUCKET}/data/layer/domain/dataset/1/colname1=2",
+        ]
+        self.glue_boto_client.get_table.assert_not_called()
+
+    @patch("api.adapter.glue_adapter.GLUE_MAX_PARTITIONS_PER_REQUEST", 2)
+    def test_create_partitions_in_batches(self):
+        self.glue_boto_client.batch_create_partition.return_value = {}
+
+        self.glue_adapter.create_partitions(
+            self.valid_schema, ["colname1=1", "colname1=2", "colname1=3"]
+        )
+
+        batches = [
+            [partition["Values"] for partition in call.kwargs["PartitionInputList"]]
+            for call in self.glue_boto_client.batch_create_partition.call_args_list
+        ]
+        assert batches == [[["1"], ["2"]], [["3"]]]
+
+    def test_create_partitions_skips_existing_partitions(self):
+        self.glue_boto_client.batch_create_partition.return_value = {
+            "Errors": [
+                {
+                    "PartitionValues": ["1"],
+                    "ErrorDetail": {"ErrorCode": "AlreadyExistsException"},
+                }
+            ]
+        }
+
+        self.glue_adapter.create_partitions(self.valid_schema, ["colname1=1"])
+
+    def test_create_partitions_raises_error_when_partitions_fail(self):
+        self.glue_boto_client.batch_create_partition.return_value = {
+            "Errors": [
+                {
+                    "PartitionValues": ["1"],
+                    "ErrorDetail": {"ErrorCode": "InternalServiceException"},
+                }
+            ]
+        }
+
+        with pytest.raises(
+            AWSServiceError,
+            match=r"Failed to register partitions for table \[layer_domain_dataset_1\]",
+        ):
+            self.glue_adapter.create_partitions(self.valid_schema, ["colname1=1"])
+
+    def test_create_partitions_is_skipped_for_projected_tables(self):
+        self.glue_adapter.partition_projection = True
+        self.glue_boto_client.get_table.return_value = {
+            "Table": {"Parameters": {"projection.enabled": "true"}}
+        }
+
+        self.glue_adapter.create_partitions(self.valid_schema, ["colname1=1"])
+
+        self.glue_boto_client.batch_create_partition.assert_not_called()
+
     def test_create_table_already_exists_error(self):
         self.glue_boto_client.create_table.side_effect = ClientError(
             error_response={"Error": {"Code": "AlreadyExistsException"}},
@@ -0,0 +1,202 @@
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+from api.adapter.job_queue_store import DynamoDBJobQueueStore, SQLiteJobQueueStore
+from api.common.custom_exceptions import AWSServiceError
+from api.domain.scheduled_task import ScheduledTask, TaskStatus, TaskType
+
+
+def build_task(task_type: TaskType, priority: int, enqueued_at: float) -> ScheduledTask:
+    return ScheduledTask(
+        task_type=task_type,
+        payload={"job_id": "abc-123"},
+        priority=priority,
+        enqueued_at=enqueued_at,
+    )
+
+
+class TestSQLiteJobQueueStore:
+    @pytest.fixture(autouse=True)
+    def setup_store(self, tmp_path):
+        self.store = SQLiteJobQueueStore(str(tmp_path / "job_queue.db"))
+
+    def test_claims_tasks_by_priority_then_queue_time(self):
+        upload = build_task(TaskType.UPLOAD, 1, 100.0)
+        query = build_task(TaskType.QUERY, 0, 200.0)
+        later_upload = build_task(TaskType.UPLOAD, 1, 150.0)
+        for task in [upload, query, later_upload]:
+            self.store.enqueue(task)
+
+        claimed = [self.store.claim_next("worker", 9999999999.0) for _ in range(4)]
+
+        assert [task.task_id for task in claimed[:3]] == [
+            query.task_id,
+            upload.task_id,
+            later_upload.task_id,
+        ]
+        assert claimed[3] is None
+
+    def test_claim_marks_task_running(self):
+        self.store.enqueue(build_task(TaskType.UPLOAD, 1, 100.0))
+
+        claimed = self.store.claim_next("worker", 9999999999.0)
+
+        assert claimed.status == TaskStatus.RUNNING
+        assert claimed.worker_id == "worker"
+        assert claimed.attempts == 1
+        assert self.store.count_queued() == 0
+
+    def test_reclaims_task_when_lease_has_expired(self):
+        self.store.enqueue(build_task(TaskType.UPLOAD, 1, 100.0))
+        self.store.claim_next("first-worker", 0.0)
+
+        claimed = self.store.claim_next("second-worker", 9999999999.0)
+
+        assert claimed.worker_id == "second-worker"
+        assert claimed.attempts == 2
+
+    def test_does_not_claim_task_with_active_lease(self):
+        self.store.enqueue(build_task(TaskType.UPLOAD, 1, 100.0))
+        task = self.store.claim_next("first-worker", 0.0)
+
+        self.store.renew_lease(task, 9999999999.0)
+
+        assert self.store.claim_next("second-worker", 9999999999.0) is None
+
+    def test_complete_removes_task(self):
+        self.store.enqueue(build_task(TaskType.UPLOAD, 1, 100.0))
+        task = self.store.claim_next("worker", 0.0)
+
+        self.store.complete(task)
+
+        assert self.store.claim_next("worker", 9999999999.0) is None
+
+    def test_complete_leaves_task_claimed_again_by_another_worker(self):
+        self.store.enqueue(build_task(TaskType.UPLOAD, 1, 100.0))
+        expired_task = self.store.claim_next("first-worker", 0.0)
+        self.store.claim_next("second-worker", 0.0)
+
+        self.store.complete(expired_task)
+        self.store.renew_lease(expired_task, 9999999999.0)
+
+        reclaimed_task = self.store.claim_next("third-worker", 9999999999.0)
+        assert reclaimed_task.task_id == expired_task.task_id
+        assert reclaimed_task.attempts == 3
+
+    def test_counts_queued_tasks(self):
+        for enqueued_at in [100.0, 200.0, 300.0]:
+            self.store.enqueue(build_task(TaskType.UPLOAD, 1, enqueued_at))
+        self.store.claim_next("worker", 9999999999.0)
+
+        assert self.store.count_queued() == 2
+
+
+class TestDynamoDBJobQueueStore:
+    def setup_method(self):
+        self.service_table = Mock()
+        self.data_source = Mock()
+        self.data_source.Table.return_value = self.service_table
+        self.store = DynamoDBJobQueueStore(self.data_source)
+        self.task = build_task(TaskType.QUERY, 0, 100.0)
+
+    def test_enqueue_stores_task_in_service_table(self):
+        self.store.enqueue(self.task)
+
+        self.service_table.put_item.assert_called_once_with(
+            Item={
+                "PK": "TASK",
+                "SK": self.task.order_key(),
+                "Status": "QUEUED",
+                "Attempts": 0,
+                "Task": json.dumps(self.task.dict()),
+            }
+        )
+
+    def test_enqueue_raises_error_when_put_fails(self):
+        self.service_table.put_item.side_effect = ClientError(
+            error_response={"Error": {"Code": "Failed"}}, operation_name="PutItem"
+        )
+
+        with pytest.raises(
+            AWSServiceError, match="There was an error queueing the job"
+        ):
+            self.store.enqueue(self.task)
+
+    @patch("api.adapter.job_queue_store.time")
+    def test_claim_next_claims_first_claimable_task(self, mock_time):
+        mock_time.time.return_value = 50
+        other_task = build_task(TaskType.UPLOAD, 1, 100.0)
+        self.service_table.query.return_value = {
+            "Items": [
+                {"Task": json.dumps(self.task.dict()), "Attempts": 0},
+                {"Task": json.dumps(other_task.dict()), "Attempts": 0},
+            ]
+        }
+
+        claimed = self.store.claim_next("worker", 400.0)
+
+        assert claimed.task_id == self.task.task_id
+        assert claimed.status == TaskStatus.RUNNING
+        assert claimed.worker_id == "worker"
+        assert claimed.attempts == 1
+        self.service_table.update_item.assert_called_once()
+        assert self.service_table.update_item.call_args.kwargs["Key"] == {
+            "PK": "TASK",
+            "SK": self.task.order_key(),
+        }
+
+    def test_claim_next_skips_tasks_claimed_by_another_worker(self):
+        other_task = build_task(TaskType.UPLOAD, 1, 100.0)
+        self.service_table.query.return_value = {
+            "Items": [
+                {"Task": json.dumps(self.task.dict()), "Attempts": 0},
+                {"Task": json.dumps(other_task.dict()), "Attempts": 0},
+            ]
+        }
+        self.service_table.update_item.side_effect = [
+            ClientError(
+                error_response={"Error": {"Code": "ConditionalCheckFailedException"}},
+                operation_name="UpdateItem",
+            ),
+            None,
+        ]
+
+        claimed = self.store.claim_next("worker", 400.0)
+
+        assert claimed.task_id == other_task.task_id
+
+    def test_claim_next_returns_none_when_queue_is_empty(self):
+        self.service_table.query.return_value = {"Items": []}
+
+        assert self.store.claim_next("worker", 400.0) is None
+
+    def test_complete_deletes_task(self):
+        self.store.complete(self.task)
+
+        self.service_table.delete_item.assert_called_once_with(
+            Key={"PK": "TASK", "SK": self.task.order_key()},
+            ConditionExpression=Attr("WorkerId").eq(None) & Attr("Attempts").eq(0),
+        )
+
+    def test_complete_leaves_task_claimed_again_by_another_worker(self):
+        self.service_table.delete_item.side_effect = ClientError(
+            error_response={"Error": {"Code": "ConditionalCheckFailedException"}},
+            operation_name="DeleteItem",
+        )
+
+        self.store.complete(self.task)
+
+    def test_count_queued_pages_through_tasks(self):
+        self.service_table.query.side_effect = [
+            {"Items": [{"SK": "a"}, {"SK": "b"}], "LastEvaluatedKey": {"SK": "b"}},
+            {"Items": [{"SK": "c"}]},
+        ]
+
+        assert self.store.count_queued() == 3
+        assert self.service_table.query.call_args.kwargs["ExclusiveStartKey"] == {
+            "SK": "b"
+        }
@@ -0,0 +1,179 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from api.adapter.local_query_adapter import LocalQueryAdapter
+from api.application.services.partitioning_service import (
+    generate_partitioned_data,
+    partition_to_parquet,
+)
+from api.common.custom_exceptions import LocalQueryError
+from api.domain.schema import Column, Schema
+from api.domain.schema_metadata import SchemaMetadata
+from api.domain.sql_query import SQLQuery, SQLQueryOrderBy
+
+
+class TestLocalQueryAdapter:
+    def setup_method(self):
+        self.schema = Schema(
+            metadata=SchemaMetadata(
+                layer="raw",
+                domain="domain",
+                dataset="dataset",
+                version=1,
+                sensitivity="PUBLIC",
+            ),
+            columns=[
+                Column(
+                    name="year",
+                    partition_index=0,
+                    data_type="int",
+                    allow_null=False,
+                ),
+                Column(
+                    name="day",
+                    partition_index=1,
+                    data_type="date",
+                    allow_null=False,
+                    format="%Y-%m-%d",
+                ),
+                Column(
+                    name="name",
+                    partition_index=None,
+                    data_type="string",
+                    allow_null=True,
+                ),
+                Column(
+                    name="value",
+                    partition_index=None,
+                    data_type="double",
+                    allow_null=True,
+                ),
+            ],
+        )
+        self.table_name = self.schema.metadata.glue_table_name()
+
+    def write_dataset(self, data_root: Path, dataframe: pd.DataFrame):
+        dataset_path = data_root / self.schema.metadata.dataset_location()
+        for partition in generate_partitioned_data(self.schema, dataframe):
+            partition_path = dataset_path / partition.path
+            partition_path.mkdir(parents=True)
+            partition_to_parquet(
+                self.schema, partition, partition_path / "file.parquet"
+            )
+
+    def write_default_dataset(self, data_root: Path):
+        self.write_dataset(
+            data_root,
+            pd.DataFrame(
+                {
+                    "year": [2020, 2020, 2021],
+                    "day": pd.to_datetime(["2020-01-01", "2020-01-02", "2021-01-01"]),
+                    "name": ["a", "b", None],
+                    "value": [1.5, 2.5, 3.5],
+                }
+            ),
+        )
+
+    def test_query_sql_returns_every_column(self, tmp_path):
+        self.write_default_dataset(tmp_path)
+        adapter = LocalQueryAdapter(data_root=str(tmp_path))
+
+        result = adapter.query_sql(
+            self.schema,
+            SQLQuery(order_by_columns=[SQLQueryOrderBy(column="value")]).to_sql(
+                self.table_name
+            ),
+        )
+
+        assert list(result.columns) == ["name", "value", "year", "day"]
+        assert result["name"].tolist() == ["a", "b", pd.NA]
+        assert result["value"].tolist() == [1.5, 2.5, 3.5]
+        assert result["year"].tolist() == [2020, 2020, 2021]
+        assert [str(day) for day in result["day"]] == [
+            "2020-01-01",
+            "2020-01-02",
+            "2021-01-01",
+        ]
+
+    def test_query_sql_filters_and_aggregates(self, tmp_path):
+        self.write_default_dataset(tmp_path)
+        adapter = LocalQueryAdapter(data_root=str(tmp_path))
+
+        result = adapter.query_sql(
+            self.schema,
+            SQLQuery(
+                select_columns=["year", "sum(value) as total"],
+                filter="year = 2020 AND day >= DATE '2020-01-02'",
+                group_by_columns=["year"],
+            ).to_sql(self.table_name),
+        )
+
+        assert result.to_dict(orient="records") == [{"year": 2020, "total": 2.5}]
+
+    def test_query_sql_only_reads_matching_partitions(self, tmp_path):
+        self.write_default_dataset(tmp_path)
+        # A file that cannot be read fails the query if its partition is not pruned
+        broken_partition = (
+            tmp_path
+            / self.schema.metadata.dataset_location()
+            / "year=2021"
+            / "day=2021-01-01 00:00:00"
+        )
+        (broken_partition / "broken.parquet").write_bytes(b"not parquet")
+        adapter = LocalQueryAdapter(data_root=str(tmp_path))
+
+        result = adapter.query_sql(
+            self.schema,
+            SQLQuery(select_columns=["name"], filter="year = 2020").to_sql(
+                self.table_name
+            ),
+        )
+
+        assert sorted(result["name"].tolist()) == ["a", "b"]
+        with pytest.raises(LocalQueryError):
+            adapter.query_sql(self.schema, SQLQuery().to_sql(self.table_name))
+
+    def test_query_sql_returns_empty_result_for_dataset_without_data(self, tmp_path):
+        adapter = LocalQueryAdapter(data_root=str(tmp_path))
+
+        result = adapter.query_sql(self.schema, SQLQuery().to_sql(self.table_name))
+
+        assert result.empty
+        assert list(result.columns) == ["name", "value", "year", "day"]
+
+    def test_query_sql_raises_local_query_error_for_invalid_query(self, tmp_path):
+        self.write_default_dataset(tmp_path)
+        adapter = LocalQueryAdapter(data_root=str(tmp_path))
+
+        with pytest.raises(LocalQueryError):
+            adapter.query_sql(self.schema, f"SELECT missing FROM {self.table_name}")
+
+    def test_query_sql_in_chunks_reads_result_in_chunks(self, tmp_path):
+        self.write_default_dataset(tmp_path)
+        adapter = LocalQueryAdapter(data_root=str(tmp_path))
+
+        chunks = list(
+            adapter.query_sql_in_chunks(
+                self.schema,
+                SQLQuery(order_by_columns=[SQLQueryOrderBy(column="value")]).to_sql(
+                    self.table_name
+                ),
+                chunk_size=2,
+            )
+        )
+
+        assert [len(chunk) for chunk in chunks] == [2, 1]
+        assert pd.concat(chunks)["value"].tolist() == [1.5, 2.5, 3.5]
+
+    def test_query_sql_in_chunks_raises_before_reading_for_invalid_query(
+        self, tmp_path
+    ):
+        self.write_default_dataset(tmp_path)
+        adapter = LocalQueryAdapter(data_root=str(tmp_path))
+
+        with pytest.raises(LocalQueryError):
+            adapter.query_sql_in_chunks(
+                self.schema, f"SELECT missing FROM {self.table_name}"
+            )
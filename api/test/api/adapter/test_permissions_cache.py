@@ -0,0 +1,92 @@
+from unittest.mock import Mock
+
+import pytest
+
+from api.adapter.permissions_cache import PermissionsCache
+from api.domain.permission_item import PermissionItem
+
+READ_ALL = PermissionItem(id="READ_ALL", type="READ", sensitivity="ALL")
+USER_ADMIN = PermissionItem(id="USER_ADMIN", type="USER_ADMIN")
+
+
+class TestPermissionsCache:
+    def setup_method(self):
+        self.now = 1000.0
+        self.permissions_cache = PermissionsCache(ttl=60, clock=lambda: self.now)
+
+    def test_reads_cached_permissions_until_they_expire(self):
+        load = Mock(side_effect=[[READ_ALL], [USER_ADMIN]])
+
+        first = self.permissions_cache.get_subject_permissions("subject", load)
+        self.now += 59
+        second = self.permissions_cache.get_subject_permissions("subject", load)
+        self.now += 1
+        third = self.permissions_cache.get_subject_permissions("subject", load)
+
+        assert (first, second, third) == ([READ_ALL], [READ_ALL], [USER_ADMIN])
+        assert load.call_count == 2
+
+    def test_invalidate_subject_only_removes_that_subject(self):
+        self.permissions_cache.get_subject_permissions("subject", lambda: [READ_ALL])
+        self.permissions_cache.get_subject_permissions("other", lambda: [READ_ALL])
+
+        self.permissions_cache.invalidate_subject("subject")
+
+        assert self.permissions_cache.get_subject_permissions(
+            "subject", lambda: [USER_ADMIN]
+        ) == [USER_ADMIN]
+        assert self.permissions_cache.get_subject_permissions(
+            "other", lambda: [USER_ADMIN]
+        ) == [READ_ALL]
+
+    def test_invalidate_all_removes_every_subject(self):
+        self.permissions_cache.get_subject_permissions("subject", lambda: [READ_ALL])
+        self.permissions_cache.get_subject_permissions("other", lambda: [READ_ALL])
+
+        self.permissions_cache.invalidate_all()
+
+        assert self.permissions_cache.metrics()["entries"] == 0
+
+    def test_does_not_cache_permissions_read_before_an_invalidation(self):
+        def load():
+            self.permissions_cache.invalidate_subject("subject")
+            return [READ_ALL]
+
+        result = self.permissions_cache.get_subject_permissions("subject", load)
+
+        assert result == [READ_ALL]
+        assert self.permissions_cache.metrics()["entries"] == 0
+
+    def test_does_not_cache_permissions_that_fail_to_load(self):
+        with pytest.raises(ValueError):
+            self.permissions_cache.get_subject_permissions(
+                "subject", Mock(side_effect=ValueError("Failed"))
+            )
+
+        assert self.permissions_cache.metrics()["entries"] == 0
+
+    def test_ttl_of_zero_turns_the_cache_off(self):
+        permissions_cache = PermissionsCache(ttl=0)
+        load = Mock(return_value=[READ_ALL])
+
+        permissions_cache.get_subject_permissions("subject", load)
+        permissions_cache.get_subject_permissions("subject", load)
+
+        assert load.call_count == 2
+
+    def test_metrics(self):
+        self.permissions_cache.get_subject_permissions("subject", lambda: [READ_ALL])
+        self.now += 10
+        self.permissions_cache.get_subject_permissions("subject", lambda: [READ_ALL])
+        self.permissions_cache.get_subject_permissions("other", lambda: [READ_ALL])
+        self.permissions_cache.invalidate_subject("other")
+
+        assert self.permissions_cache.metrics() == {
+            "hits": 1,
+            "misses": 2,
+            "hit_ratio": 0.333,
+            "invalidations": 1,
+            "entries": 1,
+            "ttl_seconds": 60,
+            "max_staleness_seconds": 10.0,
+        }
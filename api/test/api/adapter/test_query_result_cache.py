@@ -0,0 +1,208 @@
+import io
+from unittest.mock import Mock
+
+import pandas as pd
+import pytest
+from botocore.exceptions import ClientError
+
+from api.adapter.query_result_cache import (
+    DisabledQueryResultCache,
+    LocalQueryResultCache,
+    QueryResultCache,
+    SharedQueryResultCache,
+    create_query_result_cache,
+)
+from api.domain.dataset_metadata import DatasetMetadata
+
+DATASET = DatasetMetadata("raw", "domain", "dataset", 1)
+SQL = "SELECT * FROM raw_domain_dataset_1"
+
+
+class TestQueryResultCache:
+    def setup_method(self):
+        self.cache = QueryResultCache(max_size=10_000)
+        self.dataframe = pd.DataFrame({"col1": [1, 2, 3], "col2": ["a", "b", "c"]})
+
+    def test_returns_cached_result(self):
+        key = self.cache.cache_key(DATASET, SQL)
+        self.cache.put(key, self.dataframe)
+
+        result = self.cache.get(self.cache.cache_key(DATASET, SQL))
+
+        pd.testing.assert_frame_equal(result, self.dataframe)
+        assert self.cache.metrics()["hits"] == 1
+        assert self.cache.metrics()["misses"] == 0
+
+    def test_counts_miss_when_result_is_not_cached(self):
+        assert self.cache.get(self.cache.cache_key(DATASET, SQL)) is None
+        assert self.cache.metrics()["misses"] == 1
+
+    def test_cache_key_differs_by_sql_and_dataset(self):
+        other_dataset = DatasetMetadata("raw", "domain", "other", 1)
+
+        keys = {
+            self.cache.cache_key(DATASET, SQL),
+            self.cache.cache_key(DATASET, f"{SQL} LIMIT 10"),
+            self.cache.cache_key(other_dataset, SQL),
+        }
+
+        assert len(keys) == 3
+
+    def test_invalidate_changes_cache_key_of_dataset_only(self):
+        other_dataset = DatasetMetadata("raw", "domain", "other", 1)
+        key = self.cache.cache_key(DATASET, SQL)
+        other_key = self.cache.cache_key(other_dataset, SQL)
+
+        self.cache.invalidate(DatasetMetadata("raw", "domain", "dataset", 2))
+
+        assert self.cache.cache_key(DATASET, SQL) != key
+        assert self.cache.cache_key(other_dataset, SQL) == other_key
+
+    def test_evicts_least_recently_used_results_when_full(self):
+        result_size = len(self.dataframe.to_parquet())
+        self.cache.max_size = result_size * 2
+        self.cache.put("first", self.dataframe)
+        self.cache.put("second", self.dataframe)
+        self.cache.get("first")
+
+        self.cache.put("third", self.dataframe)
+
+        assert self.cache.get("second") is None
+        assert self.cache.get("first") is not None
+        assert self.cache.get("third") is not None
+        assert self.cache.metrics()["entries"] == 2
+        assert self.cache.metrics()["size_bytes"] == result_size * 2
+
+    def test_does_not_cache_result_larger_than_cache(self):
+        self.cache.max_size = 10
+
+        self.cache.put("key", self.dataframe)
+
+        assert self.cache.get("key") is None
+        assert self.cache.metrics()["entries"] == 0
+
+    def test_does_not_cache_when_data_version_cannot_be_read(self):
+        self.cache._get_data_version = Mock(side_effect=Exception("Failed"))
+
+        key = self.cache.cache_key(DATASET, SQL)
+        self.cache.put(key, self.dataframe)
+
+        assert key is None
+        assert self.cache.get(key) is None
+        assert self.cache.metrics()["entries"] == 0
+
+
+class TestLocalQueryResultCache:
+    @pytest.fixture(autouse=True)
+    def setup_cache(self, tmp_path):
+        self.path = str(tmp_path / "query_cache.db")
+        self.cache = LocalQueryResultCache(self.path)
+
+    def test_data_versions_are_shared_between_caches_on_the_same_host(self):
+        other_cache = LocalQueryResultCache(self.path)
+        key = self.cache.cache_key(DATASET, SQL)
+        assert other_cache.cache_key(DATASET, SQL) == key
+
+        other_cache.invalidate(DATASET)
+        other_cache.invalidate(DATASET)
+
+        assert self.cache._get_data_version(DATASET) == 2
+        assert self.cache.cache_key(DATASET, SQL) != key
+
+
+class TestSharedQueryResultCache:
+    def setup_method(self):
+        self.s3_client = Mock()
+        self.service_table = Mock()
+        data_source = Mock()
+        data_source.Table.return_value = self.service_table
+        self.cache = SharedQueryResultCache(
+            self.s3_client, data_source, "query-bucket", max_size=10_000
+        )
+        self.dataframe = pd.DataFrame({"col1": [1, 2, 3]})
+
+    def test_reads_data_version_from_service_table(self):
+        self.service_table.get_item.return_value = {"Item": {"Version": 3}}
+
+        assert self.cache._get_data_version(DATASET) == 3
+        self.service_table.get_item.assert_called_once_with(
+            Key={"PK": "DATA_VERSION", "SK": "raw/domain/dataset"},
+            ConsistentRead=True,
+        )
+
+    def test_data_version_defaults_to_zero(self):
+        self.service_table.get_item.return_value = {}
+
+        assert self.cache._get_data_version(DATASET) == 0
+
+    def test_invalidate_increments_data_version(self):
+        self.cache.invalidate(DATASET)
+
+        self.service_table.update_item.assert_called_once_with(
+            Key={"PK": "DATA_VERSION", "SK": "raw/domain/dataset"},
+            UpdateExpression="ADD #V :one",
+            ExpressionAttributeNames={"#V": "Version"},
+            ExpressionAttributeValues={":one": 1},
+        )
+
+    def test_put_stores_result_in_s3(self):
+        self.cache.put("key", self.dataframe)
+
+        self.s3_client.put_object.assert_called_once_with(
+            Bucket="query-bucket",
+            Key="query_cache/key.parquet",
+            Body=self.dataframe.to_parquet(),
+        )
+
+    def test_get_reads_result_from_s3_when_not_cached_in_memory(self):
+        self.s3_client.get_object.return_value = {
+            "Body": io.BytesIO(self.dataframe.to_parquet())
+        }
+
+        first_result = self.cache.get("key")
+        second_result = self.cache.get("key")
+
+        pd.testing.assert_frame_equal(first_result, self.dataframe)
+        pd.testing.assert_frame_equal(second_result, self.dataframe)
+        self.s3_client.get_object.assert_called_once_with(
+            Bucket="query-bucket", Key="query_cache/key.parquet"
+        )
+        assert self.cache.metrics()["hits"] == 2
+
+    def test_get_returns_none_when_result_is_not_in_s3(self):
+        self.s3_client.get_object.side_effect = ClientError(
+            error_response={"Error": {"Code": "NoSuchKey"}}, operation_name="GetObject"
+        )
+
+        assert self.cache.get("key") is None
+        assert self.cache.metrics()["misses"] == 1
+
+    def test_get_returns_none_when_s3_fails(self):
+        self.s3_client.get_object.side_effect = ClientError(
+            error_response={"Error": {"Code": "AccessDenied"}},
+            operation_name="GetObject",
+        )
+
+        assert self.cache.get("key") is None
+
+
+class TestDisabledQueryResultCache:
+    def test_never_caches_results(self):
+        cache = DisabledQueryResultCache()
+
+        key = cache.cache_key(DATASET, SQL)
+        cache.put(key, pd.DataFrame({"col1": [1]}))
+
+        assert cache.get(key) is None
+        assert cache.metrics()["entries"] == 0
+
+
+class TestCreateQueryResultCache:
+    def test_cache_is_off_unless_a_backend_is_chosen(self):
+        assert isinstance(create_query_result_cache(), DisabledQueryResultCache)
+        assert isinstance(create_query_result_cache("none"), DisabledQueryResultCache)
+
+    def test_creates_local_cache(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+
+        assert isinstance(create_query_result_cache("local"), LocalQueryResultCache)
@@ -1,11 +1,17 @@
+import io
+import re
 from pathlib import Path
-from unittest.mock import Mock, call
+from unittest.mock import Mock, call, patch
 
+from boto3.exceptions import S3UploadFailedError
 from botocore.exceptions import ClientError
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
 
 from api.adapter.s3_adapter import S3Adapter
+from api.application.services.data_files import write_compacted_file
 from api.application.services.partitioning_service import Partition
 from api.common.config.auth import Sensitivity
 from api.common.config.aws import OUTPUT_QUERY_BUCKET
@@ -14,6 +20,7 @@ from api.common.custom_exceptions import (
     AWSServiceError,
 )
 from api.domain.dataset_metadata import DatasetMetadata
+from api.domain.dataset_statistics import DatasetSizeChange
 from api.domain.schema_metadata import SchemaMetadata
 from api.domain.schema import Schema, Column
 from test.test_utils import (
@@ -21,6 +28,20 @@ from test.test_utils import (
 )
 
 
+def parquet_content(dataframe: pd.DataFrame) -> bytes:
+    buffer = io.BytesIO()
+    dataframe.to_parquet(buffer)
+    return buffer.getvalue()
+
+
+def get_object_tail(content: bytes):
+    def get_object(Bucket: str, Key: str, Range: str) -> dict:
+        length = int(Range.removeprefix("bytes=-"))
+        return {"Body": io.BytesIO(content[-length:])}
+
+    return get_object
+
+
 class TestS3AdapterUpload:
     mock_s3_client = None
     persistence_adapter = None
@@ -136,7 +157,235 @@ class TestS3AdapterUpload:
             ),
         ]
 
-        self.mock_s3_client.put_object.assert_has_calls(calls)
+        self.mock_s3_client.put_object.assert_has_calls(calls, any_order=True)
+
+    def test_upload_encoded_partitions(self):
+        schema = Schema(
+            metadata=SchemaMetadata(
+                layer="layer",
+                domain="domain",
+                dataset="dataset",
+                version=1,
+                sensitivity=Sensitivity.PRIVATE,
+            ),
+            columns=[],
+        )
+
+        stored_files = self.persistence_adapter.upload_encoded_partitions(
+            schema,
+            "data.parquet",
+            [("year=2020", b"content1"), ("year=2021", b"content22")],
+        )
+
+        assert stored_files == {
+            "data/layer/domain/dataset/1/year=2020/data.parquet": 8,
+            "data/layer/domain/dataset/1/year=2021/data.parquet": 9,
+        }
+
+        self.mock_s3_client.put_object.assert_has_calls(
+            [
+                call(
+                    Bucket="dataset",
+                    Key="data/layer/domain/dataset/1/year=2020/data.parquet",
+                    Body=b"content1",
+                ),
+                call(
+                    Bucket="dataset",
+                    Key="data/layer/domain/dataset/1/year=2021/data.parquet",
+                    Body=b"content22",
+                ),
+            ],
+            any_order=True,
+        )
+
+    @patch("api.adapter.s3_adapter.time")
+    def test_upload_encoded_partitions_retries_failed_partitions(self, mock_time):
+        schema = Schema(
+            metadata=SchemaMetadata(
+                layer="layer",
+                domain="domain",
+                dataset="dataset",
+                version=1,
+                sensitivity=Sensitivity.PRIVATE,
+            ),
+            columns=[],
+        )
+        self.mock_s3_client.put_object.side_effect = [
+            ClientError({"Error": {"Code": "SlowDown"}}, "PutObject"),
+            None,
+        ]
+
+        self.persistence_adapter.upload_encoded_partitions(
+            schema, "data.parquet", [("year=2020", b"content1")]
+        )
+
+        assert self.mock_s3_client.put_object.call_count == 2
+        mock_time.sleep.assert_called_once_with(1)
+
+    @patch("api.adapter.s3_adapter.time")
+    def test_upload_encoded_partitions_retries_server_errors(self, mock_time):
+        schema = Schema(
+            metadata=SchemaMetadata(
+                layer="layer",
+                domain="domain",
+                dataset="dataset",
+                version=1,
+                sensitivity=Sensitivity.PRIVATE,
+            ),
+            columns=[],
+        )
+        self.mock_s3_client.put_object.side_effect = [
+            ClientError(
+                {
+                    "Error": {"Code": "BadGateway"},
+                    "ResponseMetadata": {"HTTPStatusCode": 502},
+                },
+                "PutObject",
+            ),
+            None,
+        ]
+
+        self.persistence_adapter.upload_encoded_partitions(
+            schema, "data.parquet", [("year=2020", b"content1")]
+        )
+
+        assert self.mock_s3_client.put_object.call_count == 2
+
+    @patch("api.adapter.s3_adapter.time")
+    def test_upload_encoded_partitions_does_not_retry_client_errors(self, mock_time):
+        schema = Schema(
+            metadata=SchemaMetadata(
+                layer="layer",
+                domain="domain",
+                dataset="dataset",
+                version=1,
+                sensitivity=Sensitivity.PRIVATE,
+            ),
+            columns=[],
+        )
+        self.mock_s3_client.put_object.side_effect = ClientError(
+            {
+                "Error": {"Code": "AccessDenied"},
+                "ResponseMetadata": {"HTTPStatusCode": 403},
+            },
+            "PutObject",
+        )
+
+        with pytest.raises(
+            AWSServiceError,
+            match=re.escape("Failed to store 1 of 1 partitions: ['year=2020']"),
+        ):
+            self.persistence_adapter.upload_encoded_partitions(
+                schema, "data.parquet", [("year=2020", b"content1")]
+            )
+
+        assert self.mock_s3_client.put_object.call_count == 1
+        mock_time.sleep.assert_not_called()
+
+    @patch("api.adapter.s3_adapter.time")
+    def test_upload_encoded_partitions_reports_every_failed_partition(self, mock_time):
+        schema = Schema(
+            metadata=SchemaMetadata(
+                layer="layer",
+                domain="domain",
+                dataset="dataset",
+                version=1,
+                sensitivity=Sensitivity.PRIVATE,
+            ),
+            columns=[],
+        )
+
+        def put_object(Bucket, Key, Body):
+            if Body != b"content2":
+                raise ClientError({"Error": {"Code": "SlowDown"}}, "PutObject")
+
+        self.mock_s3_client.put_object.side_effect = put_object
+
+        with pytest.raises(
+            AWSServiceError,
+            match=re.escape(
+                "Failed to store 2 of 3 partitions: ['year=2020', 'year=2022']"
+            ),
+        ):
+            self.persistence_adapter.upload_encoded_partitions(
+                schema,
+                "data.parquet",
+                [
+                    ("year=2020", b"content1"),
+                    ("year=2021", b"content2"),
+                    ("year=2022", b"content3"),
+                ],
+            )
+
+        assert self.mock_s3_client.put_object.call_count == 7
+
+    def test_upload_staged_data(self, tmp_path):
+        schema_metadata = SchemaMetadata(
+            layer="raw",
+            domain="some",
+            dataset="values",
+            sensitivity="PUBLIC",
+            version=2,
+        )
+        (tmp_path / "year=2020").mkdir()
+        (tmp_path / "year=2020" / "file1.parquet").write_bytes(b"data")
+        (tmp_path / "year=2021").mkdir()
+        (tmp_path / "year=2021" / "file1.parquet").write_bytes(b"more data")
+
+        uploaded_files = self.persistence_adapter.upload_staged_data(
+            schema_metadata, tmp_path
+        )
+
+        assert uploaded_files == {
+            "data/raw/some/values/2/year=2020/file1.parquet": 4,
+            "data/raw/some/values/2/year=2021/file1.parquet": 9,
+        }
+
+        self.mock_s3_client.upload_file.assert_has_calls(
+            [
+                call(
+                    Filename=(tmp_path / "year=2020" / "file1.parquet").as_posix(),
+                    Bucket="dataset",
+                    Key="data/raw/some/values/2/year=2020/file1.parquet",
+                ),
+                call(
+                    Filename=(tmp_path / "year=2021" / "file1.parquet").as_posix(),
+                    Bucket="dataset",
+                    Key="data/raw/some/values/2/year=2021/file1.parquet",
+                ),
+            ],
+            any_order=True,
+        )
+
+    def test_upload_staged_data_reports_every_failed_file(self, tmp_path):
+        schema_metadata = SchemaMetadata(
+            layer="raw",
+            domain="some",
+            dataset="values",
+            sensitivity="PUBLIC",
+            version=2,
+        )
+        for partition in ["year=2020", "year=2021", "year=2022"]:
+            (tmp_path / partition).mkdir()
+            (tmp_path / partition / "file1.parquet").write_bytes(b"data")
+
+        def upload_file(Filename, Bucket, Key):
+            if "year=2021" not in Key:
+                raise S3UploadFailedError("Failed to upload")
+
+        self.mock_s3_client.upload_file.side_effect = upload_file
+
+        with pytest.raises(
+            AWSServiceError,
+            match=re.escape(
+                "Failed to store 2 of 3 staged files: "
+                "['data/raw/some/values/2/year=2020/file1.parquet', "
+                "'data/raw/some/values/2/year=2022/file1.parquet']"
+            ),
+        ):
+            self.persistence_adapter.upload_staged_data(schema_metadata, tmp_path)
+
+        assert self.mock_s3_client.upload_file.call_count == 3
 
     def test_raw_data_upload(self):
         schema_metadata = SchemaMetadata(
@@ -159,6 +408,40 @@ class TestS3AdapterUpload:
             Key="raw_data/raw/some/values/2/123-456-789.csv",
         )
 
+    def test_stages_incoming_file(self):
+        key = self.persistence_adapter.upload_incoming_file(
+            Path("abc-123-filename.csv"), "123-456-789"
+        )
+
+        assert key == "incoming_uploads/123-456-789/abc-123-filename.csv"
+        self.mock_s3_client.upload_file.assert_called_once_with(
+            Filename="abc-123-filename.csv", Bucket="dataset", Key=key
+        )
+
+    def test_downloads_incoming_file(self):
+        self.persistence_adapter.download_incoming_file(
+            "incoming_uploads/123-456-789/abc-123-filename.csv",
+            Path("abc-123-filename.csv"),
+        )
+
+        self.mock_s3_client.download_file.assert_called_once_with(
+            Bucket="dataset",
+            Key="incoming_uploads/123-456-789/abc-123-filename.csv",
+            Filename="abc-123-filename.csv",
+        )
+
+    def test_delete_incoming_file_does_not_raise_when_it_fails(self):
+        self.mock_s3_client.delete_object.side_effect = ClientError(
+            error_response={"Error": {"Code": "InternalError"}},
+            operation_name="DeleteObject",
+        )
+
+        self.persistence_adapter.delete_incoming_file("incoming_uploads/key.csv")
+
+        self.mock_s3_client.delete_object.assert_called_once_with(
+            Bucket="dataset", Key="incoming_uploads/key.csv"
+        )
+
 
 class TestS3AdapterDataRetrieval:
     mock_s3_client = None
@@ -200,31 +483,65 @@ class TestS3AdapterDataRetrieval:
             Bucket=self.s3_bucket, Key="raw_data/raw/domain/dataset/2/bad_file"
         )
 
-    def test_get_last_updated_time_success(self):
+    def test_list_objects_from_path(self):
         self.mock_s3_client.get_paginator.return_value.paginate.return_value = [
             {
-                "NextToken": "xxx",
-                "ResponseMetadata": {"key": "value"},
                 "Contents": [
                     {
                         "Key": "data/layer/domain/dataset/1/123-456-789_111-222-333.parquet",
+                        "Size": 100,
                         "LastModified": "2020-01-03",
                     },
+                ],
+            },
+            {
+                "Contents": [
                     {
                         "Key": "data/layer/domain/dataset/1/123-456-789_444-555-666.parquet",
+                        "Size": 200,
                         "LastModified": "2020-01-03",
                     },
+                ],
+            },
+            {},
+        ]
+
+        res = self.persistence_adapter.list_objects_from_path("path")
+
+        assert res == [
+            {
+                "Key": "data/layer/domain/dataset/1/123-456-789_111-222-333.parquet",
+                "Size": 100,
+            },
+            {
+                "Key": "data/layer/domain/dataset/1/123-456-789_444-555-666.parquet",
+                "Size": 200,
+            },
+        ]
+        self.mock_s3_client.get_paginator.return_value.paginate.assert_called_once_with(
+            Bucket=self.s3_bucket, Prefix="path"
+        )
+
+    def test_get_folder_statistics(self):
+        self.mock_s3_client.get_paginator.return_value.paginate.return_value = [
+            {
+                "NextToken": "xxx",
+                "ResponseMetadata": {"key": "value"},
+                "Contents": [
                     {
-                        "Key": "data/layer/domain/dataset/1/123-456-789_777-888-999.parquet",
+                        "Key": "data/layer/domain/dataset/1/123-456-789_111-222-333.parquet",
                         "LastModified": "2020-01-03",
+                        "Size": 100,
                     },
                     {
-                        "Key": "data/layer/domain/dataset/1/999-999-999_111-888-999.parquet",
-                        "LastModified": "2020-01-03",
+                        "Key": "data/layer/domain/dataset/1/123-456-789_444-555-666.parquet",
+                        "LastModified": "2020-01-28",
+                        "Size": 200,
                     },
                     {
-                        "Key": "data/layer/domain/dataset/2/888-888-888_777-888-999.parquet",
-                        "LastModified": "2020-01-28",
+                        "Key": "data/layer/domain/dataset/1/999-999-999_111-888-999.parquet",
+                        "LastModified": "2020-01-03",
+                        "Size": 300,
                     },
                 ],
                 "Name": "data-bucket",
@@ -233,14 +550,66 @@ class TestS3AdapterDataRetrieval:
             }
         ]
 
-        res = self.persistence_adapter.get_last_updated_time("path")
-        assert res == "2020-01-28"
+        res = self.persistence_adapter.get_folder_statistics("path")
+        assert res == {
+            "size_bytes": 600,
+            "object_count": 3,
+            "last_updated": "2020-01-28",
+        }
         self.mock_s3_client.get_paginator.assert_called_once_with("list_objects_v2")
         self.mock_s3_client.get_paginator.return_value.paginate.assert_called_once_with(
             Bucket=self.s3_bucket, Prefix="path"
         )
 
-    def test_get_last_updated_time_when_empty(self):
+    def test_read_parquet_metadata_reads_the_footer_of_each_file(self):
+        content = parquet_content(pd.DataFrame({"value": [1, 2, 3]}))
+        self.mock_s3_client.get_object.side_effect = get_object_tail(content)
+
+        result = self.persistence_adapter.read_parquet_metadata(
+            ["data/file1.parquet", "data/file2.parquet"]
+        )
+
+        assert {key: metadata.num_rows for key, metadata in result.items()} == {
+            "data/file1.parquet": 3,
+            "data/file2.parquet": 3,
+        }
+        self.mock_s3_client.get_object.assert_has_calls(
+            [
+                call(
+                    Bucket=self.s3_bucket,
+                    Key="data/file1.parquet",
+                    Range="bytes=-65536",
+                ),
+                call(
+                    Bucket=self.s3_bucket,
+                    Key="data/file2.parquet",
+                    Range="bytes=-65536",
+                ),
+            ],
+            any_order=True,
+        )
+
+    @patch("api.adapter.s3_adapter.PARQUET_FOOTER_READ_BYTES", 16)
+    def test_read_parquet_metadata_reads_footers_larger_than_the_first_read(self):
+        content = parquet_content(pd.DataFrame({"value": [1, 2, 3]}))
+        footer_length = int.from_bytes(content[-8:-4], "little")
+        self.mock_s3_client.get_object.side_effect = get_object_tail(content)
+
+        result = self.persistence_adapter.read_parquet_metadata(["data/file.parquet"])
+
+        assert result["data/file.parquet"].num_rows == 3
+        self.mock_s3_client.get_object.assert_has_calls(
+            [
+                call(Bucket=self.s3_bucket, Key="data/file.parquet", Range="bytes=-16"),
+                call(
+                    Bucket=self.s3_bucket,
+                    Key="data/file.parquet",
+                    Range=f"bytes=-{footer_length + 8}",
+                ),
+            ]
+        )
+
+    def test_get_folder_statistics_when_empty(self):
         self.mock_s3_client.get_paginator.return_value.paginate.return_value = [
             {
                 "NextToken": "xxx",
@@ -252,8 +621,8 @@ class TestS3AdapterDataRetrieval:
             }
         ]
 
-        res = self.persistence_adapter.get_last_updated_time("path")
-        assert res is None
+        res = self.persistence_adapter.get_folder_statistics("path")
+        assert res == {"size_bytes": 0, "object_count": 0, "last_updated": None}
         self.mock_s3_client.get_paginator.assert_called_once_with("list_objects_v2")
         self.mock_s3_client.get_paginator.return_value.paginate.assert_called_once_with(
             Bucket=self.s3_bucket, Prefix="path"
@@ -277,19 +646,24 @@ class TestS3Deletion:
                 "ResponseMetadata": {"key": "value"},
                 "Contents": [
                     {
-                        "Key": "data/layer/domain/dataset/1/123-456-789_111-222-333.parquet"
+                        "Key": "data/layer/domain/dataset/1/123-456-789_111-222-333.parquet",
+                        "Size": 10,
                     },
                     {
-                        "Key": "data/layer/domain/dataset/1/123-456-789_444-555-666.parquet"
+                        "Key": "data/layer/domain/dataset/1/123-456-789_444-555-666.parquet",
+                        "Size": 10,
                     },
                     {
-                        "Key": "data/layer/domain/dataset/1/123-456-789_777-888-999.parquet"
+                        "Key": "data/layer/domain/dataset/1/123-456-789_777-888-999.parquet",
+                        "Size": 10,
                     },
                     {
-                        "Key": "data/layer/domain/dataset/1/999-999-999_111-888-999.parquet"
+                        "Key": "data/layer/domain/dataset/1/999-999-999_111-888-999.parquet",
+                        "Size": 10,
                     },
                     {
-                        "Key": "data/layer/domain/dataset/2/888-888-888_777-888-999.parquet"
+                        "Key": "data/layer/domain/dataset/2/888-888-888_777-888-999.parquet",
+                        "Size": 10,
                     },
                 ],
                 "Name": "data-bucket",
@@ -311,7 +685,7 @@ class TestS3Deletion:
             ],
         }
 
-        self.persistence_adapter.delete_dataset_files(
+        size_change = self.persistence_adapter.delete_dataset_files(
             DatasetMetadata(
                 "layer",
                 "domain",
@@ -320,6 +694,8 @@ class TestS3Deletion:
             ),
             "123-456-789.csv",
         )
+
+        assert size_change == DatasetSizeChange(size_bytes=-30, object_count=-3)
         self.mock_s3_client.get_paginator.assert_called_once_with("list_objects_v2")
         self.mock_s3_client.get_paginator.return_value.paginate.assert_called_once_with(
             Bucket="data-bucket", Prefix="data/layer/domain/dataset/1"
@@ -349,19 +725,24 @@ class TestS3Deletion:
                 "ResponseMetadata": {"key": "value"},
                 "Contents": [
                     {
-                        "Key": "data/layer/domain/dataset/1/2022/123-456-789_111-222-333.parquet"
+                        "Key": "data/layer/domain/dataset/1/2022/123-456-789_111-222-333.parquet",
+                        "Size": 10,
                     },
                     {
-                        "Key": "data/layer/domain/dataset/1/2021/123-456-789_444-555-666.parquet"
+                        "Key": "data/layer/domain/dataset/1/2021/123-456-789_444-555-666.parquet",
+                        "Size": 10,
                     },
                     {
-                        "Key": "data/layer/domain/dataset/1/2019/123-456-789_777-888-999.parquet"
+                        "Key": "data/layer/domain/dataset/1/2019/123-456-789_777-888-999.parquet",
+                        "Size": 10,
                     },
                     {
-                        "Key": "data/layer/domain/dataset/1/2019/999-999-999_111-888-999.parquet"
+                        "Key": "data/layer/domain/dataset/1/2019/999-999-999_111-888-999.parquet",
+                        "Size": 10,
                     },
                     {
-                        "Key": "data/layer/domain/dataset/2/2022/888-888-888_777-888-999.parquet"
+                        "Key": "data/layer/domain/dataset/2/2022/888-888-888_777-888-999.parquet",
+                        "Size": 10,
                     },
                 ],
                 "Name": "data-bucket",
@@ -383,9 +764,11 @@ class TestS3Deletion:
             ]
         }
 
-        self.persistence_adapter.delete_dataset_files(
+        size_change = self.persistence_adapter.delete_dataset_files(
             DatasetMetadata("layer", "domain", "dataset", 1), "123-456-789.csv"
         )
+
+        assert size_change == DatasetSizeChange(size_bytes=-30, object_count=-3)
         self.mock_s3_client.get_paginator.assert_called_once_with("list_objects_v2")
         self.mock_s3_client.get_paginator.return_value.paginate.assert_called_once_with(
             Bucket="data-bucket", Prefix="data/layer/domain/dataset/1"
@@ -408,6 +791,72 @@ class TestS3Deletion:
             },
         )
 
+    def test_deletion_of_dataset_files_removes_upload_from_compacted_files(self):
+        shared = write_compacted_file(
+            [
+                ("123-456-789", pa.table({"value": [1, 2]})),
+                ("999-999-999", pa.table({"value": [3]})),
+            ]
+        )
+        only_upload = write_compacted_file([("123-456-789", pa.table({"value": [4]}))])
+        other_upload = write_compacted_file([("999-999-999", pa.table({"value": [5]}))])
+        contents = {
+            "data/layer/domain/dataset/1/2022/compacted-1.parquet": shared,
+            "data/layer/domain/dataset/1/2021/compacted-2.parquet": only_upload,
+            "data/layer/domain/dataset/1/2019/compacted-3.parquet": other_upload,
+        }
+        self.persistence_adapter.list_objects_from_path = Mock(
+            return_value=[
+                *[
+                    {"Key": key, "Size": len(content)}
+                    for key, content in contents.items()
+                ],
+                {
+                    "Key": "data/layer/domain/dataset/1/2019/123-456-789_777-888-999.parquet",
+                    "Size": 100,
+                },
+            ]
+        )
+        self.persistence_adapter.read_parquet_metadata = Mock(
+            side_effect=lambda keys: {
+                key: pq.read_metadata(pa.BufferReader(contents[key])) for key in keys
+            }
+        )
+        self.persistence_adapter.retrieve_data = Mock(
+            side_effect=lambda key: io.BytesIO(contents[key])
+        )
+        self.mock_s3_client.delete_objects.return_value = {}
+
+        size_change = self.persistence_adapter.delete_dataset_files(
+            DatasetMetadata("layer", "domain", "dataset", 1), "123-456-789.csv"
+        )
+
+        put_arguments = self.mock_s3_client.put_object.call_args.kwargs
+        assert size_change == DatasetSizeChange(
+            size_bytes=len(put_arguments["Body"])
+            - len(shared)
+            - 100
+            - len(only_upload),
+            object_count=-2,
+        )
+        assert put_arguments["Key"] == (
+            "data/layer/domain/dataset/1/2022/compacted-1.parquet"
+        )
+        assert pq.read_table(pa.BufferReader(put_arguments["Body"])).to_pydict() == {
+            "value": [3]
+        }
+        self.mock_s3_client.delete_objects.assert_called_once_with(
+            Bucket="data-bucket",
+            Delete={
+                "Objects": [
+                    {
+                        "Key": "data/layer/domain/dataset/1/2019/123-456-789_777-888-999.parquet"
+                    },
+                    {"Key": "data/layer/domain/dataset/1/2021/compacted-2.parquet"},
+                ],
+            },
+        )
+
     def test_deletion_of_dataset_files_when_error_is_thrown(self):
         self.mock_s3_client.delete_objects.return_value = {
             "Errors": [
@@ -426,27 +875,28 @@ class TestS3Deletion:
             ]
         }
         msg = "The item \\[123-456-789.csv\\] could not be deleted. Please contact your administrator."
-        self.persistence_adapter.list_files_from_path = Mock(
-            return_value=["data/123-456-789.csv"]
+        self.persistence_adapter.list_objects_from_path = Mock(
+            return_value=[{"Key": "data/123-456-789.csv", "Size": 10}]
         )
         with pytest.raises(AWSServiceError, match=msg):
             self.persistence_adapter.delete_dataset_files(
                 DatasetMetadata("layer", "domain", "dataset", 3), "123-456-789.csv"
             )
 
-        self.persistence_adapter.list_files_from_path.assert_called_once_with(
+        self.persistence_adapter.list_objects_from_path.assert_called_once_with(
             "data/layer/domain/dataset/3"
         )
 
     def test_no_deletion_is_attempted_if_there_are_no_files(self):
-        self.persistence_adapter.list_files_from_path = Mock(return_value=[""])
+        self.persistence_adapter.list_objects_from_path = Mock(return_value=[])
         self.persistence_adapter._delete_objects = Mock()
 
-        self.persistence_adapter.delete_dataset_files(
+        size_change = self.persistence_adapter.delete_dataset_files(
             DatasetMetadata("layer", "domain", "dataset", 3), "123-456-789.csv"
         )
 
-        self.persistence_adapter.list_files_from_path.assert_called_once_with(
+        assert size_change == DatasetSizeChange()
+        self.persistence_adapter.list_objects_from_path.assert_called_once_with(
             "data/layer/domain/dataset/3"
         )
         self.mock_s3_client.delete_objects.assert_not_called()
@@ -508,20 +958,24 @@ class TestS3Deletion:
                 "data/layer/domain/dataset/1/789-123.parquet",
             ]
         )
-        self.persistence_adapter._delete_data = Mock()
+        self.mock_s3_client.delete_objects.return_value = {}
 
         self.persistence_adapter.delete_previous_dataset_files(
             DatasetMetadata("layer", "domain", "dataset", 1), "123-456"
         )
-        expected_calls = [
-            call("data/layer/domain/dataset/1/abc-def.parquet"),
-            call("data/layer/domain/dataset/1/789-123.parquet"),
-        ]
 
         self.persistence_adapter.list_files_from_path.assert_called_once_with(
             "data/layer/domain/dataset/1"
         )
-        self.persistence_adapter._delete_data.assert_has_calls(expected_calls)
+        self.mock_s3_client.delete_objects.assert_called_once_with(
+            Bucket="data-bucket",
+            Delete={
+                "Objects": [
+                    {"Key": "data/layer/domain/dataset/1/abc-def.parquet"},
+                    {"Key": "data/layer/domain/dataset/1/789-123.parquet"},
+                ]
+            },
+        )
 
     def test_delete_previous_dataset_files_when_none_exist(self):
         self.persistence_adapter.list_files_from_path = Mock(
@@ -529,7 +983,6 @@ class TestS3Deletion:
                 "data/layer/domain/dataset/1/123-456.parquet",
             ]
         )
-        self.persistence_adapter._delete_data = Mock()
 
         self.persistence_adapter.delete_previous_dataset_files(
             DatasetMetadata("layer", "domain", "dataset", 1), "123-456"
@@ -538,7 +991,49 @@ class TestS3Deletion:
         self.persistence_adapter.list_files_from_path.assert_called_once_with(
             "data/layer/domain/dataset/1"
         )
-        self.persistence_adapter._delete_data.assert_not_called()
+        self.mock_s3_client.delete_objects.assert_not_called()
+
+    @patch("api.adapter.s3_adapter.S3_DELETE_BATCH_SIZE", 2)
+    def test_deletes_files_in_batches(self):
+        keys = [
+            f"data/layer/domain/dataset/1/file{index}.parquet" for index in range(5)
+        ]
+        self.mock_s3_client.delete_objects.return_value = {}
+
+        self.persistence_adapter.delete_dataset_files_using_key(keys, "dataset")
+
+        batches = [
+            [item["Key"] for item in delete_call.kwargs["Delete"]["Objects"]]
+            for delete_call in self.mock_s3_client.delete_objects.call_args_list
+        ]
+        assert sorted(batches) == [keys[0:2], keys[2:4], keys[4:5]]
+
+    @patch("api.adapter.s3_adapter.S3_DELETE_BATCH_SIZE", 2)
+    def test_attempts_every_batch_and_reports_failures_together(self):
+        keys = [
+            f"data/layer/domain/dataset/1/file{index}.parquet" for index in range(5)
+        ]
+
+        def delete_objects(Bucket, Delete):
+            batch_keys = [item["Key"] for item in Delete["Objects"]]
+            if keys[0] in batch_keys:
+                raise ClientError(
+                    error_response={"Error": {"Code": "InternalError"}},
+                    operation_name="DeleteObjects",
+                )
+            if keys[4] in batch_keys:
+                return {"Errors": [{"Key": keys[4], "Code": "AccessDenied"}]}
+            return {"Deleted": [{"Key": key} for key in batch_keys]}
+
+        self.mock_s3_client.delete_objects.side_effect = delete_objects
+
+        with pytest.raises(
+            AWSServiceError,
+            match=r"The item \[dataset\] could not be deleted. Please contact your administrator.",
+        ):
+            self.persistence_adapter.delete_dataset_files_using_key(keys, "dataset")
+
+        assert self.mock_s3_client.delete_objects.call_count == 3
 
 
 class TestS3FileList:
@@ -0,0 +1,137 @@
+from unittest.mock import Mock
+
+from api.adapter.schema_cache import SchemaCache
+from api.domain.dataset_metadata import DatasetMetadata
+from api.domain.schema import Column, Schema
+from api.domain.schema_metadata import Owner, SchemaMetadata
+
+
+def build_schema(dataset: str, version: int) -> Schema:
+    return Schema(
+        metadata=SchemaMetadata(
+            layer="raw",
+            domain="domain",
+            dataset=dataset,
+            version=version,
+            sensitivity="PUBLIC",
+            owners=[Owner(name="owner", email="owner@email.com")],
+        ),
+        columns=[
+            Column(
+                name="colname1", partition_index=None, data_type="int", allow_null=True
+            )
+        ],
+    )
+
+
+DATASET = DatasetMetadata("raw", "domain", "dataset")
+SCHEMA_V1 = build_schema("dataset", 1)
+SCHEMA_V2 = build_schema("dataset", 2)
+OTHER_SCHEMA = build_schema("other", 1)
+
+
+class TestSchemaCache:
+    def setup_method(self):
+        self.now = 1000.0
+        self.schema_cache = SchemaCache(ttl=60, clock=lambda: self.now)
+
+    def test_reads_cached_schemas_until_they_expire(self):
+        load = Mock(side_effect=[SCHEMA_V1, SCHEMA_V2])
+
+        first = self.schema_cache.get_schema(DATASET, None, load)
+        self.now += 59
+        second = self.schema_cache.get_schema(DATASET, None, load)
+        self.now += 1
+        third = self.schema_cache.get_schema(DATASET, None, load)
+
+        assert (first, second, third) == (SCHEMA_V1, SCHEMA_V1, SCHEMA_V2)
+        assert load.call_count == 2
+
+    def test_caches_schemas_by_version(self):
+        self.schema_cache.get_schema(DATASET, 1, lambda: SCHEMA_V1)
+        self.schema_cache.get_schema(DATASET, 2, lambda: SCHEMA_V2)
+        load = Mock()
+
+        assert self.schema_cache.get_schema(DATASET, 1, load) == SCHEMA_V1
+        assert self.schema_cache.get_schema(DATASET, 2, load) == SCHEMA_V2
+        load.assert_not_called()
+
+    def test_latest_schema_is_also_cached_by_its_version(self):
+        self.schema_cache.get_schema(DATASET, None, lambda: SCHEMA_V2)
+        load = Mock()
+
+        assert self.schema_cache.get_schema(DATASET, 2, load) == SCHEMA_V2
+        load.assert_not_called()
+
+    def test_versioned_schema_is_not_the_latest(self):
+        self.schema_cache.get_schema(DATASET, 1, lambda: SCHEMA_V1)
+
+        assert (
+            self.schema_cache.get_schema(DATASET, None, lambda: SCHEMA_V2) == SCHEMA_V2
+        )
+
+    def test_does_not_cache_missing_schemas(self):
+        load = Mock(side_effect=[None, SCHEMA_V1])
+
+        assert self.schema_cache.get_schema(DATASET, None, load) is None
+        assert self.schema_cache.get_schema(DATASET, None, load) == SCHEMA_V1
+
+    def test_invalidate_dataset_only_removes_that_dataset(self):
+        other_dataset = DatasetMetadata("raw", "domain", "other")
+        self.schema_cache.get_schema(DATASET, None, lambda: SCHEMA_V1)
+        self.schema_cache.get_schema(DATASET, 1, lambda: SCHEMA_V1)
+        self.schema_cache.get_schema(other_dataset, None, lambda: OTHER_SCHEMA)
+
+        self.schema_cache.invalidate_dataset(
+            DatasetMetadata("raw", "domain", "dataset", 1)
+        )
+
+        assert (
+            self.schema_cache.get_schema(DATASET, None, lambda: SCHEMA_V2) == SCHEMA_V2
+        )
+        assert self.schema_cache.get_schema(DATASET, 1, lambda: None) is None
+        assert self.schema_cache.get_schema(other_dataset, None, Mock()) == OTHER_SCHEMA
+
+    def test_does_not_cache_schemas_read_before_an_invalidation(self):
+        def load():
+            self.schema_cache.invalidate_dataset(DATASET)
+            return SCHEMA_V1
+
+        self.schema_cache.get_schema(DATASET, None, load)
+
+        assert (
+            self.schema_cache.get_schema(DATASET, None, lambda: SCHEMA_V2) == SCHEMA_V2
+        )
+
+    def test_changing_a_schema_does_not_change_the_cached_schema(self):
+        loaded = self.schema_cache.get_schema(
+            DATASET, None, lambda: build_schema("dataset", 1)
+        )
+        loaded.metadata.description = "changed by the caller"
+        cached = self.schema_cache.get_schema(DATASET, None, Mock())
+        cached.columns[0].allow_null = False
+
+        assert self.schema_cache.get_schema(DATASET, None, Mock()) == SCHEMA_V1
+
+    def test_zero_ttl_turns_the_cache_off(self):
+        schema_cache = SchemaCache(ttl=0)
+        load = Mock(return_value=SCHEMA_V1)
+
+        schema_cache.get_schema(DATASET, None, load)
+        schema_cache.get_schema(DATASET, None, load)
+
+        assert load.call_count == 2
+
+    def test_reports_metrics(self):
+        self.schema_cache.get_schema(DATASET, None, lambda: SCHEMA_V1)
+        self.schema_cache.get_schema(DATASET, None, lambda: SCHEMA_V1)
+        self.schema_cache.invalidate_dataset(DATASET)
+
+        assert self.schema_cache.metrics() == {
+            "hits": 1,
+            "misses": 1,
+            "hit_ratio": 0.5,
+            "invalidations": 1,
+            "entries": 0,
+            "ttl_seconds": 60,
+        }
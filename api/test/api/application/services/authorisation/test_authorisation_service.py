@@ -5,11 +5,14 @@ from fastapi import HTTPException
 from fastapi.security import SecurityScopes
 from jwt.exceptions import InvalidTokenError
 import pytest
+from starlette.requests import Request
 
 from api.application.services.authorisation.authorisation_service import (
     secure_dataset_endpoint,
     check_credentials_availability,
     check_permissions,
+    get_request_token,
+    get_subject_id,
     secure_endpoint,
     have_credentials,
     validate_token,
@@ -18,7 +21,7 @@ from api.application.services.authorisation.dataset_access_evaluator import (
     DatasetAccessEvaluator,
 )
 from api.application.services.permissions_service import PermissionsService
-from api.common.config.auth import Action
+from api.common.config.auth import ShareEz_ACCESS_TOKEN, Action
 from api.common.custom_exceptions import (
     AuthorisationError,
     UserCredentialsUnavailableError,
@@ -35,6 +38,15 @@ class MockToken:
     subject: str
 
 
+def build_request(client_token: str = None, user_token: str = None) -> Request:
+    headers = []
+    if client_token:
+        headers.append((b"authorization", f"Bearer {client_token}".encode()))
+    if user_token:
+        headers.append((b"cookie", f"{ShareEz_ACCESS_TOKEN}={user_token}".encode()))
+    return Request({"type": "http", "headers": headers})
+
+
 class TestCheckCredentialsAvailability:
     def test_succeeds_when_at_least_user_credential_type_available(self):
         try:
@@ -150,6 +162,49 @@ class TestValidateToken:
         )
         mock_parse_token.assert_called_once_with("client-token")
 
+    @patch("api.application.services.authorisation.authorisation_service.parse_token")
+    def test_reuses_the_token_parsed_for_the_request(self, mock_parse_token):
+        request = build_request(client_token="client-token")
+        token = Token({"sub": "the-client-id"})
+        request.state.token = token
+
+        res = validate_token(False, "client-token", None, request)
+
+        mock_parse_token.assert_not_called()
+        assert res == token
+
+
+class TestGetRequestToken:
+    @patch("api.application.services.authorisation.authorisation_service.parse_token")
+    def test_parses_the_token_once_per_request(self, mock_parse_token):
+        request = build_request(user_token="user-token")
+        token = Token({"sub": "the-user-id"})
+        mock_parse_token.return_value = token
+
+        assert get_request_token(request) == token
+        assert get_subject_id(request) == "the-user-id"
+
+        mock_parse_token.assert_called_once_with("user-token")
+        assert request.state.token == token
+
+    @patch("api.application.services.authorisation.authorisation_service.parse_token")
+    def test_favours_client_token_when_both_tokens_available(self, mock_parse_token):
+        request = build_request(client_token="client-token", user_token="user-token")
+
+        get_request_token(request)
+
+        mock_parse_token.assert_called_once_with("client-token")
+
+    @patch("api.application.services.authorisation.authorisation_service.parse_token")
+    def test_does_not_keep_tokens_that_fail_to_parse(self, mock_parse_token):
+        request = build_request(client_token="invalid-token")
+        mock_parse_token.side_effect = InvalidTokenError()
+
+        with pytest.raises(InvalidTokenError):
+            get_request_token(request)
+
+        assert getattr(request.state, "token", None) is None
+
 
 class TestCheckPermissions:
     @patch.object(PermissionsService, "get_subject_permissions")
@@ -213,7 +268,7 @@ class TestSecureEndpoint:
 
         mock_check_permissions.assert_called_once_with(client_token, scopes)
         mock_validate_token.assert_called_once_with(
-            browser_request, client_token, user_token
+            browser_request, client_token, user_token, None
         )
 
     @patch("api.application.services.authorisation.authorisation_service.parse_token")
@@ -315,7 +370,7 @@ class TestSecureDatasetEndpoint:
         )
 
         mock_validate_token.assert_called_once_with(
-            browser_request, client_token, user_token
+            browser_request, client_token, user_token, None
         )
         mock_process_dataset_metadata.assert_called_once_with(layer, domain, dataset)
         mock_can_access_dataset.assert_called_once_with(metadata, subject_id, ["READ"])
@@ -30,12 +30,14 @@ class TestDatasetAccessEvaluator:
         assert actual == expected
 
     @pytest.mark.parametrize(
-        "permission, input_filters, expected_filters",
+        "permissions, input_filters, expected_filters",
         [
             (
-                PermissionItem(
-                    id="READ_ALL_ALL", layer="ALL", sensitivity="ALL", type="READ"
-                ),
+                [
+                    PermissionItem(
+                        id="READ_ALL_ALL", layer="ALL", sensitivity="ALL", type="READ"
+                    )
+                ],
                 DatasetFilters(),
                 DatasetFilters(
                     sensitivity=["PUBLIC", "PRIVATE", "PROTECTED"],
@@ -43,42 +45,44 @@ class TestDatasetAccessEvaluator:
                 ),
             ),
             (
-                PermissionItem(
-                    id="WRITE_RAW_ALL",
-                    layer="RAW",
-                    sensitivity="ALL",
-                    type="WRITE",
-                ),
+                [
+                    PermissionItem(
+                        id="WRITE_ALL_PUBLIC",
+                        layer="ALL",
+                        sensitivity="PUBLIC",
+                        type="WRITE",
+                    ),
+                    PermissionItem(
+                        id="WRITE_RAW_PRIVATE",
+                        layer="RAW",
+                        sensitivity="PRIVATE",
+                        type="WRITE",
+                    ),
+                ],
                 DatasetFilters(),
                 DatasetFilters(
-                    sensitivity=["PUBLIC", "PRIVATE", "PROTECTED"], layer=["raw"]
+                    sensitivity=["PUBLIC", "PRIVATE"], layer=["raw", "layer"]
                 ),
             ),
             (
-                PermissionItem(
-                    id="WRITE_ALL_PUBLIC",
-                    layer="ALL",
-                    sensitivity="PUBLIC",
-                    type="WRITE",
-                ),
-                DatasetFilters(),
-                DatasetFilters(sensitivity=["PUBLIC"], layer=["raw", "layer"]),
-            ),
-            (
-                PermissionItem(
-                    id="READ_RAW_PROTECTED_TEST",
-                    layer="RAW",
-                    sensitivity="PROTECTED",
-                    type="READ",
-                    domain="TEST",
-                ),
+                [
+                    PermissionItem(
+                        id="READ_RAW_PROTECTED_TEST",
+                        layer="RAW",
+                        sensitivity="PROTECTED",
+                        type="READ",
+                        domain="TEST",
+                    )
+                ],
                 DatasetFilters(),
-                DatasetFilters(sensitivity=["PROTECTED"], layer=["raw"], domain="TEST"),
+                DatasetFilters(sensitivity=["PROTECTED"], layer=["raw"]),
             ),
             (
-                PermissionItem(
-                    id="READ_ALL_ALL", layer="ALL", sensitivity="ALL", type="READ"
-                ),
+                [
+                    PermissionItem(
+                        id="READ_ALL_ALL", layer="ALL", sensitivity="ALL", type="READ"
+                    )
+                ],
                 DatasetFilters(key_only_tags=["tag1"]),
                 DatasetFilters(
                     sensitivity=["PUBLIC", "PRIVATE", "PROTECTED"],
@@ -87,36 +91,36 @@ class TestDatasetAccessEvaluator:
                 ),
             ),
             (
-                PermissionItem(
-                    id="WRITE_ALL_PUBLIC",
-                    layer="ALL",
-                    sensitivity="PUBLIC",
-                    type="WRITE",
-                ),
-                DatasetFilters(sensitivity="ALL"),
+                [
+                    PermissionItem(
+                        id="WRITE_ALL_PUBLIC",
+                        layer="ALL",
+                        sensitivity="PUBLIC",
+                        type="WRITE",
+                    )
+                ],
+                DatasetFilters(sensitivity="ALL", layer="raw", domain="other"),
                 DatasetFilters(sensitivity=["PUBLIC"], layer=["raw", "layer"]),
             ),
         ],
     )
-    def test_extract_datasets_from_permission(
-        self, permission, input_filters, expected_filters
+    def test_fetch_datasets_reads_schemas_once_for_all_permissions(
+        self, permissions, input_filters, expected_filters
     ):
-        self.schema_service.get_schema_metadatas = Mock()
-        self.schema_service.get_schema_metadatas.return_value = "dataset"
+        self.schema_service.get_schema_metadatas = Mock(return_value=[])
 
-        res = self.evaluator.extract_datasets_from_permission(permission, input_filters)
+        self.evaluator.fetch_datasets(permissions, input_filters)
 
         self.schema_service.get_schema_metadatas.assert_called_once_with(
             expected_filters
         )
-        assert res == "dataset"
 
     def test_fetch_datasets(self):
         permissions = [
             PermissionItem(
-                id="READ_ALL",
+                id="READ_ALL_PUBLIC",
                 layer="ALL",
-                sensitivity="ALL",
+                sensitivity="PUBLIC",
                 type="READ",
             ),
             PermissionItem(
@@ -128,43 +132,35 @@ class TestDatasetAccessEvaluator:
             ),
         ]
 
-        self.evaluator.extract_datasets_from_permission = Mock(
-            side_effect=[
-                [
-                    DatasetMetadata(layer="raw", domain="domain", dataset="dataset"),
-                    DatasetMetadata(layer="raw", domain="domain_1", dataset="dataset"),
-                ],
-                [
-                    DatasetMetadata(layer="raw", domain="domain", dataset="dataset"),
-                    DatasetMetadata(layer="raw", domain="domain_2", dataset="dataset"),
-                ],
+        def schema_metadata(layer, domain, sensitivity):
+            return SchemaMetadata(
+                layer=layer, domain=domain, dataset="dataset", sensitivity=sensitivity
+            )
+
+        self.schema_service.get_schema_metadatas = Mock(
+            return_value=[
+                schema_metadata("raw", "domain_2", "PUBLIC"),
+                schema_metadata("raw", "test", "PROTECTED"),
+                schema_metadata("raw", "other", "PROTECTED"),
+                schema_metadata("layer", "test", "PROTECTED"),
+                schema_metadata("layer", "domain_1", "PUBLIC"),
             ]
         )
 
-        expected = [
-            DatasetMetadata(
-                layer="raw",
-                domain="domain",
-                dataset="dataset",
-                version=None,
-            ),
-            DatasetMetadata(
-                layer="raw",
-                domain="domain_1",
-                dataset="dataset",
-                version=None,
-            ),
-            DatasetMetadata(
-                layer="raw",
-                domain="domain_2",
-                dataset="dataset",
-                version=None,
-            ),
+        res = self.evaluator.fetch_datasets(permissions)
+
+        assert res == [
+            schema_metadata("layer", "domain_1", "PUBLIC"),
+            schema_metadata("raw", "domain_2", "PUBLIC"),
+            schema_metadata("raw", "test", "PROTECTED"),
         ]
+        self.schema_service.get_schema_metadatas.assert_called_once()
 
-        res = self.evaluator.fetch_datasets(permissions)
+    def test_fetch_datasets_without_permissions(self):
+        res = self.evaluator.fetch_datasets([])
 
-        assert res == expected
+        assert res == []
+        self.schema_service.get_schema_metadatas.assert_not_called()
 
     @pytest.mark.parametrize(
         "metadata, permission, expected",
@@ -1,11 +1,17 @@
 from unittest.mock import patch, Mock
 
+from jwt.exceptions import PyJWKClientConnectionError
+
 import pytest
 
 from api.application.services.authorisation.token_utils import (
+    VerifiedTokenCache,
     parse_token,
     get_validated_token_payload,
+    refresh_signing_keys,
 )
+from api.common.custom_exceptions import AuthorisationError
+from api.domain.token import Token
 
 
 class TestParseToken:
@@ -71,6 +77,20 @@ class TestParseToken:
         with pytest.raises(ValueError, match="Error detail"):
             parse_token("user-token")
 
+    @pytest.mark.parametrize("token", [None, ""])
+    @patch(
+        "api.application.services.authorisation.token_utils.get_validated_token_payload"
+    )
+    def test_raises_authorisation_error_without_a_token(
+        self, mock_token_payload, token
+    ):
+        with pytest.raises(
+            AuthorisationError, match="You are not authorised to perform this action"
+        ):
+            parse_token(token)
+
+        mock_token_payload.assert_not_called()
+
     @patch("jwt.decode")
     @patch("api.application.services.authorisation.token_utils.jwks_client")
     def test_extract_token_permissions_for_users(self, mock_jwks_client, mock_decode):
@@ -91,3 +111,114 @@ class TestParseToken:
             "cognito:groups": ["READ/domain/dataset", "WRITE/domain/dataset"],
             "scope": "phone openid email",
         }
+
+    @patch(
+        "api.application.services.authorisation.token_utils.verified_token_cache",
+        VerifiedTokenCache(clock=lambda: 1000),
+    )
+    @patch(
+        "api.application.services.authorisation.token_utils.get_validated_token_payload"
+    )
+    def test_verifies_a_token_once_until_it_expires(self, mock_token_payload):
+        mock_token_payload.return_value = {"sub": "the-client-id", "exp": 2000}
+
+        first = parse_token("client-token")
+        second = parse_token("client-token")
+
+        mock_token_payload.assert_called_once_with("client-token")
+        assert first is second
+        assert second.subject == "the-client-id"
+
+    @patch(
+        "api.application.services.authorisation.token_utils.verified_token_cache",
+        VerifiedTokenCache(clock=lambda: 1000),
+    )
+    @patch(
+        "api.application.services.authorisation.token_utils.get_validated_token_payload"
+    )
+    def test_does_not_cache_tokens_that_fail_verification(self, mock_token_payload):
+        mock_token_payload.side_effect = [
+            ValueError("Error detail"),
+            {"sub": "the-client-id", "exp": 2000},
+        ]
+
+        with pytest.raises(ValueError, match="Error detail"):
+            parse_token("client-token")
+
+        assert parse_token("client-token").subject == "the-client-id"
+        assert mock_token_payload.call_count == 2
+
+
+class TestVerifiedTokenCache:
+    def setup_method(self):
+        self.now = 1000
+        self.cache = VerifiedTokenCache(max_size=2, clock=lambda: self.now)
+
+    def test_serves_tokens_until_they_expire(self):
+        token = Token({"sub": "the-user-id"})
+        self.cache.put("user-token", token, 1060)
+
+        assert self.cache.get("user-token") is token
+        self.now = 1060
+        assert self.cache.get("user-token") is None
+        assert self.cache.metrics()["entries"] == 0
+
+    def test_does_not_cache_tokens_without_an_expiry(self):
+        self.cache.put("user-token", Token({"sub": "the-user-id"}), None)
+
+        assert self.cache.get("user-token") is None
+
+    def test_evicts_the_least_recently_used_token(self):
+        first, second, third = (Token({"sub": f"subject-{i}"}) for i in range(3))
+        self.cache.put("first", first, 2000)
+        self.cache.put("second", second, 2000)
+        self.cache.get("first")
+
+        self.cache.put("third", third, 2000)
+
+        assert self.cache.get("first") is first
+        assert self.cache.get("second") is None
+        assert self.cache.get("third") is third
+
+    def test_keys_tokens_by_their_hash(self):
+        self.cache.put("user-token", Token({"sub": "the-user-id"}), 2000)
+
+        assert "user-token" not in self.cache._tokens
+
+    def test_is_turned_off_with_no_entries(self):
+        cache = VerifiedTokenCache(max_size=0, clock=lambda: self.now)
+        cache.put("user-token", Token({"sub": "the-user-id"}), 2000)
+
+        assert cache.get("user-token") is None
+
+    def test_reports_metrics(self):
+        self.cache.put("user-token", Token({"sub": "the-user-id"}), 2000)
+        self.cache.get("user-token")
+        self.cache.get("other-token")
+
+        assert self.cache.metrics() == {
+            "hits": 1,
+            "misses": 1,
+            "hit_ratio": 0.5,
+            "entries": 1,
+            "max_entries": 2,
+        }
+
+
+class TestRefreshSigningKeys:
+    @patch("api.application.services.authorisation.token_utils.jwks_client")
+    def test_fetches_the_key_set(self, mock_jwks_client):
+        refresh_signing_keys()
+
+        mock_jwks_client.get_jwk_set.assert_called_once_with(refresh=True)
+
+    @patch("api.application.services.authorisation.token_utils.AppLogger")
+    @patch("api.application.services.authorisation.token_utils.jwks_client")
+    def test_logs_failures_to_fetch_the_key_set(self, mock_jwks_client, mock_logger):
+        mock_jwks_client.get_jwk_set.side_effect = PyJWKClientConnectionError("down")
+
+        refresh_signing_keys()
+
+        mock_logger.warning.assert_called_once_with(
+            "Failed to refresh the token signing keys: down"
+        )
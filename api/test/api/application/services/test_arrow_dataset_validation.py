@@ -0,0 +1,279 @@
+import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from api.application.services.arrow_dataset_validation import (
+    build_validated_table,
+    clean_column_headers,
+    convert_date_columns,
+    remove_empty_rows,
+    table_has_acceptable_null_values,
+    table_has_correct_columns,
+    table_has_correct_data_types,
+    table_has_no_illegal_characters_in_partition_columns,
+    table_has_rows,
+)
+from api.application.services.dataset_validation import build_validated_dataframe
+from api.common.custom_exceptions import (
+    DatasetValidationError,
+    UnprocessableDatasetError,
+)
+from api.domain.schema import Schema, Column
+from api.domain.schema_metadata import Owner, SchemaMetadata
+
+
+class TestArrowDatasetValidation:
+    def setup_method(self):
+        self.schema_metadata = SchemaMetadata(
+            layer="raw",
+            domain="test_domain",
+            dataset="test_dataset",
+            sensitivity="PUBLIC",
+            owners=[Owner(name="owner", email="owner@email.com")],
+        )
+
+        self.valid_schema = Schema(
+            metadata=self.schema_metadata,
+            columns=[
+                Column(
+                    name="colname1",
+                    partition_index=0,
+                    data_type="int",
+                    allow_null=True,
+                ),
+                Column(
+                    name="colname2",
+                    partition_index=None,
+                    data_type="string",
+                    allow_null=False,
+                ),
+                Column(
+                    name="colname3",
+                    partition_index=None,
+                    data_type="boolean",
+                    allow_null=True,
+                ),
+                Column(
+                    name="colname4",
+                    partition_index=None,
+                    data_type="date",
+                    allow_null=True,
+                    format="%d/%m/%Y",
+                ),
+            ],
+        )
+
+    def test_fully_valid_table(self):
+        batch = pa.RecordBatch.from_pydict(
+            {
+                "colname3": [True, False],
+                "ColName1": [1234, 4567],
+                "colname2": ["Carlos", "Ada"],
+                "colname4": ["12/06/2021", "01/01/2000"],
+            }
+        )
+
+        validated_table = build_validated_table(self.valid_schema, batch)
+
+        assert validated_table.column_names == [
+            "colname1",
+            "colname2",
+            "colname3",
+            "colname4",
+        ]
+        assert validated_table.schema == self.valid_schema.generate_storage_schema()
+        assert validated_table.column("colname4").to_pylist() == [
+            datetime.date(2021, 6, 12),
+            datetime.date(2000, 1, 1),
+        ]
+
+    def test_matches_pandas_validation_output(self):
+        data = {
+            "colname1": [1234, 4567],
+            "colname2": ["Carlos", "Ada"],
+            "colname3": [True, None],
+            "colname4": ["12/06/2021", "01/01/2000"],
+        }
+
+        validated_table = build_validated_table(
+            self.valid_schema, pa.RecordBatch.from_pydict(data)
+        )
+        validated_dataframe = build_validated_dataframe(
+            self.valid_schema, pd.DataFrame(data)
+        )
+
+        assert validated_table.equals(
+            pa.Table.from_pandas(
+                validated_dataframe,
+                schema=self.valid_schema.generate_storage_schema(),
+                preserve_index=False,
+            )
+        )
+
+    def test_invalid_table_reports_all_errors(self):
+        batch = pa.RecordBatch.from_pydict(
+            {
+                "colname1": [1.5, 2.5],
+                "colname2": ["Carlos", None],
+                "colname3": [True, False],
+                "colname4": ["2021-06-12", "2000-01-01"],
+            }
+        )
+
+        with pytest.raises(DatasetValidationError) as error:
+            build_validated_table(self.valid_schema, batch)
+
+        assert set(error.value.message) == {
+            "Failed to convert column [colname1] to type [int]",
+            "Column [colname2] does not allow null values",
+            "Column [colname4] does not match specified date format in at least one row",
+        }
+
+    def test_table_has_rows(self):
+        table = pa.table({"colname1": pa.array([], pa.int64())})
+
+        with pytest.raises(
+            UnprocessableDatasetError,
+            match="Dataset has no rows, it cannot be processed",
+        ):
+            table_has_rows(table)
+
+    def test_remove_empty_rows(self):
+        table = pa.table(
+            {"colname1": [1.0, float("nan"), 3.0], "colname2": ["a", None, "x"]}
+        )
+
+        result, errors = remove_empty_rows(table)
+
+        assert result.to_pydict() == {"colname1": [1.0, 3.0], "colname2": ["a", "x"]}
+        assert errors == []
+
+    def test_clean_column_headers(self):
+        table = pa.table({"Col Name 1": [1], "ColName2": ["a"]})
+
+        result, errors = clean_column_headers(table)
+
+        assert result.column_names == ["col_name_1", "colname2"]
+        assert errors == []
+
+    def test_table_has_correct_columns(self):
+        table = pa.table({"colname1": [1], "colname2": ["a"]})
+
+        with pytest.raises(UnprocessableDatasetError) as error:
+            table_has_correct_columns(table, self.valid_schema)
+
+        assert error.value.message == [
+            "Expected columns: ['colname1', 'colname2', 'colname3', 'colname4'], received: ['colname1', 'colname2']"  # noqa: E501
+        ]
+
+    def test_convert_date_columns_leaves_parsed_dates(self):
+        table = pa.table(
+            {"colname4": pa.array([datetime.date(2021, 6, 12)], pa.date32())}
+        )
+        schema = Schema(
+            metadata=self.schema_metadata,
+            columns=[
+                Column(
+                    name="colname4",
+                    partition_index=None,
+                    data_type="date",
+                    allow_null=True,
+                    format="%d/%m/%Y",
+                )
+            ],
+        )
+
+        result, errors = convert_date_columns(table, schema)
+
+        assert result.equals(table)
+        assert errors == []
+
+    def test_table_has_acceptable_null_values_treats_nan_as_null(self):
+        schema = Schema(
+            metadata=self.schema_metadata,
+            columns=[
+                Column(
+                    name="colname1",
+                    partition_index=None,
+                    data_type="double",
+                    allow_null=False,
+                )
+            ],
+        )
+        table = pa.table({"colname1": [1.0, float("nan")]})
+
+        _, errors = table_has_acceptable_null_values(table, schema)
+
+        assert errors == ["Column [colname1] does not allow null values"]
+
+    def test_table_has_correct_data_types_casts_to_storage_types(self):
+        schema = Schema(
+            metadata=self.schema_metadata,
+            columns=[
+                Column(
+                    name="colname1",
+                    partition_index=None,
+                    data_type="double",
+                    allow_null=True,
+                ),
+                Column(
+                    name="colname2",
+                    partition_index=None,
+                    data_type="string",
+                    allow_null=True,
+                ),
+            ],
+        )
+        table = pa.table(
+            {
+                "colname1": pa.array([1, 2], pa.int32()),
+                "colname2": pa.array([None, None], pa.null()),
+            }
+        )
+
+        result, errors = table_has_correct_data_types(table, schema)
+
+        assert errors == []
+        assert result.schema == pa.schema(
+            [("colname1", pa.float64()), ("colname2", pa.string())]
+        )
+
+    def test_table_has_correct_data_types_reports_failed_conversion(self):
+        schema = Schema(
+            metadata=self.schema_metadata,
+            columns=[
+                Column(
+                    name="colname1",
+                    partition_index=None,
+                    data_type="tinyint",
+                    allow_null=True,
+                )
+            ],
+        )
+        table = pa.table({"colname1": [1, 1000]})
+
+        _, errors = table_has_correct_data_types(table, schema)
+
+        assert errors == ["Failed to convert column [colname1] to type [tinyint]"]
+
+    def test_table_has_illegal_characters_in_partition_columns(self):
+        schema = Schema(
+            metadata=self.schema_metadata,
+            columns=[
+                Column(
+                    name="colname1",
+                    partition_index=0,
+                    data_type="string",
+                    allow_null=True,
+                )
+            ],
+        )
+        table = pa.table({"colname1": ["a/b", "c", None]})
+
+        _, errors = table_has_no_illegal_characters_in_partition_columns(table, schema)
+
+        assert errors == [
+            "Partition column [colname1] has values with illegal characters '/'"
+        ]
@@ -0,0 +1,148 @@
+import io
+from decimal import Decimal
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from api.application.services.column_statistics import (
+    file_column_statistics,
+    merge_column_statistics,
+)
+from api.application.services.partitioning_service import (
+    generate_partitioned_data,
+    partition_to_parquet,
+)
+from api.domain.dataset_statistics import ColumnStatistics
+from api.domain.schema import Column, Schema
+from api.domain.schema_metadata import SchemaMetadata
+
+
+def read_metadata(table: pa.Table, **kwargs) -> pq.FileMetaData:
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, **kwargs)
+    return pq.read_metadata(pa.BufferReader(buffer.getvalue()))
+
+
+class TestFileColumnStatistics:
+    def setup_method(self):
+        self.schema = Schema(
+            metadata=SchemaMetadata(
+                layer="raw",
+                domain="domain",
+                dataset="dataset",
+                sensitivity="PUBLIC",
+            ),
+            columns=[
+                Column(
+                    name="year",
+                    partition_index=0,
+                    data_type="int",
+                    allow_null=False,
+                ),
+                Column(
+                    name="day",
+                    partition_index=1,
+                    data_type="date",
+                    allow_null=False,
+                    format="%Y-%m-%d",
+                ),
+                Column(
+                    name="name",
+                    partition_index=None,
+                    data_type="string",
+                    allow_null=True,
+                ),
+                Column(
+                    name="date",
+                    partition_index=None,
+                    data_type="date",
+                    allow_null=True,
+                    format="%Y-%m-%d",
+                ),
+                Column(
+                    name="value",
+                    partition_index=None,
+                    data_type="double",
+                    allow_null=True,
+                ),
+            ],
+        )
+
+    def test_reads_statistics_of_the_written_partition_files(self, tmp_path):
+        dataframe = pd.DataFrame(
+            {
+                "year": [2020, 2020],
+                "day": pd.to_datetime(["2020-01-01", "2020-01-01"]),
+                "name": ["b", None],
+                "date": pd.to_datetime(["2021-03-01", "2019-12-31"]),
+                "value": [2.5, -1.0],
+            }
+        )
+        [partition] = generate_partitioned_data(self.schema, dataframe)
+        partition_to_parquet(self.schema, partition, tmp_path / "file.parquet")
+
+        result = file_column_statistics(
+            self.schema, pq.read_metadata(tmp_path / "file.parquet"), partition.path
+        )
+
+        assert result == {
+            "year": ColumnStatistics(min=2020, max=2020),
+            "day": ColumnStatistics(min="2020-01-01", max="2020-01-01"),
+            "name": ColumnStatistics(min="b", max="b", null_count=1),
+            "date": ColumnStatistics(min="2019-12-31", max="2021-03-01"),
+            "value": ColumnStatistics(min=-1.0, max=2.5),
+        }
+
+    def test_merges_the_statistics_of_every_row_group(self):
+        metadata = read_metadata(
+            pa.table({"value": pa.array([5, None, 1, 9], pa.int64())}),
+            row_group_size=2,
+        )
+
+        result = file_column_statistics(self.schema, metadata, "")
+
+        assert metadata.num_row_groups == 2
+        assert result == {"value": ColumnStatistics(min=1, max=9, null_count=1)}
+
+    def test_has_no_min_or_max_for_columns_of_nulls(self):
+        metadata = read_metadata(
+            pa.table({"name": pa.array([None, None], pa.string())})
+        )
+
+        result = file_column_statistics(self.schema, metadata, "")
+
+        assert result == {"name": ColumnStatistics(null_count=2)}
+
+    def test_converts_decimals_to_floats(self):
+        metadata = read_metadata(
+            pa.table({"value": pa.array([Decimal("1.25")], pa.decimal128(5, 2))})
+        )
+
+        result = file_column_statistics(self.schema, metadata, "")
+
+        assert result == {"value": ColumnStatistics(min=1.25, max=1.25)}
+
+
+class TestMergeColumnStatistics:
+    def test_merges_statistics_of_each_column(self):
+        result = merge_column_statistics(
+            [
+                {
+                    "a": ColumnStatistics(min=1, max=3, null_count=1),
+                    "b": ColumnStatistics(null_count=2),
+                },
+                {
+                    "a": ColumnStatistics(min=0, max=2, null_count=4),
+                    "b": ColumnStatistics(min="x", max="y"),
+                },
+            ]
+        )
+
+        assert result == {
+            "a": ColumnStatistics(min=0, max=3, null_count=5),
+            "b": ColumnStatistics(min="x", max="y", null_count=2),
+        }
+
+    def test_merging_no_statistics_is_empty(self):
+        assert merge_column_statistics([]) == {}
@@ -0,0 +1,493 @@
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import Mock, call, patch
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from api.application.services.compaction_service import (
+    CompactionService,
+    merge_parquet_files,
+    plan_compaction,
+)
+from api.application.services.data_files import compacted_file_uploads
+from api.application.services.data_service import DataService
+from api.common.custom_exceptions import AWSServiceError, ConflictError
+from api.domain.dataset_statistics import DatasetSizeChange
+from api.domain.Jobs.CompactionJob import CompactionStep
+from api.domain.scheduled_task import ScheduledTask, TaskType
+from api.domain.schema import Column, Schema
+from api.domain.schema_metadata import Owner, SchemaMetadata
+
+PARTITION = "data/raw/domain/dataset/1/year=2020"
+
+
+def parquet_bytes(df: pd.DataFrame) -> bytes:
+    return df.to_parquet(compression="gzip", index=False)
+
+
+class TestPlanCompaction:
+    def test_groups_small_files_by_partition(self):
+        objects = [
+            {"Key": f"{PARTITION}/111_a.parquet", "Size": 10},
+            {"Key": f"{PARTITION}/222_a.parquet", "Size": 10},
+            {"Key": f"{PARTITION}/111_b.parquet", "Size": 10},
+            {"Key": "data/raw/domain/dataset/1/year=2021/111_c.parquet", "Size": 10},
+            {"Key": "data/raw/domain/dataset/1/year=2021/111_d.parquet", "Size": 10},
+            {"Key": f"{PARTITION}/222_b.parquet", "Size": 10},
+        ]
+
+        result = plan_compaction(objects, small_file_size=50, target_file_size=100)
+
+        assert [[item["Key"] for item in merge] for merge in result] == [
+            [
+                f"{PARTITION}/111_a.parquet",
+                f"{PARTITION}/111_b.parquet",
+                f"{PARTITION}/222_a.parquet",
+                f"{PARTITION}/222_b.parquet",
+            ],
+            [
+                "data/raw/domain/dataset/1/year=2021/111_c.parquet",
+                "data/raw/domain/dataset/1/year=2021/111_d.parquet",
+            ],
+        ]
+
+    def test_ignores_large_files_and_single_small_files(self):
+        objects = [
+            {"Key": f"{PARTITION}/111_a.parquet", "Size": 500},
+            {"Key": f"{PARTITION}/111_b.parquet", "Size": 10},
+            {"Key": "data/raw/domain/dataset/1/year=2021/222_a.parquet", "Size": 10},
+        ]
+
+        assert plan_compaction(objects, small_file_size=50, target_file_size=100) == []
+
+    def test_splits_merges_at_the_target_size_and_file_limit(self):
+        objects = [
+            {"Key": f"{PARTITION}/111_{index}.parquet", "Size": 40}
+            for index in range(7)
+        ]
+
+        by_size = plan_compaction(objects, small_file_size=50, target_file_size=100)
+        by_count = plan_compaction(
+            objects, small_file_size=50, target_file_size=1000, max_files_per_merge=2
+        )
+
+        assert [len(merge) for merge in by_size] == [3, 3]
+        assert [len(merge) for merge in by_count] == [2, 2, 2]
+
+
+class TestCompactionService:
+    def setup_method(self):
+        self.s3_adapter = Mock()
+        self.job_service = Mock()
+        self.schema_service = Mock()
+        self.job_queue = Mock()
+        self.dataset_statistics_service = Mock()
+        self.db_adapter = Mock()
+        self.db_adapter.acquire_dataset_lock.return_value = True
+        self.compaction_service = CompactionService(
+            self.s3_adapter,
+            self.job_service,
+            self.schema_service,
+            self.job_queue,
+            self.dataset_statistics_service,
+            self.db_adapter,
+        )
+        self.schema = Schema(
+            metadata=SchemaMetadata(
+                layer="raw",
+                domain="domain",
+                dataset="dataset",
+                version=1,
+                sensitivity="PUBLIC",
+                owners=[Owner(name="owner", email="owner@email.com")],
+            ),
+            columns=[
+                Column(
+                    name="year",
+                    partition_index=0,
+                    data_type="int",
+                    allow_null=False,
+                ),
+                Column(
+                    name="value",
+                    partition_index=None,
+                    data_type="string",
+                    allow_null=True,
+                ),
+            ],
+        )
+
+    def test_merge_parquet_files_records_the_upload_of_each_row(self):
+        result = merge_parquet_files(
+            self.schema,
+            [
+                (
+                    f"{PARTITION}/222_a.parquet",
+                    parquet_bytes(pd.DataFrame({"value": ["a", "b"]})),
+                ),
+                (
+                    f"{PARTITION}/111_a.parquet",
+                    parquet_bytes(pd.DataFrame({"value": ["c"]})),
+                ),
+                (
+                    f"{PARTITION}/222_b.parquet",
+                    parquet_bytes(pd.DataFrame({"value": ["d"]})),
+                ),
+            ],
+        )
+
+        assert list(pd.read_parquet(BytesIO(result))["value"]) == ["c", "a", "b", "d"]
+        assert compacted_file_uploads(pq.read_metadata(BytesIO(result)).metadata) == [
+            ("111", 1),
+            ("222", 3),
+        ]
+
+    def test_merge_parquet_files_keeps_the_uploads_of_compacted_files(self):
+        compacted = merge_parquet_files(
+            self.schema,
+            [
+                (
+                    f"{PARTITION}/111_a.parquet",
+                    parquet_bytes(pd.DataFrame({"value": ["a"]})),
+                ),
+                (
+                    f"{PARTITION}/222_a.parquet",
+                    parquet_bytes(pd.DataFrame({"value": ["b"]})),
+                ),
+            ],
+        )
+
+        result = merge_parquet_files(
+            self.schema,
+            [
+                (f"{PARTITION}/compacted-1.parquet", compacted),
+                (
+                    f"{PARTITION}/333_a.parquet",
+                    parquet_bytes(pd.DataFrame({"value": ["c"]})),
+                ),
+            ],
+        )
+
+        assert list(pd.read_parquet(BytesIO(result))["value"]) == ["a", "b", "c"]
+        assert compacted_file_uploads(pq.read_metadata(BytesIO(result)).metadata) == [
+            ("111", 1),
+            ("222", 1),
+            ("333", 1),
+        ]
+
+    @patch("api.application.services.compaction_service.uuid")
+    def test_compact_files_writes_merged_file_before_removing_originals(
+        self, mock_uuid
+    ):
+        mock_uuid.uuid4.return_value = "new"
+        keys = [f"{PARTITION}/111_a.parquet", f"{PARTITION}/111_b.parquet"]
+        self.s3_adapter.retrieve_data.side_effect = [
+            BytesIO(parquet_bytes(pd.DataFrame({"value": ["a"]}))),
+            BytesIO(parquet_bytes(pd.DataFrame({"value": ["b"]}))),
+        ]
+
+        merged_key, merged_size = self.compaction_service.compact_files(
+            self.schema, keys
+        )
+
+        stored_key, stored_content = self.s3_adapter.store_data.call_args[0]
+        assert merged_key == stored_key == f"{PARTITION}/compacted-new.parquet"
+        assert merged_size == len(stored_content)
+        assert list(pd.read_parquet(BytesIO(stored_content))["value"]) == ["a", "b"]
+        self.s3_adapter.delete_dataset_files_using_key.assert_called_once_with(
+            keys, f"{PARTITION}/compacted-new.parquet"
+        )
+
+    @patch("api.application.services.compaction_service.uuid")
+    def test_compact_files_removes_merged_file_when_originals_cannot_be_removed(
+        self, mock_uuid
+    ):
+        mock_uuid.uuid4.return_value = "new"
+        keys = [f"{PARTITION}/111_a.parquet", f"{PARTITION}/111_b.parquet"]
+        self.s3_adapter.retrieve_data.side_effect = [
+            BytesIO(parquet_bytes(pd.DataFrame({"value": ["a"]}))),
+            BytesIO(parquet_bytes(pd.DataFrame({"value": ["b"]}))),
+        ]
+        self.s3_adapter.delete_dataset_files_using_key.side_effect = [
+            AWSServiceError("failed"),
+            None,
+        ]
+        self.s3_adapter.list_files_from_path.return_value = keys + [
+            f"{PARTITION}/compacted-new.parquet"
+        ]
+
+        with pytest.raises(AWSServiceError, match="failed"):
+            self.compaction_service.compact_files(self.schema, keys)
+
+        self.s3_adapter.delete_dataset_files_using_key.assert_has_calls(
+            [
+                call(keys, f"{PARTITION}/compacted-new.parquet"),
+                call(
+                    [f"{PARTITION}/compacted-new.parquet"],
+                    f"{PARTITION}/compacted-new.parquet",
+                ),
+            ]
+        )
+
+    @patch("api.application.services.compaction_service.uuid")
+    def test_compact_files_finishes_swap_when_some_originals_were_removed(
+        self, mock_uuid
+    ):
+        mock_uuid.uuid4.return_value = "new"
+        keys = [f"{PARTITION}/111_a.parquet", f"{PARTITION}/111_b.parquet"]
+        self.s3_adapter.retrieve_data.side_effect = [
+            BytesIO(parquet_bytes(pd.DataFrame({"value": ["a"]}))),
+            BytesIO(parquet_bytes(pd.DataFrame({"value": ["b"]}))),
+        ]
+        self.s3_adapter.delete_dataset_files_using_key.side_effect = [
+            AWSServiceError("failed"),
+            None,
+        ]
+        self.s3_adapter.list_files_from_path.return_value = [
+            f"{PARTITION}/111_b.parquet",
+            f"{PARTITION}/compacted-new.parquet",
+        ]
+
+        merged_key, _ = self.compaction_service.compact_files(self.schema, keys)
+
+        assert merged_key == f"{PARTITION}/compacted-new.parquet"
+        self.s3_adapter.delete_dataset_files_using_key.assert_called_with(
+            [f"{PARTITION}/111_b.parquet"], f"{PARTITION}/compacted-new.parquet"
+        )
+
+    def test_compact_dataset_queues_compaction_task(self):
+        self.schema_service.get_schema.return_value = self.schema
+        compaction_job = Mock(job_id="abc-123")
+        self.job_service.create_compaction_job.return_value = compaction_job
+
+        result = self.compaction_service.compact_dataset("subject-123", Mock())
+
+        assert result == "abc-123"
+        self.job_service.create_compaction_job.assert_called_once_with(
+            "subject-123", self.schema.metadata
+        )
+        self.job_queue.submit.assert_called_once_with(
+            TaskType.COMPACTION,
+            {
+                "job_id": "abc-123",
+                "subject_id": "subject-123",
+                "layer": self.schema.get_layer(),
+                "domain": self.schema.get_domain(),
+                "dataset": self.schema.get_dataset(),
+                "version": self.schema.get_version(),
+            },
+        )
+
+    def test_abandon_compaction_task_fails_job(self):
+        self.schema_service.get_schema.return_value = self.schema
+        task = ScheduledTask(
+            task_type=TaskType.COMPACTION,
+            payload={
+                "job_id": "abc-123",
+                "subject_id": "subject-123",
+                "layer": "raw",
+                "domain": "domain",
+                "dataset": "dataset",
+                "version": 1,
+            },
+        )
+
+        self.compaction_service.abandon_compaction_task(task)
+
+        compaction_job, errors = self.job_service.fail.call_args.args
+        assert compaction_job.job_id == "abc-123"
+        assert errors == [
+            "The compaction was interrupted and could not be completed, please try again"
+        ]
+
+    def test_process_compaction_records_progress(self):
+        compaction_job = Mock()
+        other_partition = "data/raw/domain/dataset/1/year=2021"
+        self.s3_adapter.list_objects_from_path.return_value = [
+            {"Key": f"{PARTITION}/111_a.parquet", "Size": 10},
+            {"Key": f"{PARTITION}/111_b.parquet", "Size": 10},
+            {"Key": f"{other_partition}/222_a.parquet", "Size": 10},
+            {"Key": f"{other_partition}/222_b.parquet", "Size": 10},
+            {"Key": f"{other_partition}/222_c.parquet", "Size": 10},
+        ]
+        self.compaction_service.compact_files = Mock(
+            side_effect=[
+                (f"{PARTITION}/compacted-1.parquet", 15),
+                (f"{other_partition}/compacted-2.parquet", 20),
+            ]
+        )
+
+        self.compaction_service.process_compaction(compaction_job, self.schema)
+
+        self.s3_adapter.list_objects_from_path.assert_called_once_with(
+            "data/raw/domain/dataset/1"
+        )
+        self.job_service.update_step.assert_called_once_with(
+            compaction_job, CompactionStep.COMPACTING
+        )
+        self.compaction_service.compact_files.assert_has_calls(
+            [
+                call(
+                    self.schema,
+                    [f"{PARTITION}/111_a.parquet", f"{PARTITION}/111_b.parquet"],
+                ),
+                call(
+                    self.schema,
+                    [
+                        f"{other_partition}/222_a.parquet",
+                        f"{other_partition}/222_b.parquet",
+                        f"{other_partition}/222_c.parquet",
+                    ],
+                ),
+            ]
+        )
+        self.job_service.record_compaction_progress.assert_has_calls(
+            [call(compaction_job, 2, 1), call(compaction_job, 3, 1)]
+        )
+        self.job_service.succeed_compaction.assert_called_once_with(compaction_job)
+        self.dataset_statistics_service.record_compaction.assert_called_once_with(
+            self.schema.metadata, DatasetSizeChange(size_bytes=-15, object_count=-3)
+        )
+        self.dataset_statistics_service.record_change.assert_not_called()
+        self.db_adapter.release_dataset_lock.assert_called_once_with(
+            self.schema.metadata, compaction_job.job_id
+        )
+
+    def test_process_compaction_fails_job_on_error(self):
+        compaction_job = Mock()
+        self.s3_adapter.list_objects_from_path.side_effect = AWSServiceError(
+            "Could not list files"
+        )
+
+        self.compaction_service.process_compaction(compaction_job, self.schema)
+
+        self.job_service.fail.assert_called_once_with(
+            compaction_job, ["Could not list files"]
+        )
+        self.job_service.succeed_compaction.assert_not_called()
+        self.dataset_statistics_service.record_change.assert_called_once_with(
+            self.schema.metadata
+        )
+        self.dataset_statistics_service.record_compaction.assert_not_called()
+
+    def test_process_compaction_fails_job_when_dataset_is_locked(self):
+        compaction_job = Mock(job_id="abc-123")
+        self.db_adapter.acquire_dataset_lock.return_value = False
+
+        self.compaction_service.process_compaction(compaction_job, self.schema)
+
+        self.db_adapter.acquire_dataset_lock.assert_called_once()
+        assert self.db_adapter.acquire_dataset_lock.call_args.args[:2] == (
+            self.schema.metadata,
+            "abc-123",
+        )
+        self.s3_adapter.list_objects_from_path.assert_not_called()
+        self.job_service.fail.assert_called_once_with(
+            compaction_job,
+            [
+                "The dataset is already being compacted, overwritten or having a file deleted, please try again later"
+            ],
+        )
+        self.db_adapter.release_dataset_lock.assert_not_called()
+
+
+class DatasetLocks:
+    """Holds dataset locks in memory, like the service table does"""
+
+    def __init__(self):
+        self.owners = {}
+
+    def acquire_dataset_lock(self, dataset, owner, expiry):
+        return self.owners.setdefault(dataset.dataset_identifier(), owner) == owner
+
+    def release_dataset_lock(self, dataset, owner):
+        if self.owners.get(dataset.dataset_identifier()) == owner:
+            del self.owners[dataset.dataset_identifier()]
+
+
+class TestCompactionWithOverwrite:
+    def setup_method(self):
+        self.s3_adapter = Mock()
+        self.db_adapter = DatasetLocks()
+        self.compaction_service = CompactionService(
+            self.s3_adapter, Mock(), Mock(), Mock(), Mock(), self.db_adapter
+        )
+        self.data_service = DataService(
+            self.s3_adapter,
+            Mock(),
+            Mock(),
+            Mock(),
+            Mock(),
+            Mock(),
+            Mock(),
+            Mock(),
+            Mock(),
+            self.db_adapter,
+            single_pass_upload=False,
+            process_pool_size=0,
+        )
+        self.data_service.validate_incoming_data = Mock(return_value=1)
+        self.schema = Schema(
+            metadata=SchemaMetadata(
+                layer="raw",
+                domain="domain",
+                dataset="dataset",
+                version=1,
+                sensitivity="PUBLIC",
+                owners=[Owner(name="owner", email="owner@email.com")],
+                update_behaviour="OVERWRITE",
+            ),
+            columns=[
+                Column(
+                    name="year", partition_index=0, data_type="int", allow_null=False
+                ),
+                Column(
+                    name="value",
+                    partition_index=None,
+                    data_type="string",
+                    allow_null=True,
+                ),
+            ],
+        )
+
+    def overwrite(self):
+        self.data_service.process_upload(
+            Mock(), self.schema, Path("data.csv"), "333-333"
+        )
+
+    @patch("api.application.services.data_service.delete_incoming_raw_file")
+    @patch("api.application.services.data_service.construct_chunked_dataframe")
+    def test_overwrite_does_not_remove_files_while_they_are_compacted(
+        self, mock_construct_chunked_dataframe, _mock_delete_incoming_raw_file
+    ):
+        mock_construct_chunked_dataframe.return_value = []
+        keys = [f"{PARTITION}/111_a.parquet", f"{PARTITION}/222_a.parquet"]
+        self.s3_adapter.list_objects_from_path.return_value = [
+            {"Key": key, "Size": 10} for key in keys
+        ]
+        overwrite_errors = []
+
+        def retrieve_data(key):
+            # The overwrite runs once the compaction has read the files it merges
+            if key == keys[-1]:
+                with pytest.raises(ConflictError) as error:
+                    self.overwrite()
+                overwrite_errors.append(error.value)
+            return BytesIO(parquet_bytes(pd.DataFrame({"value": [key]})))
+
+        self.s3_adapter.retrieve_data.side_effect = retrieve_data
+
+        self.compaction_service.process_compaction(Mock(job_id="job-1"), self.schema)
+
+        assert len(overwrite_errors) == 1
+        self.s3_adapter.delete_previous_dataset_files.assert_not_called()
+        self.s3_adapter.store_data.assert_called_once()
+
+        self.overwrite()
+
+        self.s3_adapter.delete_previous_dataset_files.assert_called_once_with(
+            self.schema.metadata, "333-333"
+        )
+        assert self.db_adapter.owners == {}
@@ -0,0 +1,67 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from api.application.services.data_files import (
+    file_uploads,
+    is_compacted_file,
+    read_file_uploads,
+    remove_upload,
+    upload_row_groups,
+    write_compacted_file,
+)
+
+PARTITION = "data/raw/domain/dataset/1/year=2020"
+
+
+def table(values) -> pa.Table:
+    return pa.table({"value": pa.array(values, pa.int32())})
+
+
+def metadata(content: bytes) -> pq.FileMetaData:
+    return pq.read_metadata(pa.BufferReader(content))
+
+
+class TestDataFiles:
+    def test_is_compacted_file(self):
+        assert is_compacted_file(f"{PARTITION}/compacted-1.parquet")
+        assert not is_compacted_file(f"{PARTITION}/abc-123_1.parquet")
+
+    def test_file_uploads_of_upload_file(self):
+        content = write_compacted_file([("ignored", table([1, 2]))])
+
+        assert file_uploads(f"{PARTITION}/abc-123_1.parquet", metadata(content)) == [
+            ("abc-123", 2)
+        ]
+
+    def test_write_compacted_file_stores_each_upload_in_its_own_row_groups(self):
+        content = write_compacted_file(
+            [
+                ("def-456", table([1])),
+                ("abc-123", table([2, 3])),
+                ("def-456", table([4])),
+                ("ghi-789", table([])),
+            ]
+        )
+        key = f"{PARTITION}/compacted-1.parquet"
+
+        assert file_uploads(key, metadata(content)) == [("abc-123", 2), ("def-456", 2)]
+        assert upload_row_groups(key, metadata(content)) == {
+            "abc-123": [0],
+            "def-456": [1],
+        }
+        assert [
+            (raw_file_identifier, uploaded.column("value").to_pylist())
+            for raw_file_identifier, uploaded in read_file_uploads(key, content)
+        ] == [("abc-123", [2, 3]), ("def-456", [1, 4])]
+
+    def test_remove_upload(self):
+        key = f"{PARTITION}/compacted-1.parquet"
+        content = write_compacted_file(
+            [("abc-123", table([1, 2])), ("def-456", table([3]))]
+        )
+
+        remaining = remove_upload(key, content, "abc-123")
+
+        assert pq.read_table(pa.BufferReader(remaining)).to_pydict() == {"value": [3]}
+        assert file_uploads(key, metadata(remaining)) == [("def-456", 1)]
+        assert remove_upload(key, remaining, "def-456") is None
@@ -1,24 +1,37 @@
 import re
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List
 from unittest.mock import Mock, patch, MagicMock, call
 
 import pandas as pd
+import pyarrow as pa
 import pytest
 
 from api.application.services.data_service import (
     DataService,
+    encode_chunk,
+    validate_chunk,
+    validate_chunk_data,
 )
+from api.application.services.partitioning_service import Partition
 from api.common.custom_exceptions import (
     UserError,
     AWSServiceError,
     UnprocessableDatasetError,
     DatasetValidationError,
     QueryExecutionError,
+    LocalQueryError,
+    TooManyRequestsError,
+    ConflictError,
 )
 from api.domain.Jobs.QueryJob import QueryStep
 from api.domain.Jobs.UploadJob import UploadStep
 from api.domain.dataset_metadata import DatasetMetadata
+from api.domain.dataset_statistics import ColumnStatistics, DatasetStatistics
+from api.domain.query_page import QueryCursor
+from api.domain.scheduled_task import ScheduledTask, TaskType
 from api.domain.enriched_schema import (
     EnrichedSchema,
     EnrichedSchemaMetadata,
@@ -28,6 +41,19 @@ from api.domain.schema import Schema, Column
 from api.domain.schema_metadata import Owner, SchemaMetadata
 from api.domain.sql_query import SQLQuery
 
+UPLOAD_TASK_PAYLOAD = {
+    "job_id": "abc-123",
+    "subject_id": "subject-123",
+    "filename": "data.csv",
+    "file_path": "data.csv",
+    "incoming_file_key": "incoming_uploads/123-456-789/data.csv",
+    "raw_file_identifier": "123-456-789",
+    "layer": "raw",
+    "domain": "some",
+    "dataset": "other",
+    "version": 2,
+}
+
 
 class TestUploadDataset:
     def setup_method(self):
@@ -35,12 +61,23 @@ class TestUploadDataset:
         self.athena_adapter = Mock()
         self.job_service = Mock()
         self.schema_service = Mock()
+        self.glue_adapter = Mock()
+        self.job_queue = Mock()
+        self.query_result_cache = Mock()
+        self.dataset_statistics_service = Mock()
+        self.db_adapter = Mock()
+        self.db_adapter.acquire_dataset_lock.return_value = True
         self.data_service = DataService(
             self.s3_adapter,
-            None,
+            self.glue_adapter,
             self.athena_adapter,
             self.job_service,
             self.schema_service,
+            self.job_queue,
+            self.query_result_cache,
+            self.dataset_statistics_service,
+            db_adapter=self.db_adapter,
+            stage_incoming_files=True,
         )
         self.valid_schema = Schema(
             metadata=SchemaMetadata(
@@ -78,14 +115,10 @@ class TestUploadDataset:
     # Upload Dataset  -------------------------------------
 
     @patch("api.application.services.data_service.UploadJob")
-    @patch("api.application.services.data_service.Thread")
     @patch("api.application.services.data_service.construct_chunked_dataframe")
-    @patch.object(DataService, "process_upload")
-    def test_upload_dataset_triggers_process_upload_and_returns_expected_data(
+    def test_upload_dataset_queues_upload_task_and_returns_expected_data(
         self,
-        mock_process_upload,
         _mock_construct_chunked_dataframe,
-        mock_thread,
         mock_upload_job,
     ):
         # GIVEN
@@ -102,6 +135,9 @@ class TestUploadDataset:
 
         mock_job.job_id = "abc-123"
         mock_upload_job.return_value = mock_job
+        self.s3_adapter.upload_incoming_file.return_value = (
+            "incoming_uploads/123-456-789/data.csv"
+        )
 
         # WHEN
         uploaded_raw_file = self.data_service.upload_dataset(
@@ -120,13 +156,195 @@ class TestUploadDataset:
             DatasetMetadata("raw", "some", "other", 1),
         )
         self.data_service.generate_raw_file_identifier.assert_called_once()
-        mock_thread.assert_called_once_with(
-            target=mock_process_upload,
-            args=(mock_job, schema, Path("data.csv"), "123-456-789"),
-            name="abc-123",
+        self.job_queue.submit.assert_called_once_with(
+            TaskType.UPLOAD,
+            {
+                "job_id": "abc-123",
+                "subject_id": "subject-123",
+                "filename": "data.csv",
+                "file_path": "data.csv",
+                "incoming_file_key": "incoming_uploads/123-456-789/data.csv",
+                "raw_file_identifier": "123-456-789",
+                "layer": "raw",
+                "domain": "some",
+                "dataset": "other",
+                "version": 2,
+            },
+        )
+        self.s3_adapter.upload_incoming_file.assert_called_once_with(
+            Path("data.csv"), "123-456-789"
         )
         assert uploaded_raw_file == ("123-456-789.csv", 1, "abc-123")
 
+    def test_upload_dataset_does_not_stage_file_processed_on_this_host(self):
+        self.data_service.stage_incoming_files = False
+        self.schema_service.get_schema.return_value = self.valid_schema
+        self.data_service.generate_raw_file_identifier = Mock(
+            return_value="123-456-789"
+        )
+        self.job_service.create_upload_job.return_value = Mock(job_id="abc-123")
+
+        self.data_service.upload_dataset(
+            "subject-123",
+            "abc-123",
+            DatasetMetadata("raw", "some", "other", 1),
+            Path("data.csv"),
+        )
+
+        self.s3_adapter.upload_incoming_file.assert_not_called()
+        payload = self.job_queue.submit.call_args.args[1]
+        assert payload["incoming_file_key"] is None
+        assert payload["file_path"] == "data.csv"
+
+    @patch("api.application.services.data_service.delete_incoming_raw_file")
+    @patch("api.application.services.data_service.construct_chunked_dataframe")
+    def test_upload_dataset_fails_job_when_queue_is_full(
+        self, _mock_construct_chunked_dataframe, mock_delete_incoming_raw_file
+    ):
+        # GIVEN
+        self.schema_service.get_schema.return_value = self.valid_schema
+        self.data_service.generate_raw_file_identifier = Mock(
+            return_value="123-456-789"
+        )
+        mock_job = Mock()
+        self.job_service.create_upload_job.return_value = mock_job
+        self.job_queue.submit.side_effect = TooManyRequestsError("Queue full")
+        self.s3_adapter.upload_incoming_file.return_value = "incoming_uploads/key"
+
+        # WHEN/THEN
+        with pytest.raises(TooManyRequestsError, match="Queue full"):
+            self.data_service.upload_dataset(
+                "subject-123",
+                "abc-123",
+                DatasetMetadata("raw", "some", "other", 1),
+                Path("data.csv"),
+            )
+
+        self.job_service.fail.assert_called_once_with(mock_job, ["Queue full"])
+        mock_delete_incoming_raw_file.assert_called_once_with(
+            self.valid_schema, Path("data.csv"), "123-456-789"
+        )
+        self.s3_adapter.delete_incoming_file.assert_called_once_with(
+            "incoming_uploads/key"
+        )
+
+    @patch.object(DataService, "process_upload")
+    def test_run_upload_task_processes_queued_upload(self, mock_process_upload):
+        # GIVEN
+        self.schema_service.get_schema.return_value = self.valid_schema
+        task = ScheduledTask(
+            task_type=TaskType.UPLOAD, payload=UPLOAD_TASK_PAYLOAD, attempts=1
+        )
+
+        # WHEN
+        self.data_service.run_upload_task(task)
+
+        # THEN
+        self.schema_service.get_schema.assert_called_once_with(
+            DatasetMetadata("raw", "some", "other", 2)
+        )
+        (
+            upload_job,
+            schema,
+            file_path,
+            raw_file_identifier,
+        ) = mock_process_upload.call_args.args
+        assert upload_job.job_id == "abc-123"
+        assert upload_job.subject_id == "subject-123"
+        assert schema == self.valid_schema
+        assert file_path == Path("data.csv")
+        assert raw_file_identifier == "123-456-789"
+        self.s3_adapter.delete_dataset_files.assert_not_called()
+        self.s3_adapter.download_incoming_file.assert_called_once_with(
+            "incoming_uploads/123-456-789/data.csv", Path("data.csv")
+        )
+        self.s3_adapter.delete_incoming_file.assert_called_once_with(
+            "incoming_uploads/123-456-789/data.csv"
+        )
+
+    @patch.object(DataService, "process_upload")
+    @patch.object(Path, "exists", return_value=True)
+    def test_run_upload_task_uses_incoming_file_received_by_this_host(
+        self, _mock_exists, mock_process_upload
+    ):
+        # GIVEN
+        self.schema_service.get_schema.return_value = self.valid_schema
+        task = ScheduledTask(
+            task_type=TaskType.UPLOAD, payload=UPLOAD_TASK_PAYLOAD, attempts=1
+        )
+
+        # WHEN
+        self.data_service.run_upload_task(task)
+
+        # THEN
+        self.s3_adapter.download_incoming_file.assert_not_called()
+        mock_process_upload.assert_called_once()
+
+    @patch.object(DataService, "process_upload")
+    def test_run_upload_task_deletes_incoming_file_when_processing_fails(
+        self, mock_process_upload
+    ):
+        # GIVEN
+        self.schema_service.get_schema.return_value = self.valid_schema
+        mock_process_upload.side_effect = ValueError("Failed")
+        task = ScheduledTask(
+            task_type=TaskType.UPLOAD, payload=UPLOAD_TASK_PAYLOAD, attempts=1
+        )
+
+        # WHEN/THEN
+        with pytest.raises(ValueError, match="Failed"):
+            self.data_service.run_upload_task(task)
+
+        self.s3_adapter.delete_incoming_file.assert_called_once_with(
+            "incoming_uploads/123-456-789/data.csv"
+        )
+
+    @patch.object(DataService, "process_upload")
+    def test_run_upload_task_removes_partial_data_when_retried(
+        self, mock_process_upload
+    ):
+        # GIVEN
+        self.schema_service.get_schema.return_value = self.valid_schema
+        task = ScheduledTask(
+            task_type=TaskType.UPLOAD, payload=UPLOAD_TASK_PAYLOAD, attempts=2
+        )
+
+        # WHEN
+        self.data_service.run_upload_task(task)
+
+        # THEN
+        self.s3_adapter.delete_dataset_files.assert_called_once_with(
+            self.valid_schema.metadata, "123-456-789"
+        )
+        self.dataset_statistics_service.record_change.assert_called_once_with(
+            self.valid_schema.metadata
+        )
+        mock_process_upload.assert_called_once()
+
+    @patch("api.application.services.data_service.delete_incoming_raw_file")
+    def test_abandon_upload_task_fails_job(self, mock_delete_incoming_raw_file):
+        # GIVEN
+        self.schema_service.get_schema.return_value = self.valid_schema
+        task = ScheduledTask(
+            task_type=TaskType.UPLOAD, payload=UPLOAD_TASK_PAYLOAD, attempts=3
+        )
+
+        # WHEN
+        self.data_service.abandon_upload_task(task)
+
+        # THEN
+        upload_job, errors = self.job_service.fail.call_args.args
+        assert upload_job.job_id == "abc-123"
+        assert errors == [
+            "The upload was interrupted and could not be completed, please try again"
+        ]
+        mock_delete_incoming_raw_file.assert_called_once_with(
+            self.valid_schema, Path("data.csv"), "123-456-789"
+        )
+        self.s3_adapter.delete_incoming_file.assert_called_once_with(
+            "incoming_uploads/123-456-789/data.csv"
+        )
+
     # Generate Permanent Filename ----------------------------
     @patch("api.application.services.data_service.uuid")
     def test_generates_permanent_filename(self, mock_uuid):
@@ -156,6 +374,10 @@ class TestUploadDataset:
         # GIVEN
         schema = self.valid_schema
         upload_job = Mock()
+        mock_process_chunks.return_value = {
+            "data/raw/some/other/2/colname1=1/123-456-789_111.parquet": 100
+        }
+        mock_validate_incoming_data.return_value = 3
 
         expected_update_step_calls = [
             call(upload_job, UploadStep.VALIDATION),
@@ -184,10 +406,90 @@ class TestUploadDataset:
         mock_delete_incoming_raw_file.assert_called_once_with(
             schema, Path("data.csv"), "123-456-789"
         )
-        mock_load_partitions.assert_called_once_with(schema)
+        mock_load_partitions.assert_called_once_with(schema, {"colname1=1"})
+        self.dataset_statistics_service.record_upload.assert_called_once_with(
+            schema,
+            "123-456-789",
+            3,
+            False,
+            {"data/raw/some/other/2/colname1=1/123-456-789_111.parquet": 100},
+        )
 
         self.job_service.update_step.assert_has_calls(expected_update_step_calls)
         self.job_service.succeed.assert_called_once_with(upload_job)
+        self.query_result_cache.invalidate.assert_called_once_with(schema.metadata)
+
+    @patch.object(DataService, "validate_incoming_data")
+    @patch.object(DataService, "process_chunks")
+    @patch("api.application.services.data_service.delete_incoming_raw_file")
+    @patch.object(DataService, "load_partitions")
+    def test_process_upload_holds_the_dataset_lock_while_overwriting(
+        self,
+        _mock_load_partitions,
+        _mock_delete_incoming_raw_file,
+        mock_process_chunks,
+        mock_validate_incoming_data,
+    ):
+        # GIVEN
+        schema = self.valid_schema.copy(deep=True)
+        schema.metadata.update_behaviour = "OVERWRITE"
+        mock_process_chunks.return_value = {}
+        mock_validate_incoming_data.return_value = 3
+
+        # WHEN
+        self.data_service.process_upload(
+            Mock(), schema, Path("data.csv"), "123-456-789"
+        )
+
+        # THEN
+        dataset, lock_owner, _ = self.db_adapter.acquire_dataset_lock.call_args.args
+        assert (dataset, lock_owner) == (schema.metadata, "upload-123-456-789")
+        self.db_adapter.release_dataset_lock.assert_called_once_with(
+            schema.metadata, "upload-123-456-789"
+        )
+
+    @patch.object(DataService, "validate_incoming_data")
+    @patch.object(DataService, "process_chunks")
+    @patch("api.application.services.data_service.delete_incoming_raw_file")
+    def test_process_upload_fails_overwrite_when_dataset_is_locked(
+        self,
+        _mock_delete_incoming_raw_file,
+        mock_process_chunks,
+        mock_validate_incoming_data,
+    ):
+        # GIVEN
+        schema = self.valid_schema.copy(deep=True)
+        schema.metadata.update_behaviour = "OVERWRITE"
+        upload_job = Mock()
+        mock_validate_incoming_data.return_value = 3
+        self.db_adapter.acquire_dataset_lock.return_value = False
+
+        # WHEN/THEN
+        with pytest.raises(ConflictError):
+            self.data_service.process_upload(
+                upload_job, schema, Path("data.csv"), "123-456-789"
+            )
+
+        mock_process_chunks.assert_not_called()
+        self.job_service.fail.assert_called_once_with(
+            upload_job,
+            [
+                "The dataset is being compacted, overwritten or having a file deleted, please try again later"
+            ],
+        )
+        self.db_adapter.release_dataset_lock.assert_not_called()
+
+    def test_process_upload_does_not_lock_the_dataset_when_appending(self):
+        self.data_service.validate_incoming_data = Mock(return_value=3)
+        self.data_service.process_chunks = Mock(return_value={})
+        self.data_service.load_partitions = Mock()
+
+        with patch("api.application.services.data_service.delete_incoming_raw_file"):
+            self.data_service.process_upload(
+                Mock(), self.valid_schema, Path("data.csv"), "123-456-789"
+            )
+
+        self.db_adapter.acquire_dataset_lock.assert_not_called()
 
     @patch("api.application.services.data_service.delete_incoming_raw_file")
     @patch.object(DataService, "validate_incoming_data")
@@ -212,6 +514,261 @@ class TestUploadDataset:
             schema, Path("data.csv"), "123-456-789"
         )
         self.job_service.fail.assert_called_once_with(upload_job, ["some message"])
+        self.query_result_cache.invalidate.assert_called_once_with(schema.metadata)
+        self.dataset_statistics_service.record_upload.assert_not_called()
+        self.dataset_statistics_service.record_change.assert_called_once_with(
+            schema.metadata
+        )
+
+    @patch.object(DataService, "validate_and_stage_incoming_data")
+    @patch.object(DataService, "promote_staged_data")
+    @patch("api.application.services.data_service.delete_staging_directory")
+    @patch("api.application.services.data_service.delete_incoming_raw_file")
+    @patch.object(DataService, "load_partitions")
+    def test_single_pass_process_upload_stages_and_promotes_data(
+        self,
+        mock_load_partitions,
+        mock_delete_incoming_raw_file,
+        mock_delete_staging_directory,
+        mock_promote_staged_data,
+        mock_validate_and_stage_incoming_data,
+    ):
+        # GIVEN
+        schema = self.valid_schema
+        upload_job = Mock()
+        self.data_service.single_pass_upload = True
+        self.data_service.validate_incoming_data = Mock()
+        self.data_service.process_chunks = Mock()
+        mock_validate_and_stage_incoming_data.return_value = (
+            Path("123-456-789-staging"),
+            2,
+        )
+        mock_promote_staged_data.return_value = {
+            "data/raw/some/other/2/colname1=1/123-456-789_111.parquet": 100
+        }
+
+        # WHEN
+        self.data_service.process_upload(
+            upload_job, schema, Path("data.csv"), "123-456-789"
+        )
+
+        # THEN
+        mock_validate_and_stage_incoming_data.assert_called_once_with(
+            schema, Path("data.csv"), "123-456-789"
+        )
+        mock_promote_staged_data.assert_called_once_with(
+            schema, Path("123-456-789-staging"), "123-456-789"
+        )
+        self.data_service.validate_incoming_data.assert_not_called()
+        self.data_service.process_chunks.assert_not_called()
+        mock_load_partitions.assert_called_once_with(schema, {"colname1=1"})
+        mock_delete_staging_directory.assert_called_once_with("123-456-789")
+        self.dataset_statistics_service.record_upload.assert_called_once_with(
+            schema,
+            "123-456-789",
+            2,
+            False,
+            {"data/raw/some/other/2/colname1=1/123-456-789_111.parquet": 100},
+        )
+        self.job_service.succeed.assert_called_once_with(upload_job)
+
+    @patch("api.application.services.data_service.delete_staging_directory")
+    @patch("api.application.services.data_service.delete_incoming_raw_file")
+    @patch.object(DataService, "validate_and_stage_incoming_data")
+    def test_single_pass_process_upload_deletes_staged_data_on_failure(
+        self,
+        mock_validate_and_stage_incoming_data,
+        mock_delete_incoming_raw_file,
+        mock_delete_staging_directory,
+    ):
+        # Given
+        upload_job = Mock()
+        self.data_service.single_pass_upload = True
+        mock_validate_and_stage_incoming_data.side_effect = DatasetValidationError(
+            "some message"
+        )
+
+        # When/Then
+        with pytest.raises(DatasetValidationError, match="some message"):
+            self.data_service.process_upload(
+                upload_job, self.valid_schema, Path("data.csv"), "123-456-789"
+            )
+
+        self.s3_adapter.upload_raw_data.assert_not_called()
+        mock_delete_staging_directory.assert_called_once_with("123-456-789")
+        self.job_service.fail.assert_called_once_with(upload_job, ["some message"])
+
+    # Validate and stage dataset -----------------------------
+    @patch("api.application.services.data_service.create_staging_directory")
+    @patch("api.application.services.data_service.build_validated_dataframe")
+    @patch("api.application.services.data_service.construct_chunked_dataframe")
+    def test_validate_and_stage_stages_each_validated_chunk_once(
+        self,
+        mock_construct_chunked_dataframe,
+        mock_build_validated_dataframe,
+        mock_create_staging_directory,
+    ):
+        # Given
+        schema = self.valid_schema
+        chunk1 = pd.DataFrame({"colname1": [1, 2]})
+        chunk2 = pd.DataFrame({"colname1": [3]})
+        validated_chunk1 = pd.DataFrame({})
+        validated_chunk2 = pd.DataFrame({})
+        mock_construct_chunked_dataframe.return_value = [chunk1, chunk2]
+        mock_build_validated_dataframe.side_effect = [
+            validated_chunk1,
+            validated_chunk2,
+        ]
+        mock_create_staging_directory.return_value = Path("123-456-789-staging")
+        self.data_service.stage_data = Mock()
+        self.data_service.generate_permanent_filename = Mock(
+            side_effect=["file1.parquet", "file2.parquet"]
+        )
+
+        # When
+        result = self.data_service.validate_and_stage_incoming_data(
+            schema, Path("data.csv"), "123-456-789"
+        )
+
+        # Then
+        assert result == (Path("123-456-789-staging"), 3)
+        mock_construct_chunked_dataframe.assert_called_once_with(Path("data.csv"))
+        mock_build_validated_dataframe.assert_has_calls(
+            [call(schema, chunk1), call(schema, chunk2)]
+        )
+        self.data_service.stage_data.assert_has_calls(
+            [
+                call(
+                    schema,
+                    validated_chunk1,
+                    Path("123-456-789-staging"),
+                    "file1.parquet",
+                ),
+                call(
+                    schema,
+                    validated_chunk2,
+                    Path("123-456-789-staging"),
+                    "file2.parquet",
+                ),
+            ]
+        )
+
+    @patch("api.application.services.data_service.create_staging_directory")
+    @patch("api.application.services.data_service.construct_chunked_dataframe")
+    def test_validate_and_stage_streams_chunks_into_one_file_per_partition(
+        self, mock_construct_chunked_dataframe, mock_create_staging_directory, tmp_path
+    ):
+        # Given
+        self.data_service.streaming_partition_writers = True
+        mock_construct_chunked_dataframe.return_value = [
+            pd.DataFrame({"colname1": [1, 2], "colname2": ["a", "b"]}),
+            pd.DataFrame({"colname1": [1, 2], "colname2": ["c", "d"]}),
+        ]
+        mock_create_staging_directory.return_value = tmp_path
+
+        # When
+        self.data_service.validate_and_stage_incoming_data(
+            self.valid_schema, Path("data.csv"), "123-456-789"
+        )
+
+        # Then
+        staged_files = sorted(tmp_path.rglob("*.parquet"))
+        assert [
+            staged_file.parent.relative_to(tmp_path).as_posix()
+            for staged_file in staged_files
+        ] == ["colname1=1", "colname1=2"]
+        assert list(pd.read_parquet(staged_files[0])["colname2"]) == ["a", "c"]
+        assert list(pd.read_parquet(staged_files[1])["colname2"]) == ["b", "d"]
+
+    @patch("api.application.services.data_service.delete_incoming_raw_file")
+    @patch("api.application.services.data_service.create_staging_directory")
+    @patch("api.application.services.data_service.build_validated_dataframe")
+    @patch("api.application.services.data_service.construct_chunked_dataframe")
+    def test_validate_and_stage_collects_errors_from_every_chunk_and_stops_staging(
+        self,
+        mock_construct_chunked_dataframe,
+        mock_build_validated_dataframe,
+        mock_create_staging_directory,
+        mock_delete_incoming_raw_file,
+    ):
+        # Given
+        schema = self.valid_schema
+        mock_construct_chunked_dataframe.return_value = [
+            pd.DataFrame({}),
+            pd.DataFrame({}),
+            pd.DataFrame({}),
+        ]
+        mock_build_validated_dataframe.side_effect = [
+            DatasetValidationError(["error 1"]),
+            pd.DataFrame({}),
+            DatasetValidationError(["error 2"]),
+        ]
+        self.data_service.stage_data = Mock()
+
+        # When/Then
+        with pytest.raises(DatasetValidationError) as error:
+            self.data_service.validate_and_stage_incoming_data(
+                schema, Path("data.csv"), "123-456-789"
+            )
+
+        assert set(error.value.message) == {"error 1", "error 2"}
+        self.data_service.stage_data.assert_not_called()
+        mock_delete_incoming_raw_file.assert_called_once_with(
+            schema, Path("data.csv"), "123-456-789"
+        )
+
+    def test_stage_data_writes_each_partition_to_the_staging_directory(self, tmp_path):
+        # Given
+        schema = self.valid_schema
+        dataframe = pd.DataFrame(
+            {"colname1": [1, 1, 2], "colname2": ["Carlos", "Ada", "Grace"]}
+        )
+
+        # When
+        self.data_service.stage_data(schema, dataframe, tmp_path, "file.parquet")
+
+        # Then
+        first_partition = pd.read_parquet(tmp_path / "colname1=1" / "file.parquet")
+        second_partition = pd.read_parquet(tmp_path / "colname1=2" / "file.parquet")
+        assert list(first_partition["colname2"]) == ["Carlos", "Ada"]
+        assert list(second_partition["colname2"]) == ["Grace"]
+
+    def test_promote_staged_data_returns_the_uploaded_files(self, tmp_path):
+        # Given
+        uploaded_files = {
+            "data/raw/some/other/2/colname1=1/file.parquet": 100,
+            "data/raw/some/other/2/colname1=2/file.parquet": 50,
+        }
+        self.s3_adapter.upload_staged_data.return_value = uploaded_files
+
+        # When
+        result = self.data_service.promote_staged_data(
+            self.valid_schema, tmp_path, "123-456-789"
+        )
+
+        # Then
+        assert result == uploaded_files
+        self.s3_adapter.upload_staged_data.assert_called_once_with(
+            self.valid_schema.metadata, tmp_path
+        )
+
+    def test_promotes_staged_data_and_removes_existing_data_when_overwriting(self):
+        # Given
+        schema = self.valid_schema.copy(deep=True)
+        schema.metadata.update_behaviour = "OVERWRITE"
+
+        # When
+        self.data_service.promote_staged_data(
+            schema, Path("123-456-789-staging"), "123-456-789"
+        )
+
+        # Then
+        self.s3_adapter.upload_staged_data.assert_called_once_with(
+            schema.metadata, Path("123-456-789-staging")
+        )
+        self.s3_adapter.delete_previous_dataset_files.assert_called_once_with(
+            schema.metadata, "123-456-789"
+        )
 
     # Validate dataset ---------------------------------------
     @patch("api.application.services.data_service.build_validated_dataframe")
@@ -225,9 +782,9 @@ class TestUploadDataset:
         schema = self.valid_schema
         self.schema_service.get_schema.return_value = schema
 
-        chunk1 = pd.DataFrame({})
-        chunk2 = pd.DataFrame({})
-        chunk3 = pd.DataFrame({})
+        chunk1 = pd.DataFrame({"colname1": [1, 2]})
+        chunk2 = pd.DataFrame({"colname1": [3]})
+        chunk3 = pd.DataFrame({"colname1": [4, 5]})
 
         mock_construct_chunked_dataframe.return_value = [
             chunk1,
@@ -242,11 +799,12 @@ class TestUploadDataset:
         ]
 
         # When
-        self.data_service.validate_incoming_data(
+        rows = self.data_service.validate_incoming_data(
             schema, Path("data.csv"), "123-456-789"
         )
 
         mock_build_validated_dataframe.assert_has_calls(expected_calls)
+        assert rows == 5
 
     # Dataset chunk validation -------------------------------
     @patch("api.application.services.data_service.construct_chunked_dataframe")
@@ -368,10 +926,20 @@ class TestUploadDataset:
             chunk2,
         ]
 
-        self.data_service.process_chunk = Mock()
+        self.data_service.process_chunk = Mock(
+            side_effect=[
+                {"data/col1=one/file1.parquet": 10},
+                {
+                    "data/col1=one/file2.parquet": 20,
+                    "data/col1=two/file2.parquet": 30,
+                },
+            ]
+        )
 
         # When
-        self.data_service.process_chunks(schema, Path("data.csv"), "123-456-789")
+        result = self.data_service.process_chunks(
+            schema, Path("data.csv"), "123-456-789"
+        )
 
         # Then
         expected_calls = [
@@ -379,6 +947,11 @@ class TestUploadDataset:
             call(schema, "123-456-789", chunk2),
         ]
         self.data_service.process_chunk.assert_has_calls(expected_calls)
+        assert result == {
+            "data/col1=one/file1.parquet": 10,
+            "data/col1=one/file2.parquet": 20,
+            "data/col1=two/file2.parquet": 30,
+        }
         self.s3_adapter.list_raw_files.assert_not_called()
         self.s3_adapter.delete_dataset_files.assert_not_called()
 
@@ -429,22 +1002,146 @@ class TestUploadDataset:
             chunk2,
         ]
 
-        self.data_service.process_chunk = Mock()
+        self.data_service.process_chunk = Mock(return_value={})
+
+        # When
+        self.data_service.process_chunks(schema, Path("data.csv"), "123-456-789")
+
+        # Then
+        expected_calls = [
+            call(schema, "123-456-789", chunk1),
+            call(schema, "123-456-789", chunk2),
+        ]
+        self.data_service.process_chunk.assert_has_calls(expected_calls)
+
+        self.s3_adapter.delete_previous_dataset_files.assert_called_once_with(
+            schema.metadata, "123-456-789"
+        )
+
+    @patch("api.application.services.data_service.construct_chunked_dataframe")
+    def test_validates_chunks_in_the_process_pool_and_collects_all_errors(
+        self, mock_construct_chunked_dataframe
+    ):
+        # Given
+        self.data_service.process_pool_size = 2
+        self.data_service._process_pool = ThreadPoolExecutor(max_workers=2)
+        mock_construct_chunked_dataframe.return_value = [
+            pd.DataFrame({"colname1": [1234, 4567], "colname2": ["Carlos", None]}),
+            pd.DataFrame({"colname1": [4332, 4567], "colname2": ["Carlos", "Ada"]}),
+            pd.DataFrame({"colname1": [3543, "s2134"], "colname2": ["Carlos", "Ada"]}),
+        ]
+
+        # When/Then
+        with pytest.raises(DatasetValidationError) as error:
+            self.data_service.validate_incoming_data(
+                self.valid_schema, Path("data.csv"), "123-456-789"
+            )
+
+        assert "Column [colname2] does not allow null values" in error.value.message
+        assert (
+            "Column [colname1] has an incorrect data type. Expected int, received string"
+            in error.value.message
+        )
+
+    @patch("api.application.services.data_service.construct_chunked_dataframe")
+    def test_processes_chunks_in_the_process_pool_and_uploads_in_chunk_order(
+        self, mock_construct_chunked_dataframe
+    ):
+        # Given
+        self.data_service.process_pool_size = 2
+        self.data_service._process_pool = ThreadPoolExecutor(max_workers=2)
+        self.data_service.generate_permanent_filename = Mock(
+            side_effect=["file1.parquet", "file2.parquet"]
+        )
+        mock_construct_chunked_dataframe.return_value = [
+            pd.DataFrame({"colname1": [1, 2], "colname2": ["Carlos", "Ada"]}),
+            pd.DataFrame({"colname1": [1], "colname2": ["Grace"]}),
+        ]
+        self.s3_adapter.upload_encoded_partitions.side_effect = [
+            {"colname1=1/file1.parquet": 10, "colname1=2/file1.parquet": 20},
+            {"colname1=1/file2.parquet": 30},
+        ]
+
+        # When
+        result = self.data_service.process_chunks(
+            self.valid_schema, Path("data.csv"), "123-456-789"
+        )
+
+        # Then
+        assert result == {
+            "colname1=1/file1.parquet": 10,
+            "colname1=2/file1.parquet": 20,
+            "colname1=1/file2.parquet": 30,
+        }
+        upload_calls = self.s3_adapter.upload_encoded_partitions.call_args_list
+        assert [upload_call.args[1] for upload_call in upload_calls] == [
+            "file1.parquet",
+            "file2.parquet",
+        ]
+        assert [path for path, _ in upload_calls[0].args[2]] == [
+            "colname1=1",
+            "colname1=2",
+        ]
+        assert [path for path, _ in upload_calls[1].args[2]] == ["colname1=1"]
+
+    def test_validate_chunk_returns_the_validation_errors(self):
+        chunk = pd.DataFrame({"colname1": [1234, 4567], "colname2": ["Carlos", None]})
+
+        assert validate_chunk(self.valid_schema, chunk) == [
+            "Column [colname2] does not allow null values"
+        ]
+
+    def test_encode_chunk_returns_encoded_partitions(self):
+        chunk = pd.DataFrame({"colname1": [1, 2], "colname2": ["Carlos", "Ada"]})
+
+        result = encode_chunk(self.valid_schema, chunk)
+
+        assert [path for path, _ in result] == ["colname1=1", "colname1=2"]
+        assert list(pd.read_parquet(BytesIO(result[1][1]))["colname2"]) == ["Ada"]
+
+    @patch("api.application.services.data_service.ARROW_PARQUET_VALIDATION", True)
+    @patch("api.application.services.data_service.build_validated_dataframe")
+    def test_validate_chunk_data_keeps_record_batches_in_arrow(
+        self, mock_build_validated_dataframe
+    ):
+        chunk = pa.RecordBatch.from_pydict(
+            {"colname1": [1, 2], "colname2": ["Carlos", "Ada"]}
+        )
+
+        result = validate_chunk_data(self.valid_schema, chunk)
 
-        # When
-        self.data_service.process_chunks(schema, Path("data.csv"), "123-456-789")
+        assert isinstance(result, pa.Table)
+        assert result.schema == self.valid_schema.generate_storage_schema()
+        mock_build_validated_dataframe.assert_not_called()
 
-        # Then
-        expected_calls = [
-            call(schema, "123-456-789", chunk1),
-            call(schema, "123-456-789", chunk2),
-        ]
-        self.data_service.process_chunk.assert_has_calls(expected_calls)
+    @patch("api.application.services.data_service.build_validated_dataframe")
+    def test_validate_chunk_data_converts_record_batches_to_pandas_by_default(
+        self, mock_build_validated_dataframe
+    ):
+        chunk = pa.RecordBatch.from_pydict(
+            {"colname1": [1, 2], "colname2": ["Carlos", "Ada"]}
+        )
 
-        self.s3_adapter.delete_previous_dataset_files.assert_called_once_with(
-            schema.metadata, "123-456-789"
+        validate_chunk_data(self.valid_schema, chunk)
+
+        mock_build_validated_dataframe.assert_called_once()
+        assert isinstance(mock_build_validated_dataframe.call_args[0][1], pd.DataFrame)
+
+    @patch("api.application.services.data_service.ARROW_PARQUET_VALIDATION", True)
+    @patch("api.application.services.data_service.build_validated_dataframe")
+    def test_encode_chunk_encodes_arrow_partitions(
+        self, mock_build_validated_dataframe
+    ):
+        chunk = pa.RecordBatch.from_pydict(
+            {"colname1": [1, 2], "colname2": ["Carlos", "Ada"]}
         )
 
+        result = encode_chunk(self.valid_schema, chunk)
+
+        assert [path for path, _ in result] == ["colname1=1", "colname1=2"]
+        assert list(pd.read_parquet(BytesIO(result[1][1]))["colname2"]) == ["Ada"]
+        mock_build_validated_dataframe.assert_not_called()
+
     # Process Chunks -----------------------------------------
     @patch("api.application.services.data_service.build_validated_dataframe")
     def test_validates_and_uploads_chunk(self, mock_build_validated_dataframe):
@@ -494,31 +1191,44 @@ class TestUploadDataset:
         dataframe = pd.DataFrame({})
         filename = "11111111_22222222.parquet"
         partitioned_dataframe = [
-            ("some/path1", pd.DataFrame({})),
-            ("some/path2", pd.DataFrame({})),
+            Partition(path="some=path1", df=pd.DataFrame({})),
+            Partition(path="some=path2", df=pd.DataFrame({})),
         ]
         mock_generate_partitioned_data.return_value = partitioned_dataframe
 
+        self.s3_adapter.upload_partitioned_data.return_value = {
+            "data/some=path1/11111111_22222222.parquet": 10
+        }
+
         # When
-        self.data_service.upload_data(schema, dataframe, filename)
+        result = self.data_service.upload_data(schema, dataframe, filename)
 
         # Then
+        assert result == {"data/some=path1/11111111_22222222.parquet": 10}
         self.s3_adapter.upload_partitioned_data.assert_called_once_with(
             schema,
             filename,
             partitioned_dataframe,
         )
 
-    def test_load_partitions(self):
-        self.athena_adapter.query_sql_async.return_value = "query_id"
-
-        self.data_service.load_partitions(self.valid_schema)
-        self.athena_adapter.query_sql_async.assert_called_once_with(
-            "MSCK REPAIR TABLE `raw_some_other_2`;"
+    def test_load_partitions_registers_the_written_partitions(self):
+        self.data_service.load_partitions(
+            self.valid_schema, {"colname1=2", "colname1=1"}
         )
-        self.athena_adapter.wait_for_query_to_complete.assert_called_once_with(
-            "query_id"
+
+        self.glue_adapter.create_partitions.assert_called_once_with(
+            self.valid_schema, ["colname1=1", "colname1=2"]
         )
+        self.athena_adapter.query_sql_async.assert_not_called()
+
+    def test_load_partitions_does_nothing_for_unpartitioned_datasets(self):
+        schema = self.valid_schema.copy(deep=True)
+        for column in schema.columns:
+            column.partition_index = None
+
+        self.data_service.load_partitions(schema, {""})
+
+        self.glue_adapter.create_partitions.assert_not_called()
 
 
 class TestListRawFiles:
@@ -595,37 +1305,38 @@ class TestDatasetInfoRetrieval:
                 ),
             ],
         )
+        self.dataset_statistics_service = Mock()
         self.data_service = DataService(
             self.s3_adapter,
             None,
             self.athena_adapter,
             self.job_service,
             self.schema_service,
+            dataset_statistics_service=self.dataset_statistics_service,
+        )
+        self.dataset_statistics_service.get_statistics.return_value = DatasetStatistics(
+            last_updated="2022-03-01 11:03:49+00:00"
         )
-        self.s3_adapter.get_last_updated_time.return_value = "2022-03-01 11:03:49+00:00"
 
     def test_get_last_updated_time(self):
-        time = "2022-03-01 11:03:49+00:00"
-        self.s3_adapter.get_last_updated_time.return_value = time
-
         last_updated_time = self.data_service.get_last_updated_time(
             self.valid_schema.metadata
         )
         assert last_updated_time == "2022-03-01 11:03:49+00:00"
-        self.s3_adapter.get_last_updated_time.assert_called_once_with(
-            self.valid_schema.metadata.dataset_location()
+        self.dataset_statistics_service.get_statistics.assert_called_once_with(
+            self.valid_schema.metadata
         )
+        self.s3_adapter.list_objects_from_path.assert_not_called()
 
     def test_get_last_updated_time_empty(self):
-        self.s3_adapter.get_last_updated_time.return_value = None
+        self.dataset_statistics_service.get_statistics.return_value = (
+            DatasetStatistics()
+        )
 
         last_updated_time = self.data_service.get_last_updated_time(
             self.valid_schema.metadata
         )
         assert last_updated_time == "Never updated"
-        self.s3_adapter.get_last_updated_time.assert_called_once_with(
-            self.valid_schema.metadata.dataset_location()
-        )
 
     def test_get_schema_information(self):
         expected_schema = EnrichedSchema(
@@ -646,6 +1357,7 @@ class TestDatasetInfoRetrieval:
                     partition_index=0,
                     data_type="int",
                     allow_null=False,
+                    statistics={"min": 1, "max": 12, "null_count": 0},
                 ),
                 EnrichedColumn(
                     name="colname2",
@@ -659,188 +1371,84 @@ class TestDatasetInfoRetrieval:
                     data_type="date",
                     allow_null=False,
                     format="%d/%m/%Y",
-                    statistics={"max": "2021-07-01", "min": "2014-01-01"},
+                    statistics={
+                        "min": "2014-01-01",
+                        "max": "2021-07-01",
+                        "null_count": 0,
+                    },
                 ),
             ],
         )
         self.schema_service.get_schema.return_value = self.valid_schema
-        self.athena_adapter.query.return_value = pd.DataFrame(
-            {
-                "data_size": [48718],
-                "max_date": [pd.to_datetime("2021-07-01")],
-                "min_date": [pd.to_datetime("2014-01-01")],
-            }
+        self.dataset_statistics_service.get_statistics.return_value = DatasetStatistics(
+            row_count=48718,
+            last_updated="2022-03-01 11:03:49+00:00",
+            column_statistics={
+                "colname1": ColumnStatistics(min=1, max=12),
+                "date": ColumnStatistics(min="2014-01-01", max="2021-07-01"),
+            },
         )
         dataset_metadata = DatasetMetadata("raw", "some", "other", 2)
+
         actual_schema = self.data_service.get_dataset_info(dataset_metadata)
 
-        self.athena_adapter.query.assert_called_once_with(
-            dataset_metadata,
-            SQLQuery(
-                select_columns=[
-                    "count(*) as data_size",
-                    "cast(max(date) as date) as max_date",
-                    "cast(min(date) as date) as min_date",
-                ]
-            ),
-        )
         assert actual_schema == expected_schema
-
-    def test_get_schema_information_for_multiple_dates(self):
-        valid_schema = Schema(
-            metadata=SchemaMetadata(
-                layer="raw",
-                domain="some",
-                dataset="other",
-                sensitivity="PUBLIC",
-                version=1,
-                owners=[Owner(name="owner", email="owner@email.com")],
-            ),
-            columns=[
-                Column(
-                    name="colname1",
-                    partition_index=0,
-                    data_type="int",
-                    allow_null=False,
-                ),
-                Column(
-                    name="date",
-                    partition_index=None,
-                    data_type="date",
-                    allow_null=False,
-                    format="%d/%m/%Y",
-                ),
-                Column(
-                    name="date2",
-                    partition_index=None,
-                    data_type="date",
-                    allow_null=False,
-                    format="%d/%m/%Y",
-                ),
-            ],
+        self.dataset_statistics_service.get_statistics.assert_called_once_with(
+            dataset_metadata
         )
+        self.dataset_statistics_service.recompute_statistics.assert_not_called()
+        self.athena_adapter.query.assert_not_called()
 
-        expected_schema = EnrichedSchema(
-            metadata=EnrichedSchemaMetadata(
-                layer="raw",
-                domain="some",
-                dataset="other",
-                sensitivity="PUBLIC",
-                version=1,
-                owners=[Owner(name="owner", email="owner@email.com")],
-                number_of_rows=48718,
-                number_of_columns=3,
-                last_updated="2022-03-01 11:03:49+00:00",
-            ),
-            columns=[
-                EnrichedColumn(
-                    name="colname1",
-                    partition_index=0,
-                    data_type="int",
-                    allow_null=False,
-                ),
-                EnrichedColumn(
-                    name="date",
-                    partition_index=None,
-                    data_type="date",
-                    allow_null=False,
-                    format="%d/%m/%Y",
-                    statistics={"max": "2021-07-01", "min": "2014-01-01"},
-                ),
-                EnrichedColumn(
-                    name="date2",
-                    partition_index=None,
-                    data_type="date",
-                    allow_null=False,
-                    format="%d/%m/%Y",
-                    statistics={"max": "2020-07-01", "min": "2015-01-01"},
-                ),
-            ],
+    def test_get_schema_information_recomputes_statistics_that_were_not_recorded(
+        self,
+    ):
+        self.schema_service.get_schema.return_value = self.valid_schema
+        self.dataset_statistics_service.get_statistics.return_value = DatasetStatistics(
+            last_updated="2022-03-01 11:03:49+00:00"
         )
-        self.schema_service.get_schema.return_value = valid_schema
-        self.athena_adapter.query.return_value = pd.DataFrame(
-            {
-                "data_size": [48718],
-                "max_date": [pd.to_datetime("2021-07-01")],
-                "min_date": [pd.to_datetime("2014-01-01")],
-                "max_date2": [pd.to_datetime("2020-07-01")],
-                "min_date2": [pd.to_datetime("2015-01-01")],
-            }
+        self.dataset_statistics_service.recompute_statistics.return_value = (
+            DatasetStatistics(
+                row_count=2,
+                column_statistics={"colname2": ColumnStatistics(null_count=2)},
+            )
         )
 
         actual_schema = self.data_service.get_dataset_info(
-            DatasetMetadata("raw", "some", "other", 1)
-        )
-
-        expected_dataset_metadata = DatasetMetadata("raw", "some", "other", 1)
-        self.athena_adapter.query.assert_called_once_with(
-            expected_dataset_metadata,
-            SQLQuery(
-                select_columns=[
-                    "count(*) as data_size",
-                    "cast(max(date) as date) as max_date",
-                    "cast(max(date2) as date) as max_date2",
-                    "cast(min(date) as date) as min_date",
-                    "cast(min(date2) as date) as min_date2",
-                ]
-            ),
+            DatasetMetadata("raw", "some", "other", 2)
         )
 
-        assert actual_schema == expected_schema
+        self.dataset_statistics_service.recompute_statistics.assert_called_once_with(
+            self.valid_schema
+        )
+        assert actual_schema.metadata.number_of_rows == 2
+        assert actual_schema.metadata.last_updated == "Never updated"
+        assert [column.statistics for column in actual_schema.columns] == [
+            None,
+            {"min": None, "max": None, "null_count": 2},
+            None,
+        ]
+        self.athena_adapter.query.assert_not_called()
 
-    def test_get_schema_size_for_datasets_with_no_dates(self):
-        valid_schema = Schema(
-            metadata=SchemaMetadata(
-                layer="raw",
-                domain="some",
-                dataset="other",
-                sensitivity="PUBLIC",
-                version=3,
-                owners=[Owner(name="owner", email="owner@email.com")],
-            ),
-            columns=[
-                Column(
-                    name="colname1",
-                    partition_index=0,
-                    data_type="int",
-                    allow_null=False,
-                )
-            ],
+    def test_get_schema_information_of_an_empty_dataset(self):
+        self.schema_service.get_schema.return_value = self.valid_schema
+        self.dataset_statistics_service.get_statistics.return_value = (
+            DatasetStatistics()
         )
-        expected_schema = EnrichedSchema(
-            metadata=EnrichedSchemaMetadata(
-                layer="raw",
-                domain="some",
-                dataset="other",
-                sensitivity="PUBLIC",
-                version=3,
-                owners=[Owner(name="owner", email="owner@email.com")],
-                number_of_rows=48718,
-                number_of_columns=1,
-                last_updated="2022-03-01 11:03:49+00:00",
-            ),
-            columns=[
-                EnrichedColumn(
-                    name="colname1",
-                    partition_index=0,
-                    data_type="int",
-                    allow_null=False,
-                )
-            ],
+        self.dataset_statistics_service.recompute_statistics.return_value = (
+            DatasetStatistics()
         )
-        self.schema_service.get_schema.return_value = valid_schema
-        self.athena_adapter.query.return_value = pd.DataFrame({"data_size": [48718]})
 
         actual_schema = self.data_service.get_dataset_info(
-            DatasetMetadata("raw", "some", "other", 3)
-        )
-
-        self.athena_adapter.query.assert_called_once_with(
-            DatasetMetadata("raw", "some", "other", 3),
-            SQLQuery(select_columns=["count(*) as data_size"]),
+            DatasetMetadata("raw", "some", "other", 2)
         )
 
-        assert actual_schema == expected_schema
+        assert actual_schema.metadata.number_of_rows == 0
+        assert actual_schema.metadata.last_updated == "Never updated"
+        assert [column.statistics for column in actual_schema.columns] == [
+            None,
+            None,
+            None,
+        ]
 
     def test_generates_raw_file_identifier(self):
         filename = self.data_service.generate_raw_file_identifier()
@@ -853,12 +1461,25 @@ class TestQueryDataset:
         self.s3_adapter = Mock()
         self.athena_adapter = Mock()
         self.job_service = Mock()
+        self.query_result_cache = Mock()
+        self.query_result_cache.get.return_value = None
+        self.schema_service = Mock()
+        self.dataset_statistics_service = Mock()
+        self.dataset_statistics_service.get_statistics.return_value = DatasetStatistics(
+            size_bytes=1000
+        )
+        self.local_query_adapter = Mock()
         self.data_service = DataService(
             self.s3_adapter,
             None,
             self.athena_adapter,
             None,
-            self.job_service,
+            self.schema_service,
+            None,
+            self.query_result_cache,
+            self.dataset_statistics_service,
+            self.local_query_adapter,
+            local_query_max_size=100,
         )
 
     def test_is_query_too_large_with_limit_under(self):
@@ -871,40 +1492,63 @@ class TestQueryDataset:
 
     def test_is_query_too_large_with_dataset_size_under(self):
         query = SQLQuery()
-        self.s3_adapter.get_folder_size.return_value = 100
+        self.dataset_statistics_service.get_statistics.return_value = DatasetStatistics(
+            size_bytes=100
+        )
 
         dataset = DatasetMetadata("raw", "domain1", "dataset1", 2)
         response = self.data_service.is_query_too_large(dataset, query)
         assert response is False
-        self.s3_adapter.get_folder_size.assert_called_once_with(
-            dataset.s3_file_location()
-        )
+        self.dataset_statistics_service.get_statistics.assert_called_once_with(dataset)
 
     def test_is_query_too_large_with_dataset_size_over(self):
         query = SQLQuery()
-        self.s3_adapter.get_folder_size.return_value = 1_000_000_000
+        self.dataset_statistics_service.get_statistics.return_value = DatasetStatistics(
+            size_bytes=1_000_000_000
+        )
 
         dataset = DatasetMetadata("raw", "domain1", "dataset1", 2)
         response = self.data_service.is_query_too_large(dataset, query)
         assert response is True
-        self.s3_adapter.get_folder_size.assert_called_once_with(
-            dataset.s3_file_location()
-        )
+        self.dataset_statistics_service.get_statistics.assert_called_once_with(dataset)
 
     def test_query_data_success(self):
         query = SQLQuery()
         expected_response = pd.DataFrame().empty
         self.data_service.is_query_too_large = Mock(return_value=False)
-        self.athena_adapter.query.return_value = expected_response
+        self.athena_adapter.query_sql.return_value = expected_response
+        self.query_result_cache.cache_key.return_value = "key"
         dataset_metadata = DatasetMetadata("raw", "domain1", "dataset1", 2)
 
-        response = self.data_service.query_data(dataset_metadata, query)
+        response = self.data_service.query_data(dataset_metadata, query, "subject-123")
         assert response == expected_response
 
-        self.athena_adapter.query.assert_called_once_with(dataset_metadata, query)
+        self.athena_adapter.query_sql.assert_called_once_with(
+            "SELECT * FROM raw_domain1_dataset1_2", "subject-123"
+        )
         self.data_service.is_query_too_large.assert_called_once_with(
             dataset_metadata, query
         )
+        self.query_result_cache.cache_key.assert_called_once_with(
+            dataset_metadata, "SELECT * FROM raw_domain1_dataset1_2"
+        )
+        self.query_result_cache.put.assert_called_once_with("key", expected_response)
+
+    def test_query_data_returns_cached_result(self):
+        query = SQLQuery(limit=10)
+        cached_result = pd.DataFrame({"col1": [1, 2]})
+        self.data_service.is_query_too_large = Mock()
+        self.query_result_cache.cache_key.return_value = "key"
+        self.query_result_cache.get.return_value = cached_result
+        dataset_metadata = DatasetMetadata("raw", "domain1", "dataset1", 2)
+
+        response = self.data_service.query_data(dataset_metadata, query)
+
+        assert response is cached_result
+        self.query_result_cache.get.assert_called_once_with("key")
+        self.data_service.is_query_too_large.assert_not_called()
+        self.athena_adapter.query_sql.assert_not_called()
+        self.query_result_cache.put.assert_not_called()
 
     def test_query_data_for_query_too_large(self):
         query = SQLQuery()
@@ -917,7 +1561,209 @@ class TestQueryDataset:
         self.data_service.is_query_too_large.assert_called_once_with(
             dataset_metadata, query
         )
-        self.athena_adapter.query.assert_not_called()
+        self.athena_adapter.query_sql.assert_not_called()
+
+    def test_query_data_in_chunks_streams_and_caches_single_chunk_result(self):
+        query = SQLQuery()
+        chunk = pd.DataFrame({"col1": [1, 2]})
+        self.data_service.is_query_too_large = Mock(return_value=False)
+        self.athena_adapter.query_sql_in_chunks.return_value = iter([chunk])
+        self.query_result_cache.cache_key.return_value = "key"
+        dataset_metadata = DatasetMetadata("raw", "domain1", "dataset1", 2)
+
+        chunks = self.data_service.query_data_in_chunks(
+            dataset_metadata, query, "subject-123"
+        )
+
+        self.query_result_cache.put.assert_not_called()
+        assert list(chunks) == [chunk]
+        self.athena_adapter.query_sql_in_chunks.assert_called_once_with(
+            "SELECT * FROM raw_domain1_dataset1_2", "subject-123"
+        )
+        self.query_result_cache.put.assert_called_once_with("key", chunk)
+
+    def test_query_data_in_chunks_does_not_cache_result_of_several_chunks(self):
+        chunks = [pd.DataFrame({"col1": [1]}), pd.DataFrame({"col1": [2]})]
+        self.data_service.is_query_too_large = Mock(return_value=False)
+        self.athena_adapter.query_sql_in_chunks.return_value = iter(chunks)
+        dataset_metadata = DatasetMetadata("raw", "domain1", "dataset1", 2)
+
+        result = self.data_service.query_data_in_chunks(dataset_metadata, SQLQuery())
+
+        assert list(result) == chunks
+        self.query_result_cache.put.assert_not_called()
+
+    def test_query_data_in_chunks_returns_cached_result(self):
+        cached_result = pd.DataFrame({"col1": [1, 2]})
+        self.query_result_cache.get.return_value = cached_result
+        dataset_metadata = DatasetMetadata("raw", "domain1", "dataset1", 2)
+
+        result = self.data_service.query_data_in_chunks(dataset_metadata, SQLQuery())
+
+        assert list(result) == [cached_result]
+        self.athena_adapter.query_sql_in_chunks.assert_not_called()
+
+    def test_query_data_in_chunks_for_query_too_large(self):
+        self.data_service.is_query_too_large = Mock(return_value=True)
+        dataset_metadata = DatasetMetadata("raw", "domain1", "dataset1", 1)
+
+        with pytest.raises(UnprocessableDatasetError):
+            self.data_service.query_data_in_chunks(dataset_metadata, SQLQuery())
+
+        self.athena_adapter.query_sql_in_chunks.assert_not_called()
+
+    def test_use_local_query_engine_for_small_dataset(self):
+        self.dataset_statistics_service.get_statistics.return_value = DatasetStatistics(
+            size_bytes=100
+        )
+
+        dataset = DatasetMetadata("raw", "domain1", "dataset1", 2)
+        assert self.data_service.use_local_query_engine(dataset) is True
+        self.dataset_statistics_service.get_statistics.assert_called_once_with(dataset)
+
+    def test_use_local_query_engine_when_turned_off(self):
+        self.data_service.local_query_max_size = 0
+
+        dataset = DatasetMetadata("raw", "domain1", "dataset1", 2)
+        assert self.data_service.use_local_query_engine(dataset) is False
+        self.dataset_statistics_service.get_statistics.assert_not_called()
+
+    def test_query_data_queries_small_dataset_locally(self):
+        expected_response = pd.DataFrame({"col1": [1, 2]})
+        self.data_service.is_query_too_large = Mock(return_value=False)
+        self.data_service.use_local_query_engine = Mock(return_value=True)
+        self.local_query_adapter.query_sql.return_value = expected_response
+        self.query_result_cache.cache_key.return_value = "key"
+        dataset_metadata = DatasetMetadata("raw", "domain1", "dataset1", 2)
+
+        response = self.data_service.query_data(dataset_metadata, SQLQuery())
+
+        assert response is expected_response
+        self.schema_service.get_schema.assert_called_once_with(dataset_metadata)
+        self.local_query_adapter.query_sql.assert_called_once_with(
+            self.schema_service.get_schema.return_value,
+            "SELECT * FROM raw_domain1_dataset1_2",
+        )
+        self.athena_adapter.query_sql.assert_not_called()
+        self.query_result_cache.put.assert_called_once_with("key", expected_response)
+
+    def test_query_data_falls_back_to_athena_when_local_query_fails(self):
+        expected_response = pd.DataFrame({"col1": [1, 2]})
+        self.data_service.is_query_too_large = Mock(return_value=False)
+        self.data_service.use_local_query_engine = Mock(return_value=True)
+        self.local_query_adapter.query_sql.side_effect = LocalQueryError("Failed")
+        self.athena_adapter.query_sql.return_value = expected_response
+        dataset_metadata = DatasetMetadata("raw", "domain1", "dataset1", 2)
+
+        response = self.data_service.query_data(dataset_metadata, SQLQuery())
+
+        assert response is expected_response
+        self.athena_adapter.query_sql.assert_called_once_with(
+            "SELECT * FROM raw_domain1_dataset1_2", None
+        )
+
+    def test_query_data_in_chunks_queries_small_dataset_locally(self):
+        chunks = [pd.DataFrame({"col1": [1]}), pd.DataFrame({"col1": [2]})]
+        self.data_service.is_query_too_large = Mock(return_value=False)
+        self.data_service.use_local_query_engine = Mock(return_value=True)
+        self.local_query_adapter.query_sql_in_chunks.return_value = iter(chunks)
+        dataset_metadata = DatasetMetadata("raw", "domain1", "dataset1", 2)
+
+        result = self.data_service.query_data_in_chunks(dataset_metadata, SQLQuery())
+
+        assert list(result) == chunks
+        self.local_query_adapter.query_sql_in_chunks.assert_called_once_with(
+            self.schema_service.get_schema.return_value,
+            "SELECT * FROM raw_domain1_dataset1_2",
+        )
+        self.athena_adapter.query_sql_in_chunks.assert_not_called()
+
+    def test_query_data_in_chunks_falls_back_to_athena_when_local_query_fails(self):
+        chunk = pd.DataFrame({"col1": [1, 2]})
+        self.data_service.is_query_too_large = Mock(return_value=False)
+        self.data_service.use_local_query_engine = Mock(return_value=True)
+        self.local_query_adapter.query_sql_in_chunks.side_effect = LocalQueryError(
+            "Failed"
+        )
+        self.athena_adapter.query_sql_in_chunks.return_value = iter([chunk])
+        dataset_metadata = DatasetMetadata("raw", "domain1", "dataset1", 2)
+
+        result = self.data_service.query_data_in_chunks(dataset_metadata, SQLQuery())
+
+        assert list(result) == [chunk]
+
+    def test_query_data_page_runs_query_for_first_page(self):
+        query = SQLQuery(select_columns=["col1"])
+        dataset_metadata = DatasetMetadata("raw", "domain1", "dataset1", 2)
+        self.athena_adapter.query_async.return_value = "the-execution-id"
+        self.athena_adapter.get_query_results_page.return_value = (
+            [{"col1": "1"}],
+            "token-1",
+        )
+
+        page = self.data_service.query_data_page(dataset_metadata, query, 1)
+
+        assert page.data == [{"col1": "1"}]
+        assert QueryCursor.decode(page.next_cursor) == QueryCursor(
+            query_execution_id="the-execution-id", next_token="token-1", query=query
+        )
+        self.athena_adapter.query_async.assert_called_once_with(
+            dataset_metadata, query, None
+        )
+        self.athena_adapter.wait_for_query_to_complete.assert_called_once_with(
+            "the-execution-id"
+        )
+        self.athena_adapter.get_query_results_page.assert_called_once_with(
+            "the-execution-id", 1, None
+        )
+
+    def test_query_data_page_reads_page_of_cursor(self):
+        query = SQLQuery(select_columns=["col1"])
+        dataset_metadata = DatasetMetadata("raw", "domain1", "dataset1", 2)
+        cursor = QueryCursor(
+            query_execution_id="the-execution-id", next_token="token-1", query=query
+        ).encode()
+        self.athena_adapter.get_query_execution.return_value = {
+            "Query": "SELECT col1 FROM raw_domain1_dataset1_2"
+        }
+        self.athena_adapter.get_query_results_page.return_value = (
+            [{"col1": "2"}],
+            None,
+        )
+
+        page = self.data_service.query_data_page(
+            dataset_metadata, SQLQuery(), 5, cursor
+        )
+
+        assert page.data == [{"col1": "2"}]
+        assert page.next_cursor is None
+        self.athena_adapter.query_async.assert_not_called()
+        self.athena_adapter.get_query_execution.assert_called_once_with(
+            "the-execution-id"
+        )
+        self.athena_adapter.get_query_results_page.assert_called_once_with(
+            "the-execution-id", 5, "token-1"
+        )
+
+    def test_query_data_page_raises_error_for_cursor_of_another_dataset(self):
+        cursor = QueryCursor(
+            query_execution_id="the-execution-id",
+            next_token="token-1",
+            query=SQLQuery(),
+        ).encode()
+        self.athena_adapter.get_query_execution.return_value = {
+            "Query": "SELECT * FROM raw_domain2_dataset2_1"
+        }
+
+        with pytest.raises(
+            UserError,
+            match=r"The cursor is not for a query on layer \[raw\], domain \[domain1\], dataset \[dataset1\] and version \[2\]",
+        ):
+            self.data_service.query_data_page(
+                DatasetMetadata("raw", "domain1", "dataset1", 2), SQLQuery(), 5, cursor
+            )
+
+        self.athena_adapter.get_query_results_page.assert_not_called()
 
 
 class TestQueryLargeDataset:
@@ -925,16 +1771,17 @@ class TestQueryLargeDataset:
         self.s3_adapter = Mock()
         self.athena_adapter = Mock()
         self.job_service = Mock()
+        self.job_queue = Mock()
         self.data_service = DataService(
             self.s3_adapter,
             None,
             self.athena_adapter,
             self.job_service,
             self.job_service,
+            self.job_queue,
         )
 
-    @patch("api.application.services.data_service.Thread")
-    def test_query_large_creates_query_job_and_triggers_async_query(self, mock_thread):
+    def test_query_large_creates_query_job_and_queues_query_task(self):
         subject_id = "subject-123"
         dataset_metadata = DatasetMetadata("raw", "domain1", "dataset1", 4)
         query = SQLQuery()
@@ -952,16 +1799,46 @@ class TestQueryLargeDataset:
         self.job_service.create_query_job.assert_called_once_with(
             subject_id, dataset_metadata
         )
-        self.athena_adapter.query_async.assert_called_once_with(dataset_metadata, query)
+        self.athena_adapter.query_async.assert_called_once_with(
+            dataset_metadata, query, subject_id
+        )
 
-        mock_thread.assert_called_once_with(
-            target=self.data_service.generate_results_download_url_async,
-            args=(
-                query_job,
-                query_execution_id,
-            ),
+        self.job_queue.submit.assert_called_once_with(
+            TaskType.QUERY,
+            {
+                "job_id": "12838",
+                "subject_id": subject_id,
+                "query_execution_id": query_execution_id,
+                "layer": "raw",
+                "domain": "domain1",
+                "dataset": "dataset1",
+                "version": 4,
+            },
         )
 
+    @patch.object(DataService, "generate_results_download_url_async")
+    def test_run_query_task_generates_results(self, mock_generate_results):
+        task = ScheduledTask(
+            task_type=TaskType.QUERY,
+            payload={
+                "job_id": "12838",
+                "subject_id": "subject-123",
+                "query_execution_id": "111-222-333",
+                "layer": "raw",
+                "domain": "domain1",
+                "dataset": "dataset1",
+                "version": 4,
+            },
+        )
+
+        self.data_service.run_query_task(task)
+
+        query_job, query_execution_id = mock_generate_results.call_args.args
+        assert query_job.job_id == "12838"
+        assert query_job.subject_id == "subject-123"
+        assert query_job.domain == "domain1"
+        assert query_execution_id == "111-222-333"
+
     def test_updates_query_job_with_presigned_s3_url_when_querying_is_complete(self):
         # GIVEN
         query_job = Mock()
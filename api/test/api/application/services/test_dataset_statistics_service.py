@@ -0,0 +1,534 @@
+import io
+import json
+from unittest.mock import ANY, Mock, call
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from api.application.services.dataset_statistics_service import (
+    DatasetStatisticsService,
+)
+from api.application.services.data_files import write_compacted_file
+from api.common.custom_exceptions import AWSServiceError
+from api.domain.dataset_metadata import DatasetMetadata
+from api.domain.dataset_statistics import (
+    ColumnStatistics,
+    DatasetSizeChange,
+    DatasetStatistics,
+)
+from api.domain.schema import Column, Schema
+from api.domain.schema_metadata import SchemaMetadata
+
+DATASET = DatasetMetadata("raw", "domain", "dataset", 2)
+SCHEMA = Schema(
+    metadata=SchemaMetadata(
+        layer="raw",
+        domain="domain",
+        dataset="dataset",
+        version=2,
+        sensitivity="PUBLIC",
+    ),
+    columns=[
+        Column(name="year", partition_index=0, data_type="int", allow_null=False),
+        Column(name="value", partition_index=None, data_type="int", allow_null=True),
+    ],
+)
+
+
+def parquet_metadata(values) -> pq.FileMetaData:
+    buffer = io.BytesIO()
+    pq.write_table(pa.table({"value": pa.array(values, pa.int32())}), buffer)
+    return pq.read_metadata(pa.BufferReader(buffer.getvalue()))
+
+
+def compacted_file_metadata(uploads) -> pq.FileMetaData:
+    return pq.read_metadata(
+        pa.BufferReader(
+            write_compacted_file(
+                [
+                    (
+                        raw_file_identifier,
+                        pa.table({"value": pa.array(values, pa.int32())}),
+                    )
+                    for raw_file_identifier, values in uploads
+                ]
+            )
+        )
+    )
+
+
+class TestDatasetStatisticsService:
+    def setup_method(self):
+        self.s3_adapter = Mock()
+        self.db_adapter = Mock()
+        self.dataset_statistics_service = DatasetStatisticsService(
+            self.s3_adapter, self.db_adapter
+        )
+        self.s3_adapter.get_folder_statistics.return_value = {
+            "size_bytes": 300,
+            "object_count": 2,
+            "last_updated": "2022-03-01 11:03:49+00:00",
+        }
+        self.s3_adapter.list_files_from_path.return_value = []
+        self.db_adapter.list_dataset_upload_statistics.return_value = {}
+        self.db_adapter.get_dataset_statistics.return_value = {
+            "SizeBytes": 300,
+            "ColumnsComplete": True,
+        }
+        self.db_adapter.add_dataset_size.return_value = True
+
+    def test_get_statistics_reads_recorded_statistics(self):
+        self.db_adapter.get_dataset_statistics.return_value = {
+            "SizeBytes": 300,
+            "ObjectCount": 2,
+            "LastUpdated": "2022-03-01 11:03:49+00:00",
+            "UploadRows": {"abc-123": 10, "def-456": 5},
+            "RowsComplete": True,
+        }
+
+        result = self.dataset_statistics_service.get_statistics(DATASET)
+
+        assert result == DatasetStatistics(
+            size_bytes=300,
+            object_count=2,
+            row_count=15,
+            last_updated="2022-03-01 11:03:49+00:00",
+        )
+        self.db_adapter.get_dataset_statistics.assert_called_once_with(DATASET)
+        self.s3_adapter.get_folder_statistics.assert_not_called()
+
+    def test_get_statistics_reads_complete_column_statistics(self):
+        self.db_adapter.get_dataset_statistics.return_value = {
+            "SizeBytes": 300,
+            "ColumnStatistics": json.dumps(
+                {"value": {"min": 1, "max": 5, "null_count": 2}}
+            ),
+            "ColumnsComplete": True,
+        }
+
+        result = self.dataset_statistics_service.get_statistics(DATASET)
+
+        assert result.column_statistics == {
+            "value": ColumnStatistics(min=1, max=5, null_count=2)
+        }
+
+    def test_get_statistics_has_no_column_statistics_until_every_upload_is_included(
+        self,
+    ):
+        self.db_adapter.get_dataset_statistics.return_value = {
+            "SizeBytes": 300,
+            "ColumnStatistics": json.dumps(
+                {"value": {"min": 1, "max": 5, "null_count": 2}}
+            ),
+            "ColumnsComplete": False,
+        }
+
+        result = self.dataset_statistics_service.get_statistics(DATASET)
+
+        assert result.column_statistics is None
+
+    def test_get_statistics_has_no_row_count_until_every_upload_is_counted(self):
+        self.db_adapter.get_dataset_statistics.return_value = {
+            "SizeBytes": 300,
+            "ObjectCount": 2,
+            "LastUpdated": "2022-03-01 11:03:49+00:00",
+            "UploadRows": {"abc-123": 10},
+        }
+
+        result = self.dataset_statistics_service.get_statistics(DATASET)
+
+        assert result.row_count is None
+
+    def test_get_statistics_records_statistics_when_there_are_none(self):
+        self.db_adapter.get_dataset_statistics.side_effect = [
+            None,
+            {
+                "SizeBytes": 300,
+                "ObjectCount": 2,
+                "LastUpdated": "2022-03-01 11:03:49+00:00",
+            },
+        ]
+
+        result = self.dataset_statistics_service.get_statistics(DATASET)
+
+        assert result == DatasetStatistics(
+            size_bytes=300,
+            object_count=2,
+            last_updated="2022-03-01 11:03:49+00:00",
+        )
+        self.s3_adapter.get_folder_statistics.assert_called_once_with(
+            "data/raw/domain/dataset/2"
+        )
+        self.db_adapter.update_dataset_size.assert_called_once_with(
+            DATASET, 300, 2, "2022-03-01 11:03:49+00:00"
+        )
+
+    def test_record_upload_stores_rows_and_adds_the_size_of_the_upload_files(self):
+        self.s3_adapter.read_parquet_metadata.return_value = {
+            "data/raw/domain/dataset/2/year=2020/abc-123_1.parquet": parquet_metadata(
+                [1]
+            ),
+        }
+        self.dataset_statistics_service.record_upload(
+            SCHEMA,
+            "abc-123",
+            10,
+            False,
+            {"data/raw/domain/dataset/2/year=2020/abc-123_1.parquet": 100},
+        )
+
+        self.db_adapter.store_dataset_upload_rows.assert_called_once_with(
+            SCHEMA.metadata, "abc-123", 10, False
+        )
+        self.db_adapter.add_dataset_size.assert_called_once_with(
+            SCHEMA.metadata, 100, 1, ANY
+        )
+        self.s3_adapter.list_files_from_path.assert_not_called()
+        self.s3_adapter.get_folder_statistics.assert_not_called()
+
+    def test_record_upload_refreshes_size_when_none_has_been_recorded(self):
+        self.s3_adapter.read_parquet_metadata.return_value = {
+            "data/raw/domain/dataset/2/year=2020/abc-123_1.parquet": parquet_metadata(
+                [1]
+            ),
+        }
+        self.db_adapter.add_dataset_size.return_value = False
+
+        self.dataset_statistics_service.record_upload(
+            SCHEMA,
+            "abc-123",
+            10,
+            False,
+            {"data/raw/domain/dataset/2/year=2020/abc-123_1.parquet": 100},
+        )
+
+        self.s3_adapter.get_folder_statistics.assert_called_once_with(
+            "data/raw/domain/dataset/2"
+        )
+        self.db_adapter.update_dataset_size.assert_called_once_with(
+            SCHEMA.metadata, 300, 2, "2022-03-01 11:03:49+00:00"
+        )
+
+    def test_record_upload_with_overwrite_sets_the_size_of_the_upload_files(self):
+        self.s3_adapter.read_parquet_metadata.return_value = {
+            "data/raw/domain/dataset/2/year=2020/abc-123_1.parquet": parquet_metadata(
+                [1]
+            ),
+            "data/raw/domain/dataset/2/year=2021/abc-123_2.parquet": parquet_metadata(
+                [1]
+            ),
+        }
+        self.db_adapter.list_dataset_upload_statistics.return_value = {
+            "abc-123": json.dumps({"value": {"min": 1, "max": 1, "null_count": 0}}),
+            "old-upload": json.dumps({"value": {"min": 5, "max": 5, "null_count": 0}}),
+        }
+
+        self.dataset_statistics_service.record_upload(
+            SCHEMA,
+            "abc-123",
+            10,
+            True,
+            {
+                "data/raw/domain/dataset/2/year=2020/abc-123_1.parquet": 100,
+                "data/raw/domain/dataset/2/year=2021/abc-123_2.parquet": 50,
+            },
+        )
+
+        self.db_adapter.update_dataset_size.assert_called_once_with(
+            SCHEMA.metadata, 150, 2, ANY
+        )
+        self.db_adapter.add_dataset_size.assert_not_called()
+        self.db_adapter.delete_dataset_upload_statistics.assert_called_once_with(
+            SCHEMA.metadata, ["old-upload"]
+        )
+        (
+            _,
+            column_statistics,
+            complete,
+        ) = self.db_adapter.update_dataset_column_statistics.call_args.args
+        assert json.loads(column_statistics) == {
+            "value": {"min": 1, "max": 1, "null_count": 0}
+        }
+        assert complete is True
+
+    def test_record_upload_stores_column_statistics_read_from_the_upload_files(self):
+        upload_files = {
+            "data/raw/domain/dataset/2/year=2020/abc-123_1.parquet": 100,
+            "data/raw/domain/dataset/2/year=2021/abc-123_2.parquet": 100,
+        }
+        self.s3_adapter.read_parquet_metadata.return_value = {
+            "data/raw/domain/dataset/2/year=2020/abc-123_1.parquet": parquet_metadata(
+                [3, None]
+            ),
+            "data/raw/domain/dataset/2/year=2021/abc-123_2.parquet": parquet_metadata(
+                [1, 2]
+            ),
+        }
+        self.db_adapter.list_dataset_upload_statistics.return_value = {
+            "abc-123": json.dumps(
+                {
+                    "value": {"min": 1, "max": 3, "null_count": 1},
+                    "year": {"min": 2020, "max": 2021, "null_count": 0},
+                }
+            ),
+            "def-456": json.dumps(
+                {
+                    "value": {"min": 7, "max": 9, "null_count": 0},
+                    "year": {"min": 2021, "max": 2021, "null_count": 0},
+                }
+            ),
+        }
+
+        self.dataset_statistics_service.record_upload(
+            SCHEMA, "abc-123", 4, False, upload_files
+        )
+
+        self.s3_adapter.read_parquet_metadata.assert_called_once_with(
+            list(upload_files)
+        )
+        (
+            dataset,
+            raw_file_identifier,
+            upload_statistics,
+        ) = self.db_adapter.store_dataset_upload_statistics.call_args.args
+        assert (dataset, raw_file_identifier) == (SCHEMA.metadata, "abc-123")
+        assert json.loads(upload_statistics) == {
+            "value": {"min": 1, "max": 3, "null_count": 1},
+            "year": {"min": 2020, "max": 2021, "null_count": 0},
+        }
+        (
+            dataset,
+            column_statistics,
+            complete,
+        ) = self.db_adapter.update_dataset_column_statistics.call_args.args
+        assert json.loads(column_statistics) == {
+            "value": {"min": 1, "max": 9, "null_count": 1},
+            "year": {"min": 2020, "max": 2021, "null_count": 0},
+        }
+        assert complete is True
+        self.db_adapter.delete_dataset_upload_statistics.assert_not_called()
+
+    def test_record_upload_keeps_column_statistics_incomplete(self):
+        self.s3_adapter.read_parquet_metadata.return_value = {
+            "data/raw/domain/dataset/2/year=2020/abc-123_1.parquet": parquet_metadata(
+                [1]
+            ),
+        }
+        self.db_adapter.get_dataset_statistics.return_value = {
+            "SizeBytes": 300,
+            "ColumnsComplete": False,
+        }
+        self.db_adapter.list_dataset_upload_statistics.return_value = {
+            "abc-123": json.dumps({"value": {"min": 1, "max": 1, "null_count": 0}})
+        }
+
+        self.dataset_statistics_service.record_upload(
+            SCHEMA,
+            "abc-123",
+            1,
+            False,
+            {"data/raw/domain/dataset/2/year=2020/abc-123_1.parquet": 100},
+        )
+
+        _, _, complete = self.db_adapter.update_dataset_column_statistics.call_args.args
+        assert complete is False
+        self.s3_adapter.list_files_from_path.assert_not_called()
+
+    def test_record_upload_lists_the_dataset_when_column_statistics_were_not_recorded(
+        self,
+    ):
+        self.s3_adapter.read_parquet_metadata.return_value = {
+            "data/raw/domain/dataset/2/year=2020/abc-123_1.parquet": parquet_metadata(
+                [1]
+            ),
+        }
+        self.db_adapter.get_dataset_statistics.return_value = {"SizeBytes": 300}
+        self.s3_adapter.list_files_from_path.return_value = [
+            "data/raw/domain/dataset/2/year=2020/abc-123_1.parquet",
+            "data/raw/domain/dataset/2/year=2020/old-upload_1.parquet",
+        ]
+        self.db_adapter.list_dataset_upload_statistics.return_value = {
+            "abc-123": json.dumps({"value": {"min": 1, "max": 1, "null_count": 0}})
+        }
+
+        self.dataset_statistics_service.record_upload(
+            SCHEMA,
+            "abc-123",
+            1,
+            False,
+            {"data/raw/domain/dataset/2/year=2020/abc-123_1.parquet": 100},
+        )
+
+        self.s3_adapter.list_files_from_path.assert_called_once_with(
+            "data/raw/domain/dataset/2/"
+        )
+        _, _, complete = self.db_adapter.update_dataset_column_statistics.call_args.args
+        assert complete is False
+        self.db_adapter.add_dataset_size.assert_called_once_with(
+            SCHEMA.metadata, 100, 1, ANY
+        )
+
+    def test_record_file_deletion_removes_rows_and_subtracts_the_deleted_size(self):
+        self.dataset_statistics_service.record_file_deletion(
+            DATASET, "abc-123", DatasetSizeChange(size_bytes=-100, object_count=-2)
+        )
+
+        self.db_adapter.delete_dataset_upload_rows.assert_called_once_with(
+            DATASET, "abc-123"
+        )
+        self.db_adapter.add_dataset_size.assert_called_once_with(
+            DATASET, -100, -2, None
+        )
+        self.s3_adapter.get_folder_statistics.assert_not_called()
+
+    def test_record_file_deletion_removes_the_statistics_of_the_upload(self):
+        self.db_adapter.list_dataset_upload_statistics.return_value = {
+            "abc-123": json.dumps({"value": {"min": 1, "max": 3, "null_count": 1}}),
+            "def-456": json.dumps({"value": {"min": 7, "max": 9, "null_count": 0}}),
+        }
+
+        self.dataset_statistics_service.record_file_deletion(
+            DATASET, "abc-123", DatasetSizeChange(size_bytes=-100, object_count=-1)
+        )
+
+        self.s3_adapter.list_files_from_path.assert_not_called()
+        self.db_adapter.delete_dataset_upload_statistics.assert_called_once_with(
+            DATASET, ["abc-123"]
+        )
+        (
+            dataset,
+            column_statistics,
+            complete,
+        ) = self.db_adapter.update_dataset_column_statistics.call_args.args
+        assert json.loads(column_statistics) == {
+            "value": {"min": 7, "max": 9, "null_count": 0}
+        }
+        assert complete is True
+
+    def test_record_failed_file_deletion_lists_the_dataset(self):
+        compacted_file = "data/raw/domain/dataset/2/year=2021/compacted-1.parquet"
+        self.s3_adapter.list_files_from_path.return_value = [compacted_file]
+        self.s3_adapter.read_parquet_metadata.return_value = {
+            compacted_file: compacted_file_metadata([("def-456", [7, 9])])
+        }
+        self.db_adapter.list_dataset_upload_statistics.return_value = {
+            "abc-123": json.dumps({"value": {"min": 1, "max": 3, "null_count": 1}}),
+            "def-456": json.dumps({"value": {"min": 7, "max": 9, "null_count": 0}}),
+        }
+
+        self.dataset_statistics_service.record_file_deletion(DATASET, "abc-123", None)
+
+        self.s3_adapter.read_parquet_metadata.assert_called_once_with([compacted_file])
+        self.db_adapter.delete_dataset_upload_statistics.assert_called_once_with(
+            DATASET, ["abc-123"]
+        )
+        self.db_adapter.update_dataset_size.assert_called_once_with(
+            DATASET, 300, 2, "2022-03-01 11:03:49+00:00"
+        )
+        self.db_adapter.add_dataset_size.assert_not_called()
+
+    def test_record_compaction_adds_the_change_in_size(self):
+        self.dataset_statistics_service.record_compaction(
+            DATASET, DatasetSizeChange(size_bytes=-20, object_count=-4)
+        )
+
+        self.db_adapter.add_dataset_size.assert_called_once_with(DATASET, -20, -4, ANY)
+        self.s3_adapter.list_files_from_path.assert_not_called()
+        self.db_adapter.update_dataset_column_statistics.assert_not_called()
+
+    def test_recompute_statistics_splits_compacted_files_by_upload(self):
+        compacted_file = "data/raw/domain/dataset/2/year=2021/compacted-1.parquet"
+        self.s3_adapter.list_files_from_path.return_value = [compacted_file]
+        self.s3_adapter.read_parquet_metadata.return_value = {
+            compacted_file: compacted_file_metadata(
+                [("def-456", [7, 9]), ("abc-123", [1, None, 3])]
+            )
+        }
+        self.db_adapter.get_dataset_statistics.return_value = {"SizeBytes": 300}
+
+        self.dataset_statistics_service.recompute_statistics(SCHEMA)
+
+        self.db_adapter.replace_dataset_upload_rows.assert_called_once_with(
+            SCHEMA.metadata, {"abc-123": 3, "def-456": 2}
+        )
+        assert self.db_adapter.store_dataset_upload_statistics.call_args_list == [
+            call(
+                SCHEMA.metadata,
+                "abc-123",
+                json.dumps(
+                    {
+                        "value": {"min": 1, "max": 3, "null_count": 1},
+                        "year": {"min": 2021, "max": 2021, "null_count": 0},
+                    }
+                ),
+            ),
+            call(
+                SCHEMA.metadata,
+                "def-456",
+                json.dumps(
+                    {
+                        "value": {"min": 7, "max": 9, "null_count": 0},
+                        "year": {"min": 2021, "max": 2021, "null_count": 0},
+                    }
+                ),
+            ),
+        ]
+
+    def test_recompute_statistics_reads_every_data_file(self):
+        self.s3_adapter.list_files_from_path.return_value = [
+            "data/raw/domain/dataset/2/year=2020/abc-123_1.parquet",
+            "data/raw/domain/dataset/2/year=2021/def-456_1.parquet",
+            "data/raw/domain/dataset/2/year=2021/abc-123_2.parquet",
+        ]
+        self.s3_adapter.read_parquet_metadata.return_value = {
+            "data/raw/domain/dataset/2/year=2020/abc-123_1.parquet": parquet_metadata(
+                [3, None]
+            ),
+            "data/raw/domain/dataset/2/year=2021/def-456_1.parquet": parquet_metadata(
+                [7]
+            ),
+            "data/raw/domain/dataset/2/year=2021/abc-123_2.parquet": parquet_metadata(
+                [1]
+            ),
+        }
+        self.db_adapter.get_dataset_statistics.return_value = {"SizeBytes": 300}
+
+        self.dataset_statistics_service.recompute_statistics(SCHEMA)
+
+        self.db_adapter.replace_dataset_upload_rows.assert_called_once_with(
+            SCHEMA.metadata, {"abc-123": 3, "def-456": 1}
+        )
+        assert self.db_adapter.store_dataset_upload_statistics.call_args_list == [
+            call(
+                SCHEMA.metadata,
+                "abc-123",
+                json.dumps(
+                    {
+                        "value": {"min": 1, "max": 3, "null_count": 1},
+                        "year": {"min": 2020, "max": 2021, "null_count": 0},
+                    }
+                ),
+            ),
+            call(
+                SCHEMA.metadata,
+                "def-456",
+                json.dumps(
+                    {
+                        "value": {"min": 7, "max": 7, "null_count": 0},
+                        "year": {"min": 2021, "max": 2021, "null_count": 0},
+                    }
+                ),
+            ),
+        ]
+        self.db_adapter.update_dataset_size.assert_called_once_with(
+            SCHEMA.metadata, 300, 2, "2022-03-01 11:03:49+00:00"
+        )
+
+    def test_record_change_does_not_raise_when_recording_fails(self):
+        self.db_adapter.update_dataset_size.side_effect = AWSServiceError("Failed")
+
+        self.dataset_statistics_service.record_change(DATASET)
+
+        self.s3_adapter.get_folder_statistics.assert_called_once_with(
+            "data/raw/domain/dataset/2"
+        )
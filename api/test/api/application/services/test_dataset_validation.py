@@ -173,6 +173,26 @@ class TestDatasetValidation:
         with pytest.raises(DatasetValidationError):
             build_validated_dataframe(valid_schema, dataframe)
 
+    def test_partition_column_check_ignores_values_that_are_not_strings(self):
+        schema = Schema(
+            metadata=self.schema_metadata,
+            columns=[
+                Column(
+                    name="colname1",
+                    partition_index=0,
+                    data_type="string",
+                    allow_null=True,
+                ),
+            ],
+        )
+        dataframe = pd.DataFrame({"colname1": ["a.b", None, 1, "c*d"]})
+
+        _, errors = dataset_has_no_illegal_characters_in_partition_columns(
+            dataframe, schema
+        )
+
+        assert errors == []
+
     def test_valid_when_date_partition_column_with_illegal_slash_character(self):
         valid_schema = Schema(
             metadata=self.schema_metadata,
@@ -260,6 +280,38 @@ class TestDatasetValidation:
         with pytest.raises(DatasetValidationError):
             build_validated_dataframe(schema, dataframe)
 
+    def test_reports_every_column_with_unacceptable_null_values_in_schema_order(self):
+        schema = Schema(
+            metadata=self.schema_metadata,
+            columns=[
+                Column(
+                    name="col1", partition_index=None, data_type="int", allow_null=False
+                ),
+                Column(
+                    name="col2",
+                    partition_index=None,
+                    data_type="double",
+                    allow_null=True,
+                ),
+                Column(
+                    name="col3",
+                    partition_index=None,
+                    data_type="string",
+                    allow_null=False,
+                ),
+            ],
+        )
+        dataframe = pd.DataFrame(
+            {"col3": ["hello", None], "col2": [None, 1.5], "col1": [None, 2]}
+        )
+
+        _, errors = dataset_has_acceptable_null_values(dataframe, schema)
+
+        assert errors == [
+            "Column [col1] does not allow null values",
+            "Column [col3] does not allow null values",
+        ]
+
     def test_validates_correct_data_types(self):
         dataframe = pd.DataFrame(
             {"col1": [1234, 4567], "col2": [4.53, 9.33], "col3": ["Carlos", "Ada"]}
@@ -1,13 +1,16 @@
-from unittest.mock import Mock
+from unittest.mock import Mock, call
 
 import pytest
 
 from api.application.services.delete_service import DeleteService
 from api.common.custom_exceptions import (
     AWSServiceError,
+    ConflictError,
     UserError,
 )
 from api.domain.dataset_metadata import DatasetMetadata
+from api.domain.Jobs.DeletionJob import DeletionStep
+from api.domain.scheduled_task import ScheduledTask, TaskType
 
 
 class TestDeleteService:
@@ -15,8 +18,21 @@ class TestDeleteService:
         self.s3_adapter = Mock()
         self.glue_adapter = Mock()
         self.schema_service = Mock()
+        self.job_service = Mock()
+        self.job_queue = Mock()
+        self.query_result_cache = Mock()
+        self.dataset_statistics_service = Mock()
+        self.db_adapter = Mock()
+        self.db_adapter.acquire_dataset_lock.return_value = True
         self.delete_service = DeleteService(
-            self.s3_adapter, self.glue_adapter, self.schema_service
+            self.s3_adapter,
+            self.glue_adapter,
+            self.schema_service,
+            self.job_service,
+            self.job_queue,
+            self.query_result_cache,
+            self.dataset_statistics_service,
+            self.db_adapter,
         )
 
     def test_delete_file(self):
@@ -34,6 +50,41 @@ class TestDeleteService:
             dataset_metadata,
             "2022-01-01T00:00:00-file.csv",
         )
+        self.query_result_cache.invalidate.assert_called_once_with(dataset_metadata)
+        self.dataset_statistics_service.record_file_deletion.assert_called_once_with(
+            dataset_metadata,
+            "2022-01-01T00:00:00-file",
+            self.s3_adapter.delete_dataset_files.return_value,
+        )
+        lock_owner = self.db_adapter.acquire_dataset_lock.call_args.args[1]
+        self.db_adapter.release_dataset_lock.assert_called_once_with(
+            dataset_metadata, lock_owner
+        )
+
+    def test_delete_file_when_dataset_is_locked(self):
+        self.db_adapter.acquire_dataset_lock.return_value = False
+        dataset_metadata = DatasetMetadata("layer", "domain", "dataset", 1)
+
+        with pytest.raises(ConflictError):
+            self.delete_service.delete_dataset_file(
+                dataset_metadata, "2022-01-01T00:00:00-file.csv"
+            )
+
+        self.s3_adapter.delete_dataset_files.assert_not_called()
+        self.db_adapter.release_dataset_lock.assert_not_called()
+
+    def test_delete_file_records_a_failed_deletion_without_its_size(self):
+        self.s3_adapter.delete_dataset_files.side_effect = AWSServiceError("failed")
+        dataset_metadata = DatasetMetadata("layer", "domain", "dataset", 1)
+
+        with pytest.raises(AWSServiceError):
+            self.delete_service.delete_dataset_file(
+                dataset_metadata, "2022-01-01T00:00:00-file.csv"
+            )
+
+        self.dataset_statistics_service.record_file_deletion.assert_called_once_with(
+            dataset_metadata, "2022-01-01T00:00:00-file", None
+        )
 
     def test_delete_file_when_file_does_not_exist(self):
         self.s3_adapter.find_raw_file.side_effect = UserError("Some message")
@@ -98,6 +149,94 @@ class TestDeleteService:
         )
         self.glue_adapter.delete_tables.assert_called_once_with(tables)
         self.schema_service.delete_schemas.assert_called_once_with(dataset_metadata)
+        self.query_result_cache.invalidate.assert_called_once_with(dataset_metadata)
+        self.dataset_statistics_service.delete_statistics.assert_called_once_with(
+            dataset_metadata
+        )
+
+    def test_delete_dataset_invalidates_cached_results_when_deletion_fails(self):
+        self.s3_adapter.delete_dataset_files_using_key.side_effect = AWSServiceError(
+            "Failed"
+        )
+        dataset_metadata = DatasetMetadata("layer", "domain", "dataset")
+
+        with pytest.raises(AWSServiceError):
+            self.delete_service.delete_dataset(dataset_metadata)
+
+        self.query_result_cache.invalidate.assert_called_once_with(dataset_metadata)
+        self.glue_adapter.delete_tables.assert_not_called()
+
+    def test_delete_dataset_in_background_queues_deletion_task(self):
+        deletion_job = Mock(job_id="abc-123")
+        self.job_service.create_deletion_job.return_value = deletion_job
+        dataset_metadata = DatasetMetadata("layer", "domain", "dataset")
+
+        result = self.delete_service.delete_dataset_in_background(
+            "subject-123", dataset_metadata
+        )
+
+        assert result == "abc-123"
+        self.job_service.create_deletion_job.assert_called_once_with(
+            "subject-123", dataset_metadata
+        )
+        self.job_queue.submit.assert_called_once_with(
+            TaskType.DELETION,
+            {
+                "job_id": "abc-123",
+                "subject_id": "subject-123",
+                "layer": "layer",
+                "domain": "domain",
+                "dataset": "dataset",
+            },
+        )
+        self.s3_adapter.delete_dataset_files_using_key.assert_not_called()
+
+    def test_run_deletion_task_deletes_dataset_and_succeeds_job(self):
+        self.s3_adapter.list_dataset_files.return_value = ["aaa"]
+        self.glue_adapter.get_tables_for_dataset.return_value = ["table_a"]
+        task = ScheduledTask(
+            task_type=TaskType.DELETION,
+            payload={
+                "job_id": "abc-123",
+                "subject_id": "subject-123",
+                "layer": "layer",
+                "domain": "domain",
+                "dataset": "dataset",
+            },
+        )
+
+        self.delete_service.run_deletion_task(task)
+
+        dataset_metadata = DatasetMetadata("layer", "domain", "dataset")
+        self.s3_adapter.delete_dataset_files_using_key.assert_called_once_with(
+            ["aaa"], "layer/domain/dataset"
+        )
+        self.glue_adapter.delete_tables.assert_called_once_with(["table_a"])
+        self.schema_service.delete_schemas.assert_called_once_with(dataset_metadata)
+        deletion_job = self.job_service.succeed.call_args.args[0]
+        assert deletion_job.job_id == "abc-123"
+        self.job_service.update_step.assert_has_calls(
+            [
+                call(deletion_job, DeletionStep.DELETING),
+                call(deletion_job, DeletionStep.NONE),
+            ]
+        )
+
+    def test_process_deletion_fails_job_when_deletion_fails(self):
+        deletion_job = Mock()
+        self.s3_adapter.list_dataset_files.return_value = ["aaa"]
+        self.s3_adapter.delete_dataset_files_using_key.side_effect = AWSServiceError(
+            "The item [layer/domain/dataset] could not be deleted"
+        )
+
+        self.delete_service.process_deletion(
+            deletion_job, DatasetMetadata("layer", "domain", "dataset")
+        )
+
+        self.job_service.fail.assert_called_once_with(
+            deletion_job, ["The item [layer/domain/dataset] could not be deleted"]
+        )
+        self.schema_service.delete_schemas.assert_not_called()
 
     def test_delete_schema_upload_success(self):
         dataset_metadata = DatasetMetadata("layer", "domain", "dataset", 1)
@@ -1,5 +1,9 @@
 import csv
+import io
+
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from api.application.services.format_service import FormatService
 from api.domain.mime_type import MimeType
@@ -25,3 +29,44 @@ class TestFormatService:
             0: {"area": "area_1", "column1": 1, "column2": "item1"},
             1: {"area": "area_2", "column1": 2, "column2": "item2"},
         }
+
+    def test_format_chunks_to_csv_writes_header_once(self):
+        chunks = [self.df.iloc[:1], self.df.iloc[1:]]
+
+        output = FormatService.from_chunks_to_mimetype(chunks, MimeType.TEXT_CSV)
+
+        assert "".join(output) == self.df.to_csv(
+            quoting=csv.QUOTE_NONNUMERIC, index=False
+        )
+
+    def test_format_chunks_to_ndjson(self):
+        chunks = [self.df.iloc[:1], self.df.iloc[:0], self.df.iloc[1:]]
+
+        output = FormatService.from_chunks_to_mimetype(chunks, MimeType.NDJSON)
+
+        assert list(output) == [
+            '{"column1":1,"column2":"item1","area":"area_1"}\n',
+            '{"column1":2,"column2":"item2","area":"area_2"}\n',
+        ]
+
+    def test_format_chunks_to_parquet_writes_a_row_group_per_chunk(self):
+        df = self.df.astype("string")
+        chunks = [df.iloc[:1], df.iloc[1:]]
+
+        output = FormatService.from_chunks_to_mimetype(chunks, MimeType.BINARY)
+
+        parquet_file = pq.ParquetFile(io.BytesIO(b"".join(output)))
+        assert parquet_file.metadata.num_row_groups == 2
+        pd.testing.assert_frame_equal(parquet_file.read().to_pandas(), df)
+
+    def test_format_chunks_to_arrow_stream(self):
+        chunks = [self.df.iloc[:1], self.df.iloc[1:]]
+
+        output = FormatService.from_chunks_to_mimetype(chunks, MimeType.ARROW_STREAM)
+
+        reader = pa.ipc.open_stream(b"".join(output))
+        batches = list(reader)
+        assert len(batches) == 2
+        pd.testing.assert_frame_equal(
+            pa.Table.from_batches(batches).to_pandas(), self.df
+        )
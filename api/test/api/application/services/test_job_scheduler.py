@@ -0,0 +1,118 @@
+from threading import Event
+from unittest.mock import Mock
+
+import pytest
+
+from api.application.services.job_scheduler import JobQueue, JobScheduler, TaskHandler
+from api.common.custom_exceptions import TooManyRequestsError
+from api.domain.scheduled_task import ScheduledTask, TaskType
+
+
+class TestJobQueue:
+    def setup_method(self):
+        self.store = Mock()
+        self.job_queue = JobQueue(self.store, max_size=2)
+
+    def test_submit_enqueues_task_with_priority_of_its_type(self):
+        self.store.count_queued.return_value = 1
+
+        task = self.job_queue.submit(TaskType.QUERY, {"job_id": "abc-123"})
+
+        self.store.enqueue.assert_called_once_with(task)
+        assert task.task_type == TaskType.QUERY
+        assert task.payload == {"job_id": "abc-123"}
+        assert task.priority == 0
+
+    def test_submit_raises_error_when_queue_is_full(self):
+        self.store.count_queued.return_value = 2
+
+        with pytest.raises(
+            TooManyRequestsError,
+            match="There are too many jobs waiting to be processed, please try again later",
+        ):
+            self.job_queue.submit(TaskType.UPLOAD, {"job_id": "abc-123"})
+
+        self.store.enqueue.assert_not_called()
+
+
+class TestJobScheduler:
+    def setup_method(self):
+        self.store = Mock()
+        self.upload_handler = TaskHandler(Mock(), Mock())
+        self.scheduler = JobScheduler(
+            self.store,
+            {TaskType.UPLOAD: self.upload_handler},
+            concurrency=2,
+            poll_interval=0.01,
+            max_attempts=2,
+        )
+
+    def test_run_next_runs_and_completes_claimed_task(self):
+        task = ScheduledTask(task_type=TaskType.UPLOAD, payload={}, attempts=1)
+        self.store.claim_next.return_value = task
+
+        assert self.scheduler.run_next() is True
+
+        self.upload_handler.run.assert_called_once_with(task)
+        self.upload_handler.abandon.assert_not_called()
+        self.store.complete.assert_called_once_with(task)
+
+    def test_run_next_returns_false_when_there_are_no_tasks(self):
+        self.store.claim_next.return_value = None
+
+        assert self.scheduler.run_next() is False
+
+        self.upload_handler.run.assert_not_called()
+
+    def test_abandons_task_after_too_many_attempts(self):
+        task = ScheduledTask(task_type=TaskType.UPLOAD, payload={}, attempts=3)
+        self.store.claim_next.return_value = task
+
+        self.scheduler.run_next()
+
+        self.upload_handler.abandon.assert_called_once_with(task)
+        self.upload_handler.run.assert_not_called()
+        self.store.complete.assert_called_once_with(task)
+
+    def test_completes_task_when_handler_fails(self):
+        task = ScheduledTask(task_type=TaskType.UPLOAD, payload={}, attempts=1)
+        self.store.claim_next.return_value = task
+        self.upload_handler.run.side_effect = Exception("Failed")
+
+        self.scheduler.run_next()
+
+        self.store.complete.assert_called_once_with(task)
+        assert self.scheduler.run_next() is True
+
+    def test_runs_at_most_concurrency_tasks_at_once(self):
+        tasks = [
+            ScheduledTask(task_type=TaskType.UPLOAD, payload={}, attempts=1)
+            for _ in range(3)
+        ]
+        self.store.claim_next.side_effect = tasks + [None] * 100
+        release = Event()
+        both_running = Event()
+        all_run = Event()
+        running = []
+
+        def run(task):
+            running.append(task)
+            if len(running) == 2:
+                both_running.set()
+            if len(running) == 3:
+                all_run.set()
+            release.wait(5)
+
+        self.upload_handler.run.side_effect = run
+
+        thread = self.scheduler.start()
+        assert both_running.wait(5)
+        assert not all_run.wait(0.1)
+        assert len(running) == 2
+
+        release.set()
+        assert all_run.wait(5)
+        self.scheduler.stop()
+        thread.join(5)
+
+        assert self.store.complete.call_count == 3
@@ -2,6 +2,8 @@ from unittest.mock import patch
 
 from api.adapter.dynamodb_adapter import DynamoDBAdapter
 from api.application.services.job_service import JobService
+from api.domain.Jobs.CompactionJob import CompactionJob, CompactionStep
+from api.domain.Jobs.DeletionJob import DeletionStep
 from api.domain.Jobs.Job import JobStatus
 from api.domain.Jobs.QueryJob import QueryStep, QueryJob
 from api.domain.Jobs.UploadJob import UploadStep, UploadJob
@@ -135,6 +137,52 @@ class TestCreateQueryJob:
         mock_store_query_job.assert_called_once_with(result)
 
 
+class TestCreateCompactionJob:
+    def setup_method(self):
+        self.job_service = JobService()
+
+    @patch("api.domain.Jobs.Job.uuid")
+    @patch.object(DynamoDBAdapter, "store_compaction_job")
+    def test_creates_compaction_job(self, mock_store_compaction_job, mock_uuid):
+        # GIVEN
+        mock_uuid.uuid4.return_value = "abc-123"
+
+        # WHEN
+        result = self.job_service.create_compaction_job(
+            "subject-123", DatasetMetadata("layer", "domain1", "dataset2", 4)
+        )
+
+        # THEN
+        assert result.job_id == "abc-123"
+        assert result.subject_id == "subject-123"
+        assert result.step == CompactionStep.INITIALISATION
+        assert result.status == JobStatus.IN_PROGRESS
+        mock_store_compaction_job.assert_called_once_with(result)
+
+
+class TestCreateDeletionJob:
+    def setup_method(self):
+        self.job_service = JobService()
+
+    @patch("api.domain.Jobs.Job.uuid")
+    @patch.object(DynamoDBAdapter, "store_deletion_job")
+    def test_creates_deletion_job(self, mock_store_deletion_job, mock_uuid):
+        # GIVEN
+        mock_uuid.uuid4.return_value = "abc-123"
+
+        # WHEN
+        result = self.job_service.create_deletion_job(
+            "subject-123", DatasetMetadata("layer", "domain1", "dataset2")
+        )
+
+        # THEN
+        assert result.job_id == "abc-123"
+        assert result.subject_id == "subject-123"
+        assert result.step == DeletionStep.INITIALISATION
+        assert result.status == JobStatus.IN_PROGRESS
+        mock_store_deletion_job.assert_called_once_with(result)
+
+
 class TestUpdateJob:
     def setup_method(self):
         self.job_service = JobService()
@@ -230,6 +278,41 @@ class TestSucceedsQueryJob:
         mock_update_query_job.assert_called_once_with(job)
 
 
+class TestCompactionJobProgress:
+    def setup_method(self):
+        self.job_service = JobService()
+
+    @patch.object(DynamoDBAdapter, "update_compaction_job")
+    def test_records_compaction_progress(self, mock_update_compaction_job):
+        # GIVEN
+        job = CompactionJob(
+            "subject-123", DatasetMetadata("layer", "domain1", "dataset2", 4)
+        )
+
+        # WHEN
+        self.job_service.record_compaction_progress(job, 12, 1)
+
+        # THEN
+        assert job.files_compacted == 12
+        assert job.files_written == 1
+        mock_update_compaction_job.assert_called_once_with(job)
+
+    @patch.object(DynamoDBAdapter, "update_compaction_job")
+    def test_succeeds_compaction_job(self, mock_update_compaction_job):
+        # GIVEN
+        job = CompactionJob(
+            "subject-123", DatasetMetadata("layer", "domain1", "dataset2", 4)
+        )
+
+        # WHEN
+        self.job_service.succeed_compaction(job)
+
+        # THEN
+        assert job.step == CompactionStep.NONE
+        assert job.status == JobStatus.SUCCESS
+        mock_update_compaction_job.assert_called_once_with(job)
+
+
 class TestFailsJob:
     def setup_method(self):
         self.job_service = JobService()
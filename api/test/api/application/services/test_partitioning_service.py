@@ -1,9 +1,13 @@
+import datetime
 from typing import List
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from api.application.services.partitioning_service import (
     Partition,
+    PartitionedParquetWriter,
     generate_path,
     drop_columns,
     generate_partitioned_data,
@@ -185,6 +189,73 @@ class TestPartitioning:
         actual = generate_partitioned_data(schema, df)
         self.assert_partitions_are_the_same(expected, actual)
 
+    def test_partitions_arrow_tables_like_dataframes(self):
+        schema = Schema(
+            metadata=SchemaMetadata(
+                layer="raw",
+                domain="test_domain",
+                dataset="test_dataset",
+                sensitivity="PUBLIC",
+                owners=[Owner(name="change_me", email="change_me@email.com")],
+            ),
+            columns=[
+                Column(
+                    name="col1",
+                    partition_index=0,
+                    data_type="int",
+                    allow_null=True,
+                ),
+                Column(
+                    name="col2",
+                    partition_index=1,
+                    data_type="date",
+                    allow_null=False,
+                    format="%Y-%m-%d",
+                ),
+                Column(
+                    name="col3",
+                    partition_index=None,
+                    data_type="string",
+                    allow_null=True,
+                ),
+            ],
+        )
+        dates = [
+            datetime.date(2021, 1, 2),
+            datetime.date(2021, 1, 1),
+            datetime.date(2021, 1, 2),
+            datetime.date(2021, 1, 1),
+        ]
+        table = pa.table(
+            {
+                "col1": pa.array([2, 1, 2, None], pa.int32()),
+                "col2": pa.array(dates, pa.date32()),
+                "col3": ["a", "b", "c", "d"],
+            }
+        )
+        df = pd.DataFrame(
+            {
+                "col1": [2, 1, 2, None],
+                "col2": pd.to_datetime(dates),
+                "col3": ["a", "b", "c", "d"],
+            }
+        ).astype({"col1": "Int64"})
+
+        actual = generate_partitioned_data(schema, table)
+        expected = generate_partitioned_data(schema, df)
+
+        assert [partition.path for partition in actual] == [
+            "col1=1/col2=2021-01-01 00:00:00",
+            "col1=2/col2=2021-01-02 00:00:00",
+        ]
+        assert [partition.path for partition in actual] == [
+            partition.path for partition in expected
+        ]
+        assert [partition.df.to_pydict() for partition in actual] == [
+            {"col3": ["b"]},
+            {"col3": ["a", "c"]},
+        ]
+
     def assert_partitions_are_the_same(
         self, expected: List[Partition], actual: List[Partition]
     ):
@@ -193,3 +264,77 @@ class TestPartitioning:
             assert actual_partition.df.to_dict() == expected_partition.df.to_dict()
             assert actual_partition.path == expected_partition.path
             assert actual_partition.keys == expected_partition.keys
+
+
+class TestPartitionedParquetWriter:
+    def setup_method(self):
+        self.schema = Schema(
+            metadata=SchemaMetadata(
+                layer="raw",
+                domain="test_domain",
+                dataset="test_dataset",
+                sensitivity="PUBLIC",
+                owners=[Owner(name="change_me", email="change_me@email.com")],
+            ),
+            columns=[
+                Column(
+                    name="col1",
+                    partition_index=0,
+                    data_type="int",
+                    allow_null=False,
+                ),
+                Column(
+                    name="col2",
+                    partition_index=None,
+                    data_type="string",
+                    allow_null=True,
+                ),
+            ],
+        )
+        self.filenames = (f"file{index}.parquet" for index in range(100))
+
+    def test_appends_chunks_to_one_file_per_partition(self, tmp_path):
+        with PartitionedParquetWriter(
+            self.schema, tmp_path, lambda: next(self.filenames), row_group_size=3
+        ) as writer:
+            writer.write(pd.DataFrame({"col1": [1, 1, 2], "col2": ["a", "b", "c"]}))
+            writer.write(pd.DataFrame({"col1": [1, 2], "col2": ["d", "e"]}))
+
+        partition_1 = pq.ParquetFile(tmp_path / "col1=1" / "file0.parquet")
+        partition_2 = pq.ParquetFile(tmp_path / "col1=2" / "file1.parquet")
+
+        assert len(list(tmp_path.rglob("*.parquet"))) == 2
+        assert partition_1.read().to_pydict() == {"col2": ["a", "b", "d"]}
+        assert partition_1.metadata.num_row_groups == 1
+        assert partition_2.read().to_pydict() == {"col2": ["c", "e"]}
+
+    def test_rolls_over_to_a_new_file_at_the_target_size(self, tmp_path):
+        with PartitionedParquetWriter(
+            self.schema,
+            tmp_path,
+            lambda: next(self.filenames),
+            target_file_size=1,
+            row_group_size=1,
+        ) as writer:
+            writer.write(pa.table({"col1": [1, 1], "col2": ["a", "b"]}))
+            writer.write(pa.table({"col1": [1], "col2": ["c"]}))
+
+        assert sorted(
+            pq.read_table(path).column("col2")[0].as_py()
+            for path in (tmp_path / "col1=1").glob("*.parquet")
+        ) == ["a", "c"]
+        assert len(list((tmp_path / "col1=1").glob("*.parquet"))) == 2
+
+    def test_flushes_every_partition_when_too_many_rows_are_buffered(self, tmp_path):
+        writer = PartitionedParquetWriter(
+            self.schema,
+            tmp_path,
+            lambda: next(self.filenames),
+            row_group_size=10,
+            max_buffered_rows=3,
+        )
+
+        writer.write(pd.DataFrame({"col1": [1, 2, 3], "col2": ["a", "b", "c"]}))
+
+        assert len(list(tmp_path.rglob("*.parquet"))) == 3
+        writer.close()
@@ -46,49 +46,21 @@ class TestGetSubjectPermissions:
     def test_get_permissions(self):
         subject_id = "123abc"
         expected_response = [
-            {
-                "id": "WRITE_ALL_PUBLIC",
-                "type": "WRITE",
-                "layer": "ALL",
-                "sensitivity": "PUBLIC",
-                "domain": None,
-            },
-            {
-                "id": "READ_ALL_PRIVATE",
-                "type": "READ",
-                "layer": "ALL",
-                "sensitivity": "PRIVATE",
-                "domain": None,
-            },
-        ]
-        self.dynamo_adapter.get_permission_keys_for_subject.return_value = [
-            "WRITE_ALL_PUBLIC",
-            "READ_ALL_PRIVATE",
-        ]
-        self.dynamo_adapter.get_all_permissions.return_value = [
             PermissionItem(
                 id="WRITE_ALL_PUBLIC",
                 type="WRITE",
                 layer="ALL",
                 sensitivity="PUBLIC",
             ),
-            PermissionItem(
-                id="READ_ALL_PRIVATE",
-                type="READ",
-                layer="ALL",
-                sensitivity="PRIVATE",
-            ),
-            PermissionItem(
-                id="DATA_ADMIN",
-                type="DATA_ADMIN",
-            ),
         ]
+        self.dynamo_adapter.get_permissions_for_subject.return_value = expected_response
+
         actual_response = self.permissions_service.get_subject_permissions(subject_id)
 
-        self.dynamo_adapter.get_permission_keys_for_subject.assert_called_once_with(
+        self.dynamo_adapter.get_permissions_for_subject.assert_called_once_with(
             subject_id
         )
-        assert [item.dict() for item in actual_response] == expected_response
+        assert actual_response == expected_response
 
 
 class TestGetUIPermissions:
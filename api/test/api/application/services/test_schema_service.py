@@ -4,6 +4,7 @@ import pytest
 from botocore.exceptions import ClientError
 
 
+from api.adapter.schema_cache import SchemaCache
 from api.application.services.schema_service import (
     SchemaService,
 )
@@ -28,6 +29,7 @@ class TestUploadSchema:
             self.dynamodb_adapter,
             self.glue_adapter,
             self.protected_domain_service,
+            SchemaCache(ttl=60),
         )
         self.valid_schema = Schema(
             metadata=SchemaMetadata(
@@ -180,6 +182,7 @@ class TestUpdateSchema:
             self.dynamodb_adapter,
             self.glue_adapter,
             self.protected_domain_service,
+            SchemaCache(ttl=60),
         )
         self.valid_schema = Schema(
             metadata=SchemaMetadata(
@@ -295,6 +298,23 @@ class TestUpdateSchema:
         )
         assert result == "raw/testdomain/testdataset/3"
 
+    def test_update_schema_invalidates_cached_schemas(self):
+        self.dynamodb_adapter.get_latest_schema.return_value = {
+            **self.valid_schema.metadata.dict(),
+            "columns": [dict(col) for col in self.valid_schema.columns],
+        }
+        dataset = DatasetMetadata("raw", "testdomain", "testdataset")
+        assert self.schema_service.get_schema(dataset).get_version() == 1
+
+        self.schema_service.update_schema(self.valid_updated_schema)
+        self.dynamodb_adapter.get_latest_schema.return_value = {
+            **self.valid_updated_schema.metadata.dict(),
+            "columns": [dict(col) for col in self.valid_updated_schema.columns],
+        }
+
+        assert self.schema_service.get_schema(dataset).get_version() == 2
+        assert self.dynamodb_adapter.get_latest_schema.call_count == 3
+
     def test_update_schema_enforces_sensitivity_consistency(self):
         original_schema = self.valid_schema
         new_schema = self.valid_updated_schema.copy(deep=True)
@@ -342,6 +362,7 @@ class TestGetSchema:
             self.dynamodb_adapter,
             self.glue_adapter,
             self.protected_domain_service,
+            SchemaCache(ttl=60),
         )
         self.metadata = SchemaMetadata(
             layer="raw",
@@ -408,6 +429,36 @@ class TestGetSchema:
         assert res == self.schema
         self.dynamodb_adapter.get_latest_schema.assert_called_once_with(metadata)
 
+    def test_get_schema_is_cached(self):
+        self.dynamodb_adapter.get_latest_schema = Mock(return_value=self.schema_dict)
+        metadata = DatasetMetadata("raw", "some", "other")
+
+        first = self.schema_service.get_schema(metadata)
+        second = self.schema_service.get_schema(metadata)
+        versioned = self.schema_service.get_schema(self.metadata)
+
+        assert first == second == versioned == self.schema
+        self.dynamodb_adapter.get_latest_schema.assert_called_once_with(metadata)
+        self.dynamodb_adapter.get_schema.assert_not_called()
+
+    def test_get_schema_without_cache(self):
+        self.dynamodb_adapter.get_schema = Mock(return_value=self.schema_dict)
+
+        self.schema_service.get_schema(self.metadata)
+        self.schema_service.get_schema(self.metadata, use_cache=False)
+
+        assert self.dynamodb_adapter.get_schema.call_count == 2
+
+    def test_delete_schema_invalidates_cached_schemas(self):
+        self.dynamodb_adapter.get_schema = Mock(return_value=self.schema_dict)
+        self.schema_service.get_schema(self.metadata)
+
+        self.schema_service.delete_schema(self.metadata)
+        self.dynamodb_adapter.get_schema.return_value = None
+
+        with pytest.raises(SchemaNotFoundError):
+            self.schema_service.get_schema(self.metadata)
+
     def test_get_schema_raises_exception(self):
         self.dynamodb_adapter.get_schema = Mock(return_value=None)
 
@@ -450,6 +501,7 @@ class TestDeleteSchema:
             self.dynamodb_adapter,
             None,
             None,
+            SchemaCache(ttl=60),
         )
 
     def test_delete_schemas(self):
@@ -0,0 +1,46 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+from anyio import CapacityLimiter
+
+from api.common.concurrency import run_blocking
+
+
+def test_run_blocking_returns_result_of_call():
+    def add(first, second, third=0):
+        return first + second + third
+
+    assert asyncio.run(run_blocking(add, 1, 2, third=3)) == 6
+
+
+def test_run_blocking_runs_call_off_the_event_loop_thread():
+    async def run():
+        return threading.get_ident(), await run_blocking(threading.get_ident)
+
+    loop_thread, call_thread = asyncio.run(run())
+
+    assert call_thread != loop_thread
+
+
+def test_run_blocking_limits_concurrent_calls():
+    running = []
+    most_running = []
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            running.append(1)
+            most_running.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.pop()
+
+    async def run():
+        await asyncio.gather(*[run_blocking(call) for _ in range(6)])
+
+    with patch("api.common.concurrency.aws_call_limiter", CapacityLimiter(2)):
+        asyncio.run(run())
+
+    assert max(most_running) == 2
@@ -1,5 +1,7 @@
 import os
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from fastapi import UploadFile
@@ -12,6 +14,7 @@ from api.common.config.constants import CONTENT_ENCODING
 from api.common.data_handlers import (
     CHUNK_SIZE,
     construct_chunked_dataframe,
+    map_chunks,
     store_file_to_disk,
     store_csv_file_to_disk,
 )
@@ -112,3 +115,43 @@ class TestConstructChunkedDataframe:
         construct_chunked_dataframe(path)
         mock_pq.ParquetFile.assert_called_once_with("file/path.parquet")
         mock_parquet_file.iter_batches.assert_called_once_with(batch_size=CHUNK_SIZE)
+
+
+class TestMapChunks:
+    def test_maps_chunks_in_order_without_an_executor(self):
+        result = list(map_chunks(lambda chunk: chunk * 2, [1, 2, 3]))
+
+        assert result == [2, 4, 6]
+
+    def test_maps_chunks_in_order_with_an_executor(self):
+        def slow_for_early_chunks(chunk):
+            time.sleep(0.01 * (5 - chunk))
+            return chunk * 2
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            result = list(
+                map_chunks(
+                    slow_for_early_chunks,
+                    range(5),
+                    executor=executor,
+                    max_in_flight=4,
+                )
+            )
+
+        assert result == [0, 2, 4, 6, 8]
+
+    def test_limits_the_chunks_read_ahead_of_the_results(self):
+        read_chunks = []
+
+        def chunks():
+            for chunk in range(10):
+                read_chunks.append(chunk)
+                yield chunk
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = map_chunks(
+                lambda chunk: chunk, chunks(), executor=executor, max_in_flight=2
+            )
+            next(results)
+
+            assert len(read_chunks) == 2
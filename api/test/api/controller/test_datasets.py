@@ -1,13 +1,15 @@
+import io
 from pathlib import Path
 from unittest.mock import patch, ANY
 
 import pandas as pd
+import pyarrow as pa
 import pytest
 
-from api.adapter.s3_adapter import S3Adapter
 from api.application.services.authorisation.dataset_access_evaluator import (
     DatasetAccessEvaluator,
 )
+from api.application.services.compaction_service import CompactionService
 from api.application.services.data_service import DataService
 from api.application.services.delete_service import DeleteService
 from api.application.services.search_service import SearchService
@@ -22,6 +24,7 @@ from api.domain.dataset_filters import DatasetFilters
 from api.domain.dataset_metadata import DatasetMetadata
 from api.domain.schema import Schema, Column
 from api.domain.schema_metadata import Owner, SchemaMetadata
+from api.domain.query_page import QueryPage
 from api.domain.search_metadata import SearchMetadata, MatchField
 from api.domain.sql_query import SQLQuery
 from test.api.common.controller_test_utils import BaseClientTest
@@ -554,7 +557,7 @@ class TestListDatasets(BaseClientTest):
         assert response.status_code == 200
         assert response.json() == expected_response
 
-    @patch.object(S3Adapter, "get_last_updated_time")
+    @patch.object(DataService, "get_last_updated_time")
     @patch.object(DatasetAccessEvaluator, "get_authorised_datasets")
     @patch("api.controller.datasets.get_subject_id")
     def test_returns_enriched_metadata_for_datasets_with_certain_sensitivity(
@@ -807,6 +810,15 @@ class TestDatasetInfo(BaseClientTest):
 
 
 class TestQuery(BaseClientTest):
+    def setup_method(self):
+        self.get_subject_id_patch = patch(
+            "api.controller.datasets.get_subject_id", return_value="subject_id"
+        )
+        self.get_subject_id_patch.start()
+
+    def teardown_method(self):
+        self.get_subject_id_patch.stop()
+
     def test_returns_error_response_when_domain_uppercase(self):
         response = self.client.post(
             f"{BASE_API_PATH}/datasets/layer/MYDOMAIN/mydataset/query",
@@ -829,7 +841,7 @@ class TestQuery(BaseClientTest):
         )
         assert res.status_code == 200
         mock_query_method.assert_called_once_with(
-            DatasetMetadata("raw", "mydomain", "mydataset", 1), SQLQuery()
+            DatasetMetadata("raw", "mydomain", "mydataset", 1), SQLQuery(), "subject_id"
         )
 
     @patch.object(DataService, "query_data")
@@ -845,6 +857,7 @@ class TestQuery(BaseClientTest):
         mock_query_method.assert_called_once_with(
             DatasetMetadata("raw", "mydomain", "mydataset", 1),
             SQLQuery(select_columns=["column1"], limit="10"),
+            "subject_id",
         )
 
     @patch("api.controller.datasets.construct_dataset_metadata")
@@ -860,7 +873,9 @@ class TestQuery(BaseClientTest):
         self.client.post(query_url, headers={"Authorization": "Bearer test-token"})
 
         mock_query_method.assert_called_once_with(
-            DatasetMetadata("raw", "mydomain", "mydataset", 32), SQLQuery()
+            DatasetMetadata("raw", "mydomain", "mydataset", 32),
+            SQLQuery(),
+            "subject_id",
         )
 
     @patch.object(DataService, "query_data")
@@ -888,6 +903,7 @@ class TestQuery(BaseClientTest):
                 aggregation_conditions="",
                 limit="10",
             ),
+            "subject_id",
         )
 
     @patch.object(DataService, "query_data")
@@ -917,14 +933,42 @@ class TestQuery(BaseClientTest):
             "1": {"column1": "2", "column2": "item2", "area": "area_2"},
         }
 
-    @patch.object(DataService, "query_data")
+    @patch.object(DataService, "query_data_in_chunks")
     def test_request_query_in_csv_is_successful(self, mock_query_method):
-        mock_query_method.return_value = pd.DataFrame(
-            {
-                "column1": [1, 2],
-                "column2": ["item1", "item2"],
-                "area": ["area_1", "area_2"],
-            }
+        mock_query_method.return_value = iter(
+            [
+                pd.DataFrame(
+                    {
+                        "column1": [1, 2],
+                        "column2": ["item1", "item2"],
+                        "area": ["area_1", "area_2"],
+                    }
+                )
+            ]
+        )
+
+        query_url = f"{BASE_API_PATH}/datasets/raw/mydomain/mydataset/query?version=12"
+
+        response = self.client.post(
+            query_url,
+            headers={"Authorization": "Bearer test-token", "Accept": "text/csv"},
+        )
+
+        assert response.status_code == 200
+        mock_query_method.assert_called_once_with(
+            DatasetMetadata("raw", "mydomain", "mydataset", 12),
+            SQLQuery(),
+            "subject_id",
+        )
+
+    @patch.object(DataService, "query_data_in_chunks")
+    def test_streams_query_result_in_csv(self, mock_query_method):
+        mock_query_method.return_value = iter(
+            [
+                pd.DataFrame({"column1": [], "column2": []}),
+                pd.DataFrame({"column1": [1], "column2": ["item1"]}),
+                pd.DataFrame({"column1": [2], "column2": ["item2"]}),
+            ]
         )
 
         query_url = f"{BASE_API_PATH}/datasets/raw/mydomain/mydataset/query?version=12"
@@ -935,6 +979,99 @@ class TestQuery(BaseClientTest):
         )
 
         assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert response.text == '"column1","column2"\n"1","item1"\n"2","item2"\n'
+
+    @patch.object(DataService, "query_data_in_chunks")
+    def test_streams_query_result_in_ndjson(self, mock_query_method):
+        mock_query_method.return_value = iter(
+            [
+                pd.DataFrame({"column1": [1], "column2": ["item1"]}),
+                pd.DataFrame({"column1": [2], "column2": [None]}),
+            ]
+        )
+
+        query_url = f"{BASE_API_PATH}/datasets/raw/mydomain/mydataset/query?version=12"
+
+        response = self.client.post(
+            query_url,
+            headers={
+                "Authorization": "Bearer test-token",
+                "Accept": "application/x-ndjson",
+            },
+        )
+
+        assert response.status_code == 200
+        assert response.text == (
+            '{"column1":"1","column2":"item1"}\n{"column1":"2","column2":null}\n'
+        )
+
+    @patch.object(DataService, "query_data_in_chunks")
+    def test_streams_query_result_in_parquet(self, mock_query_method):
+        mock_query_method.return_value = iter(
+            [
+                pd.DataFrame({"column1": [1], "column2": ["item1"]}),
+                pd.DataFrame({"column1": [2], "column2": ["item2"]}),
+            ]
+        )
+
+        query_url = f"{BASE_API_PATH}/datasets/raw/mydomain/mydataset/query?version=12"
+
+        response = self.client.post(
+            query_url,
+            headers={
+                "Authorization": "Bearer test-token",
+                "Accept": "application/octet-stream",
+            },
+        )
+
+        assert response.status_code == 200
+        pd.testing.assert_frame_equal(
+            pd.read_parquet(io.BytesIO(response.content)),
+            pd.DataFrame({"column1": ["1", "2"], "column2": ["item1", "item2"]}),
+            check_dtype=False,
+        )
+
+    @patch.object(DataService, "query_data_in_chunks")
+    def test_streams_query_result_in_arrow_without_converting_to_strings(
+        self, mock_query_method
+    ):
+        mock_query_method.return_value = iter(
+            [
+                pd.DataFrame({"column1": [1], "column2": ["item1"]}),
+                pd.DataFrame({"column1": [2], "column2": ["item2"]}),
+            ]
+        )
+
+        query_url = f"{BASE_API_PATH}/datasets/raw/mydomain/mydataset/query?version=12"
+
+        response = self.client.post(
+            query_url,
+            headers={
+                "Authorization": "Bearer test-token",
+                "Accept": "application/vnd.apache.arrow.stream",
+            },
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+        pd.testing.assert_frame_equal(
+            pa.ipc.open_stream(response.content).read_pandas(),
+            pd.DataFrame({"column1": [1, 2], "column2": ["item1", "item2"]}),
+        )
+
+    @patch.object(DataService, "query_data_in_chunks")
+    def test_returns_204_if_streamed_result_is_empty(self, mock_query_method):
+        mock_query_method.return_value = iter([pd.DataFrame({"column1": []})])
+
+        query_url = f"{BASE_API_PATH}/datasets/raw/mydomain/mydataset/query?version=12"
+
+        response = self.client.post(
+            query_url,
+            headers={"Authorization": "Bearer test-token", "Accept": "text/csv"},
+        )
+
+        assert response.status_code == 204
 
     @patch.object(DataService, "query_data")
     def test_returns_formatted_json_from_query_if_format_is_not_provided(
@@ -1003,7 +1140,7 @@ class TestQuery(BaseClientTest):
 
         assert response.status_code == 400
         assert response.json() == {
-            "details": "Provided value for Accept header parameter [text/plain] is not supported. Supported formats: application/json, text/csv, application/octet-stream"
+            "details": "Provided value for Accept header parameter [text/plain] is not supported. Supported formats: application/json, text/csv, application/octet-stream, application/x-ndjson, application/vnd.apache.arrow.stream"
         }
 
     @pytest.mark.parametrize(
@@ -1190,6 +1327,38 @@ class TestLargeDatasetQuery(BaseClientTest):
         }
 
 
+class TestCompactDataset(BaseClientTest):
+    @patch.object(CompactionService, "compact_dataset")
+    @patch("api.controller.datasets.get_subject_id")
+    def test_returns_202_with_the_compaction_job_id(
+        self, mock_get_subject_id, mock_compact_dataset
+    ):
+        mock_get_subject_id.return_value = "subject_id"
+        mock_compact_dataset.return_value = "abc-123"
+
+        response = self.client.post(
+            f"{BASE_API_PATH}/datasets/raw/mydomain/mydataset/compact?version=2",
+            headers={"Authorization": "Bearer test-token"},
+        )
+
+        mock_compact_dataset.assert_called_once_with(
+            "subject_id", DatasetMetadata("raw", "mydomain", "mydataset", 2)
+        )
+        assert response.status_code == 202
+        assert response.json() == {"details": {"job_id": "abc-123"}}
+
+    def test_returns_error_response_when_domain_uppercase(self):
+        response = self.client.post(
+            f"{BASE_API_PATH}/datasets/raw/MYDOMAIN/mydataset/compact?version=2",
+            headers={"Authorization": "Bearer test-token"},
+        )
+
+        assert response.status_code == 400
+        assert response.json() == {
+            "details": ["domain -> was required to be lowercase only."]
+        }
+
+
 class TestListFilesFromDataset(BaseClientTest):
     @patch.object(DataService, "list_raw_files")
     def test_returns_metadata_for_all_datasets(self, mock_list_raw_files):
@@ -1280,3 +1449,90 @@ class TestDeleteDataset(BaseClientTest):
 
         assert response.status_code == 202
         assert response.json() == {"details": "mydataset has been deleted."}
+
+    @patch.object(DeleteService, "delete_dataset_in_background")
+    @patch("api.controller.datasets.get_subject_id")
+    def test_returns_202_with_the_deletion_job_id_when_deleting_in_background(
+        self, mock_get_subject_id, mock_delete_dataset_in_background
+    ):
+        mock_get_subject_id.return_value = "subject_id"
+        mock_delete_dataset_in_background.return_value = "abc-123"
+
+        response = self.client.delete(
+            f"{BASE_API_PATH}/datasets/layer/mydomain/mydataset?background=true",
+            headers={"Authorization": "Bearer test-token"},
+        )
+
+        mock_delete_dataset_in_background.assert_called_once_with(
+            "subject_id", DatasetMetadata("layer", "mydomain", "mydataset")
+        )
+
+        assert response.status_code == 202
+        assert response.json() == {"details": {"job_id": "abc-123"}}
+
+
+class TestPaginatedDatasetQuery(BaseClientTest):
+    def setup_method(self):
+        self.get_subject_id_patch = patch(
+            "api.controller.datasets.get_subject_id", return_value="subject_id"
+        )
+        self.get_subject_id_patch.start()
+
+    def teardown_method(self):
+        self.get_subject_id_patch.stop()
+
+    @patch.object(DataService, "query_data_page")
+    def test_returns_first_page_of_query(self, mock_query_data_page):
+        mock_query_data_page.return_value = QueryPage(
+            data=[{"column1": "1"}], next_cursor="the-cursor"
+        )
+
+        response = self.client.post(
+            f"{BASE_API_PATH}/datasets/raw/mydomain/mydataset/query/paginated?version=1&page_size=10",
+            headers={"Authorization": "Bearer test-token"},
+            json={"select_columns": ["column1"]},
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "data": [{"column1": "1"}],
+            "next_cursor": "the-cursor",
+        }
+        mock_query_data_page.assert_called_once_with(
+            DatasetMetadata("raw", "mydomain", "mydataset", 1),
+            SQLQuery(select_columns=["column1"]),
+            10,
+            None,
+            "subject_id",
+        )
+
+    @patch.object(DataService, "query_data_page")
+    def test_returns_page_of_cursor(self, mock_query_data_page):
+        mock_query_data_page.return_value = QueryPage(data=[], next_cursor=None)
+
+        response = self.client.post(
+            f"{BASE_API_PATH}/datasets/raw/mydomain/mydataset/query/paginated?version=1&cursor=the-cursor",
+            headers={"Authorization": "Bearer test-token"},
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"data": [], "next_cursor": None}
+        mock_query_data_page.assert_called_once_with(
+            DatasetMetadata("raw", "mydomain", "mydataset", 1),
+            SQLQuery(),
+            1000,
+            "the-cursor",
+            "subject_id",
+        )
+
+    @patch.object(DataService, "query_data_page")
+    def test_returns_error_response_when_page_size_too_large(
+        self, mock_query_data_page
+    ):
+        response = self.client.post(
+            f"{BASE_API_PATH}/datasets/raw/mydomain/mydataset/query/paginated?page_size=1001",
+            headers={"Authorization": "Bearer test-token"},
+        )
+
+        assert response.status_code == 400
+        mock_query_data_page.assert_not_called()
@@ -0,0 +1,38 @@
+from unittest.mock import patch
+
+from api.domain.Jobs.CompactionJob import CompactionJob, CompactionStep
+from api.domain.Jobs.Job import JobType, JobStatus
+from api.domain.dataset_metadata import DatasetMetadata
+
+
+@patch("api.domain.Jobs.Job.uuid")
+@patch("api.domain.Jobs.CompactionJob.time")
+def test_initialise_compaction_job(mock_time, mock_uuid):
+    mock_time.time.return_value = 1000
+    mock_uuid.uuid4.return_value = "abc-123"
+
+    job = CompactionJob("subject-123", DatasetMetadata("raw", "domain1", "dataset1", 3))
+
+    assert job.job_id == "abc-123"
+    assert job.job_type == JobType.COMPACTION
+    assert job.status == JobStatus.IN_PROGRESS
+    assert job.step == CompactionStep.INITIALISATION
+    assert job.errors == set()
+    assert job.subject_id == "subject-123"
+    assert job.layer == "raw"
+    assert job.domain == "domain1"
+    assert job.dataset == "dataset1"
+    assert job.version == 3
+    assert job.files_compacted == 0
+    assert job.files_written == 0
+    assert job.expiry_time == 605800
+
+
+def test_record_progress():
+    job = CompactionJob("subject-123", DatasetMetadata("raw", "domain1", "dataset1", 3))
+
+    job.record_progress(10, 2)
+    job.record_progress(5, 1)
+
+    assert job.files_compacted == 15
+    assert job.files_written == 3
@@ -0,0 +1,25 @@
+from unittest.mock import patch
+
+from api.domain.Jobs.DeletionJob import DeletionJob, DeletionStep
+from api.domain.Jobs.Job import JobType, JobStatus
+from api.domain.dataset_metadata import DatasetMetadata
+
+
+@patch("api.domain.Jobs.Job.uuid")
+@patch("api.domain.Jobs.DeletionJob.time")
+def test_initialise_deletion_job(mock_time, mock_uuid):
+    mock_time.time.return_value = 1000
+    mock_uuid.uuid4.return_value = "abc-123"
+
+    job = DeletionJob("subject-123", DatasetMetadata("raw", "domain1", "dataset1"))
+
+    assert job.job_id == "abc-123"
+    assert job.job_type == JobType.DELETION
+    assert job.status == JobStatus.IN_PROGRESS
+    assert job.step == DeletionStep.INITIALISATION
+    assert job.errors == set()
+    assert job.subject_id == "subject-123"
+    assert job.layer == "raw"
+    assert job.domain == "domain1"
+    assert job.dataset == "dataset1"
+    assert job.expiry_time == 605800
@@ -0,0 +1,28 @@
+import pytest
+
+from api.common.custom_exceptions import UserError
+from api.domain.query_page import QueryCursor
+from api.domain.sql_query import SQLQuery
+
+
+class TestQueryCursor:
+    def test_decodes_encoded_cursor(self):
+        cursor = QueryCursor(
+            query_execution_id="the-execution-id",
+            next_token="token-1",
+            query=SQLQuery(select_columns=["column1"], limit=10),
+        )
+
+        assert QueryCursor.decode(cursor.encode()) == cursor
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "not a cursor",
+            "bm90IGpzb24=",
+            "eyJxdWVyeV9leGVjdXRpb25faWQiOiAiaWQifQ==",
+        ],
+    )
+    def test_raises_user_error_for_invalid_cursor(self, cursor):
+        with pytest.raises(UserError, match="Invalid cursor"):
+            QueryCursor.decode(cursor)
@@ -0,0 +1,31 @@
+from api.domain.scheduled_task import ScheduledTask, TaskType
+
+
+class TestScheduledTask:
+    def test_order_key_sorts_by_priority_then_queue_time(self):
+        later_query = ScheduledTask(
+            task_type=TaskType.QUERY, payload={}, priority=0, enqueued_at=200.5
+        )
+        query = ScheduledTask(
+            task_type=TaskType.QUERY, payload={}, priority=0, enqueued_at=9.25
+        )
+        upload = ScheduledTask(
+            task_type=TaskType.UPLOAD, payload={}, priority=1, enqueued_at=1.0
+        )
+
+        ordered = sorted(
+            [upload, later_query, query], key=lambda task: task.order_key()
+        )
+
+        assert ordered == [query, later_query, upload]
+
+    def test_order_key_format(self):
+        task = ScheduledTask(
+            task_type=TaskType.UPLOAD,
+            payload={},
+            task_id="abc-123",
+            priority=1,
+            enqueued_at=1650000000.5,
+        )
+
+        assert task.order_key() == "001#1650000000.500000#abc-123"
@@ -135,6 +135,11 @@ class TestSchema:
         )
         assert res == expected
 
+    def test_reuses_storage_schema_of_schemas_with_the_same_columns(self):
+        schema = self.schema.copy(deep=True)
+
+        assert schema.generate_storage_schema() is self.schema.generate_storage_schema()
+
 
 class TestSchemaMetadata:
     def setup_method(self):
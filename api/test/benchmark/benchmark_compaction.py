@@ -0,0 +1,125 @@
+"""
+Compares the time taken to query a synthetic dataset made of many small files before and after
+it has been compacted. The files are written to a local directory and queried with pyarrow,
+which has the same per-file overhead of opening and reading footers that Athena has on S3.
+
+Run from the api directory with:
+
+    python -m test.benchmark.benchmark_compaction --partitions 20 --uploads 50
+"""
+import argparse
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from api.application.services.compaction_service import (
+    merge_parquet_files,
+    plan_compaction,
+)
+from api.application.services.partitioning_service import (
+    generate_partitioned_data,
+    partition_to_parquet,
+)
+from api.common.config.constants import COMPACTED_FILE_PREFIX
+from api.domain.schema import Column, Schema
+from api.domain.schema_metadata import SchemaMetadata
+
+SCHEMA = Schema(
+    metadata=SchemaMetadata(
+        layer="raw", domain="benchmark", dataset="small_files", sensitivity="PUBLIC"
+    ),
+    columns=[
+        Column(name="day", partition_index=0, data_type="int", allow_null=False),
+        Column(name="value", partition_index=None, data_type="double", allow_null=True),
+        Column(name="label", partition_index=None, data_type="string", allow_null=True),
+    ],
+)
+
+
+def write_uploads(directory: Path, partitions: int, uploads: int, rows: int) -> None:
+    """
+    Each upload is written in chunks, like the upload service does, so every chunk produces
+    one small file in every partition
+    """
+    for _ in range(uploads):
+        raw_file_identifier = str(uuid.uuid4())
+        for _ in range(4):
+            df = pd.DataFrame(
+                {
+                    "day": np.random.randint(0, partitions, rows),
+                    "value": np.random.random(rows),
+                    "label": np.random.choice(["a", "b", "c"], rows),
+                }
+            )
+            for partition in generate_partitioned_data(SCHEMA, df):
+                partition_directory = directory / partition.path
+                partition_directory.mkdir(parents=True, exist_ok=True)
+                partition_to_parquet(
+                    SCHEMA,
+                    partition,
+                    partition_directory
+                    / f"{raw_file_identifier}_{uuid.uuid4()}.parquet",
+                )
+
+
+def compact(directory: Path) -> None:
+    objects = [
+        {"Key": path.as_posix(), "Size": path.stat().st_size}
+        for path in directory.rglob("*.parquet")
+    ]
+    for merge in plan_compaction(objects):
+        paths = [Path(item["Key"]) for item in merge]
+        merged = merge_parquet_files(
+            SCHEMA, [(path.as_posix(), path.read_bytes()) for path in paths]
+        )
+        (
+            paths[0].parent / f"{COMPACTED_FILE_PREFIX}{uuid.uuid4()}.parquet"
+        ).write_bytes(merged)
+        for path in paths:
+            path.unlink()
+
+
+def time_query(directory: Path, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        dataset = ds.dataset(directory, format="parquet", partitioning="hive")
+        dataset.to_table(columns=["value"], filter=ds.field("label") == "a")
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dataset compaction")
+    parser.add_argument("--partitions", type=int, default=20)
+    parser.add_argument("--uploads", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        directory = Path(temporary_directory)
+        write_uploads(directory, args.partitions, args.uploads, args.rows)
+
+        files_before = len(list(directory.rglob("*.parquet")))
+        query_before = time_query(directory, args.repeats)
+
+        start = time.perf_counter()
+        compact(directory)
+        compaction_time = time.perf_counter() - start
+
+        files_after = len(list(directory.rglob("*.parquet")))
+        query_after = time_query(directory, args.repeats)
+
+    print(f"Files:         {files_before} -> {files_after}")
+    print(f"Query time:    {query_before:.3f}s -> {query_after:.3f}s")
+    print(f"Compaction:    {compaction_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Load tests the async dataset info endpoint with concurrent requests. The AWS calls behind the
+endpoint are replaced by a sleep of `--latency` seconds, so the benchmark measures how many of
+them one API worker can wait on at once. It is run once with the blocking calls made directly
+on the event loop, as the endpoints used to, and once with them run through `run_blocking`.
+
+Run from the api directory, with the environment variables the API needs set, with:
+
+    python -m test.benchmark.benchmark_concurrent_requests --requests 100 --latency 0.2
+"""
+import argparse
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
+
+from api.application.services.authorisation.authorisation_service import (
+    secure_dataset_endpoint,
+)
+from api.common.config.constants import BASE_API_PATH
+from api.domain.dataset_metadata import DatasetMetadata
+from api.entry import app
+from test.test_utils import mock_secure_dataset_endpoint
+
+
+async def run_inline(function, *args, **kwargs):
+    return function(*args, **kwargs)
+
+
+def blocking_call(latency: float):
+    def call(*args, **kwargs):
+        time.sleep(latency)
+        return {}
+
+    return call
+
+
+async def send_requests(requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *[
+                client.get(f"{BASE_API_PATH}/datasets/raw/domain/dataset/info")
+                for _ in range(requests)
+            ]
+        )
+        duration = time.perf_counter() - start
+    assert all(response.status_code == 200 for response in responses)
+    return duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the async endpoints")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    app.dependency_overrides[secure_dataset_endpoint] = mock_secure_dataset_endpoint()
+    app.user_middleware.clear()
+    app.middleware_stack = app.build_middleware_stack()
+
+    with patch(
+        "api.controller.datasets.construct_dataset_metadata",
+        side_effect=lambda *args: DatasetMetadata(*args),
+    ), patch(
+        "api.controller.datasets.data_service.get_dataset_info",
+        side_effect=blocking_call(args.latency),
+    ):
+        with patch("api.controller.datasets.run_blocking", run_inline):
+            blocking_time = asyncio.run(send_requests(args.requests))
+        threaded_time = asyncio.run(send_requests(args.requests))
+
+    print(f"Requests: {args.requests}, AWS call latency: {args.latency}s")
+    print(
+        f"Blocking event loop: {blocking_time:.2f}s, {args.requests / blocking_time:,.1f} requests/s"
+    )
+    print(
+        f"run_blocking:        {threaded_time:.2f}s, {args.requests / threaded_time:,.1f} requests/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
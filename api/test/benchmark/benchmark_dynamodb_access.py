@@ -0,0 +1,233 @@
+"""
+Compares the DynamoDB reads made to authorise a subject and to validate permissions with the
+partition queries the adapter used to make and with the key based reads it makes now. The tables
+are held by an in-memory stand-in for DynamoDB that reads items the way DynamoDB does: key
+conditions select the items that are read, filters are applied after reading them, and a query
+returns at most 1MB of items per page. Every request also waits `--latency` seconds, as a round
+trip to DynamoDB would.
+
+Run from the api directory, with the environment variables the API needs set, with:
+
+    python -m test.benchmark.benchmark_dynamodb_access --subjects 50000 --lookups 200
+"""
+import argparse
+import random
+import time
+from functools import reduce
+from typing import Dict, List
+
+from boto3.dynamodb.conditions import Attr, ConditionBase, Key, Or
+
+from api.adapter.dynamodb_adapter import DynamoDBAdapter
+from api.adapter.permissions_cache import PermissionsCache
+from api.common.config.auth import PermissionsTableItem
+from api.common.config.aws import DYNAMO_PERMISSIONS_TABLE_NAME
+
+QUERY_PAGE_SIZE = 1024 * 1024
+
+
+def matches(condition: ConditionBase, item: Dict) -> bool:
+    expression = condition.get_expression()
+    operator, values = expression["operator"], expression["values"]
+    if operator == "AND":
+        return all(matches(value, item) for value in values)
+    if operator == "OR":
+        return any(matches(value, item) for value in values)
+    if operator == "=":
+        return item.get(values[0].name) == values[1]
+    if operator == "begins_with":
+        return str(item.get(values[0].name, "")).startswith(values[1])
+    raise NotImplementedError(operator)
+
+
+class InMemoryTable:
+    def __init__(self, name: str, latency: float):
+        self.name = name
+        self.latency = latency
+        self.items: Dict[tuple, Dict] = {}
+        self.requests = 0
+        self.items_read = 0
+
+    def put_item(self, Item: Dict) -> None:
+        self.items[(Item["PK"], Item["SK"])] = Item
+
+    def get_item(self, Key: Dict) -> Dict:
+        self._request()
+        item = self.items.get((Key["PK"], Key["SK"]))
+        self.items_read += 1
+        return {"Item": item} if item is not None else {}
+
+    def query(
+        self, KeyConditionExpression, FilterExpression=None, ExclusiveStartKey=None
+    ) -> Dict:
+        self._request()
+        keys = sorted(self.items)
+        start = keys.index(ExclusiveStartKey) + 1 if ExclusiveStartKey else 0
+        page, page_size, last_key = [], 0, None
+        for key in keys[start:]:
+            item = self.items[key]
+            if not matches(KeyConditionExpression, item):
+                continue
+            self.items_read += 1
+            page_size += len(str(item))
+            if FilterExpression is None or matches(FilterExpression, item):
+                page.append(item)
+            if page_size >= QUERY_PAGE_SIZE:
+                last_key = key
+                break
+        response = {"Items": page, "Count": len(page)}
+        if last_key is not None:
+            response["LastEvaluatedKey"] = last_key
+        return response
+
+    def _request(self) -> None:
+        self.requests += 1
+        time.sleep(self.latency)
+
+
+class InMemoryDynamoDB:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.tables: Dict[str, InMemoryTable] = {}
+
+    def Table(self, name: str) -> InMemoryTable:
+        return self.tables.setdefault(name, InMemoryTable(name, self.latency))
+
+    def batch_get_item(self, RequestItems: Dict) -> Dict:
+        responses = {}
+        for name, request in RequestItems.items():
+            table = self.tables[name]
+            table._request()
+            table.items_read += len(request["Keys"])
+            responses[name] = [
+                table.items[(key["PK"], key["SK"])]
+                for key in request["Keys"]
+                if (key["PK"], key["SK"]) in table.items
+            ]
+        return {"Responses": responses, "UnprocessedKeys": {}}
+
+
+def populate(table: InMemoryTable, subjects: int, domains: int) -> List[str]:
+    permissions = ["DATA_ADMIN", "USER_ADMIN"] + [
+        f"{action}_{layer}_{sensitivity}"
+        for action in ["READ", "WRITE"]
+        for layer in ["ALL", "RAW", "LAYER"]
+        for sensitivity in ["ALL", "PUBLIC", "PRIVATE"]
+    ]
+    permissions += [
+        f"{action}_ALL_PROTECTED_DOMAIN{index}"
+        for action in ["READ", "WRITE"]
+        for index in range(domains)
+    ]
+    for permission in permissions:
+        table.put_item(
+            Item={
+                "PK": PermissionsTableItem.PERMISSION,
+                "SK": permission,
+                "Id": permission,
+                "Type": (
+                    permission
+                    if permission.endswith("_ADMIN")
+                    else permission.split("_")[0]
+                ),
+            }
+        )
+    for index in range(subjects):
+        table.put_item(
+            Item={
+                "PK": PermissionsTableItem.SUBJECT,
+                "SK": f"subject-{index:06}",
+                "Id": f"subject-{index:06}",
+                "Type": "CLIENT",
+                "Permissions": set(random.sample(permissions, 5)),
+            }
+        )
+    return permissions
+
+
+def partition_subject_permissions(adapter: DynamoDBAdapter, subject_id: str) -> None:
+    """
+    How a subject's permissions used to be resolved: the SUBJECT partition filtered on the
+    subject's id, then every item of the PERMISSION partition. Every page is read here, the
+    adapter read only the first page and so could not find subjects beyond it.
+    """
+    [subject] = adapter.collect_all_items(
+        adapter.permissions_table.query,
+        KeyConditionExpression=Key("PK").eq(PermissionsTableItem.SUBJECT),
+        FilterExpression=Attr("Id").eq(subject_id),
+    )
+    adapter.collect_all_items(
+        adapter.permissions_table.query,
+        KeyConditionExpression=Key("PK").eq(PermissionsTableItem.PERMISSION),
+    )
+
+
+def partition_find_permissions(
+    adapter: DynamoDBAdapter, permissions: List[str]
+) -> None:
+    """How permissions used to be validated: the PERMISSION partition filtered on every id"""
+    adapter.collect_all_items(
+        adapter.permissions_table.query,
+        KeyConditionExpression=Key("PK").eq(PermissionsTableItem.PERMISSION),
+        FilterExpression=reduce(Or, [Attr("Id").eq(value) for value in permissions]),
+    )
+
+
+def measure(name: str, table: InMemoryTable, lookups: int, function) -> None:
+    table.requests, table.items_read = 0, 0
+    start = time.perf_counter()
+    for _ in range(lookups):
+        function()
+    duration = time.perf_counter() - start
+    print(
+        f"{name:<40} {duration / lookups * 1000:>9.2f}ms {table.requests / lookups:>9.1f}"
+        f" {table.items_read / lookups:>12.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DynamoDB access patterns")
+    parser.add_argument("--subjects", type=int, default=50_000)
+    parser.add_argument("--domains", type=int, default=100)
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.005)
+    args = parser.parse_args()
+
+    data_source = InMemoryDynamoDB(args.latency)
+    table = data_source.Table(DYNAMO_PERMISSIONS_TABLE_NAME)
+    permissions = populate(table, args.subjects, args.domains)
+    # The cache is turned off so that every lookup reads DynamoDB
+    adapter = DynamoDBAdapter(data_source, PermissionsCache(ttl=0))
+
+    def subject_id() -> str:
+        return f"subject-{random.randrange(args.subjects):06}"
+
+    print(f"{'':<40} {'per lookup':>11} {'requests':>9} {'items read':>12}")
+    measure(
+        "Subject permissions, partition queries",
+        table,
+        max(args.lookups // 20, 1),
+        lambda: partition_subject_permissions(adapter, subject_id()),
+    )
+    measure(
+        "Subject permissions, key reads",
+        table,
+        args.lookups,
+        lambda: adapter.get_permissions_for_subject(subject_id()),
+    )
+    measure(
+        "Validate permissions, partition query",
+        table,
+        args.lookups,
+        lambda: partition_find_permissions(adapter, random.sample(permissions, 5)),
+    )
+    measure(
+        "Validate permissions, key reads",
+        table,
+        args.lookups,
+        lambda: adapter.validate_permissions(random.sample(permissions, 5)),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Measures the throughput of upload validation on a synthetic dataset, for the pandas pipeline and
+the Arrow-native pipeline. Validation runs in a single thread, so the rows per second reported
+are per core. Each validation step is also timed on its own to show where the time is spent.
+
+Run from the api directory with:
+
+    python -m test.benchmark.benchmark_validation --rows 1000000 --columns 100
+"""
+import argparse
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from api.application.services import dataset_validation
+from api.application.services.arrow_dataset_validation import build_validated_table
+from api.domain.schema import Column, Schema
+from api.domain.schema_metadata import SchemaMetadata
+
+COLUMN_TYPES = ["int", "double", "string", "boolean"]
+
+
+def build_schema(columns: int) -> Schema:
+    return Schema(
+        metadata=SchemaMetadata(
+            layer="raw", domain="benchmark", dataset="validation", sensitivity="PUBLIC"
+        ),
+        columns=[
+            Column(
+                name=f"column_{index}",
+                partition_index=0 if index == 2 else None,
+                data_type=COLUMN_TYPES[index % len(COLUMN_TYPES)],
+                allow_null=index % 2 == 0,
+            )
+            for index in range(columns)
+        ],
+    )
+
+
+def build_dataframe(schema: Schema, rows: int) -> pd.DataFrame:
+    generator = np.random.default_rng(0)
+    generators = {
+        "int": lambda: generator.integers(0, 1000, rows),
+        "double": lambda: generator.random(rows),
+        "string": lambda: generator.choice(["alpha", "beta", "gamma", "delta"], rows),
+        "boolean": lambda: generator.random(rows) > 0.5,
+    }
+    return pd.DataFrame(
+        {column.name: generators[column.data_type]() for column in schema.columns}
+    )
+
+
+def time_call(function: Callable, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark upload validation")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--columns", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    schema = build_schema(args.columns)
+    dataframe = build_dataframe(schema, args.rows)
+    batch = pa.RecordBatch.from_pandas(dataframe, preserve_index=False)
+
+    steps = {
+        "remove_empty_rows": lambda: dataset_validation.remove_empty_rows(
+            dataframe.copy(deep=False)
+        ),
+        "dataset_has_correct_columns": lambda: dataset_validation.dataset_has_correct_columns(
+            dataframe, schema
+        ),
+        "dataset_has_acceptable_null_values": lambda: dataset_validation.dataset_has_acceptable_null_values(
+            dataframe, schema
+        ),
+        "dataset_has_correct_data_types": lambda: dataset_validation.dataset_has_correct_data_types(
+            dataframe, schema
+        ),
+        "dataset_has_no_illegal_characters_in_partition_columns": lambda: dataset_validation.dataset_has_no_illegal_characters_in_partition_columns(
+            dataframe, schema
+        ),
+    }
+    for name, step in steps.items():
+        print(f"{name:<56} {time_call(step, args.repeats):.3f}s")
+
+    pandas_time = time_call(
+        lambda: dataset_validation.build_validated_dataframe(
+            schema, dataframe.copy(deep=False)
+        ),
+        args.repeats,
+    )
+    arrow_time = time_call(lambda: build_validated_table(schema, batch), args.repeats)
+
+    print(f"Rows x columns: {args.rows} x {args.columns}")
+    print(
+        f"Pandas:  {pandas_time:.3f}s, {args.rows / pandas_time:,.0f} rows/s per core"
+    )
+    print(f"Arrow:   {arrow_time:.3f}s, {args.rows / arrow_time:,.0f} rows/s per core")
+
+
+if __name__ == "__main__":
+    main()
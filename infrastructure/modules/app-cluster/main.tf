@@ -10,6 +10,7 @@ locals {
     "RESOURCE_PREFIX" : var.resource-name-prefix,
     "COGNITO_USER_LOGIN_APP_CREDENTIALS_SECRETS_NAME" : var.cognito_user_login_app_credentials_secrets_name
     "CUSTOM_USER_NAME_REGEX" : var.custom_user_name_regex
+    "ATHENA_ADMISSION_REPLICAS" : tostring(var.app-replica-count-max)
   }, var.project_information)
 }
 
@@ -140,6 +141,7 @@ resource "aws_iam_policy" "app_glue_access" {
           "glue:GetDatabases",
           "glue:UpdateTable",
           "glue:BatchDeleteTable",
+          "glue:BatchCreatePartition",
           "glue:CreateTable"
         ],
         "Resource" : [
@@ -205,6 +207,7 @@ resource "aws_iam_policy" "app_dynamodb_access" {
         Resource : [
           var.permissions_table_arn,
           var.schema_table_arn,
+          "${var.schema_table_arn}/index/*",
           aws_dynamodb_table.service_table.arn,
           "${aws_dynamodb_table.service_table.arn}/index/*"
         ]
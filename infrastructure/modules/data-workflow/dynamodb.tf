@@ -14,6 +14,25 @@ resource "aws_dynamodb_table" "schema_table" {
     type = "N"
   }
 
+  attribute {
+    name = "CatalogPK"
+    type = "S"
+  }
+
+  attribute {
+    name = "CatalogSK"
+    type = "S"
+  }
+
+  # Only the latest version of each schema has the catalog keys, keyed by layer/sensitivity
+  # and domain/dataset
+  global_secondary_index {
+    name            = "SCHEMA_CATALOG"
+    hash_key        = "CatalogPK"
+    range_key       = "CatalogSK"
+    projection_type = "ALL"
+  }
+
   point_in_time_recovery {
     enabled = true
   }
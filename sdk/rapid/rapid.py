@@ -6,13 +6,14 @@ from datetime import datetime
 from typing import Dict, Optional
 
 import pandas as pd
+import pyarrow as pa
 
 from pandas import DataFrame
 
 from ShareEz.auth import ShareEzAuth
 from ShareEz.items.schema import Schema
 from ShareEz.items.query import Query
-from ShareEz.utils.constants import TIMEOUT_PERIOD
+from ShareEz.utils.constants import ARROW_STREAM_MIME_TYPE, TIMEOUT_PERIOD
 from ShareEz.exceptions import (
     DataFrameUploadFailedException,
     DataFrameUploadValidationException,
@@ -128,21 +129,26 @@ class ShareEz:
                 we throw the dataset not found exception.
 
         Returns:
-            DataFrame: A pandas DataFrame of the data
+            DataFrame: A pandas DataFrame of the data, with the column types of the dataset
         """
         url = f"{self.auth.url}/datasets/{layer}/{domain}/{dataset}/query"
         if version is not None:
             url = f"{url}?version={version}"
         response = requests.post(
             url,
-            headers=self.generate_headers(),
+            headers={**self.generate_headers(), "Accept": ARROW_STREAM_MIME_TYPE},
             data=json.dumps(query.dict(exclude_none=True)),
             timeout=TIMEOUT_PERIOD,
         )
-        data = json.loads(response.content.decode("utf-8"))
         if response.status_code == 200:
-            return pd.read_json(json.dumps(data), orient="index")
+            # Converting block by block and releasing the Arrow buffers as they are converted
+            # avoids holding two full copies of the data
+            table = pa.ipc.open_stream(response.content).read_all()
+            return table.to_pandas(split_blocks=True, self_destruct=True)
+        if response.status_code == 204:
+            return pd.DataFrame()
 
+        data = json.loads(response.content.decode("utf-8"))
         raise DatasetNotFoundException(
             f"Could not find dataset, {layer}/{domain}/{dataset} to download", data
         )
@@ -1 +1,2 @@
 TIMEOUT_PERIOD = 30
+ARROW_STREAM_MIME_TYPE = "application/vnd.apache.arrow.stream"
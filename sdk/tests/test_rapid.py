@@ -2,6 +2,7 @@ from mock import Mock, call
 import pytest
 import io
 import pandas as pd
+import pyarrow as pa
 from requests_mock import Mocker
 
 from ShareEz import ShareEz
@@ -26,6 +27,14 @@ from ShareEz.exceptions import (
 )
 from .conftest import ShareEz_URL, ShareEz_TOKEN
 
+def arrow_stream(df: pd.DataFrame) -> bytes:
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
 DUMMY_SCHEMA = {
     "metadata": {
         "layer": "raw",
@@ -120,16 +129,24 @@ class TestShareEz:
         dataset = "test_dataset"
         requests_mock.post(
             f"{ShareEz_URL}/datasets/{layer}/{domain}/{dataset}/query",
-            json={
-                "0": {"column1": "value1", "column2": "value2"},
-                "2": {"column1": "value3", "column2": "value4"},
-                "3": {"column1": "value5", "column2": "value6"},
-            },
+            content=arrow_stream(
+                pd.DataFrame(
+                    {
+                        "column1": ["value1", "value3", "value5"],
+                        "column2": [2, 4, 6],
+                    }
+                )
+            ),
             status_code=200,
         )
         res = ShareEz.download_dataframe(layer, domain, dataset)
         assert res.shape == (3, 2)
         assert list(res.columns) == ["column1", "column2"]
+        assert res["column2"].dtype == "int64"
+        assert (
+            requests_mock.last_request.headers["Accept"]
+            == "application/vnd.apache.arrow.stream"
+        )
 
     @pytest.mark.usefixtures("requests_mock", "ShareEz")
     def test_download_dataframe_success_with_version(
@@ -141,17 +158,35 @@ class TestShareEz:
         version = "5"
         requests_mock.post(
             f"{ShareEz_URL}/datasets/{layer}/{domain}/{dataset}/query?version=5",
-            json={
-                "0": {"column1": "value1", "column2": "value2"},
-                "2": {"column1": "value3", "column2": "value4"},
-                "3": {"column1": "value5", "column2": "value6"},
-            },
+            content=arrow_stream(
+                pd.DataFrame(
+                    {
+                        "column1": ["value1", "value3", "value5"],
+                        "column2": ["value2", "value4", "value6"],
+                    }
+                )
+            ),
             status_code=200,
         )
         res = ShareEz.download_dataframe(layer, domain, dataset, version)
         assert res.shape == (3, 2)
         assert list(res.columns) == ["column1", "column2"]
 
+    @pytest.mark.usefixtures("requests_mock", "ShareEz")
+    def test_download_dataframe_returns_empty_dataframe_when_no_rows(
+        self, requests_mock: Mocker, ShareEz: ShareEz
+    ):
+        layer = "raw"
+        domain = "test_domain"
+        dataset = "test_dataset"
+        requests_mock.post(
+            f"{ShareEz_URL}/datasets/{layer}/{domain}/{dataset}/query",
+            text="No rows were returned. Either there is no data or the query is too limiting.",
+            status_code=204,
+        )
+        res = ShareEz.download_dataframe(layer, domain, dataset)
+        assert res.empty
+
     @pytest.mark.usefixtures("requests_mock", "ShareEz")
     def test_upload_dataframe_success_after_waiting(
         self, requests_mock: Mocker, ShareEz: ShareEz